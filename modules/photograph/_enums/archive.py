@@ -0,0 +1,46 @@
+from enum import StrEnum
+
+
+class ArchiveCodec(StrEnum):
+    """归档文件的压缩方式"""
+
+    NONE = "none"
+    """只打包，不压缩"""
+
+    GZIP = "gz"
+    """gzip，压缩和解压最快"""
+
+    XZ = "xz"
+    """xz(LZMA2)，压缩率最高"""
+
+    BZIP2 = "bz2"
+    """bzip2"""
+
+    @property
+    def ext(self) -> str:
+        """归档文件后缀"""
+        return ".tar" if self == ArchiveCodec.NONE else f".tar.{self.value}"
+
+
+class ArchiveTimeSource(StrEnum):
+    """归档文件名中时间戳的来源"""
+
+    MTIME = "mtime"
+    """归档文件的修改时间，同步和复制时可能被重置"""
+
+    MEMBER_MTIME = "member-mtime"
+    """归档中最新成员的修改时间，只读取成员索引或 tar/zip 头"""
+
+    MEMBER_EXIF = "member-exif"
+    """归档中最新照片的拍摄时间，只读取每张照片开头的 EXIF，没有照片时使用成员的修改时间"""
+
+
+ARCHIVE_FILE_EXT = [
+    ".7z",  # 极致压缩率
+    ".zip",  # 最常见的格式
+    ".tar",  # 仅打包
+    *[".tar.gz", ".tgz"],
+    *[".tar.bz2", ".tbz2"],
+    *[".tar.xz", ".txz"],
+]
+"""支持的归档文件后缀"""
@@ -0,0 +1,11 @@
+from enum import StrEnum
+
+
+class PerceptualHash(StrEnum):
+    """感知哈希算法"""
+
+    DHASH = "dhash"
+    """差异哈希：9x8 灰度图相邻像素的大小关系，计算最快"""
+
+    PHASH = "phash"
+    """DCT 哈希：32x32 灰度图 DCT 低频系数与中位数的大小关系，对亮度和压缩更稳定"""
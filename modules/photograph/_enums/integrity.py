@@ -0,0 +1,17 @@
+from enum import StrEnum
+
+
+class ScrubIssueKind(StrEnum):
+    """完整性校验发现的问题"""
+
+    MISMATCH = "mismatch"
+    """stat 没有变化但校验和不一致，可能是静默损坏"""
+
+    MODIFIED = "modified"
+    """stat 和校验和都发生变化，文件被修改过（已更新清单）"""
+
+    MISSING = "missing"
+    """清单中的文件已经不存在（已从清单中删除）"""
+
+    ERROR = "error"
+    """读取文件失败"""
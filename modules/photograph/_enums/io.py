@@ -0,0 +1,47 @@
+from enum import StrEnum
+
+
+class ReadOrder(StrEnum):
+    """批量读取文件元数据时的调度顺序"""
+
+    LISTDIR = "listdir"
+    """按 `os.listdir` 返回的顺序读取（不调度）"""
+
+    INODE = "inode"
+    """按目录分批，目录内按 inode 编号排序，大多数文件系统上接近磁盘布局"""
+
+    PHYSICAL = "physical"
+    """按目录分批，目录内按文件首个数据块的物理偏移排序（Linux FIEMAP / macOS F_LOG2PHYS），
+    无法获取物理偏移时退化为 inode 排序"""
+
+
+class PrefetchMode(StrEnum):
+    """文件头预读方式"""
+
+    AUTO = "auto"
+    """支持 `posix_fadvise` 时使用 FADVISE，否则使用 READ"""
+
+    FADVISE = "fadvise"
+    """通过 `posix_fadvise(POSIX_FADV_WILLNEED)` 通知内核异步预读"""
+
+    READ = "read"
+    """在后台线程中读取文件头，填充页缓存"""
+
+
+class MoveMethod(StrEnum):
+    """移动文件时实际使用的方式"""
+
+    RENAME = "rename"
+    """同一文件系统内 `os.rename`，不复制数据"""
+
+    REFLINK = "reflink"
+    """写时复制克隆（Linux FICLONE，Btrfs/XFS 等），不复制数据"""
+
+    COPY_FILE_RANGE = "copy_file_range"
+    """`os.copy_file_range`，在内核中复制，部分文件系统上为服务端复制"""
+
+    SENDFILE = "sendfile"
+    """`os.sendfile`，在内核中复制"""
+
+    COPY = "copy"
+    """用户态的分块复制"""
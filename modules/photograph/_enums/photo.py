@@ -53,6 +53,14 @@ class SupportedPhotoHeifExt(StrEnum):
     """高效图像格式（HIF）"""
 
 
+class SupportedVideoExt(StrEnum):
+    MP4 = ".mp4"
+    """MP4 视频"""
+
+    MOV = ".mov"
+    """QuickTime 视频"""
+
+
 class ExifImageMake(StrEnum):
     """相机制造商枚举"""
 
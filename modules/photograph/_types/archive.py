@@ -0,0 +1,94 @@
+import gzip
+import json
+import os
+from datetime import datetime
+from typing import List
+
+from pydantic import BaseModel, Field
+
+from modules.photograph._enums.archive import ArchiveCodec
+
+ARCHIVE_MANIFEST_VERSION = 2
+"""归档成员索引文件格式版本"""
+
+MEMBER_INDEX_SUFFIX = ".members.json.gz"
+"""归档成员索引文件的后缀，索引文件与归档文件位于同一目录，例如 `album~20250501_120000.tar.gz.members.json.gz`"""
+
+
+class ArchiveMember(BaseModel):
+    name: str
+    """成员在归档中的路径"""
+
+    size: int
+    """文件大小"""
+
+    mtime: float
+    """修改时间(s)"""
+
+    offset: int
+    """成员 tar 头在未压缩数据流中的偏移"""
+
+    data_offset: int
+    """成员数据在未压缩数据流中的偏移"""
+
+
+class ArchiveChunk(BaseModel):
+    raw_offset: int
+    """数据块在未压缩数据流中的偏移"""
+
+    offset: int
+    """压缩后的数据块在归档文件中的偏移，从这里开始可以独立解压"""
+
+    size: int
+    """压缩后的数据块大小"""
+
+
+class ArchiveManifest(BaseModel):
+    """
+    归档成员索引：记录每个成员的位置，以及每个独立压缩的数据块的位置，
+    不解压整个归档就可以列出成员，读取单个成员时只需要解压其所在的数据块
+    """
+
+    version: int = ARCHIVE_MANIFEST_VERSION
+    """文件格式版本"""
+
+    codec: ArchiveCodec = ArchiveCodec.NONE
+    """压缩方式"""
+
+    created_at: datetime = Field(default_factory=datetime.now)
+    """索引生成时间"""
+
+    size: int = 0
+    """归档文件大小，与归档文件不一致时索引已经失效"""
+
+    chunk_bytes: int = 0
+    """每个数据块压缩前的最大大小，每个成员都从新的数据块开始"""
+
+    chunks: List[ArchiveChunk] = Field(default_factory=list)
+    """独立压缩的数据块"""
+
+    members: List[ArchiveMember] = Field(default_factory=list)
+    """归档成员"""
+
+    @staticmethod
+    def path_of(archive_file: str) -> str:
+        """归档文件对应的索引文件路径"""
+        return f"{archive_file}{MEMBER_INDEX_SUFFIX}"
+
+    def save(self, manifest_file: str) -> None:
+        data = self.model_dump(mode="json")
+        content = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        tmp_file = f"{manifest_file}.tmp"
+        with gzip.open(tmp_file, "wb") as f:
+            f.write(content.encode("utf-8"))
+        os.replace(tmp_file, manifest_file)
+
+    @classmethod
+    def load(cls, manifest_file: str) -> "ArchiveManifest":
+        with gzip.open(manifest_file, "rb") as f:
+            manifest = cls.model_validate_json(f.read())
+        if manifest.version != ARCHIVE_MANIFEST_VERSION:
+            raise ValueError(
+                f"unsupported archive manifest version {manifest.version} in '{manifest_file}'"
+            )
+        return manifest
@@ -0,0 +1,439 @@
+"""
+列式照片目录：将大量照片的元数据存储在连续的 NumPy 数组中，替代逐文件的 pydantic 对象
+"""
+
+import os
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+
+from modules.photograph._types.photo import ExifData, PhotoInfo
+from modules.photograph.exif.tiff import GpsCoordinate
+
+if TYPE_CHECKING:
+    from modules.photograph.index.geo_index import GeoGridIndex
+
+NAT = np.datetime64("NaT", "s")
+"""缺失的拍摄时间"""
+
+
+class _StringTable:
+    """字符串编码表，将重复的字符串（目录、品牌、型号）编码为整数"""
+
+    def __init__(self, values: Optional[List[str]] = None):
+        self.values: List[str] = list(values or [])
+        self._codes: Dict[str, int] = {v: i for i, v in enumerate(self.values)}
+
+    def encode(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self._codes[value] = code
+        return code
+
+
+class PhotoCatalogBuilder:
+    """逐行追加照片元数据，最后一次性生成 `PhotoCatalog`"""
+
+    def __init__(self):
+        self._dirs = _StringTable()
+        self._makes = _StringTable()
+        self._models = _StringTable()
+        self._dir_ids: List[int] = []
+        self._names: List[bytes] = []
+        self._sizes: List[int] = []
+        self._capture_times: List[Optional[datetime]] = []
+        self._make_ids: List[int] = []
+        self._model_ids: List[int] = []
+        self._file_ids: List[int] = []
+        self._gps: List[Tuple[float, float, float]] = []
+
+    def append(
+        self,
+        file_path: str,
+        size: int,
+        date_time_original: Optional[datetime],
+        make: str = "",
+        model: str = "",
+        file_id: int = 0,
+        gps: Optional[GpsCoordinate] = None,
+    ) -> None:
+        parent_dir, file_name = os.path.split(file_path)
+        self._dir_ids.append(self._dirs.encode(parent_dir))
+        self._names.append(file_name.encode("utf-8"))
+        self._sizes.append(size)
+        self._capture_times.append(date_time_original)
+        self._make_ids.append(self._makes.encode(make))
+        self._model_ids.append(self._models.encode(model))
+        self._file_ids.append(file_id)
+        if gps is None:
+            self._gps.append((np.nan, np.nan, np.nan))
+        else:
+            altitude = np.nan if gps.altitude is None else gps.altitude
+            self._gps.append((gps.latitude, gps.longitude, altitude))
+
+    def build(self) -> "PhotoCatalog":
+        name_lengths = np.fromiter(
+            (len(n) for n in self._names), dtype=np.int64, count=len(self._names)
+        )
+        name_offsets = np.zeros(len(self._names) + 1, dtype=np.int64)
+        np.cumsum(name_lengths, out=name_offsets[1:])
+        gps = np.asarray(self._gps, dtype=np.float64).reshape(-1, 3)
+        return PhotoCatalog(
+            dirs=self._dirs.values,
+            makes=self._makes.values,
+            models=self._models.values,
+            dir_id=np.asarray(self._dir_ids, dtype=np.int32),
+            name_data=np.frombuffer(b"".join(self._names), dtype=np.uint8),
+            name_offsets=name_offsets,
+            size=np.asarray(self._sizes, dtype=np.int64),
+            capture_time=np.array(
+                [
+                    NAT if t is None else np.datetime64(t, "s")
+                    for t in self._capture_times
+                ],
+                dtype="datetime64[s]",
+            ),
+            make_id=np.asarray(self._make_ids, dtype=np.int32),
+            model_id=np.asarray(self._model_ids, dtype=np.int32),
+            file_id=np.asarray(self._file_ids, dtype=np.int64),
+            latitude=gps[:, 0].copy(),
+            longitude=gps[:, 1].copy(),
+            altitude=gps[:, 2].copy(),
+        )
+
+
+class ExifRow:
+    """`ExifData` 兼容的只读行视图"""
+
+    __slots__ = ("_catalog", "_index")
+
+    def __init__(self, catalog: "PhotoCatalog", index: int):
+        self._catalog = catalog
+        self._index = index
+
+    @property
+    def date_time_original(self) -> Optional[datetime]:
+        value = self._catalog.capture_time[self._index]
+        return None if np.isnat(value) else value.astype(datetime)
+
+    @property
+    def make(self) -> str:
+        return self._catalog.makes[self._catalog.make_id[self._index]]
+
+    @property
+    def model(self) -> str:
+        return self._catalog.models[self._catalog.model_id[self._index]]
+
+    @property
+    def gps(self) -> Optional[GpsCoordinate]:
+        latitude = self._catalog.latitude[self._index]
+        if np.isnan(latitude):
+            return None
+        altitude = self._catalog.altitude[self._index]
+        return GpsCoordinate(
+            float(latitude),
+            float(self._catalog.longitude[self._index]),
+            None if np.isnan(altitude) else float(altitude),
+        )
+
+
+class PhotoRow:
+    """
+    `PhotoInfo` 兼容的只读行视图，只持有目录和行号，访问属性时才从数组中读取。
+    同时提供 `photo_info` 属性，使 `XPhoto` 的调用方式 `row.photo_info.exif_data.date_time_original` 保持可用。
+    """
+
+    __slots__ = ("_catalog", "_index")
+
+    def __init__(self, catalog: "PhotoCatalog", index: int):
+        self._catalog = catalog
+        self._index = index
+
+    @property
+    def photo_info(self) -> "PhotoRow":
+        return self
+
+    @property
+    def index(self) -> int:
+        """行号"""
+        return self._index
+
+    @property
+    def file_name(self) -> str:
+        return self._catalog.name_at(self._index)
+
+    @property
+    def file_path(self) -> str:
+        return os.path.join(
+            self._catalog.dirs[self._catalog.dir_id[self._index]], self.file_name
+        )
+
+    @property
+    def file_ext(self) -> str:
+        return os.path.splitext(self.file_name)[1]
+
+    @property
+    def size(self) -> int:
+        return int(self._catalog.size[self._index])
+
+    @property
+    def file_id(self) -> int:
+        return int(self._catalog.file_id[self._index])
+
+    @property
+    def exif_data(self) -> ExifRow:
+        return ExifRow(self._catalog, self._index)
+
+    def to_photo_info(self) -> PhotoInfo:
+        """生成完整的 `PhotoInfo` 对象"""
+        return PhotoInfo(
+            file_path=self.file_path,
+            file_name=self.file_name,
+            file_ext=self.file_ext,
+            exif_data=ExifData(date_time_original=self.exif_data.date_time_original),
+        )
+
+    def __repr__(self) -> str:
+        return f"PhotoRow({self.file_path!r}, {self.exif_data.date_time_original})"
+
+
+class PhotoCatalog:
+    """
+    列式照片目录
+
+    - 路径: 目录编码 `dir_id` + 文件名（UTF-8 拼接在 `name_data` 中，`name_offsets` 为偏移）
+    - 文件大小 `size`、文件 id（inode 编号）`file_id`
+    - 拍摄时间 `capture_time`，`datetime64[s]`，缺失时为 NaT
+    - 相机品牌/型号编码 `make_id`/`model_id`，对应 `makes`/`models`
+    - GPS 坐标 `latitude`/`longitude`/`altitude`，缺失时为 NaN
+
+    排序、过滤和分组只操作数组，返回共享编码表的新目录；按行访问时返回 `PhotoRow` 视图。
+    """
+
+    def __init__(
+        self,
+        dirs: List[str],
+        makes: List[str],
+        models: List[str],
+        dir_id: np.ndarray,
+        name_data: np.ndarray,
+        name_offsets: np.ndarray,
+        size: np.ndarray,
+        capture_time: np.ndarray,
+        make_id: np.ndarray,
+        model_id: np.ndarray,
+        file_id: np.ndarray,
+        latitude: Optional[np.ndarray] = None,
+        longitude: Optional[np.ndarray] = None,
+        altitude: Optional[np.ndarray] = None,
+    ):
+        self.dirs = dirs
+        self.makes = makes
+        self.models = models
+        self.dir_id = dir_id
+        self.name_data = name_data
+        self.name_offsets = name_offsets
+        self.size = size
+        self.capture_time = capture_time
+        self.make_id = make_id
+        self.model_id = model_id
+        self.file_id = file_id
+        missing = np.full(len(file_id), np.nan)
+        self.latitude = missing if latitude is None else latitude
+        self.longitude = missing.copy() if longitude is None else longitude
+        self.altitude = missing.copy() if altitude is None else altitude
+
+    @classmethod
+    def from_files(
+        cls,
+        file_paths: Sequence[str],
+        min_workers: int = 1,
+        max_workers: int = 8,
+        skip_errors: bool = False,
+    ) -> "PhotoCatalog":
+        """
+        并发读取照片的元数据并生成目录，目录中的行与 `file_paths` 顺序一致
+
+        Args:
+            file_paths (Sequence[str]): 图片文件路径
+            min_workers (int): 并发数下限
+            max_workers (int): 并发数上限
+            skip_errors (bool): 是否跳过读取失败的文件，否则抛出第一个错误
+        """
+        from modules.photograph.utils._concurrency import (
+            AdaptiveConcurrency,
+            adaptive_map,
+        )
+        from modules.photograph.utils._metadata import read_capture_metadata
+
+        def read(file_path: str):
+            return os.stat(file_path), read_capture_metadata(file_path)
+
+        controller = AdaptiveConcurrency(
+            min_workers=min_workers, max_workers=max_workers, name="catalog"
+        )
+        results = {}
+        for file_path, future in adaptive_map(read, file_paths, controller):
+            try:
+                results[file_path] = future.result()
+            except Exception as e:
+                if not skip_errors:
+                    raise
+                logger.warning(f"read metadata of '{file_path}' error: {e}")
+
+        builder = PhotoCatalogBuilder()
+        for file_path in file_paths:
+            if file_path not in results:
+                continue
+            st, metadata = results[file_path]
+            builder.append(
+                file_path,
+                size=st.st_size,
+                date_time_original=metadata.date_time_original,
+                make=metadata.make,
+                model=metadata.model,
+                file_id=st.st_ino,
+                gps=metadata.gps,
+            )
+        return builder.build()
+
+    def __len__(self) -> int:
+        return len(self.dir_id)
+
+    def __getitem__(self, index: int) -> PhotoRow:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"catalog index {index} out of range")
+        return PhotoRow(self, index)
+
+    def __iter__(self) -> Iterator[PhotoRow]:
+        return (PhotoRow(self, i) for i in range(len(self)))
+
+    def name_at(self, index: int) -> str:
+        start, end = self.name_offsets[index], self.name_offsets[index + 1]
+        return self.name_data[start:end].tobytes().decode("utf-8")
+
+    def take(self, indices: np.ndarray) -> "PhotoCatalog":
+        """按行号选取子目录，编码表在新旧目录之间共享"""
+        indices = np.asarray(indices, dtype=np.int64)
+        starts = self.name_offsets[indices]
+        lengths = self.name_offsets[indices + 1] - starts
+        name_offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=name_offsets[1:])
+        # 将每个文件名的字节范围展开为下标，一次性拷贝
+        byte_index = np.repeat(starts - name_offsets[:-1], lengths) + np.arange(
+            name_offsets[-1]
+        )
+        return PhotoCatalog(
+            dirs=self.dirs,
+            makes=self.makes,
+            models=self.models,
+            dir_id=self.dir_id[indices],
+            name_data=self.name_data[byte_index],
+            name_offsets=name_offsets,
+            size=self.size[indices],
+            capture_time=self.capture_time[indices],
+            make_id=self.make_id[indices],
+            model_id=self.model_id[indices],
+            file_id=self.file_id[indices],
+            latitude=self.latitude[indices],
+            longitude=self.longitude[indices],
+            altitude=self.altitude[indices],
+        )
+
+    def sort(self) -> "PhotoCatalog":
+        """按拍摄时间升序排序（稳定排序，缺失拍摄时间的排在最后）"""
+        return self.take(np.argsort(self.capture_time, kind="stable"))
+
+    def filter(self, mask: np.ndarray) -> "PhotoCatalog":
+        """按布尔掩码过滤"""
+        return self.take(np.flatnonzero(mask))
+
+    def make_mask(self, make: str) -> np.ndarray:
+        """相机品牌等于 `make` 的掩码"""
+        return self.make_id == self._code_of(self.makes, make)
+
+    def model_mask(self, model: str) -> np.ndarray:
+        """相机型号等于 `model` 的掩码"""
+        return self.model_id == self._code_of(self.models, model)
+
+    def time_mask(
+        self, start: Optional[datetime] = None, end: Optional[datetime] = None
+    ) -> np.ndarray:
+        """拍摄时间在 [start, end) 范围内的掩码"""
+        mask = ~np.isnat(self.capture_time)
+        if start is not None:
+            mask &= self.capture_time >= np.datetime64(start, "s")
+        if end is not None:
+            mask &= self.capture_time < np.datetime64(end, "s")
+        return mask
+
+    def group_by_day(self) -> List[Tuple[np.datetime64, "PhotoCatalog"]]:
+        """按拍摄日期分组，组内按拍摄时间排序，缺失拍摄时间的照片不参与分组"""
+        valid = np.flatnonzero(~np.isnat(self.capture_time))
+        order = valid[np.argsort(self.capture_time[valid], kind="stable")]
+        days = self.capture_time[order].astype("datetime64[D]")
+        unique_days, starts = np.unique(days, return_index=True)
+        groups = np.split(order, starts[1:])
+        return [(day, self.take(group)) for day, group in zip(unique_days, groups)]
+
+    def cluster_by_time(self, gap_s: float, by_camera: bool = True) -> np.ndarray:
+        """
+        按拍摄时间聚类：只排序一次，排序后相邻照片的拍摄时间相差不超过 `gap_s` 秒
+        （`by_camera=True` 时还需要是同一相机品牌和型号）的照片属于同一组
+
+        Returns:
+            np.ndarray: 每一行的分组编号，按每组第一张照片的拍摄时间从 0 开始编号，
+                缺失拍摄时间的照片为 -1
+        """
+        labels = np.full(len(self), -1, dtype=np.int64)
+        valid = np.flatnonzero(~np.isnat(self.capture_time))
+        if len(valid) == 0:
+            return labels
+        times = self.capture_time[valid].astype(np.int64)
+        if by_camera:
+            make_id, model_id = self.make_id[valid], self.model_id[valid]
+            order = np.lexsort((times, model_id, make_id))
+        else:
+            order = np.argsort(times, kind="stable")
+        times = times[order]
+        new_group = np.ones(len(order), dtype=bool)
+        new_group[1:] = np.diff(times) > gap_s
+        if by_camera:
+            new_group[1:] |= (np.diff(make_id[order]) != 0) | (
+                np.diff(model_id[order]) != 0
+            )
+        group = np.cumsum(new_group) - 1
+        # 按相机排序后的分组编号改为按开始时间编号
+        starts = np.flatnonzero(new_group)
+        rank = np.empty(len(starts), dtype=np.int64)
+        rank[np.argsort(times[starts], kind="stable")] = np.arange(len(starts))
+        labels[valid[order]] = rank[group]
+        return labels
+
+    def geo_index(self, cell_km: float = 1.0) -> "GeoGridIndex":
+        """在有 GPS 坐标的照片上建立网格空间索引，索引返回的下标为目录中的行号"""
+        from modules.photograph.index.geo_index import GeoGridIndex
+
+        return GeoGridIndex(self.latitude, self.longitude, cell_km=cell_km)
+
+    def cluster_locations(self, eps_km: float = 1.0) -> np.ndarray:
+        """
+        按拍摄地点聚类：距离不超过 `eps_km` 的照片（以及经由它们相连的照片）属于同一个地点
+
+        Returns:
+            np.ndarray: 每一行的地点编号，没有 GPS 坐标的照片为 -1
+        """
+        return self.geo_index(cell_km=eps_km).cluster(eps_km)
+
+    @staticmethod
+    def _code_of(values: List[str], value: str) -> int:
+        try:
+            return values.index(value)
+        except ValueError:
+            return -1
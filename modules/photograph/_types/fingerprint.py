@@ -0,0 +1,32 @@
+import os
+import typing
+
+from pydantic import BaseModel
+
+
+class FileFingerprint(BaseModel):
+    """文件的 stat 指纹，用于在不读取文件内容的情况下判断文件是否发生变化"""
+
+    size: int
+    """文件大小(byte)"""
+
+    mtime_ns: int
+    """最后修改时间(ns)"""
+
+    ino: int = 0
+    """inode 编号"""
+
+    @classmethod
+    def from_stat(cls, st: os.stat_result) -> "FileFingerprint":
+        return cls(size=st.st_size, mtime_ns=st.st_mtime_ns, ino=st.st_ino)
+
+    @classmethod
+    def from_path(cls, file_path: typing.Union[str, os.PathLike]) -> "FileFingerprint":
+        return cls.from_stat(os.stat(file_path))
+
+    def matches(self, file_path: typing.Union[str, os.PathLike]) -> bool:
+        """检查文件当前的 stat 是否与指纹一致，文件不存在时返回 False"""
+        try:
+            return self == FileFingerprint.from_path(file_path)
+        except OSError:
+            return False
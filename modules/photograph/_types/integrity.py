@@ -0,0 +1,130 @@
+import gzip
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from modules.photograph._enums.integrity import ScrubIssueKind
+
+INTEGRITY_MANIFEST_VERSION = 1
+"""完整性清单文件格式版本"""
+
+INTEGRITY_MANIFEST_NAME = ".integrity.json.gz"
+"""完整性清单的文件名，位于相册目录下，以 `.` 开头，不会被归档和索引"""
+
+
+class IntegrityEntry(BaseModel):
+    size: int
+    """文件大小(byte)"""
+
+    mtime_ns: int
+    """最后修改时间(ns)"""
+
+    ino: int
+    """inode 编号"""
+
+    checksum: str
+    """BLAKE2b 校验和"""
+
+    verified_at: float
+    """最后一次校验和一致的时间(s)"""
+
+
+class IntegrityManifest(BaseModel):
+    """
+    相册的完整性清单：相册中每个文件的 stat 和校验和，路径相对于相册目录
+    """
+
+    version: int = INTEGRITY_MANIFEST_VERSION
+    """文件格式版本"""
+
+    files: Dict[str, IntegrityEntry] = Field(default_factory=dict)
+    """相对路径 -> 清单条目"""
+
+    @staticmethod
+    def path_of(album_dir: str) -> str:
+        """相册对应的清单文件路径"""
+        return os.path.join(album_dir, INTEGRITY_MANIFEST_NAME)
+
+    def save(self, manifest_file: str) -> None:
+        data = self.model_dump(mode="json")
+        content = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        tmp_file = f"{manifest_file}.tmp"
+        with gzip.open(tmp_file, "wb") as f:
+            f.write(content.encode("utf-8"))
+        os.replace(tmp_file, manifest_file)
+
+    @classmethod
+    def load(cls, manifest_file: str) -> "IntegrityManifest":
+        """加载清单，文件不存在时返回空清单"""
+        if not os.path.exists(manifest_file):
+            return cls()
+        with gzip.open(manifest_file, "rb") as f:
+            manifest = cls.model_validate_json(f.read())
+        if manifest.version != INTEGRITY_MANIFEST_VERSION:
+            raise ValueError(
+                f"unsupported integrity manifest version {manifest.version} in '{manifest_file}'"
+            )
+        return manifest
+
+
+class ScrubIssue(BaseModel):
+    kind: ScrubIssueKind
+    """问题类型"""
+
+    path: str
+    """文件路径"""
+
+    size: Optional[int] = None
+    """文件大小(byte)"""
+
+    expected: Optional[str] = None
+    """清单中记录的校验和"""
+
+    actual: Optional[str] = None
+    """重新计算的校验和"""
+
+    message: Optional[str] = None
+    """错误信息"""
+
+
+class ScrubReport(BaseModel):
+    started_at: datetime = Field(default_factory=datetime.now)
+    """开始时间"""
+
+    finished_at: Optional[datetime] = None
+    """结束时间"""
+
+    albums: int = 0
+    """检查的相册数量"""
+
+    files: int = 0
+    """相册中的文件数量"""
+
+    added: int = 0
+    """新加入清单的文件数量"""
+
+    updated: int = 0
+    """stat 发生变化、重新计算校验和的文件数量"""
+
+    verified: int = 0
+    """stat 未变化、复查后校验和一致的文件数量"""
+
+    deferred: int = 0
+    """超出预算、留到之后运行时再计算校验和的新文件和 stat 发生变化的文件数量"""
+
+    bytes_read: int = 0
+    """计算校验和读取的数据量"""
+
+    issues: List[ScrubIssue] = Field(default_factory=list)
+    """发现的问题"""
+
+    @property
+    def has_errors(self) -> bool:
+        """是否存在可能的损坏或者读取失败"""
+        return any(
+            issue.kind in (ScrubIssueKind.MISMATCH, ScrubIssueKind.ERROR)
+            for issue in self.issues
+        )
@@ -1,7 +1,11 @@
 import os
 from datetime import datetime
+from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
+
+from modules.photograph.exif.fields import LazyExifFields
+from modules.photograph.exif.tiff import GpsCoordinate, TiffIndex
 
 
 class FileTag:
@@ -22,23 +26,66 @@ class ExifData(BaseModel):
     date_time_original: datetime
     """拍摄时间"""
 
-    # make: str
-    # """相机品牌"""
-
-    # model: str
-    # """相机型号"""
-
-    # exposure_time: str
-    # """曝光时间"""
-
-    # f_number: str
-    # """光圈值"""
-
-    # iso_speed: str
-    # """ISO 感光度"""
-
-    # focal_length: str
-    # """焦距"""
+    _fields: Optional[LazyExifFields] = PrivateAttr(default=None)
+    """扩展字段，记录了第一次读取时的 IFD 条目偏移，访问时才解码"""
+
+    @classmethod
+    def from_index(cls, index: TiffIndex) -> "ExifData":
+        """从 IFD 索引创建，只解码拍摄时间，其余字段按需解码"""
+        date_time_original = index.date_time_original()
+        if date_time_original is None:
+            raise ValueError("EXIF DateTimeOriginal not found in EXIF data")
+        exif_data = cls(date_time_original=date_time_original)
+        exif_data._fields = LazyExifFields(index)
+        return exif_data
+
+    def _field(self, name: str):
+        return None if self._fields is None else getattr(self._fields, name)
+
+    @property
+    def make(self) -> Optional[str]:
+        """相机品牌"""
+        return self._field("make")
+
+    @property
+    def model(self) -> Optional[str]:
+        """相机型号"""
+        return self._field("model")
+
+    @property
+    def exposure_time(self) -> Optional[str]:
+        """曝光时间"""
+        return self._field("exposure_time")
+
+    @property
+    def f_number(self) -> Optional[float]:
+        """光圈值"""
+        return self._field("f_number")
+
+    @property
+    def iso_speed(self) -> Optional[int]:
+        """ISO 感光度"""
+        return self._field("iso_speed")
+
+    @property
+    def focal_length(self) -> Optional[float]:
+        """焦距"""
+        return self._field("focal_length")
+
+    @property
+    def lens_model(self) -> Optional[str]:
+        """镜头型号"""
+        return self._field("lens_model")
+
+    @property
+    def orientation(self) -> Optional[int]:
+        """方向"""
+        return self._field("orientation")
+
+    @property
+    def gps(self) -> Optional[GpsCoordinate]:
+        """GPS 坐标"""
+        return self._field("gps")
 
 
 class PhotoInfo(BaseModel):
@@ -0,0 +1,103 @@
+import gzip
+import json
+import os
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from modules.photograph._types.fingerprint import FileFingerprint
+
+RENAME_PLAN_VERSION = 1
+"""重命名计划文件格式版本"""
+
+
+class RenamePlanEntry(BaseModel):
+    origin_file: str
+    """原始文件名"""
+
+    update_file: str
+    """更新后的文件名"""
+
+    skip: bool = False
+    """是否跳过（已经命名）"""
+
+    fingerprint: Optional[FileFingerprint] = None
+    """生成计划时源文件的 stat 指纹"""
+
+
+class ScanError(BaseModel):
+    """扫描单个文件时出现的错误"""
+
+    parent_dir: str
+    """文件所在目录"""
+
+    tag: str = ""
+    """文件所属的标签（相册名）"""
+
+    file: str = ""
+    """文件名，为空时表示目录本身无法读取"""
+
+    error_type: str
+    """异常类型名称"""
+
+    message: str
+    """异常信息"""
+
+    fingerprint: Optional[FileFingerprint] = None
+    """出错时文件的 stat 指纹"""
+
+
+class RenamePlanDir(BaseModel):
+    parent_dir: str
+    """文件所在目录"""
+
+    tag: str = ""
+    """目录对应的标签（相册名），重新扫描时使用"""
+
+    entries: List[RenamePlanEntry] = Field(default_factory=list)
+    """目录下的重命名条目"""
+
+
+class RenamePlan(BaseModel):
+    """
+    重命名计划，由模拟执行生成，保存到文件后可以审阅，再在不重新读取 EXIF 的情况下执行。
+    按目录分组存储，避免在每个条目中重复目录路径。
+    """
+
+    version: int = RENAME_PLAN_VERSION
+    """文件格式版本"""
+
+    name: str = ""
+    """生成计划的任务名称"""
+
+    created_at: datetime = Field(default_factory=datetime.now)
+    """计划生成时间"""
+
+    dirs: List[RenamePlanDir] = Field(default_factory=list)
+    """按目录分组的重命名条目"""
+
+    errors: List[ScanError] = Field(default_factory=list)
+    """扫描失败的文件"""
+
+    def save(self, plan_file: str) -> None:
+        """保存计划，文件后缀为 `.gz` 时使用 gzip 压缩"""
+        data = self.model_dump(mode="json", exclude_defaults=True)
+        data["version"] = self.version
+        content = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        opener = gzip.open if plan_file.endswith(".gz") else open
+        tmp_file = f"{plan_file}.tmp"
+        with opener(tmp_file, "wb") as f:
+            f.write(content.encode("utf-8"))
+        os.replace(tmp_file, plan_file)
+
+    @classmethod
+    def load(cls, plan_file: str) -> "RenamePlan":
+        opener = gzip.open if plan_file.endswith(".gz") else open
+        with opener(plan_file, "rb") as f:
+            plan = cls.model_validate_json(f.read())
+        if plan.version != RENAME_PLAN_VERSION:
+            raise ValueError(
+                f"unsupported rename plan version {plan.version} in '{plan_file}'"
+            )
+        return plan
@@ -0,0 +1,94 @@
+"""
+按需解码的扩展 EXIF 字段
+"""
+
+from fractions import Fraction
+from functools import cached_property
+from typing import Optional
+
+from modules.photograph.exif.tiff import GpsCoordinate, IfdName, Tag, TiffIndex
+
+
+def _as_str(value) -> Optional[str]:
+    return value if isinstance(value, str) and value else None
+
+
+def _as_float(value) -> Optional[float]:
+    if isinstance(value, tuple):
+        value = value[0] if value else None
+    if isinstance(value, (int, float, Fraction)):
+        return float(value)
+    return None
+
+
+class LazyExifFields:
+    """
+    扩展 EXIF 字段，基于 `TiffIndex` 记录的条目偏移，每个字段在第一次访问时解码并缓存，
+    只需要拍摄时间的调用方不会产生任何额外开销
+    """
+
+    def __init__(self, index: TiffIndex):
+        self._index = index
+
+    @property
+    def index(self) -> TiffIndex:
+        return self._index
+
+    @cached_property
+    def make(self) -> Optional[str]:
+        """相机品牌"""
+        return _as_str(self._index.value(IfdName.IFD0, Tag.MAKE))
+
+    @cached_property
+    def model(self) -> Optional[str]:
+        """相机型号"""
+        return _as_str(self._index.value(IfdName.IFD0, Tag.MODEL))
+
+    @cached_property
+    def exposure_time(self) -> Optional[str]:
+        """曝光时间，例如 `1/250`、`2`"""
+        value = self._index.value(IfdName.EXIF, Tag.EXPOSURE_TIME)
+        if not isinstance(value, Fraction):
+            return None
+        if value >= 1 or value.numerator != 1:
+            return (
+                f"{float(value):g}" if value.denominator != 1 else str(value.numerator)
+            )
+        return f"1/{value.denominator}"
+
+    @cached_property
+    def f_number(self) -> Optional[float]:
+        """光圈值"""
+        return _as_float(self._index.value(IfdName.EXIF, Tag.F_NUMBER))
+
+    @cached_property
+    def iso_speed(self) -> Optional[int]:
+        """ISO 感光度"""
+        value = _as_float(self._index.value(IfdName.EXIF, Tag.ISO_SPEED))
+        return None if value is None else int(value)
+
+    @cached_property
+    def focal_length(self) -> Optional[float]:
+        """焦距(mm)"""
+        return _as_float(self._index.value(IfdName.EXIF, Tag.FOCAL_LENGTH))
+
+    @cached_property
+    def lens_make(self) -> Optional[str]:
+        """镜头品牌"""
+        return _as_str(self._index.value(IfdName.EXIF, Tag.LENS_MAKE))
+
+    @cached_property
+    def lens_model(self) -> Optional[str]:
+        """镜头型号"""
+        return _as_str(self._index.value(IfdName.EXIF, Tag.LENS_MODEL))
+
+    @cached_property
+    def orientation(self) -> Optional[int]:
+        """方向（1-8，参考 EXIF Orientation）"""
+        value = self._index.value(IfdName.IFD0, Tag.ORIENTATION)
+        return value if isinstance(value, int) else None
+
+    @cached_property
+    def gps(self) -> Optional[GpsCoordinate]:
+        """GPS 坐标"""
+        return self._index.gps()
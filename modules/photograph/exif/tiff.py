@@ -0,0 +1,454 @@
+"""
+TIFF/EXIF IFD 索引：读取文件头时只记录各个 IFD 条目的类型、数量和值的偏移，
+条目的值在第一次访问时才解码
+
+支持的数据来源：
+- TIFF 结构的 RAW 文件（.ARW / .DNG / .TIFF），文件开头即为 TIFF 头
+- JPEG 文件，TIFF 头位于 APP1 `Exif\\0\\0` 段中
+- EXIF 数据块（例如 HEIF 中的 `info["exif"]`），以 `Exif\\0\\0` 或 TIFF 头开头
+"""
+
+import os
+import struct
+from datetime import datetime
+from enum import IntEnum, StrEnum
+from fractions import Fraction
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+DEFAULT_HEADER_BYTES = 64 * 1024
+"""第一次读取的文件头大小，覆盖绝大多数相机 IFD0/EXIF IFD 所在的区域"""
+
+INLINE_VALUE_BYTES = 64
+"""不超过该大小的条目值在建立索引时保存原始字节，访问时无需再次读取文件"""
+
+EXIF_DATETIME_FORMAT = "%Y:%m:%d %H:%M:%S"
+"""EXIF 日期时间格式"""
+
+
+class IfdName(StrEnum):
+    """IFD 名称"""
+
+    IFD0 = "IFD0"
+    """主图像 IFD"""
+
+    IFD1 = "IFD1"
+    """缩略图 IFD"""
+
+    EXIF = "EXIF"
+    """EXIF 子 IFD"""
+
+    GPS = "GPS"
+    """GPS 子 IFD"""
+
+    @staticmethod
+    def sub_ifd(index: int) -> str:
+        """IFD0 中 SubIFDs 指向的子 IFD（RAW 文件中的预览图和原始数据）"""
+        return f"SubIFD{index}"
+
+
+class Tag(IntEnum):
+    """常用的 TIFF/EXIF 标签编号"""
+
+    # IFD0 / IFD1 / SubIFD
+    NEW_SUBFILE_TYPE = 0x00FE
+    IMAGE_WIDTH = 0x0100
+    IMAGE_LENGTH = 0x0101
+    COMPRESSION = 0x0103
+    PHOTOMETRIC_INTERPRETATION = 0x0106
+    MAKE = 0x010F
+    MODEL = 0x0110
+    STRIP_OFFSETS = 0x0111
+    ORIENTATION = 0x0112
+    STRIP_BYTE_COUNTS = 0x0117
+    SUB_IFDS = 0x014A
+    JPEG_INTERCHANGE_FORMAT = 0x0201
+    JPEG_INTERCHANGE_FORMAT_LENGTH = 0x0202
+    EXIF_IFD_POINTER = 0x8769
+    GPS_IFD_POINTER = 0x8825
+
+    # EXIF IFD
+    EXPOSURE_TIME = 0x829A
+    F_NUMBER = 0x829D
+    ISO_SPEED = 0x8827
+    DATE_TIME_ORIGINAL = 0x9003
+    OFFSET_TIME_ORIGINAL = 0x9011
+    FOCAL_LENGTH = 0x920A
+    SUB_SEC_TIME_ORIGINAL = 0x9291
+    LENS_MAKE = 0xA433
+    LENS_MODEL = 0xA434
+
+    # GPS IFD
+    GPS_LATITUDE_REF = 0x0001
+    GPS_LATITUDE = 0x0002
+    GPS_LONGITUDE_REF = 0x0003
+    GPS_LONGITUDE = 0x0004
+    GPS_ALTITUDE_REF = 0x0005
+    GPS_ALTITUDE = 0x0006
+
+
+_TYPE_SIZES = {
+    1: 1,
+    2: 1,
+    3: 2,
+    4: 4,
+    5: 8,
+    6: 1,
+    7: 1,
+    8: 2,
+    9: 4,
+    10: 8,
+    11: 4,
+    12: 8,
+    13: 4,
+}
+"""TIFF 字段类型对应的字节数"""
+
+_TYPE_FORMATS = {
+    1: "B",
+    3: "H",
+    4: "L",
+    6: "b",
+    8: "h",
+    9: "l",
+    11: "f",
+    12: "d",
+    13: "L",
+}
+"""TIFF 数值字段类型对应的 struct 格式"""
+
+_ASCII, _UNDEFINED, _RATIONAL, _SRATIONAL = 2, 7, 5, 10
+
+IfdValue = Union[str, bytes, int, float, Fraction, None, Tuple]
+
+
+class GpsCoordinate(NamedTuple):
+    latitude: float
+    """纬度（北纬为正）"""
+
+    longitude: float
+    """经度（东经为正）"""
+
+    altitude: Optional[float]
+    """海拔(m)，缺失时为 None"""
+
+
+class EmbeddedImage(NamedTuple):
+    ifd: str
+    """图像所在的 IFD"""
+
+    offset: int
+    """图像数据在数据来源中的绝对偏移(byte)"""
+
+    length: int
+    """图像数据的大小(byte)"""
+
+
+class IfdEntry(NamedTuple):
+    tag: int
+    """标签编号"""
+
+    type: int
+    """字段类型"""
+
+    count: int
+    """值的数量"""
+
+    offset: int
+    """值在数据来源中的绝对偏移(byte)"""
+
+    raw: Optional[bytes]
+    """值的原始字节，超过 `INLINE_VALUE_BYTES` 时为 None，需要按偏移读取"""
+
+    @property
+    def size(self) -> int:
+        """值的字节数"""
+        return _TYPE_SIZES.get(self.type, 1) * self.count
+
+
+class _Source:
+    """IFD 数据来源：内存中的数据块，超出范围时按偏移读取文件"""
+
+    def __init__(self, data: bytes, file_path: Optional[str] = None):
+        self.data = data
+        self.file_path = file_path
+
+    def read(self, offset: int, size: int) -> bytes:
+        if offset + size <= len(self.data):
+            return self.data[offset : offset + size]
+        if self.file_path is None:
+            raise ValueError(f"EXIF offset {offset}+{size} out of range")
+        with open(self.file_path, "rb") as f:
+            f.seek(offset)
+            data = f.read(size)
+        if len(data) != size:
+            raise ValueError(f"EXIF offset {offset}+{size} out of range")
+        return data
+
+
+RAF_MAGIC = b"FUJIFILMCCD-RAW "
+"""富士 RAF 文件头"""
+
+
+def find_tiff_header(data: bytes) -> int:
+    """
+    在数据块中查找 TIFF 头的偏移
+
+    Args:
+        data (bytes): 文件开头的数据或 EXIF 数据块
+    Returns:
+        int: TIFF 头的偏移
+    Raises:
+        ValueError: 没有找到 TIFF 头
+    """
+    if data[:4] in (b"II*\x00", b"MM\x00*"):
+        return 0
+    if data[:6] == b"Exif\x00\x00":
+        return 6
+    if data[:16] == RAF_MAGIC and len(data) >= 92:
+        # 富士 RAF：偏移 84 处为内嵌 JPEG 预览的偏移（大端），EXIF 位于预览的 APP1 段
+        jpeg_offset = struct.unpack_from(">I", data, 84)[0]
+        return jpeg_offset + find_tiff_header(data[jpeg_offset:])
+    if data[:2] == b"\xff\xd8":
+        # 遍历 JPEG 段，直到找到 APP1 Exif 段或图像数据开始
+        pos = 2
+        while pos + 4 <= len(data) and data[pos] == 0xFF:
+            marker = data[pos + 1]
+            if marker == 0xD8 or 0xD0 <= marker <= 0xD7:
+                pos += 2
+                continue
+            if marker in (0xDA, 0xD9):
+                break
+            length = struct.unpack_from(">H", data, pos + 2)[0]
+            if marker == 0xE1 and data[pos + 4 : pos + 10] == b"Exif\x00\x00":
+                return pos + 10
+            pos += 2 + length
+    # HEIF 等容器中的 EXIF 数据块可能带有 4 字节的偏移前缀
+    for start in (4, 10):
+        if data[start : start + 4] in (b"II*\x00", b"MM\x00*"):
+            return start
+    raise ValueError("TIFF header not found")
+
+
+class TiffIndex:
+    """
+    TIFF/EXIF IFD 索引
+
+    建立索引时只解析 IFD 目录结构（IFD0、EXIF、GPS、IFD1 和 SubIFDs），不解码任何条目的值；
+    通过 `value` 访问条目时才按记录的偏移解码。
+    """
+
+    def __init__(self, source: _Source, tiff_offset: int):
+        self._source = source
+        self.tiff_offset = tiff_offset
+        """TIFF 头在数据来源中的偏移，IFD 中记录的偏移都相对于该位置"""
+
+        byte_order = source.read(tiff_offset, 2)
+        if byte_order == b"II":
+            self._endian = "<"
+        elif byte_order == b"MM":
+            self._endian = ">"
+        else:
+            raise ValueError(f"invalid TIFF byte order {byte_order!r}")
+        magic, ifd0_offset = struct.unpack(
+            f"{self._endian}HL", source.read(tiff_offset + 2, 6)
+        )
+        if magic != 42:
+            raise ValueError(f"invalid TIFF magic number {magic}")
+
+        self.ifds: Dict[str, Dict[int, IfdEntry]] = {}
+        """IFD 名称 -> {标签编号 -> 条目}"""
+        self._visited: set = set()
+        self._walk(ifd0_offset)
+        # 建立索引之后不再持有文件头数据，后续只按偏移读取
+        self._source = _Source(b"", source.file_path) if source.file_path else source
+
+    @classmethod
+    def from_file(
+        cls,
+        file_path: Union[str, os.PathLike],
+        header_bytes: int = DEFAULT_HEADER_BYTES,
+    ) -> "TiffIndex":
+        """从 TIFF 结构的 RAW 文件或 JPEG 文件建立索引"""
+        file_path = os.fspath(file_path)
+        with open(file_path, "rb") as f:
+            data = f.read(header_bytes)
+        return cls(_Source(data, file_path), find_tiff_header(data))
+
+    @classmethod
+    def from_bytes(cls, data: bytes, file_path: Optional[str] = None) -> "TiffIndex":
+        """
+        从内存中的数据建立索引
+
+        Args:
+            data (bytes): EXIF 数据块，或文件开头的数据（例如复制文件时的第一个数据块）
+            file_path (Optional[str]): `data` 为文件开头时对应的文件，用于读取超出 `data` 范围的值
+        """
+        return cls(_Source(data, file_path), find_tiff_header(data))
+
+    def _walk(self, ifd0_offset: int) -> None:
+        ifd0, ifd1_offset = self._read_ifd(ifd0_offset)
+        self.ifds[IfdName.IFD0] = ifd0
+        if ifd1_offset:
+            self.ifds[IfdName.IFD1] = self._read_ifd(ifd1_offset)[0]
+        for name, pointer in (
+            (IfdName.EXIF, Tag.EXIF_IFD_POINTER),
+            (IfdName.GPS, Tag.GPS_IFD_POINTER),
+        ):
+            offset = self._pointer(ifd0, pointer)
+            if offset:
+                self.ifds[name] = self._read_ifd(offset)[0]
+        if Tag.SUB_IFDS in ifd0:
+            offsets = self._decode(ifd0[Tag.SUB_IFDS])
+            offsets = offsets if isinstance(offsets, tuple) else (offsets,)
+            for index, offset in enumerate(offsets):
+                self.ifds[IfdName.sub_ifd(index)] = self._read_ifd(offset)[0]
+
+    def _pointer(self, ifd: Dict[int, IfdEntry], tag: int) -> Optional[int]:
+        entry = ifd.get(tag)
+        if entry is None:
+            return None
+        value = self._decode(entry)
+        return value[0] if isinstance(value, tuple) else value
+
+    def _read_ifd(self, offset: int) -> Tuple[Dict[int, IfdEntry], int]:
+        position = self.tiff_offset + offset
+        if offset == 0 or position in self._visited:
+            return {}, 0
+        self._visited.add(position)
+        count = struct.unpack(f"{self._endian}H", self._source.read(position, 2))[0]
+        data = self._source.read(position + 2, count * 12 + 4)
+        entries: Dict[int, IfdEntry] = {}
+        for i in range(count):
+            tag, field_type, value_count = struct.unpack_from(
+                f"{self._endian}HHL", data, i * 12
+            )
+            size = _TYPE_SIZES.get(field_type, 1) * value_count
+            if size <= 4:
+                value_offset = position + 2 + i * 12 + 8
+                raw = data[i * 12 + 8 : i * 12 + 8 + size]
+            else:
+                value_offset = (
+                    self.tiff_offset
+                    + struct.unpack_from(f"{self._endian}L", data, i * 12 + 8)[0]
+                )
+                raw = None
+                if size <= INLINE_VALUE_BYTES:
+                    try:
+                        raw = self._source.read(value_offset, size)
+                    except ValueError:
+                        continue
+            entries[tag] = IfdEntry(tag, field_type, value_count, value_offset, raw)
+        next_offset = struct.unpack_from(f"{self._endian}L", data, count * 12)[0]
+        return entries, next_offset
+
+    def entry(self, ifd: str, tag: int) -> Optional[IfdEntry]:
+        """获取条目，不存在时返回 None"""
+        return self.ifds.get(ifd, {}).get(tag)
+
+    def read(self, offset: int, size: int) -> bytes:
+        """按绝对偏移读取原始数据"""
+        return self._source.read(offset, size)
+
+    def value(self, ifd: str, tag: int) -> IfdValue:
+        """
+        解码条目的值
+
+        - ASCII: str
+        - UNDEFINED: bytes
+        - RATIONAL/SRATIONAL: Fraction（分母为 0 时为 None）
+        - 其他数值类型: int/float
+        数量大于 1 时返回 tuple，条目不存在时返回 None。
+        """
+        entry = self.entry(ifd, tag)
+        return None if entry is None else self._decode(entry)
+
+    def _decode(self, entry: IfdEntry) -> IfdValue:
+        raw = (
+            entry.raw
+            if entry.raw is not None
+            else self._source.read(entry.offset, entry.size)
+        )
+        if entry.type == _ASCII:
+            return raw.split(b"\x00", 1)[0].decode("utf-8", errors="replace").strip()
+        if entry.type == _UNDEFINED:
+            return raw
+        if entry.type in (_RATIONAL, _SRATIONAL):
+            fmt = "L" if entry.type == _RATIONAL else "l"
+            numbers = struct.unpack(f"{self._endian}{2 * entry.count}{fmt}", raw)
+            values: List[Optional[Fraction]] = [
+                Fraction(numbers[i], numbers[i + 1]) if numbers[i + 1] else None
+                for i in range(0, len(numbers), 2)
+            ]
+            return values[0] if entry.count == 1 else tuple(values)
+        fmt = _TYPE_FORMATS.get(entry.type)
+        if fmt is None:
+            return raw
+        numbers = struct.unpack(f"{self._endian}{entry.count}{fmt}", raw)
+        return numbers[0] if entry.count == 1 else numbers
+
+    def date_time_original(self, sub_sec: bool = False) -> Optional[datetime]:
+        """
+        拍摄时间，缺失或格式错误时返回 None
+
+        Args:
+            sub_sec (bool): 是否加上 SubSecTimeOriginal 记录的秒的小数部分（例如 `"45"` 为 0.45s）
+        """
+        value = self.value(IfdName.EXIF, Tag.DATE_TIME_ORIGINAL)
+        if not isinstance(value, str):
+            return None
+        try:
+            date_time = datetime.strptime(value, EXIF_DATETIME_FORMAT)
+        except ValueError:
+            return None
+        if sub_sec:
+            fraction = self.value(IfdName.EXIF, Tag.SUB_SEC_TIME_ORIGINAL)
+            if isinstance(fraction, str) and fraction.isdigit():
+                date_time = date_time.replace(
+                    microsecond=int(fraction[:6].ljust(6, "0"))
+                )
+        return date_time
+
+    def embedded_jpegs(self) -> List[EmbeddedImage]:
+        """
+        IFD0、IFD1 和 SubIFDs 中 JPEGInterchangeFormat 指向的内嵌 JPEG 图像（缩略图和预览图），
+        按数据大小从小到大排序，只读取 IFD 条目，不读取图像数据
+        """
+        images: List[EmbeddedImage] = []
+        for name, ifd in self.ifds.items():
+            if name in (IfdName.EXIF, IfdName.GPS):
+                continue
+            offset = self._pointer(ifd, Tag.JPEG_INTERCHANGE_FORMAT)
+            length = self._pointer(ifd, Tag.JPEG_INTERCHANGE_FORMAT_LENGTH)
+            if offset and length:
+                images.append(EmbeddedImage(name, self.tiff_offset + offset, length))
+        return sorted(images, key=lambda image: image.length)
+
+    def gps(self) -> Optional[GpsCoordinate]:
+        """GPS 坐标，没有 GPS IFD 或经纬度缺失时返回 None"""
+        if IfdName.GPS not in self.ifds:
+            return None
+        latitude = _dms_to_degrees(self.value(IfdName.GPS, Tag.GPS_LATITUDE))
+        longitude = _dms_to_degrees(self.value(IfdName.GPS, Tag.GPS_LONGITUDE))
+        if latitude is None or longitude is None:
+            return None
+        if self.value(IfdName.GPS, Tag.GPS_LATITUDE_REF) == "S":
+            latitude = -latitude
+        if self.value(IfdName.GPS, Tag.GPS_LONGITUDE_REF) == "W":
+            longitude = -longitude
+        altitude = self.value(IfdName.GPS, Tag.GPS_ALTITUDE)
+        if isinstance(altitude, Fraction):
+            altitude = float(altitude)
+            # AltitudeRef 为 1 时表示海平面以下
+            if self.value(IfdName.GPS, Tag.GPS_ALTITUDE_REF) == 1:
+                altitude = -altitude
+        else:
+            altitude = None
+        return GpsCoordinate(latitude, longitude, altitude)
+
+
+def _dms_to_degrees(value: IfdValue) -> Optional[float]:
+    """度、分、秒 -> 度"""
+    if not isinstance(value, tuple) or len(value) != 3 or None in value:
+        return None
+    degrees, minutes, seconds = value
+    return float(degrees) + float(minutes) / 60 + float(seconds) / 3600
@@ -0,0 +1,131 @@
+"""
+视频拍摄时间的读取：MP4/MOV 按 box 头跳转到 `moov/mvhd`，不扫描媒体数据；
+索尼相机的视频优先使用同名的 `M01.XML` 附属文件
+
+- MP4/MOV: 顶层 box 依次为 ftyp、mdat、moov 等，`moov` 可能位于文件末尾（在 mdat 之后），
+  读取每个 box 的头部之后直接 seek 到下一个 box，几 GB 的视频只需要几次小的读取
+- 索尼: `C0001.MP4` 的附属文件为 `C0001M01.XML`，`CreationDate` 记录带时区的本地时间
+"""
+
+import os
+import struct
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+MP4_EPOCH = datetime(1904, 1, 1, tzinfo=timezone.utc)
+"""MP4/MOV 时间戳的起点"""
+
+SONY_XML_SUFFIX = "M01.XML"
+"""索尼视频附属文件的后缀，例如 `C0001.MP4` -> `C0001M01.XML`"""
+
+_CONTAINER_BOXES = (b"moov",)
+"""需要进入的容器 box"""
+
+
+def _iter_boxes(f: BinaryIO, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """
+    遍历 [start, end) 范围内的 box，只读取 box 头
+
+    Returns:
+        Iterator[Tuple[bytes, int, int]]: (box 类型, 数据开始位置, box 结束位置)
+    """
+    position = start
+    while position + 8 <= end:
+        f.seek(position)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack(">L4s", header)
+        header_size = 8
+        if size == 1:
+            # 64 位的 box 大小
+            large = f.read(8)
+            if len(large) < 8:
+                return
+            size = struct.unpack(">Q", large)[0]
+            header_size = 16
+        elif size == 0:
+            # 一直延伸到文件末尾
+            size = end - position
+        if size < header_size:
+            raise ValueError(f"invalid box size {size} at offset {position}")
+        yield box_type, position + header_size, min(position + size, end)
+        position += size
+
+
+def read_mvhd_creation_time(file_path: str) -> Optional[datetime]:
+    """
+    读取 MP4/MOV 文件 `moov/mvhd` 中的创建时间
+
+    Args:
+        file_path (str): 视频文件路径
+    Returns:
+        Optional[datetime]: 本地时间（不含时区），缺失或为 0 时返回 None
+    Raises:
+        ValueError: 文件结构错误或没有 `moov/mvhd`
+    """
+    with open(file_path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        for box_type, data_start, box_end in _iter_boxes(f, 0, file_size):
+            if box_type not in _CONTAINER_BOXES:
+                continue
+            for child_type, child_start, _ in _iter_boxes(f, data_start, box_end):
+                if child_type != b"mvhd":
+                    continue
+                f.seek(child_start)
+                version = f.read(4)[0]
+                if version == 1:
+                    creation_time = struct.unpack(">Q", f.read(8))[0]
+                else:
+                    creation_time = struct.unpack(">L", f.read(4))[0]
+                if creation_time == 0:
+                    return None
+                # mvhd 记录的是 UTC 时间，转换为本地时间与照片的 EXIF 时间一致
+                utc_time = MP4_EPOCH + timedelta(seconds=creation_time)
+                return utc_time.astimezone().replace(tzinfo=None)
+    raise ValueError(f"'moov/mvhd' not found in file '{file_path}'")
+
+
+def sony_xml_sidecar(file_path: str) -> str:
+    """索尼视频附属文件的路径（不检查是否存在）"""
+    file_base = os.path.splitext(file_path)[0]
+    return f"{file_base}{SONY_XML_SUFFIX}"
+
+
+def read_sony_xml_creation_date(xml_path: str) -> Optional[datetime]:
+    """
+    读取索尼 `M01.XML` 附属文件中的 `CreationDate`
+
+    Args:
+        xml_path (str): 附属文件路径
+    Returns:
+        Optional[datetime]: 拍摄时的本地时间（不含时区），缺失时返回 None
+    """
+    for _, element in ET.iterparse(xml_path):
+        # 元素带有命名空间，例如 `{urn:schemas-professionalDisc:nonRealTimeMeta:ver.2.00}CreationDate`
+        if element.tag.rsplit("}", 1)[-1] == "CreationDate":
+            value = element.get("value")
+            if value:
+                return datetime.fromisoformat(value).replace(tzinfo=None)
+    return None
+
+
+def read_video_creation_time(file_path: str) -> datetime:
+    """
+    读取视频的拍摄时间：优先使用索尼 `M01.XML` 附属文件，其次使用 `moov/mvhd`
+
+    Args:
+        file_path (str): 视频文件路径
+    Raises:
+        ValueError: 没有找到拍摄时间
+    """
+    xml_path = sony_xml_sidecar(file_path)
+    if os.path.exists(xml_path):
+        creation_date = read_sony_xml_creation_date(xml_path)
+        if creation_date is not None:
+            return creation_date
+    creation_time = read_mvhd_creation_time(file_path)
+    if creation_time is None:
+        raise ValueError(f"creation time not found in file '{file_path}'")
+    return creation_time
@@ -0,0 +1,289 @@
+"""
+持久化的归档成员索引：记录各个照片根目录下全部归档文件（zip/tar/7z）中的成员文件名、大小和修改时间，
+查找某个文件在哪个归档中时只访问 SQLite 数据库，不解压归档
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from modules.photograph._enums.photo import PhotographDir
+from modules.photograph.index.photo_index import IndexUpdateStats
+from modules.photograph.utils._archive import (
+    ArchiveEntry,
+    read_archive_entries,
+    walk_archives,
+)
+from modules.photograph.utils._concurrency import AdaptiveConcurrency, adaptive_map
+
+DEFAULT_ARCHIVE_INDEX_PATH = os.path.expanduser(
+    "~/.cache/a-bag-of-scripts/archive-index.db"
+)
+"""默认的索引数据库路径"""
+
+INDEXED_ARCHIVE_DIRS = [
+    PhotographDir.ICLOUD_RAW_PHOTO,
+    PhotographDir.ICLOUD_RAW_PANO,
+    PhotographDir.ICLOUD_RAW_TIMELAPSE_PHOTO,
+    PhotographDir.ICLOUD_RAW_VIDEO,
+]
+"""默认建立索引的归档根目录"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archives (
+    path TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    member_count INTEGER NOT NULL,
+    error TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_archives_root ON archives (root);
+CREATE TABLE IF NOT EXISTS members (
+    archive TEXT NOT NULL,
+    name TEXT NOT NULL,
+    base_name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL
+);
+CREATE INDEX IF NOT EXISTS idx_members_base_name
+    ON members (base_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_members_archive ON members (archive);
+"""
+
+
+class ArchiveMemberRecord(NamedTuple):
+    archive: str
+    """归档文件路径"""
+
+    name: str
+    """成员在归档中的路径"""
+
+    size: int
+    """文件大小(byte)"""
+
+    mtime: Optional[datetime]
+    """修改时间"""
+
+
+class ArchiveIndex:
+    """
+    归档成员索引
+
+    >>> with ArchiveIndex() as index:
+    ...     index.update()
+    ...     index.query(name="DSC00001.ARW")
+    """
+
+    def __init__(self, db_path: str = DEFAULT_ARCHIVE_INDEX_PATH):
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "ArchiveIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def update(
+        self,
+        roots: Sequence[str] = INDEXED_ARCHIVE_DIRS,
+        min_workers: int = 1,
+        max_workers: int = 4,
+    ) -> IndexUpdateStats:
+        """
+        增量更新索引：只读取新增和 stat 发生变化的归档文件，删除已经不存在的归档文件
+
+        Args:
+            roots (Sequence[str]): 归档根目录
+            min_workers (int): 读取归档的并发数下限
+            max_workers (int): 读取归档的并发数上限
+        """
+        added = updated = removed = unchanged = failed = 0
+        for root in roots:
+            root = str(root)
+            if not os.path.isdir(root):
+                logger.warning(f"archive root does not exist, skip: {root}")
+                continue
+            known: Dict[str, Tuple[int, int, int]] = {
+                path: (size, mtime_ns, ino)
+                for path, size, mtime_ns, ino in self._conn.execute(
+                    "SELECT path, size, mtime_ns, ino FROM archives WHERE root = ?",
+                    (root,),
+                )
+            }
+            pending: List[Tuple[str, os.stat_result]] = []
+            for path, st in walk_archives(root):
+                fingerprint = known.pop(path, None)
+                if fingerprint == (st.st_size, st.st_mtime_ns, st.st_ino):
+                    unchanged += 1
+                    continue
+                if fingerprint is None:
+                    added += 1
+                else:
+                    updated += 1
+                pending.append((path, st))
+
+            controller = AdaptiveConcurrency(
+                min_workers=min_workers, max_workers=max_workers, name="archive-index"
+            )
+            members = 0
+            with self._conn:
+                for path in known:
+                    self._delete(path)
+                for (path, st), future in adaptive_map(
+                    lambda item: read_archive_entries(item[0]), pending, controller
+                ):
+                    error: Optional[str] = None
+                    try:
+                        entries = future.result()
+                    except Exception as e:
+                        # 无法读取的归档也记录下来，避免每次更新都重新读取
+                        logger.warning(f"read archive '{path}' error: {e}")
+                        entries, error = [], str(e)
+                        failed += 1
+                    self._delete(path)
+                    self._insert(path, root, st, entries, error)
+                    members += len(entries)
+            removed += len(known)
+            logger.info(
+                f"indexed '{root}': {len(pending)} archives read "
+                f"({members} members), {len(known)} removed"
+            )
+        return IndexUpdateStats(added, updated, removed, unchanged, failed)
+
+    def _delete(self, path: str) -> None:
+        self._conn.execute("DELETE FROM members WHERE archive = ?", (path,))
+        self._conn.execute("DELETE FROM archives WHERE path = ?", (path,))
+
+    def _insert(
+        self,
+        path: str,
+        root: str,
+        st: os.stat_result,
+        entries: List[ArchiveEntry],
+        error: Optional[str],
+    ) -> None:
+        self._conn.execute(
+            "INSERT INTO archives VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (path, root, st.st_size, st.st_mtime_ns, st.st_ino, len(entries), error),
+        )
+        self._conn.executemany(
+            "INSERT INTO members VALUES (?, ?, ?, ?, ?)",
+            (
+                (path, e.name, e.name.rsplit("/", 1)[-1], e.size, e.mtime)
+                for e in entries
+            ),
+        )
+
+    def query(
+        self,
+        name: Optional[str] = None,
+        pattern: Optional[str] = None,
+        archive: Optional[str] = None,
+        root: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[ArchiveMemberRecord]:
+        """
+        查询归档成员，所有条件之间为“且”的关系，结果按归档文件和成员路径排序
+
+        Args:
+            name (Optional[str]): 成员文件名（不含目录，不区分大小写，使用索引）
+            pattern (Optional[str]): 成员路径的 GLOB 模式，例如 `*/DSC0001?.ARW`
+            archive (Optional[str]): 归档文件路径
+            root (Optional[str]): 归档根目录
+            limit (Optional[int]): 最多返回的数量
+        """
+        conditions: List[str] = []
+        params: List = []
+        if name is not None:
+            conditions.append("m.base_name = ? COLLATE NOCASE")
+            params.append(name)
+        if pattern is not None:
+            conditions.append("m.name GLOB ?")
+            params.append(pattern)
+        if archive is not None:
+            conditions.append("m.archive = ?")
+            params.append(str(archive))
+        if root is not None:
+            conditions.append("a.root = ?")
+            params.append(str(root))
+
+        sql = (
+            "SELECT m.archive, m.name, m.size, m.mtime FROM members m "
+            "JOIN archives a ON a.path = m.archive"
+        )
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY m.archive, m.name"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [
+            ArchiveMemberRecord(
+                archive,
+                member,
+                size,
+                datetime.fromtimestamp(mtime) if mtime is not None else None,
+            )
+            for archive, member, size, mtime in self._conn.execute(sql, params)
+        ]
+
+    def entries(self, path: str, st: os.stat_result) -> Optional[List[ArchiveEntry]]:
+        """
+        索引中记录的归档成员，归档不在索引中、stat 发生变化或者读取失败时返回 None
+
+        Args:
+            path (str): 归档文件路径
+            st (os.stat_result): 归档文件当前的 stat
+        """
+        row = self._conn.execute(
+            "SELECT size, mtime_ns, ino, error FROM archives WHERE path = ?",
+            (str(path),),
+        ).fetchone()
+        if row is None or row[3] is not None:
+            return None
+        if tuple(row[:3]) != (st.st_size, st.st_mtime_ns, st.st_ino):
+            return None
+        return [
+            ArchiveEntry(name, size, mtime)
+            for name, size, mtime in self._conn.execute(
+                "SELECT name, size, mtime FROM members WHERE archive = ?", (str(path),)
+            )
+        ]
+
+    def rename(self, src: str, dst: str) -> None:
+        """归档文件重命名后更新索引中的路径，不需要重新读取归档"""
+        with self._conn:
+            self._conn.execute(
+                "UPDATE archives SET path = ? WHERE path = ?", (str(dst), str(src))
+            )
+            self._conn.execute(
+                "UPDATE members SET archive = ? WHERE archive = ?",
+                (str(dst), str(src)),
+            )
+
+    def failures(self) -> List[Tuple[str, str]]:
+        """读取失败的归档文件 (路径, 错误信息)"""
+        return list(
+            self._conn.execute(
+                "SELECT path, error FROM archives WHERE error IS NOT NULL ORDER BY path"
+            )
+        )
+
+    def count(self) -> Tuple[int, int]:
+        """索引中的 (归档文件数量, 成员数量)"""
+        archives, members = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(member_count), 0) FROM archives"
+        ).fetchone()
+        return archives, members
@@ -0,0 +1,227 @@
+"""
+基于均匀网格的空间索引：将经纬度转换为地心直角坐标(km)，按立方体网格分桶，
+半径查询和地点聚类只需要检查相邻的网格，避免 O(n²) 的两两比较
+"""
+
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+"""地球平均半径(km)"""
+
+_KEY_BITS = 21
+"""网格坐标每个维度编码使用的位数"""
+
+_KEY_OFFSET = 1 << (_KEY_BITS - 1)
+
+_KEY_MASK = (1 << _KEY_BITS) - 1
+
+_MIN_CELL_KM = 2 * EARTH_RADIUS_KM / _KEY_OFFSET
+"""网格坐标可以编码的最小网格大小(km)"""
+
+
+def to_xyz(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    """经纬度 -> 地心直角坐标(km)，形状为 (n, 3)"""
+    lat = np.radians(np.asarray(latitude, dtype=np.float64))
+    lon = np.radians(np.asarray(longitude, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return EARTH_RADIUS_KM * np.stack(
+        [cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1
+    )
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """球面距离(km)，支持广播"""
+    lat1, lon1, lat2, lon2 = (
+        np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2)
+    )
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _pack(cells: np.ndarray) -> np.ndarray:
+    """网格坐标 (n, 3) -> int64 编码"""
+    shifted = (cells + _KEY_OFFSET).astype(np.int64)
+    return (
+        (shifted[:, 0] << (2 * _KEY_BITS))
+        | (shifted[:, 1] << _KEY_BITS)
+        | shifted[:, 2]
+    )
+
+
+def _unpack(keys: np.ndarray) -> np.ndarray:
+    """int64 编码 -> 网格坐标 (n, 3)"""
+    return (
+        np.stack(
+            [
+                keys >> (2 * _KEY_BITS),
+                (keys >> _KEY_BITS) & _KEY_MASK,
+                keys & _KEY_MASK,
+            ],
+            axis=-1,
+        )
+        - _KEY_OFFSET
+    )
+
+
+class _Grid:
+    """点在网格中的分桶：按编码排序后，每个非空网格对应一段连续的点"""
+
+    def __init__(self, xyz: np.ndarray, cell_km: float):
+        if cell_km < _MIN_CELL_KM:
+            raise ValueError(f"grid cell size must be at least {_MIN_CELL_KM:.4f} km")
+        self.cell_km = cell_km
+        keys = _pack(np.floor(xyz / cell_km).astype(np.int64))
+        self.order = np.argsort(keys, kind="stable")
+        """按网格排序后的点位置"""
+        self.keys, self.starts, self.inverse = np.unique(
+            keys[self.order], return_index=True, return_inverse=True
+        )
+        self.ends = np.append(self.starts[1:], len(keys))
+        self.coords = _unpack(self.keys)
+        """非空网格的网格坐标"""
+
+    def lookup(self, keys: np.ndarray) -> np.ndarray:
+        """网格编码 -> 非空网格的序号，不存在时为 -1"""
+        if len(self.keys) == 0:
+            return np.full(len(keys), -1)
+        positions = np.searchsorted(self.keys, keys)
+        positions = np.minimum(positions, len(self.keys) - 1)
+        return np.where(self.keys[positions] == keys, positions, -1)
+
+    def members(self, cell: int) -> np.ndarray:
+        return self.order[self.starts[cell] : self.ends[cell]]
+
+
+class GeoGridIndex:
+    """
+    网格空间索引
+
+    >>> index = GeoGridIndex(latitude, longitude, cell_km=1.0)
+    >>> index.within(22.54, 114.06, radius_km=5)   # 5 km 范围内的照片
+    >>> index.cluster(eps_km=1.0)                  # 按地点聚类
+    """
+
+    def __init__(
+        self, latitude: np.ndarray, longitude: np.ndarray, cell_km: float = 1.0
+    ):
+        """
+        Args:
+            latitude (np.ndarray): 纬度，缺失时为 NaN
+            longitude (np.ndarray): 经度，缺失时为 NaN
+            cell_km (float): 网格大小(km)，与常用的查询半径相当时查询最快
+        """
+        latitude = np.asarray(latitude, dtype=np.float64)
+        longitude = np.asarray(longitude, dtype=np.float64)
+        self.size = len(latitude)
+        """原始点的数量（包含缺失坐标的点）"""
+        self.indices = np.flatnonzero(~(np.isnan(latitude) | np.isnan(longitude)))
+        """有坐标的点在原始数组中的下标"""
+        self.latitude = latitude[self.indices]
+        self.longitude = longitude[self.indices]
+        self.xyz = to_xyz(self.latitude, self.longitude)
+        self._grid = _Grid(self.xyz, cell_km)
+
+    def within(self, latitude: float, longitude: float, radius_km: float) -> np.ndarray:
+        """
+        查询距离 (latitude, longitude) 不超过 `radius_km` 的点
+
+        Returns:
+            np.ndarray: 原始数组中的下标，按距离从近到远排序
+        """
+        grid = self._grid
+        center = to_xyz(np.array([latitude]), np.array([longitude]))[0]
+        center_cell = np.floor(center / grid.cell_km).astype(np.int64)
+        reach = int(math.ceil(radius_km / grid.cell_km))
+        # 球面距离不小于弦长，弦长在半径内的点一定位于中心网格周围 reach 个网格以内
+        if (2 * reach + 1) ** 3 <= len(grid.keys):
+            steps = np.arange(-reach, reach + 1)
+            offsets = np.stack(
+                np.meshgrid(steps, steps, steps, indexing="ij"), axis=-1
+            ).reshape(-1, 3)
+            cells = grid.lookup(_pack(center_cell + offsets))
+            cells = cells[cells >= 0]
+        else:
+            cells = np.flatnonzero(
+                np.all(np.abs(grid.coords - center_cell) <= reach, axis=1)
+            )
+        if len(cells) == 0:
+            return np.empty(0, dtype=np.int64)
+        candidates = np.concatenate([grid.members(c) for c in cells])
+        distances = haversine_km(
+            latitude, longitude, self.latitude[candidates], self.longitude[candidates]
+        )
+        mask = distances <= radius_km
+        candidates, distances = candidates[mask], distances[mask]
+        return self.indices[candidates[np.argsort(distances, kind="stable")]]
+
+    def cluster(self, eps_km: float) -> np.ndarray:
+        """
+        单链接聚类：距离不超过 `eps_km` 的点属于同一个地点（距离使用弦长，在该尺度下与球面距离几乎相同）
+
+        使用边长为 eps/√3 的网格，同一个网格中的点一定属于同一个地点；
+        只需要检查两个网格以内的相邻网格之间是否存在距离不超过 eps 的点。
+
+        Returns:
+            np.ndarray: 每个原始点的地点编号（按首次出现的顺序从 0 开始），缺失坐标的点为 -1
+        """
+        labels = np.full(self.size, -1, dtype=np.int64)
+        if len(self.indices) == 0:
+            return labels
+        grid = _Grid(self.xyz, eps_km / math.sqrt(3))
+        parent = np.arange(len(grid.keys))
+
+        def find(cell: int) -> int:
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]
+                cell = parent[cell]
+            return cell
+
+        steps = np.arange(-2, 3)
+        offsets = np.stack(
+            np.meshgrid(steps, steps, steps, indexing="ij"), axis=-1
+        ).reshape(-1, 3)
+        # 只检查一半的方向，每对相邻网格只比较一次
+        offsets = offsets[[tuple(o) > (0, 0, 0) for o in offsets]]
+        for offset in offsets:
+            neighbors = grid.lookup(_pack(grid.coords + offset))
+            valid = np.flatnonzero(neighbors >= 0)
+            for cell, neighbor in zip(valid, neighbors[valid]):
+                root_a, root_b = find(cell), find(neighbor)
+                if root_a != root_b and self._connected(
+                    grid.members(cell), grid.members(neighbor), eps_km
+                ):
+                    parent[root_b] = root_a
+
+        roots = np.array([find(cell) for cell in range(len(grid.keys))])
+        point_roots = np.empty(len(self.indices), dtype=np.int64)
+        point_roots[grid.order] = roots[grid.inverse]
+        # 按首次出现的顺序重新编号
+        _, first, inverse = np.unique(
+            point_roots, return_index=True, return_inverse=True
+        )
+        rank = np.empty(len(first), dtype=np.int64)
+        rank[np.argsort(first, kind="stable")] = np.arange(len(first))
+        labels[self.indices] = rank[inverse]
+        return labels
+
+    def _connected(
+        self,
+        points_a: np.ndarray,
+        points_b: np.ndarray,
+        eps_km: float,
+        block: int = 2048,
+    ) -> bool:
+        """两组点之间是否存在距离不超过 eps 的点对，分块计算以限制内存"""
+        xyz_b = self.xyz[points_b]
+        for start in range(0, len(points_a), block):
+            xyz_a = self.xyz[points_a[start : start + block]]
+            for b_start in range(0, len(xyz_b), block):
+                diff = xyz_a[:, None, :] - xyz_b[None, b_start : b_start + block, :]
+                if np.any(np.einsum("ijk,ijk->ij", diff, diff) <= eps_km * eps_km):
+                    return True
+        return False
@@ -0,0 +1,305 @@
+"""
+照片完整性校验：每个相册目录下保存全部文件的 BLAKE2b 校验和（`.integrity.json.gz`），
+每次运行在 I/O 预算内重新计算新文件和 stat 发生变化的文件，再按上次校验时间轮流复查 stat 未变化的文件，
+几次运行之后全部文件都会被复查一遍，stat 未变化但校验和不一致的文件即为静默损坏
+"""
+
+import math
+import os
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from modules.photograph._enums.integrity import ScrubIssueKind
+from modules.photograph._enums.photo import PhotographDir
+from modules.photograph._types.fingerprint import FileFingerprint
+from modules.photograph._types.integrity import (
+    IntegrityEntry,
+    IntegrityManifest,
+    ScrubIssue,
+    ScrubReport,
+)
+from modules.photograph.utils._concurrency import AdaptiveConcurrency, adaptive_map
+from modules.photograph.utils._hash import stream_checksum
+
+INTEGRITY_PHOTO_DIRS = [
+    PhotographDir.ICLOUD_RAW_PHOTO,
+    PhotographDir.LOCAL_RAW_PHOTO,
+    PhotographDir.ICLOUD_RAW_PANO,
+    PhotographDir.ICLOUD_RAW_TIMELAPSE_PHOTO,
+    PhotographDir.ICLOUD_RAW_VIDEO,
+]
+"""默认校验的原始素材根目录，根目录下的每个子目录为一个相册"""
+
+DEFAULT_SCRUB_FRACTION = 1 / 30
+"""每次运行复查的数据量占 stat 未变化文件总大小的比例，每天运行时约一个月复查一遍"""
+
+
+class _Job(NamedTuple):
+    album: str
+    """相册目录"""
+
+    rel: str
+    """相对于相册目录的路径"""
+
+    st: os.stat_result
+    """列出文件时的 stat"""
+
+    rotation: bool
+    """是否为轮流复查（stat 未变化）的文件"""
+
+
+def find_albums(roots: Sequence[str]) -> List[str]:
+    """根目录下的相册目录（不含 dotfile），按路径排序"""
+    albums: List[str] = []
+    for root in roots:
+        root = str(root)
+        if not os.path.isdir(root):
+            logger.warning(f"photo root does not exist, skip: {root}")
+            continue
+        with os.scandir(root) as entries:
+            albums.extend(
+                entry.path
+                for entry in entries
+                if not entry.name.startswith(".")
+                and entry.is_dir(follow_symlinks=False)
+            )
+    return sorted(albums)
+
+
+def _walk_files(album_dir: str) -> Iterator[Tuple[str, os.stat_result]]:
+    """递归遍历相册中的文件（忽略 dotfile），返回 (相对路径, stat)"""
+    stack: List[str] = [album_dir]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        rel = os.path.relpath(entry.path, album_dir)
+                        yield rel.replace(os.sep, "/"), entry.stat()
+        except OSError as e:
+            logger.warning(f"scan directory '{current}' error: {e}")
+
+
+def _select_rotation(
+    candidates: List[Tuple[float, _Job]],
+    target_bytes: float,
+    limit_bytes: Optional[float] = None,
+) -> List[_Job]:
+    """
+    按上次校验时间从早到晚选择复查的文件，直到数据量达到 `target_bytes`；
+    最后一个文件可以超过 `target_bytes`（保证每次至少复查一个文件），但不超过 `limit_bytes`
+    """
+    selected: List[_Job] = []
+    total = 0
+    for _, job in sorted(candidates, key=lambda item: item[0]):
+        if total >= target_bytes:
+            break
+        if limit_bytes is not None and total + job.st.st_size > limit_bytes:
+            break
+        selected.append(job)
+        total += job.st.st_size
+    return selected
+
+
+def _select_required(
+    required: List[_Job], budget_bytes: Optional[int] = None
+) -> List[_Job]:
+    """
+    按修改时间从早到晚选择需要计算校验和的新文件和 stat 变化的文件，合计不超过 `budget_bytes`；
+    放不下的文件跳过，继续选择之后较小的文件
+    """
+    if budget_bytes is None:
+        return required
+    selected: List[_Job] = []
+    total = 0
+    for job in sorted(required, key=lambda job: job.st.st_mtime_ns):
+        if total + job.st.st_size > budget_bytes:
+            if job.st.st_size > budget_bytes:
+                path = os.path.join(job.album, job.rel)
+                logger.warning(f"'{path}' is larger than the budget, skip")
+            continue
+        selected.append(job)
+        total += job.st.st_size
+    return selected
+
+
+def scrub_albums(
+    album_dirs: Sequence[str],
+    fraction: float = DEFAULT_SCRUB_FRACTION,
+    budget_bytes: Optional[int] = None,
+    min_workers: int = 1,
+    max_workers: int = 4,
+) -> ScrubReport:
+    """
+    校验相册的完整性并更新清单
+
+    - 新文件和 stat 发生变化的文件：按修改时间从早到晚计算校验和，不超过 `budget_bytes`，
+      超出预算的文件留到之后的运行
+    - stat 未变化的文件：按上次校验时间从早到晚复查，数据量为总大小的 `fraction`，
+      并且与新文件、stat 变化的文件合计不超过 `budget_bytes`
+    - 清单中已经不存在的文件：从清单中删除
+
+    Args:
+        album_dirs (Sequence[str]): 相册目录
+        fraction (float): 每次复查的数据量占 stat 未变化文件总大小的比例，1 为全部复查
+        budget_bytes (Optional[int]): 每次运行读取的数据量上限，为 None 时不限制
+        min_workers (int): 计算校验和的并发数下限
+        max_workers (int): 计算校验和的并发数上限
+    Returns:
+        ScrubReport: 校验报告
+    """
+    report = ScrubReport()
+    now = time.time()
+    manifests: Dict[str, IntegrityManifest] = {}
+    dirty: set = set()
+    required: List[_Job] = []
+    candidates: List[Tuple[float, _Job]] = []
+
+    for album in album_dirs:
+        album = str(album)
+        manifest = IntegrityManifest.load(IntegrityManifest.path_of(album))
+        manifests[album] = manifest
+        report.albums += 1
+        remaining = set(manifest.files)
+        for rel, st in _walk_files(album):
+            report.files += 1
+            remaining.discard(rel)
+            entry = manifest.files.get(rel)
+            fingerprint = (st.st_size, st.st_mtime_ns, st.st_ino)
+            if (
+                entry is not None
+                and (entry.size, entry.mtime_ns, entry.ino) == fingerprint
+            ):
+                candidates.append((entry.verified_at, _Job(album, rel, st, True)))
+            else:
+                required.append(_Job(album, rel, st, False))
+        for rel in sorted(remaining):
+            entry = manifest.files.pop(rel)
+            dirty.add(album)
+            report.issues.append(
+                ScrubIssue(
+                    kind=ScrubIssueKind.MISSING,
+                    path=os.path.join(album, rel),
+                    size=entry.size,
+                    expected=entry.checksum,
+                )
+            )
+
+    selected = _select_required(required, budget_bytes)
+    report.deferred = len(required) - len(selected)
+    required = selected
+    required_bytes = sum(job.st.st_size for job in required)
+    target_bytes = fraction * sum(job.st.st_size for _, job in candidates)
+    limit_bytes = (
+        max(0, budget_bytes - required_bytes) if budget_bytes is not None else None
+    )
+    rotation = _select_rotation(candidates, math.ceil(target_bytes), limit_bytes)
+    logger.info(
+        f"scrub {report.albums} albums: {len(required)} new or changed files "
+        f"({required_bytes / 1024**3:.2f} GB), {len(rotation)} of {len(candidates)} "
+        f"unchanged files to re-verify"
+    )
+    if report.deferred:
+        logger.warning(
+            f"{report.deferred} new or changed files exceed the budget, "
+            f"left for later runs"
+        )
+
+    controller = AdaptiveConcurrency(
+        min_workers=min_workers, max_workers=max_workers, name="scrub"
+    )
+    jobs = required + rotation
+    try:
+        for job, future in adaptive_map(
+            # mmap 遇到坏扇区时触发 SIGBUS，使用 read() 将读取错误转换为 OSError
+            lambda job: stream_checksum(os.path.join(job.album, job.rel)),
+            jobs,
+            controller,
+        ):
+            path = os.path.join(job.album, job.rel)
+            try:
+                checksum = future.result()
+            except OSError as e:
+                report.issues.append(
+                    ScrubIssue(
+                        kind=ScrubIssueKind.ERROR,
+                        path=path,
+                        size=job.st.st_size,
+                        message=str(e),
+                    )
+                )
+                continue
+            report.bytes_read += job.st.st_size
+            if not FileFingerprint.from_stat(job.st).matches(path):
+                # 计算校验和期间文件被修改，下次运行时重新计算
+                logger.warning(f"'{path}' changed while hashing, skip")
+                continue
+            _apply(manifests[job.album], job, path, checksum, now, report)
+            dirty.add(job.album)
+    finally:
+        for album in sorted(dirty):
+            try:
+                manifests[album].save(IntegrityManifest.path_of(album))
+            except OSError as e:
+                logger.error(f"save integrity manifest of '{album}' error: {e}")
+        report.finished_at = datetime.now()
+    return report
+
+
+def _apply(
+    manifest: IntegrityManifest,
+    job: _Job,
+    path: str,
+    checksum: str,
+    now: float,
+    report: ScrubReport,
+) -> None:
+    """将校验结果写入清单和报告"""
+    entry = manifest.files.get(job.rel)
+    if job.rotation:
+        if checksum == entry.checksum:
+            entry.verified_at = now
+            report.verified += 1
+        else:
+            # 保留原来的校验和，下次运行时优先复查
+            logger.error(f"checksum mismatch: '{path}'")
+            report.issues.append(
+                ScrubIssue(
+                    kind=ScrubIssueKind.MISMATCH,
+                    path=path,
+                    size=job.st.st_size,
+                    expected=entry.checksum,
+                    actual=checksum,
+                )
+            )
+        return
+
+    if entry is None:
+        report.added += 1
+    else:
+        report.updated += 1
+        if entry.checksum != checksum:
+            report.issues.append(
+                ScrubIssue(
+                    kind=ScrubIssueKind.MODIFIED,
+                    path=path,
+                    size=job.st.st_size,
+                    expected=entry.checksum,
+                    actual=checksum,
+                )
+            )
+    manifest.files[job.rel] = IntegrityEntry(
+        size=job.st.st_size,
+        mtime_ns=job.st.st_mtime_ns,
+        ino=job.st.st_ino,
+        checksum=checksum,
+        verified_at=now,
+    )
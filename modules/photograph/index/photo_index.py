@@ -0,0 +1,304 @@
+"""
+持久化的照片索引：记录各个照片根目录下全部照片的拍摄时间、相机和相册，
+查询时只访问 SQLite 数据库，不读取照片文件
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from modules.photograph._enums.format import (
+    EXIF_SUPPORTED_FILE_EXT,
+    HEIF_SUPPORTED_FILE_EXT,
+)
+from modules.photograph._enums.photo import PhotographDir
+from modules.photograph.utils._concurrency import AdaptiveConcurrency, adaptive_map
+from modules.photograph.utils._metadata import CaptureMetadata, read_capture_metadata
+
+DEFAULT_INDEX_PATH = os.path.expanduser("~/.cache/a-bag-of-scripts/photo-index.db")
+"""默认的索引数据库路径"""
+
+INDEXED_PHOTO_DIRS = [
+    PhotographDir.ICLOUD_RAW_PHOTO,
+    PhotographDir.LOCAL_RAW_PHOTO,
+    PhotographDir.ICLOUD_RAW_PANO,
+    PhotographDir.ICLOUD_RAW_TIMELAPSE_PHOTO,
+]
+"""默认建立索引的照片根目录"""
+
+INDEXED_FILE_EXT = {str(e).lower() for e in EXIF_SUPPORTED_FILE_EXT} | set(
+    HEIF_SUPPORTED_FILE_EXT
+)
+"""建立索引的文件扩展名"""
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS photos (
+    path TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    album TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    capture_time TEXT,
+    make TEXT NOT NULL DEFAULT '',
+    model TEXT NOT NULL DEFAULT ''
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_photos_capture_time ON photos (capture_time);
+CREATE INDEX IF NOT EXISTS idx_photos_camera
+    ON photos (make COLLATE NOCASE, model COLLATE NOCASE, capture_time);
+CREATE INDEX IF NOT EXISTS idx_photos_album ON photos (album, capture_time);
+CREATE INDEX IF NOT EXISTS idx_photos_root ON photos (root);
+"""
+
+
+class PhotoRecord(NamedTuple):
+    path: str
+    """文件路径"""
+
+    root: str
+    """所属的照片根目录"""
+
+    album: str
+    """相册标签"""
+
+    size: int
+    """文件大小(byte)"""
+
+    capture_time: Optional[datetime]
+    """拍摄时间"""
+
+    make: str
+    """相机品牌"""
+
+    model: str
+    """相机型号"""
+
+
+class IndexUpdateStats(NamedTuple):
+    added: int
+    """新增的文件数量"""
+
+    updated: int
+    """发生变化并重新读取的文件数量"""
+
+    removed: int
+    """已删除的文件数量"""
+
+    unchanged: int
+    """未变化、未读取的文件数量"""
+
+    failed: int
+    """读取元数据失败的文件数量"""
+
+
+def album_tag(album_dir: str) -> str:
+    """
+    从相册目录名获取相册标签，`YYMMDD-相册名` 返回 `相册名`，其余格式返回目录名本身
+    """
+    prefix, sep, tag = album_dir.partition("-")
+    if sep and prefix.isdigit() and tag:
+        return tag
+    return album_dir
+
+
+def _walk_photos(root: str) -> Iterator[Tuple[str, str, os.stat_result]]:
+    """递归遍历根目录下的照片文件，返回 (路径, 相册目录名, stat)"""
+    stack: List[Tuple[str, str]] = [(root, "")]
+    while stack:
+        current, album = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, album or entry.name))
+                    elif os.path.splitext(entry.name)[1].lower() in INDEXED_FILE_EXT:
+                        yield entry.path, album, entry.stat()
+        except OSError as e:
+            logger.warning(f"scan directory '{current}' error: {e}")
+
+
+class PhotoIndex:
+    """
+    照片索引
+
+    >>> with PhotoIndex() as index:
+    ...     index.update()
+    ...     index.query(make="SONY", start=datetime(2025, 5, 1), end=datetime(2025, 6, 1))
+    """
+
+    def __init__(self, db_path: str = DEFAULT_INDEX_PATH):
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "PhotoIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def update(
+        self,
+        roots: Sequence[str] = INDEXED_PHOTO_DIRS,
+        min_workers: int = 1,
+        max_workers: int = 8,
+    ) -> IndexUpdateStats:
+        """
+        增量更新索引：只读取新增和 stat 发生变化的文件，删除已经不存在的文件
+
+        Args:
+            roots (Sequence[str]): 照片根目录
+            min_workers (int): 读取元数据的并发数下限
+            max_workers (int): 读取元数据的并发数上限
+        """
+        added = updated = removed = unchanged = failed = 0
+        for root in roots:
+            root = str(root)
+            if not os.path.isdir(root):
+                logger.warning(f"photo root does not exist, skip: {root}")
+                continue
+            known: Dict[str, Tuple[int, int, int]] = {
+                path: (size, mtime_ns, ino)
+                for path, size, mtime_ns, ino in self._conn.execute(
+                    "SELECT path, size, mtime_ns, ino FROM photos WHERE root = ?",
+                    (root,),
+                )
+            }
+            pending: List[Tuple[str, str, os.stat_result]] = []
+            for path, album, st in _walk_photos(root):
+                fingerprint = known.pop(path, None)
+                if fingerprint == (st.st_size, st.st_mtime_ns, st.st_ino):
+                    unchanged += 1
+                    continue
+                if fingerprint is None:
+                    added += 1
+                else:
+                    updated += 1
+                pending.append((path, album, st))
+
+            rows = []
+            controller = AdaptiveConcurrency(
+                min_workers=min_workers, max_workers=max_workers, name="photo-index"
+            )
+            for (path, album, st), future in adaptive_map(
+                lambda item: read_capture_metadata(item[0]), pending, controller
+            ):
+                try:
+                    metadata = future.result()
+                except Exception as e:
+                    # 无法读取元数据的文件也记录下来，避免每次更新都重新读取
+                    logger.warning(f"read metadata of '{path}' error: {e}")
+                    metadata = CaptureMetadata(None, "", "")
+                    failed += 1
+                rows.append(self._row(path, root, album, st, metadata))
+
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO photos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.executemany(
+                    "DELETE FROM photos WHERE path = ?", ((p,) for p in known)
+                )
+            removed += len(known)
+            logger.info(
+                f"indexed '{root}': {len(pending)} files read, {len(known)} removed"
+            )
+        return IndexUpdateStats(added, updated, removed, unchanged, failed)
+
+    @staticmethod
+    def _row(
+        path: str,
+        root: str,
+        album: str,
+        st: os.stat_result,
+        metadata: CaptureMetadata,
+    ) -> tuple:
+        capture_time = (
+            metadata.date_time_original.strftime(_TIME_FORMAT)
+            if metadata.date_time_original
+            else None
+        )
+        return (
+            path,
+            root,
+            album_tag(album),
+            st.st_size,
+            st.st_mtime_ns,
+            st.st_ino,
+            capture_time,
+            metadata.make,
+            metadata.model,
+        )
+
+    def query(
+        self,
+        make: Optional[str] = None,
+        model: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        album: Optional[str] = None,
+        root: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[PhotoRecord]:
+        """
+        查询照片，所有条件之间为“且”的关系，结果按拍摄时间排序
+
+        Args:
+            make (Optional[str]): 相机品牌（不区分大小写）
+            model (Optional[str]): 相机型号（不区分大小写）
+            start (Optional[datetime]): 拍摄时间下限（包含）
+            end (Optional[datetime]): 拍摄时间上限（不包含）
+            album (Optional[str]): 相册标签
+            root (Optional[str]): 照片根目录
+            limit (Optional[int]): 最多返回的数量
+        """
+        conditions: List[str] = []
+        params: List = []
+        if make is not None:
+            conditions.append("make = ? COLLATE NOCASE")
+            params.append(make)
+        if model is not None:
+            conditions.append("model = ? COLLATE NOCASE")
+            params.append(model)
+        if start is not None:
+            conditions.append("capture_time >= ?")
+            params.append(start.strftime(_TIME_FORMAT))
+        if end is not None:
+            conditions.append("capture_time < ?")
+            params.append(end.strftime(_TIME_FORMAT))
+        if album is not None:
+            conditions.append("album = ?")
+            params.append(album)
+        if root is not None:
+            conditions.append("root = ?")
+            params.append(str(root))
+
+        sql = "SELECT path, root, album, size, capture_time, make, model FROM photos"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY capture_time"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        records: List[PhotoRecord] = []
+        for row in self._conn.execute(sql, params):
+            capture_time = row[4] and datetime.strptime(row[4], _TIME_FORMAT)
+            records.append(PhotoRecord(*row[:4], capture_time, *row[5:]))
+        return records
+
+    def count(self) -> int:
+        """索引中的照片数量"""
+        return self._conn.execute("SELECT COUNT(*) FROM photos").fetchone()[0]
@@ -0,0 +1,341 @@
+"""
+缩略图缓存：以源文件的 stat 指纹、缩略图尺寸和 JPEG 质量为键，分片保存在磁盘上，
+总大小超过预算时按最近访问时间淘汰；命中时只 stat 源文件，不打开源文件
+"""
+
+import hashlib
+import io
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import pillow_heif
+from loguru import logger
+from PIL import Image
+
+from modules.photograph._enums.format import (
+    EXIF_SUPPORTED_FILE_EXT,
+    HEIF_SUPPORTED_FILE_EXT,
+    PhotoFormat,
+)
+from modules.photograph._types.fingerprint import FileFingerprint
+from modules.photograph.exif.tiff import IfdName, Tag, TiffIndex
+
+DEFAULT_THUMBNAIL_DIR = os.path.expanduser("~/.cache/a-bag-of-scripts/thumbnails")
+"""默认的缩略图缓存目录"""
+
+DEFAULT_MAX_BYTES = 2 * 1024**3
+"""默认的缓存大小预算(byte)"""
+
+EVICT_RATIO = 0.9
+"""超过预算时淘汰到预算的该比例，避免每次写入都触发淘汰"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS thumbnails (
+    key TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_thumbnails_last_access ON thumbnails (last_access);
+"""
+
+_ORIENTATION_TRANSPOSE = {
+    2: [Image.Transpose.FLIP_LEFT_RIGHT],
+    3: [Image.Transpose.ROTATE_180],
+    4: [Image.Transpose.FLIP_TOP_BOTTOM],
+    5: [Image.Transpose.TRANSPOSE],
+    6: [Image.Transpose.ROTATE_270],
+    7: [Image.Transpose.TRANSVERSE],
+    8: [Image.Transpose.ROTATE_90],
+}
+"""EXIF Orientation -> 旋转为正向需要的变换"""
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    """命中的数量"""
+
+    misses: int
+    """未命中、重新生成的数量"""
+
+    failed: int
+    """生成失败的数量"""
+
+    evicted: int
+    """淘汰的数量"""
+
+
+def cache_key(fingerprint: FileFingerprint, max_size: int, quality: int) -> str:
+    """缓存键：源文件的 (inode, 大小, 修改时间)、缩略图尺寸和 JPEG 质量，文件内容变化后自动失效"""
+    value = (
+        f"{fingerprint.ino}:{fingerprint.size}:{fingerprint.mtime_ns}"
+        f":{max_size}:{quality}"
+    )
+    return hashlib.blake2b(value.encode(), digest_size=16).hexdigest()
+
+
+def _open_source(file_path: str, max_size: int) -> Tuple[Image.Image, int]:
+    """
+    打开缩略图的来源图像：优先使用内嵌的预览图，其次使用 `draft` 缩小解码
+    Returns:
+        Tuple[Image.Image, int]: 图像和 EXIF Orientation
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext in HEIF_SUPPORTED_FILE_EXT:
+        heif_file = pillow_heif.open_heif(file_path)
+        primary = next(
+            (image for image in heif_file if image.info.get("primary")), heif_file[0]
+        )
+        # HEIF 的方向在解码时已经应用
+        for index, size in enumerate(primary.info.get("thumbnails") or []):
+            if size >= max_size:
+                return primary.get_thumbnail(index).to_pillow(), 1
+        return primary.to_pillow(), 1
+    if file_ext not in EXIF_SUPPORTED_FILE_EXT:
+        raise ValueError(f"Unsupported file({file_path}) format: {file_ext}")
+
+    index = TiffIndex.from_file(file_path)
+    orientation = index.value(IfdName.IFD0, Tag.ORIENTATION)
+    orientation = orientation if isinstance(orientation, int) else 1
+    # 内嵌 JPEG 按大小从小到大排列，选择第一个足够大的，只解析 JPEG 头获取尺寸
+    largest: Optional[Image.Image] = None
+    for embedded in index.embedded_jpegs():
+        try:
+            image = Image.open(io.BytesIO(index.read(embedded.offset, embedded.length)))
+        except Exception:
+            continue
+        largest = image
+        if max(image.size) >= max_size:
+            return image, orientation
+    if file_ext in (PhotoFormat.JPG, PhotoFormat.JPEG) or largest is None:
+        return Image.open(file_path), orientation
+    return largest, orientation
+
+
+def _render(file_path: str, output_file: str, max_size: int, quality: int) -> int:
+    """
+    生成缩略图（在进程池中执行）
+
+    Returns:
+        int: 缩略图文件大小(byte)
+    """
+    image, orientation = _open_source(file_path, max_size)
+    if image.format == "JPEG":
+        image.draft("RGB", (max_size, max_size))
+    image = image.convert("RGB")
+    image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+    for transpose in _ORIENTATION_TRANSPOSE.get(orientation, []):
+        image = image.transpose(transpose)
+    tmp_file = f"{output_file}.{os.getpid()}.tmp"
+    image.save(tmp_file, format="JPEG", quality=quality)
+    os.replace(tmp_file, output_file)
+    return os.path.getsize(output_file)
+
+
+class ThumbnailCache:
+    """
+    缩略图缓存
+
+    >>> with ThumbnailCache() as cache:
+    ...     thumbnails = cache.get_many(files, max_size=256)
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_THUMBNAIL_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        workers: int = 4,
+        quality: int = 85,
+    ):
+        """
+        Args:
+            cache_dir (str): 缓存目录
+            max_bytes (int): 缓存大小预算(byte)
+            workers (int): 生成缩略图的进程数，0 表示在当前进程中生成
+            quality (int): JPEG 质量
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self.quality = quality
+        os.makedirs(cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(cache_dir, "cache.db"))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._hits = self._misses = self._failed = self._evicted = 0
+
+    def __enter__(self) -> "ThumbnailCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @property
+    def stats(self) -> CacheStats:
+        """缓存统计"""
+        return CacheStats(self._hits, self._misses, self._failed, self._evicted)
+
+    def path_of(self, key: str) -> str:
+        """缓存文件路径，按键的前 4 个字符分为两级目录"""
+        return os.path.join(self.cache_dir, key[:2], key[2:4], f"{key}.jpg")
+
+    def lookup(self, file_path: str, max_size: int = 256) -> Optional[str]:
+        """查找缓存的缩略图，只 stat 源文件，未命中时返回 None"""
+        key = cache_key(FileFingerprint.from_path(file_path), max_size, self.quality)
+        size = self._cached_size(key)
+        if size is None:
+            return None
+        self._touch([(key, size)])
+        self._hits += 1
+        return self.path_of(key)
+
+    def get(self, file_path: str, max_size: int = 256) -> str:
+        """获取缩略图，未命中时生成"""
+        thumbnail = self.get_many([file_path], max_size).get(file_path)
+        if thumbnail is None:
+            raise ValueError(f"failed to generate thumbnail for '{file_path}'")
+        return thumbnail
+
+    def get_many(
+        self, file_paths: Sequence[str], max_size: int = 256
+    ) -> Dict[str, str]:
+        """
+        批量获取缩略图，未命中的在进程池中生成，生成失败的文件不包含在结果中
+
+        Returns:
+            Dict[str, str]: 源文件 -> 缩略图文件
+        """
+        results: Dict[str, str] = {}
+        hits: List[Tuple[str, int]] = []
+        pending: List[Tuple[str, str]] = []
+        for file_path in file_paths:
+            try:
+                fingerprint = FileFingerprint.from_path(file_path)
+            except OSError as e:
+                logger.warning(f"stat '{file_path}' error: {e}")
+                self._failed += 1
+                continue
+            key = cache_key(fingerprint, max_size, self.quality)
+            size = self._cached_size(key)
+            if size is not None:
+                results[file_path] = self.path_of(key)
+                hits.append((key, size))
+            else:
+                pending.append((file_path, key))
+        self._hits += len(hits)
+        self._touch(hits)
+        if not pending:
+            return results
+
+        for _, key in pending:
+            os.makedirs(os.path.dirname(self.path_of(key)), exist_ok=True)
+        args = [
+            (file_path, self.path_of(key), max_size, self.quality)
+            for file_path, key in pending
+        ]
+        if self.workers > 0:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = [executor.submit(_render, *arg) for arg in args]
+                outcomes = [self._outcome(future.result) for future in futures]
+        else:
+            outcomes = [self._outcome(lambda arg=arg: _render(*arg)) for arg in args]
+
+        rows = []
+        now = time.time()
+        for (file_path, key), outcome in zip(pending, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning(f"generate thumbnail for '{file_path}' error: {outcome}")
+                self._failed += 1
+                continue
+            results[file_path] = self.path_of(key)
+            rows.append((key, outcome, now))
+        self._misses += len(rows)
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO thumbnails VALUES (?, ?, ?)", rows
+            )
+        if self.total_bytes() > self.max_bytes:
+            self.evict()
+        return results
+
+    @staticmethod
+    def _outcome(fn) -> object:
+        try:
+            return fn()
+        except Exception as e:
+            return e
+
+    def _cached_size(self, key: str) -> Optional[int]:
+        """缓存文件的大小，不存在时返回 None"""
+        try:
+            return os.stat(self.path_of(key)).st_size
+        except FileNotFoundError:
+            return None
+
+    def _touch(self, hits: List[Tuple[str, int]]) -> None:
+        """
+        更新命中的缩略图的访问时间；进程在生成缩略图之后、写入数据库之前退出时，
+        缩略图文件没有对应的记录，命中时补充记录，使其参与淘汰
+        """
+        if not hits:
+            return
+        now = time.time()
+        with self._conn:
+            inserted = self._conn.executemany(
+                "INSERT OR IGNORE INTO thumbnails VALUES (?, ?, ?)",
+                ((key, size, now) for key, size in hits),
+            ).rowcount
+            self._conn.executemany(
+                "UPDATE thumbnails SET last_access = ? WHERE key = ?",
+                ((now, key) for key, _ in hits),
+            )
+        if inserted > 0:
+            logger.debug(f"{inserted} untracked thumbnails added to '{self.cache_dir}'")
+            if self.total_bytes() > self.max_bytes:
+                self.evict()
+
+    def total_bytes(self) -> int:
+        """缓存的缩略图总大小(byte)"""
+        return self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM thumbnails"
+        ).fetchone()[0]
+
+    def evict(self, target_bytes: Optional[int] = None) -> int:
+        """
+        按最近访问时间淘汰缩略图，直到总大小不超过 `target_bytes`
+
+        Args:
+            target_bytes (Optional[int]): 目标大小，默认为预算的 `EVICT_RATIO`
+        Returns:
+            int: 淘汰的数量
+        """
+        if target_bytes is None:
+            target_bytes = int(self.max_bytes * EVICT_RATIO)
+        excess = self.total_bytes() - target_bytes
+        if excess <= 0:
+            return 0
+        evicted: List[str] = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM thumbnails ORDER BY last_access"
+        ):
+            if excess <= 0:
+                break
+            evicted.append(key)
+            excess -= size
+        for key in evicted:
+            try:
+                os.remove(self.path_of(key))
+            except FileNotFoundError:
+                pass
+        with self._conn:
+            self._conn.executemany(
+                "DELETE FROM thumbnails WHERE key = ?", ((key,) for key in evicted)
+            )
+        self._evicted += len(evicted)
+        logger.debug(f"{len(evicted)} thumbnails evicted from '{self.cache_dir}'")
+        return len(evicted)
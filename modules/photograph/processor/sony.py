@@ -80,12 +80,13 @@ class RenameSonyRawPhotoTask(BaseTask):
             exif_info = ExifInfo(self._file_path)
             # 获取拍摄时间
             shot_time = exif_info.original_datetime
-            print(shot_time)
         except Exception as e:
             logger.warning(f"获取 EXIF 时间失败: {e}")
             # 如果获取 EXIF 时间失败，使用文件修改时间
             shot_time = datetime.fromtimestamp(self._file_path.stat().st_mtime)
 
+        self._shot_time = shot_time
+        """拍摄时间"""
         self._ready = True
 
     def description(self, dry_run: bool = True) -> str:
@@ -101,7 +102,7 @@ class RenameSonyRawPhotoTask(BaseTask):
         执行当前任务
         :param  : 是否为模拟执行
         """
-        logger.info(
+        logger.debug(
             f"Executing task for {self._file_path} in album {self._album_name}, dry_run={dry_run}"
         )
         # 这里可以添加执行任务的逻辑
@@ -156,7 +157,7 @@ class RenameSonyRawPhotoTask(BaseTask):
         :return: 新文件名（不含扩展名）
         """
         datestr = self._get_exif_datetime()
-        print(f"获取到的时间字符串: {datestr}")
+        logger.debug(f"获取到的时间字符串: {datestr}")
         exit()
         pass
 
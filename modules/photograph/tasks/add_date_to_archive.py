@@ -0,0 +1,292 @@
+"""
+为归档文件添加时间戳：`相册名.tar.gz` 重命名为 `相册名~YYYYMMDD_HHMMSS.tar.gz`，
+支持多个根目录和递归遍历，执行前一次性列出全部重命名，只确认一次
+"""
+
+import contextlib
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import ContextManager, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+from pydantic import BaseModel, Field
+
+from modules.photograph._enums.archive import ArchiveTimeSource
+from modules.photograph._types.archive import ArchiveManifest
+from modules.photograph.index.archive_index import ArchiveIndex
+from modules.photograph.utils._archive import (
+    ARCHIVE_TIME_FORMAT,
+    ArchiveEntry,
+    archive_ext,
+    archive_timestamp,
+    walk_archives,
+)
+from modules.photograph.utils._concurrency import AdaptiveConcurrency, adaptive_map
+from modules.photograph.utils._snapshot import DirSnapshot
+from modules.task.task import BaseTask, BaseTaskConfig
+
+_STAMP_PATTERN = re.compile(r"(\d{6}|\d{8})_\d{6}")
+"""文件名中的时间戳 `YYYYMMDD_HHMMSS`，以及旧的 `YYMMDD_HHMMSS`"""
+
+
+class AddDateToArchiveTaskConfig(BaseTaskConfig):
+    roots: List[str] = Field(default_factory=list, description="归档文件所在的目录")
+    """归档文件所在的目录，多个目录并发遍历"""
+
+    recursive: bool = Field(default=False, description="是否递归遍历子目录")
+    """是否递归遍历子目录"""
+
+    time_source: ArchiveTimeSource = Field(
+        default=ArchiveTimeSource.MTIME, description="时间戳来源"
+    )
+    """时间戳来源，成员时间与文件名中已有的时间戳不一致时以成员时间为准重新命名"""
+
+    index_file: Optional[str] = Field(default=None, description="归档成员索引数据库")
+    """归档成员索引数据库，存在时优先使用其中记录的成员，重命名后同步更新索引"""
+
+    snapshot_file: Optional[str] = Field(default=None, description="目录快照文件")
+    """目录快照文件，只列出上次执行之后发生变化的目录"""
+
+    workers: int = Field(default=4, ge=1, description="读取归档的并发数上限")
+    """遍历根目录和读取归档时间戳的并发数上限"""
+
+    require_confirm: bool = Field(default=True, description="执行前是否需要交互确认")
+    """执行前是否需要交互确认"""
+
+
+class ArchiveRename(BaseModel):
+    src: str
+    """归档文件"""
+
+    dst: str
+    """添加时间戳之后的归档文件"""
+
+    size: int
+    """文件大小(byte)"""
+
+
+def stamped_name(
+    file_name: str, timestamp: float, time_source: ArchiveTimeSource
+) -> Optional[str]:
+    """
+    添加时间戳之后的文件名，保留后缀的大小写；不需要重命名时返回 None
+
+    文件名中已经有合法的时间戳但与 `timestamp` 不一致时：修改时间可能被同步或复制重置，
+    `MTIME` 不覆盖已有的时间戳；成员时间来自归档内容，以成员时间为准
+    """
+    ext = archive_ext(file_name)
+    if ext is None:
+        return None
+    suffix = file_name[-len(ext) :]
+    base, sep, stamp = file_name[: -len(ext)].partition("~")
+    date_time = time.strftime(ARCHIVE_TIME_FORMAT, time.localtime(timestamp))
+    new_name = f"{base}~{date_time}{suffix}"
+    if new_name == file_name:
+        return None
+    if sep:
+        if not _is_stamp(stamp):
+            logger.warning(f"skip '{file_name}': unrecognized timestamp '{stamp}'")
+            return None
+        if time_source == ArchiveTimeSource.MTIME:
+            logger.warning(f"skip '{file_name}': already stamped, mtime differs")
+            return None
+    return new_name
+
+
+def _is_stamp(stamp: str) -> bool:
+    if not _STAMP_PATTERN.fullmatch(stamp):
+        return False
+    if len(stamp) == 13:
+        # 旧的时间戳只有两位年份，假设年份在 2000 年之后
+        stamp = f"20{stamp}"
+    try:
+        time.strptime(stamp, ARCHIVE_TIME_FORMAT)
+    except ValueError:
+        return False
+    return True
+
+
+def resolve_timestamps(
+    files: List[Tuple[str, os.stat_result]],
+    time_source: ArchiveTimeSource,
+    index: Optional[ArchiveIndex],
+    workers: int,
+) -> Dict[str, Optional[float]]:
+    """
+    读取每个归档文件的时间戳，成员列表优先使用索引中的记录，其余归档在线程池中并发读取
+
+    Returns:
+        Dict[str, Optional[float]]: 归档文件路径 -> 时间戳，读取失败时为 None
+    """
+    if time_source == ArchiveTimeSource.MTIME:
+        return {path: st.st_mtime for path, st in files}
+
+    cached: Dict[str, List[ArchiveEntry]] = {}
+    if index is not None:
+        for path, st in files:
+            entries = index.entries(path, st)
+            if entries is not None:
+                cached[path] = entries
+
+    timestamps: Dict[str, Optional[float]] = {}
+    controller = AdaptiveConcurrency(max_workers=workers, name="archive-time")
+    for (path, _), future in adaptive_map(
+        lambda item: archive_timestamp(item[0], time_source, cached.get(item[0])),
+        files,
+        controller,
+    ):
+        try:
+            timestamps[path] = future.result()
+        except Exception as e:
+            logger.warning(f"read archive '{path}' error: {e}")
+            timestamps[path] = None
+    return timestamps
+
+
+class AddDateToArchiveTask(BaseTask):
+    """
+    为归档文件添加时间戳的任务
+    """
+
+    config: AddDateToArchiveTaskConfig
+    """任务配置"""
+
+    def __init__(self, config: AddDateToArchiveTaskConfig):
+        super().__init__(config)
+        self.config = config
+        self.snapshot: Optional[DirSnapshot] = None
+        """目录快照，执行完成后保存"""
+        self.skipped_dirs: Set[str] = set()
+        """有归档因为读取失败或者目标文件名被占用而跳过的目录，不记录快照，下次运行时重新列出"""
+        self.renames: List[ArchiveRename] = self._plan()
+        """需要执行的重命名，按路径排序"""
+
+    def name(self) -> str:
+        return self.config.name
+
+    def describe(self) -> str:
+        return (
+            f"task [{self.config.name}] found {len(self.renames)} archives to stamp "
+            f"in {len(self.config.roots)} roots (time source: {self.config.time_source})."
+        )
+
+    def execute(self, dry_run: bool = False) -> int:
+        """
+        重命名归档文件，成员索引文件 `*.members.json.gz` 随归档一起重命名
+
+        Returns:
+            int: 重命名的归档数量
+        """
+        logger.info(f"start executing task [{self.config.name}]，dry_run={dry_run}")
+        for i, rename in enumerate(self.renames):
+            logger.info(
+                f"{i:>4} {rename.size / 1024**3:>8.2f}(G) "
+                f"'{rename.src}' -> '{os.path.basename(rename.dst)}'"
+            )
+        if dry_run:
+            return 0
+        if len(self.renames) == 0:
+            self._save_snapshot()
+            return 0
+        if self.config.require_confirm and not self.confirm():
+            return 0
+
+        renamed = 0
+        with self._open_index() as index:
+            for rename in self.renames:
+                if os.path.lexists(rename.dst):
+                    logger.warning(f"target '{rename.dst}' already exists, skip")
+                    self.skipped_dirs.add(os.path.dirname(rename.src))
+                    continue
+                os.rename(rename.src, rename.dst)
+                manifest_file = ArchiveManifest.path_of(rename.src)
+                if os.path.exists(manifest_file):
+                    os.rename(manifest_file, ArchiveManifest.path_of(rename.dst))
+                if index is not None:
+                    index.rename(rename.src, rename.dst)
+                renamed += 1
+        self._save_snapshot()
+        logger.info(f"{renamed} archives renamed")
+        return renamed
+
+    def _open_index(self) -> ContextManager[Optional[ArchiveIndex]]:
+        """成员时间优先使用已有的归档成员索引，索引不存在时不创建"""
+        index_file = self.config.index_file
+        use_index = (
+            index_file is not None
+            and os.path.exists(index_file)
+            and self.config.time_source != ArchiveTimeSource.MTIME
+        )
+        return ArchiveIndex(index_file) if use_index else contextlib.nullcontext()
+
+    def _scan_dirs(self) -> List[Tuple[str, bool]]:
+        """需要列出的 (目录, 是否递归)，有快照时只列出发生变化的目录"""
+        if self.config.snapshot_file is None:
+            return [(root, self.config.recursive) for root in self.config.roots]
+        self.snapshot = DirSnapshot.load(self.config.snapshot_file)
+        dirs: List[Tuple[str, bool]] = []
+        for root in self.config.roots:
+            changed = self.snapshot.refresh(root, self.config.recursive)
+            if not changed:
+                logger.info(f"'{root}' unchanged since last run, skip")
+            # 快照中每个发生变化的目录都单独列出，不需要递归
+            dirs.extend((d, False) for d in changed)
+        return dirs
+
+    def _plan(self) -> List[ArchiveRename]:
+        for root in self.config.roots:
+            if not os.path.isdir(root):
+                raise FileNotFoundError(f"directory '{root}' not found")
+        scan_dirs = self._scan_dirs()
+        files: List[Tuple[str, os.stat_result]] = []
+        if scan_dirs:
+            with ThreadPoolExecutor(
+                max_workers=min(len(scan_dirs), self.config.workers),
+                thread_name_prefix="archive-scan",
+            ) as executor:
+                for found in executor.map(
+                    lambda item: list(walk_archives(*item)), scan_dirs
+                ):
+                    files.extend(found)
+        files.sort(key=lambda item: item[0])
+
+        with self._open_index() as index:
+            timestamps = resolve_timestamps(
+                files, self.config.time_source, index, self.config.workers
+            )
+
+        renames: List[ArchiveRename] = []
+        targets = set()
+        for path, st in files:
+            timestamp = timestamps.get(path)
+            if timestamp is None:
+                logger.warning(
+                    f"skip '{path}': no timestamp ({self.config.time_source})"
+                )
+                self.skipped_dirs.add(os.path.dirname(path))
+                continue
+            new_name = stamped_name(
+                os.path.basename(path), timestamp, self.config.time_source
+            )
+            if new_name is None:
+                continue
+            dst = os.path.join(os.path.dirname(path), new_name)
+            if dst in targets or os.path.lexists(dst):
+                logger.warning(f"skip '{path}': target '{new_name}' already exists")
+                self.skipped_dirs.add(os.path.dirname(path))
+                continue
+            targets.add(dst)
+            renames.append(ArchiveRename(src=path, dst=dst, size=st.st_size))
+        return renames
+
+    def _save_snapshot(self) -> None:
+        """执行完成后记录目录当前的状态，有归档被跳过的目录除外"""
+        if self.snapshot is None or self.config.snapshot_file is None:
+            return
+        for root in self.config.roots:
+            self.snapshot.refresh(root, self.config.recursive)
+        for skipped_dir in self.skipped_dirs:
+            self.snapshot.forget(skipped_dir)
+        self.snapshot.save(self.config.snapshot_file)
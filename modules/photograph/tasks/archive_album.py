@@ -0,0 +1,99 @@
+"""
+相册归档任务：将相册打包压缩为 `相册名~YYYYMMDD_HHMMSS.tar.gz`，
+文件名中的时间与 `add-date-to-archived-files` 使用的修改时间一致
+"""
+
+import os
+from typing import List, Optional
+
+from loguru import logger
+from pydantic import Field
+
+from modules.photograph._enums.archive import ArchiveCodec
+from modules.photograph.utils._archive import (
+    DEFAULT_CHUNK_BYTES,
+    archive_album,
+    list_album,
+)
+from modules.task.task import BaseTask, BaseTaskConfig
+
+
+class ArchiveAlbumTaskConfig(BaseTaskConfig):
+    album_dirs: List[str] = Field(default_factory=list, description="相册目录列表")
+    """需要归档的相册目录"""
+
+    output_dir: Optional[str] = Field(default=None, description="归档文件的输出目录")
+    """归档文件的输出目录，为 None 时为相册的上级目录"""
+
+    codec: ArchiveCodec = Field(default=ArchiveCodec.GZIP, description="压缩方式")
+    """压缩方式"""
+
+    level: Optional[int] = Field(default=None, description="压缩级别")
+    """压缩级别，为 None 时使用默认级别"""
+
+    chunk_bytes: int = Field(
+        default=DEFAULT_CHUNK_BYTES, gt=0, description="每个数据块压缩前的大小"
+    )
+    """每个数据块压缩前的大小，数据块越大压缩率越高，占用的内存也越多"""
+
+    workers: int = Field(
+        default_factory=lambda: os.cpu_count() or 4, ge=1, description="压缩进程数"
+    )
+    """压缩进程数"""
+
+    require_confirm: bool = Field(default=True, description="执行前是否需要交互确认")
+    """执行前是否需要交互确认"""
+
+
+class ArchiveAlbumTask(BaseTask):
+    """
+    相册归档任务，不删除相册目录
+    """
+
+    config: ArchiveAlbumTaskConfig
+    """任务配置"""
+
+    def __init__(self, config: ArchiveAlbumTaskConfig):
+        super().__init__(config)
+        self.config = config
+        self.archives: List[str] = []
+        """已生成的归档文件"""
+
+    def name(self) -> str:
+        return self.config.name
+
+    def describe(self) -> str:
+        total = sum(
+            st.st_size
+            for album in self.config.album_dirs
+            for _, _, st in list_album(album)
+        )
+        return (
+            f"task [{self.config.name}] with {len(self.config.album_dirs)} albums "
+            f"({total / 1024**3:.2f} GB) to archive as {self.config.codec.ext}."
+        )
+
+    def execute(self, dry_run: bool = False) -> List[str]:
+        logger.info(f"start executing task [{self.config.name}]，dry_run={dry_run}")
+        for album_dir in self.config.album_dirs:
+            logger.info(f"album to archive: '{album_dir}'")
+        if dry_run or not self.config.album_dirs:
+            return []
+        if self.config.require_confirm and not self.confirm():
+            return []
+
+        for album_dir in self.config.album_dirs:
+            archive_file = archive_album(
+                album_dir,
+                output_dir=self.config.output_dir,
+                codec=self.config.codec,
+                level=self.config.level,
+                chunk_bytes=self.config.chunk_bytes,
+                workers=self.config.workers,
+            )
+            self.archives.append(archive_file)
+            logger.info(
+                f"'{album_dir}' archived to '{archive_file}' "
+                f"({os.path.getsize(archive_file) / 1024**3:.2f} GB)"
+            )
+        return self.archives
@@ -0,0 +1,259 @@
+"""
+重复文件查找：按文件大小分组，再比较文件头和文件尾的校验和，
+只有仍然相同的候选文件才读取整个文件计算校验和，可以选择将重复的文件替换为硬链接
+"""
+
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+from pydantic import BaseModel, Field
+
+from modules.photograph._types.fingerprint import FileFingerprint
+from modules.photograph.index.photo_index import INDEXED_FILE_EXT
+from modules.photograph.utils._hash import EDGE_BYTES, edge_checksum, file_checksum
+from modules.task.task import BaseTask, BaseTaskConfig
+
+
+class FindDuplicatesTaskConfig(BaseTaskConfig):
+    roots: List[str] = Field(default_factory=list, description="查找的根目录")
+    """查找的根目录，递归查找其中的文件"""
+
+    extensions: List[str] = Field(
+        default_factory=lambda: sorted(INDEXED_FILE_EXT),
+        description="查找的文件扩展名",
+    )
+    """查找的文件扩展名（小写），为空时查找全部文件"""
+
+    min_size: int = Field(default=1, ge=0, description="最小文件大小(byte)")
+    """小于该大小的文件不参与比较"""
+
+    workers: int = Field(default=4, ge=1, description="计算校验和的并发数")
+    """计算校验和的并发数"""
+
+    hardlink: bool = Field(default=False, description="是否将重复的文件替换为硬链接")
+    """是否将重复的文件替换为硬链接，只替换与保留文件位于同一文件系统的文件"""
+
+    require_confirm: bool = Field(default=True, description="执行前是否需要交互确认")
+    """执行前是否需要交互确认"""
+
+
+class DuplicateGroup(BaseModel):
+    size: int
+    """文件大小"""
+
+    checksum: str
+    """BLAKE2b 校验和"""
+
+    files: List[str]
+    """内容相同的文件，按路径排序，第一个文件为保留的文件"""
+
+    @property
+    def wasted(self) -> int:
+        """重复文件占用的空间"""
+        return self.size * (len(self.files) - 1)
+
+
+class DuplicateScanStats(BaseModel):
+    files: int = 0
+    """扫描的文件数量（同一个 inode 只计算一次）"""
+
+    size_candidates: int = 0
+    """存在相同大小文件的文件数量"""
+
+    edge_candidates: int = 0
+    """文件头和文件尾也相同、需要读取整个文件的文件数量"""
+
+    bytes_read: int = 0
+    """计算校验和读取的数据量"""
+
+
+class _File:
+    __slots__ = ("path", "size", "dev", "ino", "fingerprint")
+
+    def __init__(self, path: str, stat: os.stat_result):
+        self.path = path
+        self.size = stat.st_size
+        self.dev = stat.st_dev
+        self.ino = stat.st_ino
+        self.fingerprint = FileFingerprint.from_stat(stat)
+
+
+class FindDuplicatesTask(BaseTask):
+    """
+    重复文件查找任务
+    """
+
+    config: FindDuplicatesTaskConfig
+    """任务配置"""
+
+    def __init__(self, config: FindDuplicatesTaskConfig):
+        super().__init__(config)
+        self.config = config
+        self.stats = DuplicateScanStats()
+        """扫描统计"""
+        self._fingerprints: Dict[str, FileFingerprint] = {}
+        self.groups: List[DuplicateGroup] = self._find_duplicates()
+        """重复文件分组，按浪费的空间从大到小排列"""
+
+    def name(self) -> str:
+        return self.config.name
+
+    def describe(self) -> str:
+        wasted = sum(group.wasted for group in self.groups)
+        return (
+            f"task [{self.config.name}] found {len(self.groups)} duplicate groups "
+            f"({wasted / 1024**3:.2f} GB wasted) in {self.stats.files} files, "
+            f"{self.stats.bytes_read / 1024**3:.2f} GB read."
+        )
+
+    def execute(self, dry_run: bool = False) -> int:
+        """
+        输出重复文件分组，`config.hardlink=True` 时将重复的文件替换为硬链接
+
+        Returns:
+            int: 替换为硬链接的文件数量
+        """
+        logger.info(f"start executing task [{self.config.name}]，dry_run={dry_run}")
+        for group in self.groups:
+            logger.info(f"{len(group.files)} files of {group.size} bytes:")
+            for file in group.files:
+                logger.info(f"    {file}")
+        if dry_run or not self.config.hardlink or len(self.groups) == 0:
+            return 0
+        if self.config.require_confirm and not self.confirm():
+            return 0
+
+        linked = 0
+        for group in self.groups:
+            linked += self._hardlink_group(group)
+        logger.info(f"{linked} duplicate files replaced with hardlinks")
+        return linked
+
+    def _walk(self) -> Iterator[_File]:
+        extensions = {ext.lower() for ext in self.config.extensions}
+        for root in self.config.roots:
+            stack = [root]
+            while stack:
+                current = stack.pop()
+                try:
+                    with os.scandir(current) as entries:
+                        for entry in entries:
+                            if entry.name.startswith("."):
+                                continue
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif not entry.is_file(follow_symlinks=False):
+                                continue
+                            elif (
+                                not extensions
+                                or os.path.splitext(entry.name)[1].lower() in extensions
+                            ):
+                                yield _File(entry.path, entry.stat())
+                except OSError as e:
+                    logger.warning(f"scan directory '{current}' error: {e}")
+
+    def _find_duplicates(self) -> List[DuplicateGroup]:
+        # 第一步：按文件大小分组，已经是硬链接的文件只保留一个
+        by_size: Dict[int, List[_File]] = defaultdict(list)
+        seen_inodes = set()
+        for file in self._walk():
+            if file.size < self.config.min_size or (file.dev, file.ino) in seen_inodes:
+                continue
+            seen_inodes.add((file.dev, file.ino))
+            by_size[file.size].append(file)
+            self.stats.files += 1
+        candidates = [files for files in by_size.values() if len(files) > 1]
+        self.stats.size_candidates = sum(len(files) for files in candidates)
+
+        # 第二步：比较文件头和文件尾，小文件在这一步已经读取了整个文件
+        by_edge = self._regroup(
+            candidates,
+            lambda file: edge_checksum(file.path, file.size),
+            lambda file: min(file.size, 2 * EDGE_BYTES),
+        )
+        groups: List[DuplicateGroup] = []
+        candidates = []
+        for checksum, files in by_edge:
+            if files[0].size <= 2 * EDGE_BYTES:
+                groups.append(self._group(checksum, files))
+            else:
+                candidates.append(files)
+        self.stats.edge_candidates = sum(len(files) for files in candidates)
+
+        # 第三步：只对剩余的候选文件读取整个文件
+        by_content = self._regroup(
+            candidates,
+            lambda file: file_checksum(file.path),
+            lambda file: file.size,
+        )
+        groups.extend(self._group(checksum, files) for checksum, files in by_content)
+        groups.sort(key=lambda group: (-group.wasted, group.files[0]))
+        return groups
+
+    def _regroup(
+        self,
+        candidates: List[List[_File]],
+        checksum_of: Callable[[_File], str],
+        bytes_of: Callable[[_File], int],
+    ) -> List[Tuple[str, List[_File]]]:
+        """在线程池中计算候选文件的校验和，按校验和重新分组，只返回多于一个文件的分组"""
+        files = [file for group in candidates for file in group]
+        if not files:
+            return []
+
+        def checksum(file: _File) -> Optional[str]:
+            try:
+                return checksum_of(file)
+            except OSError as e:
+                logger.warning(f"read '{file.path}' error: {e}")
+                return None
+
+        with ThreadPoolExecutor(
+            max_workers=self.config.workers, thread_name_prefix="dedup"
+        ) as executor:
+            checksums = list(executor.map(checksum, files))
+
+        regrouped: Dict[Tuple[int, str], List[_File]] = defaultdict(list)
+        for file, value in zip(files, checksums):
+            if value is None:
+                continue
+            self.stats.bytes_read += bytes_of(file)
+            regrouped[(file.size, value)].append(file)
+        return [
+            (value, group) for (_, value), group in regrouped.items() if len(group) > 1
+        ]
+
+    def _group(self, checksum: str, files: List[_File]) -> DuplicateGroup:
+        for file in files:
+            self._fingerprints[file.path] = file.fingerprint
+        return DuplicateGroup(
+            size=files[0].size,
+            checksum=checksum,
+            files=sorted(file.path for file in files),
+        )
+
+    def _hardlink_group(self, group: DuplicateGroup) -> int:
+        """将分组中的其余文件替换为第一个文件的硬链接，扫描之后发生变化的文件不替换"""
+        keep = group.files[0]
+        if not self._fingerprints[keep].matches(keep):
+            logger.warning(f"'{keep}' changed since it was scanned, skip group")
+            return 0
+        keep_dev = os.stat(keep).st_dev
+        linked = 0
+        for file in group.files[1:]:
+            if not self._fingerprints[file].matches(file):
+                logger.warning(f"'{file}' changed since it was scanned, skip")
+                continue
+            if os.stat(file).st_dev != keep_dev:
+                logger.warning(f"'{file}' is on another filesystem, skip")
+                continue
+            # 先在同一目录下创建硬链接，再原子地替换重复的文件
+            tmp_file = f"{file}.dedup-tmp"
+            os.link(keep, tmp_file)
+            os.replace(tmp_file, file)
+            linked += 1
+            logger.info(f"'{file}' -> '{keep}'")
+        return linked
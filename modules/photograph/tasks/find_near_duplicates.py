@@ -0,0 +1,212 @@
+"""
+近似重复照片查找：连拍和重新导出的照片字节不同，通过内嵌缩略图的感知哈希查找
+"""
+
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+from loguru import logger
+from pydantic import BaseModel, ConfigDict, Field
+
+from modules.photograph._enums.format import PhotoFormat
+from modules.photograph._enums.hash import PerceptualHash
+from modules.photograph._enums.photo import SupportedPhotoHeifExt, SupportedPhotoRawExt
+from modules.photograph._types.photo import FileTag
+from modules.photograph._types.plan import ScanError
+from modules.photograph.tasks.rename_raw_photo import RenameRawPhotoTask
+from modules.photograph.utils._concurrency import AdaptiveConcurrency, adaptive_map
+from modules.photograph.utils._metadata import read_thumbnail
+from modules.photograph.utils._phash import near_pairs, perceptual_hash
+from modules.task.task import BaseTask, BaseTaskConfig
+
+
+class FindNearDuplicatesTaskConfig(BaseTaskConfig):
+    file_tag_list: List[FileTag] = Field(
+        default_factory=list, description="文件标签列表"
+    )
+    """文件标签列表，与 `RenameRawPhotoTask` 相同"""
+
+    supported_ext: List[str] = Field(
+        default_factory=lambda: [
+            *[e.value for e in SupportedPhotoRawExt],
+            *[e.value for e in SupportedPhotoHeifExt],
+            PhotoFormat.JPG.value,
+            PhotoFormat.JPEG.value,
+        ],
+        description="支持的文件扩展名",
+    )
+    """支持的文件扩展名"""
+
+    hash_kind: PerceptualHash = Field(
+        default=PerceptualHash.DHASH, description="感知哈希算法"
+    )
+    """感知哈希算法"""
+
+    max_distance: int = Field(default=6, ge=0, le=64, description="最大汉明距离")
+    """哈希汉明距离不超过该值时视为近似重复"""
+
+    time_window_s: float = Field(default=10.0, ge=0, description="时间窗口(s)")
+    """只比较拍摄时间相差不超过该值的照片，连拍和重新导出的照片拍摄时间相近"""
+
+    scan_workers_max: int = Field(default=8, ge=1, description="读取并发数上限")
+    """读取缩略图的并发数上限"""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+class NearDuplicatePair(BaseModel):
+    file_a: str
+    """照片 A"""
+
+    file_b: str
+    """照片 B"""
+
+    distance: int
+    """哈希汉明距离"""
+
+
+class FindNearDuplicatesTask(BaseTask):
+    """
+    近似重复照片查找任务，只输出结果，不修改任何文件
+    """
+
+    config: FindNearDuplicatesTaskConfig
+    """任务配置"""
+
+    def __init__(self, config: FindNearDuplicatesTaskConfig):
+        super().__init__(config)
+        self.config = config
+        self.scan_errors: List[ScanError] = []
+        """读取失败的文件"""
+        self.files: List[str] = []
+        """参与比较的文件"""
+        self.pairs: List[NearDuplicatePair] = self._find_pairs()
+        """近似重复的照片对，按汉明距离排序"""
+
+    def name(self) -> str:
+        return self.config.name
+
+    def describe(self) -> str:
+        description = (
+            f"task [{self.config.name}] found {len(self.pairs)} near-duplicate pairs "
+            f"in {len(self.files)} files"
+        )
+        if self.scan_errors:
+            description += f", {len(self.scan_errors)} files failed to scan"
+        return f"{description}."
+
+    def groups(self) -> List[List[str]]:
+        """将近似重复的照片对合并为分组（连通分量），按第一个文件排序"""
+        parent: Dict[str, str] = {}
+
+        def find(file: str) -> str:
+            parent.setdefault(file, file)
+            while parent[file] != file:
+                parent[file] = parent[parent[file]]
+                file = parent[file]
+            return file
+
+        for pair in self.pairs:
+            root_a, root_b = find(pair.file_a), find(pair.file_b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+        groups: Dict[str, List[str]] = {}
+        for file in parent:
+            groups.setdefault(find(file), []).append(file)
+        return sorted(sorted(group) for group in groups.values())
+
+    def execute(self, dry_run: bool = False) -> List[List[str]]:
+        logger.info(f"start executing task [{self.config.name}]，dry_run={dry_run}")
+        groups = self.groups()
+        for group in groups:
+            logger.info(f"{len(group)} near-duplicate photos:")
+            for file in group:
+                logger.info(f"    {file}")
+        return groups
+
+    def _find_all_files(self) -> List[Tuple[str, FileTag]]:
+        """
+        与 `RenameRawPhotoTask` 相同的方式列出相册中的文件，同名的文件（例如 RAW+JPEG）
+        内嵌的缩略图和拍摄时间相同，按 `supported_ext` 的顺序每组只比较一个文件
+        """
+        priority = {ext: index for index, ext in enumerate(self.config.supported_ext)}
+        items: List[Tuple[str, FileTag]] = []
+        for file_tag in self.config.file_tag_list:
+            stems: Dict[str, str] = {}
+            for file in sorted(RenameRawPhotoTask._list_dir(file_tag)):
+                if file.startswith("."):
+                    continue
+                stem, ext = os.path.splitext(file)
+                if ext.lower() not in priority:
+                    continue
+                chosen = stems.get(stem)
+                if (
+                    chosen is None
+                    or priority[ext.lower()]
+                    < priority[os.path.splitext(chosen)[1].lower()]
+                ):
+                    stems[stem] = file
+            items.extend((file, file_tag) for file in sorted(stems.values()))
+        return items
+
+    def _find_pairs(self) -> List[NearDuplicatePair]:
+        items = self._find_all_files()
+        hashes = np.zeros(len(items), dtype=np.uint64)
+        times = np.full(len(items), np.datetime64("NaT"), dtype="datetime64[s]")
+        valid = np.zeros(len(items), dtype=bool)
+
+        def read(index: int) -> Tuple[int, np.datetime64]:
+            """读取缩略图计算哈希，同时获取拍摄时间"""
+            file, file_tag = items[index]
+            thumbnail = read_thumbnail(os.path.join(file_tag.dir, file))
+            value = perceptual_hash(thumbnail.image, self.config.hash_kind)
+            date_time = thumbnail.date_time_original
+            return value, (
+                np.datetime64(date_time, "s")
+                if date_time is not None
+                else np.datetime64("NaT")
+            )
+
+        controller = AdaptiveConcurrency(
+            max_workers=self.config.scan_workers_max, name=f"scan-{self.config.name}"
+        )
+        for index, future in adaptive_map(read, range(len(items)), controller):
+            try:
+                hashes[index], times[index] = future.result()
+                valid[index] = True
+            except Exception as e:
+                file, file_tag = items[index]
+                self.scan_errors.append(
+                    ScanError(
+                        parent_dir=file_tag.dir,
+                        tag=file_tag.tag,
+                        file=file,
+                        error_type=type(e).__name__,
+                        message=str(e),
+                    )
+                )
+                logger.warning(f"scan '{os.path.join(file_tag.dir, file)}' error: {e}")
+
+        missing_time = int((valid & np.isnat(times)).sum())
+        if missing_time:
+            logger.warning(
+                f"{missing_time} files without capture time are not compared"
+            )
+        self.files = [os.path.join(file_tag.dir, file) for file, file_tag in items]
+        pairs = near_pairs(
+            hashes,
+            times,
+            self.config.max_distance,
+            self.config.time_window_s,
+            valid=valid,
+        )
+        return sorted(
+            (
+                NearDuplicatePair(
+                    file_a=self.files[i], file_b=self.files[j], distance=int(distance)
+                )
+                for i, j, distance in pairs
+            ),
+            key=lambda pair: (pair.distance, pair.file_a, pair.file_b),
+        )
@@ -0,0 +1,239 @@
+"""
+全景照片分组：不依赖相机为每组全景照片创建的目录（例如 DJI 的 `001_00NN`），
+按拍摄时间间隔和相机将照片聚类为全景组，移动到 `YYMMDD-相册名_HHMMSS/YYMMDD-相册名_HHMMSS_NN`
+"""
+
+import os
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+from pydantic import BaseModel, ConfigDict, Field
+
+from modules.photograph._enums.format import (
+    EXIF_SUPPORTED_FILE_EXT,
+    HEIF_SUPPORTED_FILE_EXT,
+)
+from modules.photograph._types.catalog import PhotoCatalog, PhotoRow
+from modules.photograph._types.photo import FileTag
+from modules.photograph.utils._fileops import move_file
+from modules.task.task import BaseTask, BaseTaskConfig
+
+
+class GroupPanoramaTaskConfig(BaseTaskConfig):
+    file_tag_list: List[FileTag] = Field(
+        default_factory=list, description="全景照片目录列表"
+    )
+    """全景照片目录列表，递归查找其中的照片，标签为分组目录名中的相册名"""
+
+    supported_ext: List[str] = Field(
+        default_factory=lambda: [
+            *[str(e) for e in EXIF_SUPPORTED_FILE_EXT],
+            *HEIF_SUPPORTED_FILE_EXT,
+        ],
+        description="支持的文件扩展名",
+    )
+    """读取拍摄时间的文件扩展名，与照片同名的其他文件（例如 xmp）随照片一起移动"""
+
+    gap_s: float = Field(default=5.0, ge=0, description="同一组照片的最大拍摄间隔(s)")
+    """排序后相邻照片的拍摄时间相差超过该值时开始新的一组"""
+
+    by_camera: bool = Field(default=True, description="是否按相机分组")
+    """是否只将同一相机品牌和型号的照片分为一组"""
+
+    min_shots: int = Field(default=1, ge=1, description="每组最少的照片数量")
+    """照片数量少于该值的分组不移动"""
+
+    output_dir: Optional[str] = Field(default=None, description="分组目录的位置")
+    """分组目录的位置，为 None 时创建在每组第一个文件所在目录的同级目录"""
+
+    verify: bool = Field(default=True, description="跨文件系统移动时是否比较校验和")
+    """分组目录位于其他文件系统时，复制后是否比较校验和再删除源文件"""
+
+    scan_workers_max: int = Field(default=8, ge=1, description="读取并发数上限")
+    """读取拍摄时间的并发数上限"""
+
+    require_confirm: bool = Field(default=True, description="执行前是否需要交互确认")
+    """执行前是否需要交互确认"""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+class PanoramaSet(BaseModel):
+    name: str
+    """分组名称 `YYMMDD-相册名_HHMMSS`"""
+
+    target_dir: str
+    """分组目录"""
+
+    start: datetime
+    """第一张照片的拍摄时间"""
+
+    camera: str
+    """相机品牌和型号"""
+
+    moves: List[Tuple[str, str]] = Field(default_factory=list)
+    """(源文件, 目标文件)"""
+
+
+class GroupPanoramaTask(BaseTask):
+    """
+    全景照片分组任务
+    """
+
+    config: GroupPanoramaTaskConfig
+    """任务配置"""
+
+    def __init__(self, config: GroupPanoramaTaskConfig):
+        super().__init__(config)
+        self.config = config
+        self.skipped: List[str] = []
+        """没有分组的文件（读取失败、缺失拍摄时间或者所在分组的照片太少）"""
+        self.sets: List[PanoramaSet] = self._find_sets()
+        """全景组，按相册和拍摄时间排序"""
+
+    def name(self) -> str:
+        return self.config.name
+
+    def describe(self) -> str:
+        files = sum(len(pano_set.moves) for pano_set in self.sets)
+        description = (
+            f"task [{self.config.name}] found {len(self.sets)} panorama sets "
+            f"with {files} files"
+        )
+        if self.skipped:
+            description += f", {len(self.skipped)} files skipped"
+        return f"{description}."
+
+    def execute(self, dry_run: bool = False) -> int:
+        """
+        创建分组目录并移动文件，目标文件已经存在时跳过
+
+        Returns:
+            int: 移动的文件数量
+        """
+        logger.info(f"start executing task [{self.config.name}]，dry_run={dry_run}")
+        for pano_set in self.sets:
+            logger.info(f"{pano_set.name} ({pano_set.camera}):")
+            for src, dst in pano_set.moves:
+                logger.info(f"    '{src}' -> '{dst}'")
+        if dry_run or len(self.sets) == 0:
+            return 0
+        if self.config.require_confirm and not self.confirm():
+            return 0
+
+        moved = 0
+        for pano_set in self.sets:
+            os.makedirs(pano_set.target_dir, exist_ok=True)
+            for src, dst in pano_set.moves:
+                if os.path.exists(dst):
+                    logger.warning(f"target '{dst}' already exists, skip")
+                    continue
+                move_file(src, dst, verify=self.config.verify)
+                moved += 1
+        logger.info(f"{moved} files moved into {len(self.sets)} panorama sets")
+        return moved
+
+    def _walk(self, root: str) -> Dict[Tuple[str, str], List[str]]:
+        """递归列出目录中的文件，按 (所在目录, 不含后缀的文件名) 分组"""
+        stems: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+        for dir_path, dir_names, file_names in os.walk(root):
+            dir_names[:] = sorted(d for d in dir_names if not d.startswith("."))
+            for file_name in sorted(file_names):
+                if file_name.startswith("."):
+                    continue
+                stem = os.path.splitext(file_name)[0]
+                stems[(dir_path, stem)].append(file_name)
+        return stems
+
+    def _find_sets(self) -> List[PanoramaSet]:
+        supported_ext = {ext.lower() for ext in self.config.supported_ext}
+        # 每组同名文件只读取第一个支持的文件
+        roots: List[Tuple[FileTag, Dict[Tuple[str, str], List[str]]]] = []
+        sources: List[str] = []
+        source_of: Dict[str, Tuple[int, Tuple[str, str]]] = {}
+        for file_tag in self.config.file_tag_list:
+            if not os.path.isdir(file_tag.dir):
+                logger.warning(f"directory '{file_tag.dir}' not found, skip")
+                continue
+            stems = self._walk(file_tag.dir)
+            roots.append((file_tag, stems))
+            for key, file_names in stems.items():
+                source = next(
+                    (
+                        name
+                        for name in file_names
+                        if os.path.splitext(name)[1].lower() in supported_ext
+                    ),
+                    None,
+                )
+                if source is None:
+                    continue
+                path = os.path.join(key[0], source)
+                sources.append(path)
+                source_of[path] = (len(roots) - 1, key)
+
+        catalog = PhotoCatalog.from_files(
+            sources, max_workers=self.config.scan_workers_max, skip_errors=True
+        )
+        read = {catalog[i].file_path for i in range(len(catalog))}
+        self.skipped.extend(path for path in sources if path not in read)
+        row_root = np.array(
+            [source_of[catalog[i].file_path][0] for i in range(len(catalog))],
+            dtype=np.int64,
+        )
+
+        sets: List[PanoramaSet] = []
+        names = set()
+        for root_index, (file_tag, stems) in enumerate(roots):
+            sub = catalog.filter(row_root == root_index)
+            labels = sub.cluster_by_time(self.config.gap_s, self.config.by_camera)
+            self.skipped.extend(sub[i].file_path for i in np.flatnonzero(labels == -1))
+            for label in range(int(labels.max(initial=-1)) + 1):
+                rows = np.flatnonzero(labels == label)
+                rows = rows[np.argsort(sub.capture_time[rows], kind="stable")]
+                keys = [source_of[sub[i].file_path][1] for i in rows]
+                if len(keys) < self.config.min_shots:
+                    self.skipped.extend(sub[i].file_path for i in rows)
+                    continue
+                first = sub[rows[0]]
+                pano_set = self._make_set(file_tag, first)
+                if pano_set.name in names:
+                    raise ValueError(
+                        f"duplicate panorama set name '{pano_set.name}', "
+                        "adjust gap_s or split the directories"
+                    )
+                names.add(pano_set.name)
+                for shot, (dir_path, stem) in enumerate(keys):
+                    for file_name in stems[(dir_path, stem)]:
+                        file_ext = os.path.splitext(file_name)[1]
+                        pano_set.moves.append(
+                            (
+                                os.path.join(dir_path, file_name),
+                                os.path.join(
+                                    pano_set.target_dir,
+                                    f"{pano_set.name}_{shot:02d}{file_ext}",
+                                ),
+                            )
+                        )
+                sets.append(pano_set)
+        if self.skipped:
+            logger.warning(f"{len(self.skipped)} files not grouped")
+        return sets
+
+    def _make_set(self, file_tag: FileTag, first: PhotoRow) -> PanoramaSet:
+        """以第一张照片的拍摄时间命名分组"""
+        start: datetime = first.exif_data.date_time_original
+        name = f"{start.strftime('%y%m%d')}-{file_tag.tag}_{start.strftime('%H%M%S')}"
+        output_dir = self.config.output_dir or os.path.dirname(
+            os.path.dirname(first.file_path)
+        )
+        camera = f"{first.exif_data.make} {first.exif_data.model}".strip()
+        return PanoramaSet(
+            name=name,
+            target_dir=os.path.join(output_dir, name),
+            start=start,
+            camera=camera,
+        )
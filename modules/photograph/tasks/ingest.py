@@ -0,0 +1,353 @@
+"""
+存储卡导入任务：每个文件只从存储卡读取一次，同时完成复制、校验和计算和 EXIF 解析，
+直接写入 `YYYYMMDD-相册名-文件标识` 格式的最终文件名
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import piexif
+import pillow_heif
+from loguru import logger
+from pydantic import BaseModel, Field
+
+from modules.photograph._enums.format import PhotoFormat, XMPFormat
+from modules.photograph._enums.photo import SupportedPhotoHeifExt, SupportedPhotoRawExt
+from modules.photograph._types.plan import ScanError
+from modules.photograph.exif.tiff import EXIF_DATETIME_FORMAT, TiffIndex
+from modules.photograph.utils._fileops import PART_SUFFIX, commit_file
+from modules.photograph.utils._naming import archive_base_name
+from modules.task.task import BaseTask, BaseTaskConfig
+
+CHECKSUM_FILE = ".checksums.b2sum"
+"""导入目录下的校验和文件，格式与 `b2sum` 相同，可以使用 `b2sum -c` 校验"""
+
+
+class IngestTaskConfig(BaseTaskConfig):
+    source_dir: str = Field(description="存储卡目录，例如 `/Volumes/Untitled/DCIM`")
+    """存储卡目录，递归查找其中的照片"""
+
+    dest_dir: str = Field(description="导入的相册目录，例如 `YYMMDD-相册名`")
+    """导入的相册目录，不存在时自动创建"""
+
+    tag: str = Field(description="相册名")
+    """相册名，用于生成文件名"""
+
+    exif_supported_ext: List[str] = Field(
+        default_factory=lambda: [
+            *[e.value for e in SupportedPhotoRawExt],
+            PhotoFormat.JPG.value,
+            PhotoFormat.JPEG.value,
+        ],
+        description="从 TIFF 结构读取 EXIF 的文件扩展名",
+    )
+    """从 TIFF 结构读取 EXIF 的文件扩展名，复制时直接解析第一个数据块"""
+
+    heif_supported_ext: List[str] = Field(
+        default_factory=lambda: [e.value for e in SupportedPhotoHeifExt],
+        description="支持的 HEIF 文件扩展名",
+    )
+    """支持的 HEIF 文件扩展名，复制完成后从目标文件读取 EXIF"""
+
+    workers: int = Field(default=4, ge=1, description="并发复制的文件数量")
+    """并发复制的文件数量"""
+
+    chunk_kb: int = Field(default=1024, ge=64, description="每次读取的数据块大小(KB)")
+    """每次读取的数据块大小(KB)，第一个数据块需要包含 EXIF，因此不小于 64KB。
+    同时在内存中的数据不超过 `workers * chunk_kb`"""
+
+    fsync: bool = Field(default=True, description="重命名之前是否将文件写入磁盘")
+    """重命名为最终文件名之前是否调用 fsync，保证最终文件名对应完整的文件"""
+
+    verify: bool = Field(default=False, description="是否重新读取目标文件校验")
+    """写入后从磁盘重新读取目标文件并比较校验和（需要额外读取一次目标文件，不会重新读取存储卡）"""
+
+    require_confirm: bool = Field(default=True, description="执行前是否需要交互确认")
+    """执行前是否需要交互确认"""
+
+
+class IngestItem:
+    def __init__(self, source_file: str, size: int, xmp_file: Optional[str] = None):
+        self.source_file = source_file
+        self.size = size
+        self.xmp_file = xmp_file
+        """同名的 XMP 附属文件"""
+
+
+class IngestResult(BaseModel):
+    source_file: str
+    """存储卡中的文件"""
+
+    dest_file: str
+    """导入后的文件"""
+
+    size: int
+    """文件大小"""
+
+    checksum: str
+    """BLAKE2b 校验和，目标文件已经存在时为空"""
+
+    skipped: bool = False
+    """目标文件已经存在（例如重复导入），没有复制"""
+
+
+class IngestTask(BaseTask):
+    """
+    存储卡导入任务
+    """
+
+    config: IngestTaskConfig
+    """任务配置"""
+
+    def __init__(self, config: IngestTaskConfig):
+        super().__init__(config)
+        self.config = config
+        self.items: List[IngestItem] = self._find_all_files()
+        """需要导入的文件"""
+        self.results: List[IngestResult] = []
+        """导入结果，按完成顺序排列"""
+        self.errors: List[ScanError] = []
+        """导入失败的文件"""
+        self._checksum_lock = threading.Lock()
+
+    def name(self) -> str:
+        return self.config.name
+
+    def describe(self) -> str:
+        total_size = sum(item.size for item in self.items)
+        return (
+            f"task [{self.config.name}] with {len(self.items)} files "
+            f"({total_size / 1024**3:.2f} GB) to ingest into '{self.config.dest_dir}'."
+        )
+
+    def execute(self, dry_run: bool = False) -> List[IngestResult]:
+        logger.info(f"start executing task [{self.config.name}]，dry_run={dry_run}")
+        if len(self.items) == 0:
+            logger.info(f"no files to ingest for task [{self.config.name}]")
+            return []
+        if dry_run:
+            for item in self.items:
+                logger.info(f"file is to be ingested: '{item.source_file}'")
+            return []
+        if self.config.require_confirm and not self.confirm():
+            return []
+
+        os.makedirs(self.config.dest_dir, exist_ok=True)
+        # 文件按大小从大到小提交，避免最后只剩一个大文件在复制
+        items = sorted(self.items, key=lambda item: item.size, reverse=True)
+        with ThreadPoolExecutor(
+            max_workers=self.config.workers, thread_name_prefix="ingest"
+        ) as executor:
+            futures = [(item, executor.submit(self._ingest, item)) for item in items]
+            for item, future in futures:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self._add_error(item, e)
+                    continue
+                self.results.append(result)
+                logger.info(
+                    f"ingest '{result.source_file}' -> '{os.path.basename(result.dest_file)}'"
+                    + (", already exists, skip" if result.skipped else "")
+                )
+        if self.errors:
+            logger.warning(
+                f"{len(self.errors)} files failed to ingest in task [{self.config.name}]"
+            )
+        return self.results
+
+    def _find_all_files(self) -> List[IngestItem]:
+        supported_ext = {
+            *self.config.exif_supported_ext,
+            *self.config.heif_supported_ext,
+        }
+        items: List[IngestItem] = []
+        stack = [self.config.source_dir]
+        while stack:
+            current = stack.pop()
+            files: Dict[str, os.DirEntry] = {}
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        files[entry.name] = entry
+            for name in sorted(files):
+                file_base, file_ext = os.path.splitext(name)
+                if file_ext.lower() not in supported_ext:
+                    continue
+                # 严格区分大小写查找 XMP 文件（macOS 的文件系统不区分大小写）
+                xmp_file: Optional[str] = None
+                for xmp_ext in (XMPFormat.XMP.value, XMPFormat.XMP.value.upper()):
+                    if f"{file_base}{xmp_ext}" in files:
+                        xmp_file = files[f"{file_base}{xmp_ext}"].path
+                        break
+                entry = files[name]
+                items.append(IngestItem(entry.path, entry.stat().st_size, xmp_file))
+        return items
+
+    def _ingest(self, item: IngestItem) -> IngestResult:
+        """复制单个文件：读取、计算校验和、写入临时文件，并在读取第一个数据块后确定最终文件名"""
+        file_base, file_ext = os.path.splitext(os.path.basename(item.source_file))
+        is_heif = file_ext.lower() in self.config.heif_supported_ext
+        chunk_size = self.config.chunk_kb * 1024
+        part_file: Optional[str] = None
+        checksum = hashlib.blake2b()
+        dest_name: Optional[str] = None
+        try:
+            with open(item.source_file, "rb") as src:
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(src.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                chunk = src.read(chunk_size)
+                if not is_heif:
+                    # 从第一个数据块解析 EXIF，超出数据块的值（很少出现）从存储卡按偏移读取
+                    dest_name = self._dest_name(
+                        file_base,
+                        file_ext,
+                        self._read_date_time(chunk, item.source_file),
+                    )
+                    existing = self._existing(dest_name, item)
+                    if existing is not None:
+                        return existing
+                # 不同目录下可能有同名文件（例如 100MSDCF 和 101MSDCF），临时文件名需要唯一
+                fd, part_file = tempfile.mkstemp(
+                    prefix=f".{file_base}", suffix=PART_SUFFIX, dir=self.config.dest_dir
+                )
+                with os.fdopen(fd, "wb") as dst:
+                    while chunk:
+                        checksum.update(chunk)
+                        dst.write(chunk)
+                        chunk = src.read(chunk_size)
+                    if self.config.fsync:
+                        dst.flush()
+                        os.fsync(dst.fileno())
+                source_stat = os.fstat(src.fileno())
+
+            if dest_name is None:
+                # HEIF 的 EXIF 不在文件开头，从刚写入的目标文件读取（仍在页缓存中）
+                dest_name = self._dest_name(
+                    file_base, file_ext, self._read_heif_date_time(part_file)
+                )
+                existing = self._existing(dest_name, item)
+                if existing is not None:
+                    os.remove(part_file)
+                    return existing
+            if source_stat.st_size != item.size:
+                raise ValueError(
+                    f"file size changed while copying: {item.size} -> {source_stat.st_size}"
+                )
+            if self.config.verify:
+                self._verify(part_file, checksum.hexdigest())
+
+            dest_file = os.path.join(self.config.dest_dir, dest_name)
+            commit_file(
+                part_file,
+                dest_file,
+                times_ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns),
+            )
+        except BaseException:
+            if part_file is not None and os.path.exists(part_file):
+                os.remove(part_file)
+            raise
+
+        self._record_checksum(checksum.hexdigest(), dest_name)
+        if item.xmp_file is not None:
+            self._copy_xmp(item.xmp_file, os.path.splitext(dest_name)[0])
+        return IngestResult(
+            source_file=item.source_file,
+            dest_file=dest_file,
+            size=item.size,
+            checksum=checksum.hexdigest(),
+        )
+
+    def _dest_name(self, file_base: str, file_ext: str, date_time: str) -> str:
+        update_name = archive_base_name(file_base, date_time, self.config.tag)
+        if update_name is None:
+            raise ValueError(f"unknown filename format, file='{file_base}{file_ext}'")
+        return f"{update_name}{file_ext}"
+
+    def _existing(self, dest_name: str, item: IngestItem) -> Optional[IngestResult]:
+        """目标文件已经存在时，大小相同视为已导入，大小不同时报错"""
+        dest_file = os.path.join(self.config.dest_dir, dest_name)
+        try:
+            size = os.stat(dest_file).st_size
+        except FileNotFoundError:
+            return None
+        if size != item.size:
+            raise FileExistsError(f"destination '{dest_file}' exists with size {size}")
+        if item.xmp_file is not None:
+            # 重复导入时补充上次导入之后添加的 XMP，已经存在的 XMP 可能已被编辑，不覆盖
+            dest_base = os.path.splitext(dest_name)[0]
+            if not os.path.exists(self._xmp_dest(item.xmp_file, dest_base)):
+                self._copy_xmp(item.xmp_file, dest_base)
+        return IngestResult(
+            source_file=item.source_file,
+            dest_file=dest_file,
+            size=size,
+            checksum="",
+            skipped=True,
+        )
+
+    @staticmethod
+    def _read_date_time(header: bytes, file_path: str) -> str:
+        date_time = TiffIndex.from_bytes(header, file_path).date_time_original()
+        if date_time is None:
+            raise ValueError(f"DateTimeOriginal not found in file '{file_path}'")
+        return date_time.strftime(EXIF_DATETIME_FORMAT)
+
+    @staticmethod
+    def _read_heif_date_time(file_path: str) -> str:
+        heif_file = pillow_heif.open_heif(file_path)
+        exif_dict = piexif.load(heif_file.info["exif"], key_is_name=True)
+        exif_data = exif_dict["Exif"]
+        if not exif_data or "DateTimeOriginal" not in exif_data:
+            raise ValueError(f"DateTimeOriginal not found in file '{file_path}'")
+        return str(exif_data["DateTimeOriginal"], "utf-8")
+
+    def _verify(self, file_path: str, checksum: str) -> None:
+        """丢弃目标文件的页缓存后重新读取，确认写入磁盘的数据与存储卡一致"""
+        with open(file_path, "rb") as f:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+            written = hashlib.blake2b()
+            for chunk in iter(lambda: f.read(self.config.chunk_kb * 1024), b""):
+                written.update(chunk)
+        if written.hexdigest() != checksum:
+            raise IOError(f"checksum mismatch after writing '{file_path}'")
+
+    def _xmp_dest(self, xmp_file: str, dest_base: str) -> str:
+        return os.path.join(
+            self.config.dest_dir, f"{dest_base}{os.path.splitext(xmp_file)[1]}"
+        )
+
+    def _copy_xmp(self, xmp_file: str, dest_base: str) -> None:
+        dest_file = self._xmp_dest(xmp_file, dest_base)
+        with open(xmp_file, "rb") as f:
+            data = f.read()
+        with open(dest_file, "wb") as f:
+            f.write(data)
+        stat = os.stat(xmp_file)
+        os.utime(dest_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    def _record_checksum(self, checksum: str, dest_name: str) -> None:
+        with self._checksum_lock:
+            with open(os.path.join(self.config.dest_dir, CHECKSUM_FILE), "a") as f:
+                f.write(f"{checksum}  {dest_name}\n")
+
+    def _add_error(self, item: IngestItem, error: Exception) -> None:
+        self.errors.append(
+            ScanError(
+                parent_dir=os.path.dirname(item.source_file),
+                tag=self.config.tag,
+                file=os.path.basename(item.source_file),
+                error_type=type(error).__name__,
+                message=str(error),
+            )
+        )
+        logger.warning(f"ingest '{item.source_file}' error: {error}")
@@ -3,7 +3,8 @@
 """
 
 import os
-from typing import List
+from functools import partial
+from typing import Dict, List, Optional, Set, Tuple
 
 import exifread
 import piexif
@@ -12,17 +13,52 @@ from loguru import logger
 from pydantic import ConfigDict, Field
 
 from modules.photograph._enums.format import PhotoFormat, XMPFormat
-from modules.photograph._enums.photo import SupportedPhotoHeifExt, SupportedPhotoRawExt
+from modules.photograph._enums.io import ReadOrder
+from modules.photograph._enums.photo import (
+    SupportedPhotoHeifExt,
+    SupportedPhotoRawExt,
+    SupportedVideoExt,
+)
+from modules.photograph._types.fingerprint import FileFingerprint
 from modules.photograph._types.photo import FileTag
+from modules.photograph._types.plan import (
+    RenamePlan,
+    RenamePlanDir,
+    RenamePlanEntry,
+    ScanError,
+)
+from modules.photograph.exif.tiff import EXIF_DATETIME_FORMAT
+from modules.photograph.exif.video import (
+    SONY_XML_SUFFIX,
+    read_video_creation_time,
+)
+from modules.photograph.utils._concurrency import AdaptiveConcurrency, adaptive_map
+from modules.photograph.utils._io_schedule import schedule_reads
+from modules.photograph.utils._naming import archive_base_name, archive_file_id
+from modules.photograph.utils._prefetch import HeaderPrefetcher, PrefetchStats
+from modules.photograph.utils._progress import ProgressReporter
+from modules.photograph.utils._snapshot import DirSnapshot
 from modules.task.task import BaseTask, BaseTaskConfig
 
 
 class ProcessTask:
-    def __init__(self, parent_dir: str, origin_file: str, update_file: str, skip=False):
+    def __init__(
+        self,
+        parent_dir: str,
+        origin_file: str,
+        update_file: str,
+        skip=False,
+        fingerprint: Optional[FileFingerprint] = None,
+        tag: str = "",
+    ):
         self.parent_dir = parent_dir
         self.origin_file = origin_file
         self.update_file = update_file
         self.skip = skip
+        self.fingerprint = fingerprint
+        """生成任务时源文件的 stat 指纹，执行前用于检查文件是否已过期"""
+        self.tag = tag
+        """文件所属的标签（相册名）"""
 
 
 class RenameRawPhotoTaskConfig(BaseTaskConfig):
@@ -43,6 +79,46 @@ class RenameRawPhotoTaskConfig(BaseTaskConfig):
     )
     """支持的 HEIF 文件扩展名"""
 
+    video_supported_ext: List[str] = Field(
+        default_factory=lambda: [e.value for e in SupportedVideoExt],
+        description="支持的视频文件扩展名",
+    )
+    """支持的视频文件扩展名，拍摄时间来自索尼 `M01.XML` 附属文件或 `moov/mvhd`"""
+
+    require_confirm: bool = Field(default=True, description="执行前是否需要交互确认")
+    """执行前是否需要交互确认，执行已审阅的计划文件时可以关闭"""
+
+    fail_fast: bool = Field(default=True, description="遇到第一个错误时是否终止扫描")
+    """遇到第一个错误时是否终止扫描，关闭后错误会收集到 `scan_errors` 中，其余文件继续生成任务"""
+
+    read_order: ReadOrder = Field(
+        default=ReadOrder.LISTDIR, description="读取 EXIF 时的文件调度顺序"
+    )
+    """读取 EXIF 时的文件调度顺序，机械硬盘/NAS 上使用 inode 或物理偏移排序可以减少寻道"""
+
+    prefetch_window: int = Field(default=0, ge=0, description="预读窗口（文件数量）")
+    """解析当前文件时提前预读的后续文件数量，0 表示不预读"""
+
+    prefetch_kb: int = Field(default=256, gt=0, description="每个文件预读的大小(KB)")
+    """每个文件预读的文件头大小(KB)，需要覆盖 EXIF 所在的区域"""
+
+    scan_workers_min: int = Field(default=1, ge=1, description="扫描并发数下限")
+    """扫描并发数下限"""
+
+    scan_workers_max: int = Field(default=1, ge=1, description="扫描并发数上限")
+    """扫描并发数上限，大于 1 时按观察到的延迟和吞吐量在上下限之间自适应调整"""
+
+    snapshot_file: Optional[str] = Field(default=None, description="目录快照文件")
+    """目录快照文件，设置后跳过上次成功执行之后没有变化的相册，执行完成后更新快照"""
+
+    progress_interval: float = Field(
+        default=1.0, gt=0, description="输出进度的最短间隔(s)"
+    )
+    """扫描和重命名时输出一行聚合进度（吞吐量、ETA、当前目录的计数）的最短间隔(s)"""
+
+    progress_log: Optional[str] = Field(default=None, description="逐个文件的日志文件")
+    """逐个文件的 JSONL 日志文件（追加写入），每个文件的扫描结果和重命名只记录在这里"""
+
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
@@ -54,79 +130,453 @@ class RenameRawPhotoTask(BaseTask):
     config: RenameRawPhotoTaskConfig
     """任务配置"""
 
-    def __init__(self, config: RenameRawPhotoTaskConfig):
+    def __init__(
+        self,
+        config: RenameRawPhotoTaskConfig,
+        process_tasks: Optional[List[ProcessTask]] = None,
+    ):
+        """
+        Args:
+            config (RenameRawPhotoTaskConfig): 任务配置
+            process_tasks (Optional[List[ProcessTask]]): 已经生成的处理任务（例如从计划文件加载），
+                为 None 时扫描 `config.file_tag_list` 中的全部文件生成
+        """
         super().__init__(config)
         self.config = config
-        self.process_tasks: List[ProcessTask] = self._find_all_files()
+        self.scan_errors: List[ScanError] = []
+        """扫描失败的文件，仅在 `config.fail_fast=False` 时收集"""
+        self.prefetch_stats = PrefetchStats()
+        """扫描时的预读统计"""
+        self.snapshot: Optional[DirSnapshot] = None
+        """目录快照，仅在设置了 `config.snapshot_file` 并扫描文件时加载"""
+        self._scanned_dirs: List[str] = []
+        self.process_tasks: List[ProcessTask] = (
+            process_tasks if process_tasks is not None else self._find_all_files()
+        )
         """处理任务列表"""
 
+    @classmethod
+    def from_plan(
+        cls, plan_file: str, config: Optional[RenameRawPhotoTaskConfig] = None
+    ) -> "RenameRawPhotoTask":
+        """
+        从计划文件创建任务，不重新读取任何 EXIF 数据
+
+        Args:
+            plan_file (str): `save_plan` 保存的计划文件
+            config (Optional[RenameRawPhotoTaskConfig]): 任务配置，为 None 时使用计划中的任务名称
+        """
+        plan = RenamePlan.load(plan_file)
+        if config is None:
+            config = RenameRawPhotoTaskConfig(name=plan.name or "rename-raw-photo")
+        process_tasks: List[ProcessTask] = []
+        for plan_dir in plan.dirs:
+            for entry in plan_dir.entries:
+                process_tasks.append(
+                    ProcessTask(
+                        parent_dir=plan_dir.parent_dir,
+                        origin_file=entry.origin_file,
+                        update_file=entry.update_file,
+                        skip=entry.skip,
+                        fingerprint=entry.fingerprint,
+                        tag=plan_dir.tag,
+                    )
+                )
+        logger.info(
+            f"loaded rename plan '{plan_file}' created at {plan.created_at}, {len(process_tasks)} files"
+        )
+        task = cls(config, process_tasks=process_tasks)
+        task.scan_errors = plan.errors
+        return task
+
+    @classmethod
+    def rescan_plan(
+        cls, plan_file: str, config: Optional[RenameRawPhotoTaskConfig] = None
+    ) -> "RenameRawPhotoTask":
+        """
+        基于已保存的计划重新扫描，只重新读取扫描失败的文件和指纹已变化的文件，
+        其余条目直接沿用计划中的结果
+
+        Args:
+            plan_file (str): `save_plan` 保存的计划文件
+            config (Optional[RenameRawPhotoTaskConfig]): 任务配置，为 None 时使用计划中的任务名称
+        """
+        plan = RenamePlan.load(plan_file)
+        if config is None:
+            config = RenameRawPhotoTaskConfig(name=plan.name or "rename-raw-photo")
+
+        process_tasks: List[ProcessTask] = []
+        rescan_items: List[Tuple[str, FileTag]] = []
+        for plan_dir in plan.dirs:
+            file_tag = FileTag(tag=plan_dir.tag, dir=plan_dir.parent_dir)
+            # 附属文件(xmp/M01.XML)与主文件同名，任意一个变化都需要重新生成整组任务
+            stale_bases = {
+                cls._owner_base(entry.origin_file)
+                for entry in plan_dir.entries
+                if entry.fingerprint is not None
+                and not entry.fingerprint.matches(
+                    os.path.join(plan_dir.parent_dir, entry.origin_file)
+                )
+            }
+            for entry in plan_dir.entries:
+                if cls._owner_base(entry.origin_file) in stale_bases:
+                    if not cls._is_sidecar(entry.origin_file):
+                        rescan_items.append((entry.origin_file, file_tag))
+                    continue
+                process_tasks.append(
+                    ProcessTask(
+                        parent_dir=plan_dir.parent_dir,
+                        origin_file=entry.origin_file,
+                        update_file=entry.update_file,
+                        skip=entry.skip,
+                        fingerprint=entry.fingerprint,
+                        tag=plan_dir.tag,
+                    )
+                )
+        task = cls(config, process_tasks=process_tasks)
+        for error in plan.errors:
+            file_tag = FileTag(tag=error.tag, dir=error.parent_dir)
+            if error.file:
+                rescan_items.append((error.file, file_tag))
+                continue
+            # 目录仍然无法列出时与 `_find_all_files` 一样记录错误
+            try:
+                files = cls._list_dir(file_tag)
+            except OSError as e:
+                if config.fail_fast:
+                    raise
+                task._add_scan_error("", file_tag, e)
+                continue
+            rescan_items.extend((file, file_tag) for file in files)
+
+        logger.info(
+            f"rescan plan '{plan_file}': {len(process_tasks)} files kept, {len(rescan_items)} files to re-examine"
+        )
+        task.process_tasks.extend(task._scan_files(rescan_items))
+        return task
+
+    def to_plan(self) -> RenamePlan:
+        """将当前的处理任务转换为重命名计划"""
+        plan_dirs: Dict[str, RenamePlanDir] = {}
+        for task in self.process_tasks:
+            plan_dir = plan_dirs.setdefault(
+                task.parent_dir,
+                RenamePlanDir(parent_dir=task.parent_dir, tag=task.tag),
+            )
+            plan_dir.entries.append(
+                RenamePlanEntry(
+                    origin_file=task.origin_file,
+                    update_file=task.update_file,
+                    skip=task.skip,
+                    fingerprint=task.fingerprint,
+                )
+            )
+        return RenamePlan(
+            name=self.config.name,
+            dirs=list(plan_dirs.values()),
+            errors=self.scan_errors,
+        )
+
+    def save_plan(self, plan_file: str) -> None:
+        """保存重命名计划，用于审阅后通过 `from_plan` 执行"""
+        self.to_plan().save(plan_file)
+        logger.info(f"rename plan saved to '{plan_file}'")
+
     def name(self) -> str:
         return self.config.name
 
     def describe(self) -> str:
-        return f"task [{self.config.name}] with {len(self.process_tasks)} files to process."
+        description = (
+            f"task [{self.config.name}] with {len(self.process_tasks)} files to process"
+        )
+        if self.scan_errors:
+            description += f", {len(self.scan_errors)} files failed to scan"
+        stats = self.prefetch_stats
+        if stats.hits + stats.misses:
+            description += (
+                f", prefetch hit rate {stats.hit_rate:.1%} "
+                f"({stats.hits}/{stats.hits + stats.misses})"
+            )
+        return f"{description}."
 
     def execute(self, dry_run: bool = False):
         logger.info(f"start executing task [{self.config.name}]，dry_run={dry_run}")
 
         class RenameItem:
-            def __init__(self, parent_dir: str, origin_file: str, update_file: str):
-                self.origin_file = os.path.join(parent_dir, origin_file)
-                self.update_file = os.path.join(parent_dir, update_file)
+            def __init__(self, task: ProcessTask, owner_base: str):
+                self.origin_file = os.path.join(task.parent_dir, task.origin_file)
+                self.update_file = os.path.join(task.parent_dir, task.update_file)
+                self.fingerprint = task.fingerprint
+                self.group = (task.parent_dir, owner_base)
+                """主文件和附属文件属于同一组"""
 
         rename_list: List[RenameItem] = []
-        for _, task in enumerate(self.process_tasks):
+        # 每个目录 [待重命名, 已命名] 的数量，逐个文件的计划使用 `save_plan` 审阅
+        dir_counts: Dict[str, List[int]] = {}
+        for task in self.process_tasks:
+            counts = dir_counts.setdefault(task.parent_dir, [0, 0])
             if task.skip:
-                # {task.parent_dir}/
-                logger.info(f"file '{task.origin_file}' has been renamed, skip")
+                counts[1] += 1
                 continue
+            counts[0] += 1
+            rename_list.append(RenameItem(task, self._owner_base(task.origin_file)))
+        for parent_dir, (to_rename, named) in dir_counts.items():
             logger.info(
-                f"file is to be renamed: '{task.origin_file}'->'{task.update_file}'"
-            )
-            rename_list.append(
-                RenameItem(task.parent_dir, task.origin_file, task.update_file)
+                f"'{parent_dir}': {to_rename} files to rename, {named} already named"
             )
         if len(rename_list) == 0:
             logger.info(f"no files to rename for task [{self.config.name}]")
+            if not dry_run:
+                self._save_snapshot()
             return
-        if not dry_run and self.confirm():
-            for item in rename_list:
-                try:
-                    # 检查源文件是否存在
-                    if not os.path.exists(item.origin_file):
-                        raise FileNotFoundError(
-                            f"源文件不存在，跳过: '{item.origin_file}'"
+        if dry_run:
+            return
+        if not self.config.require_confirm or self.confirm():
+            # 检查源文件在生成任务之后是否被修改，主文件和附属文件(xmp/M01.XML)作为一组，
+            # 任意一个文件过期时整组跳过，避免附属文件留在原来的文件名
+            stale_groups = {
+                item.group
+                for item in rename_list
+                if item.fingerprint is not None
+                and os.path.exists(item.origin_file)
+                and not item.fingerprint.matches(item.origin_file)
+            }
+            blocked_groups = self._blocked_groups(rename_list, stale_groups)
+            with self._progress("rename", len(rename_list)) as progress:
+                for item in rename_list:
+                    try:
+                        # 检查源文件是否存在
+                        if not os.path.exists(item.origin_file):
+                            raise FileNotFoundError(
+                                f"源文件不存在，跳过: '{item.origin_file}'"
+                            )
+                        if item.group in stale_groups:
+                            progress.update(item.origin_file, "stale")
+                            continue
+                        if item.group in blocked_groups:
+                            progress.update(item.origin_file, "blocked")
+                            continue
+                        # 执行期间目标文件被其他程序创建时终止，不覆盖
+                        if self._occupies(item.update_file, item.origin_file):
+                            raise FileExistsError(
+                                f"target '{item.update_file}' already exists"
+                            )
+
+                        os.rename(item.origin_file, item.update_file)
+                        progress.update(
+                            item.origin_file, "renamed", update_file=item.update_file
                         )
-
-                    logger.info(f"rename '{item.origin_file}' to '{item.update_file}'")
-                    os.rename(item.origin_file, item.update_file)
-                except Exception as e:
-                    raise RuntimeError(
-                        f"rename '{item.origin_file}' to '{item.update_file}' error: {e}"
-                    )
+                    except Exception as e:
+                        progress.update(item.origin_file, "failed", error=str(e))
+                        raise RuntimeError(
+                            f"rename '{item.origin_file}' to '{item.update_file}' error: {e}"
+                        )
+            if progress.statuses["stale"]:
+                logger.warning(
+                    f"{progress.statuses['stale']} files changed since the plan was created, skipped"
+                )
+            if progress.statuses["blocked"]:
+                logger.warning(
+                    f"{progress.statuses['blocked']} files skipped, their target names are still taken"
+                )
+            # 原地修改文件不会改变目录的 mtime，跳过的相册不记录快照，下次运行时重新扫描
+            self._save_snapshot({group[0] for group in stale_groups | blocked_groups})
+
+    @classmethod
+    def _blocked_groups(cls, rename_list: List, skipped_groups: Set) -> Set:
+        """
+        按执行顺序模拟重命名，找出目标文件名被占用的组：重命名不覆盖已经存在的文件，
+        被跳过的文件仍然占用原来的文件名，依赖这个文件名的后续重命名（例如重新编号形成的链）
+        同样需要整组跳过，直到没有新的冲突
+        """
+        exists: Dict[str, bool] = {}
+        blocked: Set = set()
+        while True:
+            conflict = None
+            freed: Set[str] = set()
+            taken: Set[str] = set()
+            for item in rename_list:
+                if item.group in skipped_groups or item.group in blocked:
+                    continue
+                target = item.update_file
+                if target not in exists:
+                    exists[target] = cls._occupies(target, item.origin_file)
+                if target in taken or (target not in freed and exists[target]):
+                    conflict = item.group
+                    break
+                freed.add(item.origin_file)
+                taken.discard(item.origin_file)
+                taken.add(target)
+            if conflict is None:
+                return blocked
+            blocked.add(conflict)
+
+    @staticmethod
+    def _occupies(target: str, origin: str) -> bool:
+        """目标文件名是否被其他文件占用，不区分大小写的文件系统上只修改大小写时不算占用"""
+        if not os.path.lexists(target):
+            return False
+        try:
+            return not os.path.samefile(origin, target)
+        except OSError:
+            return True
 
     def _find_all_files(self) -> List[ProcessTask]:
-        class FileTagItem:
-            def __init__(self, file: str, tag: FileTag):
-                self.file = file
-                self.tag = tag
-
-        file_tag_items: List[FileTagItem] = []
+        file_tag_items: List[Tuple[str, FileTag]] = []
+        if self.config.snapshot_file:
+            self.snapshot = DirSnapshot.load(self.config.snapshot_file)
         # 遍历文件夹
         for file_tag in self.config.file_tag_list:
+            if self.snapshot is not None:
+                known = self.snapshot.digest(file_tag.dir) is not None
+                if known and not self.snapshot.refresh(file_tag.dir):
+                    logger.info(
+                        f"album '{file_tag.dir}' unchanged since last run, skip"
+                    )
+                    continue
+            self._scanned_dirs.append(file_tag.dir)
             # 遍历文件
-            for file in os.listdir(file_tag.dir):
-                file_tag_items.append(FileTagItem(file, file_tag))
+            try:
+                files = self._list_dir(file_tag)
+            except OSError as e:
+                if self.config.fail_fast:
+                    raise
+                self._add_scan_error("", file_tag, e)
+                continue
+            file_tag_items.extend((file, file_tag) for file in files)
 
         # 拆开两个逻辑的目的是为了避免文件夹不存在或者其他文件系统的错误
         # 所以先获取全部文件，再生成处理任务
+        process_tasks = self._scan_files(file_tag_items)
+        if self.scan_errors:
+            logger.warning(
+                f"{len(self.scan_errors)} files failed to scan in task [{self.config.name}]"
+            )
+        return process_tasks
+
+    def _progress(self, phase: str, total: int) -> ProgressReporter:
+        """逐个文件的进度只进入队列，按 `config.progress_interval` 输出聚合的进度"""
+        return ProgressReporter(
+            f"{phase}-{self.config.name}",
+            total=total,
+            interval=self.config.progress_interval,
+            log_file=self.config.progress_log,
+        )
+
+    def _save_snapshot(self, skipped_dirs: Optional[Set[str]] = None):
+        """
+        重命名完成后更新目录快照，扫描失败或者有文件被跳过的相册不记录，下次运行时重新扫描
+
+        Args:
+            skipped_dirs (Optional[Set[str]]): 有文件因为过期或者目标文件名被占用而没有重命名的相册
+        """
+        if self.snapshot is None or not self.config.snapshot_file:
+            return
+        failed_dirs = {error.parent_dir for error in self.scan_errors}
+        failed_dirs.update(skipped_dirs or ())
+        for scanned_dir in self._scanned_dirs:
+            if scanned_dir in failed_dirs:
+                self.snapshot.forget(scanned_dir)
+            else:
+                self.snapshot.refresh(scanned_dir)
+        self.snapshot.save(self.config.snapshot_file)
+        logger.debug(f"directory snapshot saved to '{self.config.snapshot_file}'")
+
+    @staticmethod
+    def _list_dir(file_tag: FileTag) -> List[str]:
+        return os.listdir(file_tag.dir)
+
+    def _scan_files(self, items: List[Tuple[str, FileTag]]) -> List[ProcessTask]:
+        """
+        为每个文件生成处理任务，`config.fail_fast=False` 时收集错误并继续处理其余文件。
+        `config.scan_workers_max > 1` 时在线程池中并发读取，并发数由 `AdaptiveConcurrency` 动态调整，
+        生成的任务仍然按调度后的读取顺序排列。
+        """
+
+        def path_of(item: Tuple[int, str, FileTag]) -> str:
+            return os.path.join(item[2].dir, item[1])
+
+        def generate(item: Tuple[int, str, FileTag]) -> List[ProcessTask]:
+            return self._generat_task(item[1], item[2])
+
+        scheduled = schedule_reads(
+            [(index, file, file_tag) for index, (file, file_tag) in enumerate(items)],
+            self.config.read_order,
+            path_of=path_of,
+        )
+        prefetcher = HeaderPrefetcher(
+            scheduled,
+            window=self.config.prefetch_window,
+            header_kb=self.config.prefetch_kb,
+            path_of=path_of,
+        )
+        self.prefetch_stats = prefetcher.stats
+
+        if self.config.scan_workers_max > 1:
+            controller = AdaptiveConcurrency(
+                min_workers=self.config.scan_workers_min,
+                max_workers=self.config.scan_workers_max,
+                name=f"scan-{self.config.name}",
+            )
+            completed = (
+                (item, future.result)
+                for item, future in adaptive_map(generate, prefetcher, controller)
+            )
+        else:
+            completed = ((item, partial(generate, item)) for item in prefetcher)
+
+        scanned: Dict[int, List[ProcessTask]] = {}
+        with self._progress("scan", len(scheduled)) as progress:
+            for item, result in completed:
+                index, file, file_tag = item
+                file_path = os.path.join(file_tag.dir, file)
+                try:
+                    scanned[index] = result()
+                except Exception as e:
+                    progress.update(file_path, "failed", error=str(e))
+                    if self.config.fail_fast:
+                        raise
+                    self._add_scan_error(file, file_tag, e)
+                    continue
+                progress.update(
+                    file_path,
+                    "scanned" if scanned[index] else "ignored",
+                    renames={t.origin_file: t.update_file for t in scanned[index]},
+                )
 
         process_tasks: List[ProcessTask] = []
-        for item in file_tag_items:
-            tasks = self._generat_task(item.file, item.tag)
-            process_tasks.extend(tasks)
+        for index, _, _ in scheduled:
+            process_tasks.extend(scanned.get(index, []))
+        stats = self.prefetch_stats
+        if stats.hits + stats.misses:
+            logger.info(
+                f"prefetch hit rate {stats.hit_rate:.1%} "
+                f"({stats.hits}/{stats.hits + stats.misses})"
+            )
+        elif stats.issued:
+            logger.debug(f"prefetch advised {stats.issued} files, {stats.bytes} bytes")
         return process_tasks
 
+    def _add_scan_error(self, file: str, file_tag: FileTag, error: Exception):
+        try:
+            fingerprint = (
+                FileFingerprint.from_path(os.path.join(file_tag.dir, file))
+                if file
+                else None
+            )
+        except OSError:
+            fingerprint = None
+        self.scan_errors.append(
+            ScanError(
+                parent_dir=file_tag.dir,
+                tag=file_tag.tag,
+                file=file,
+                error_type=type(error).__name__,
+                message=str(error),
+                fingerprint=fingerprint,
+            )
+        )
+
     def _generat_task(self, file: str, file_tag: FileTag) -> List[ProcessTask]:
         if file.startswith("."):
             return []
@@ -148,12 +598,14 @@ class RenameRawPhotoTask(BaseTask):
             exif_dict = piexif.load(heif_file.info["exif"], key_is_name=True)
             exif_data = exif_dict["Exif"]
             if exif_data is None:
-                raise ValueError("metadata 'Exif' not found in file '{file_path}'")
+                raise ValueError(f"metadata 'Exif' not found in file '{file_path}'")
             date_time = exif_data["DateTimeOriginal"]
             date_time = str(date_time, "utf-8")
-        elif file_ext.lower() in [
-            XMPFormat.XMP,
-        ]:
+        elif file_ext.lower() in self.config.video_supported_ext:
+            date_time = read_video_creation_time(file_path).strftime(
+                EXIF_DATETIME_FORMAT
+            )
+        elif self._is_sidecar(file):
             return []
         elif file_ext.lower() in [
             PhotoFormat.JPG,
@@ -167,23 +619,12 @@ class RenameRawPhotoTask(BaseTask):
                 f"unsupported file type '{file_ext}' for file '{file_path}'"
             )
 
-        file_date, file_time = date_time.split(" ")
-        file_date = file_date.replace(":", "")  # 年月日
-        file_time = file_time.replace(":", "")  # 时分秒
-
-        # 获取文件名中的秒级标识
-        # 文件标识
-        fileid = self._get_fileid(file_base, file_time)
-        if fileid is None:
-            logger.info(
-                f"unknown filename format or already named: {file_tag.dir} / {file}, skip"
-            )
+        # 更新文件名
+        update_name = archive_base_name(file_base, date_time, file_tag.tag)
+        if update_name is None:
             raise ValueError(
                 f"unknown filename format or already named, file='{file_tag.dir}/{file_base}'"
             )
-
-        # 更新文件名
-        update_name = f"{file_date}-{file_tag.tag}-{fileid}"
         update_file = f"{update_name}{file_ext}"
 
         file_tasks = [
@@ -192,6 +633,8 @@ class RenameRawPhotoTask(BaseTask):
                 origin_file=file,
                 update_file=update_file,
                 skip=(file_base == update_name),
+                fingerprint=FileFingerprint.from_path(file_path),
+                tag=file_tag.tag,
             )
         ]
 
@@ -210,10 +653,43 @@ class RenameRawPhotoTask(BaseTask):
                     origin_file=attached_file,
                     update_file=f"{update_name}{ext}",
                     skip=(attached_file == f"{update_name}{ext}"),
+                    fingerprint=FileFingerprint.from_path(file_path),
+                    tag=file_tag.tag,
                 )
                 file_tasks.append(task)
+
+        # 索尼视频的附属文件(M01.XML)
+        if file_ext.lower() in self.config.video_supported_ext:
+            attached_file = f"{file_base}{SONY_XML_SUFFIX}"
+            if attached_file in os.listdir(file_tag.dir):
+                file_tasks.append(
+                    ProcessTask(
+                        parent_dir=file_tag.dir,
+                        origin_file=attached_file,
+                        update_file=f"{update_name}{SONY_XML_SUFFIX}",
+                        skip=(attached_file == f"{update_name}{SONY_XML_SUFFIX}"),
+                        fingerprint=FileFingerprint.from_path(
+                            os.path.join(file_tag.dir, attached_file)
+                        ),
+                        tag=file_tag.tag,
+                    )
+                )
         return file_tasks
 
+    @staticmethod
+    def _is_sidecar(file: str) -> bool:
+        """是否为附属文件(xmp/M01.XML)，附属文件随主文件一起重命名"""
+        return file.lower().endswith(XMPFormat.XMP) or file.upper().endswith(
+            SONY_XML_SUFFIX
+        )
+
+    @staticmethod
+    def _owner_base(file: str) -> str:
+        """文件所属的主文件名（不含后缀），`C0001M01.XML` 返回 `C0001`"""
+        if file.upper().endswith(SONY_XML_SUFFIX):
+            return file[: -len(SONY_XML_SUFFIX)]
+        return os.path.splitext(file)[0]
+
     def _may_have_xmp(self, file: str) -> bool:
         """判断文件是否可能包含 xmp 文件"""
         raw_list: List[str] = []
@@ -225,13 +701,7 @@ class RenameRawPhotoTask(BaseTask):
         return any(file.lower().endswith(ext) for ext in raw_list)
 
     def _get_fileid(self, file_base: str, file_time: str):
-        file_base_list = str(file_base).split("-")
-        if len(file_base_list) == 3:
-            return file_base_list[-1]
-
-        if len(file_base_list) == 1:
-            return f"{file_time}_{file_base_list[0]}"
-        return None
+        return archive_file_id(file_base, file_time)
 
         # name = file_base_list[-1]
         # print(file_base, file_base_list, name)
@@ -0,0 +1,312 @@
+"""
+延时摄影照片重命名任务：按拍摄时间划分序列，重命名为 `YYYYMMDD-相册名-序列号_帧号`，
+例如 `20250501-星空-001_00001.ARW`
+"""
+
+import os
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from loguru import logger
+from pydantic import BaseModel, Field
+
+from modules.photograph._enums.format import PhotoFormat
+from modules.photograph._types.fingerprint import FileFingerprint
+from modules.photograph._types.photo import FileTag
+from modules.photograph.exif.tiff import IfdName, Tag
+from modules.photograph.tasks.rename_raw_photo import (
+    ProcessTask,
+    RenameRawPhotoTask,
+    RenameRawPhotoTaskConfig,
+)
+from modules.photograph.utils._concurrency import AdaptiveConcurrency, adaptive_map
+from modules.photograph.utils._metadata import read_exif_index
+from modules.photograph.utils._timelapse import split_sequences
+
+
+class RenameTimelapseTaskConfig(RenameRawPhotoTaskConfig):
+    tolerance: float = Field(
+        default=0.2, gt=0, lt=0.5, description="拍摄间隔允许的相对误差"
+    )
+    """拍摄间隔允许的相对误差，超出时视为拍摄间隔发生变化，开始新的序列"""
+
+    max_dropped: int = Field(default=5, ge=0, description="连续丢帧数量上限")
+    """连续丢帧数量上限，更长的间隔视为新的序列"""
+
+    keep_gaps: bool = Field(default=False, description="帧号是否保留丢帧的空位")
+    """帧号是否保留丢帧的空位，默认连续编号，便于合成视频"""
+
+    scan_workers_max: int = Field(default=8, ge=1, description="扫描并发数上限")
+    """读取拍摄时间的并发数上限"""
+
+
+class TimelapseSequence(BaseModel):
+    parent_dir: str
+    """所在目录"""
+
+    name: str
+    """序列名称 `YYYYMMDD-相册名-序列号`"""
+
+    start: datetime
+    """第一帧的拍摄时间"""
+
+    frames: int
+    """帧数"""
+
+    interval_ms: float
+    """平均拍摄间隔(ms)"""
+
+    dropped: int
+    """丢帧数量"""
+
+
+class _Frame:
+    """同名（不含后缀）的一组文件，例如 RAW+JPEG 以及 xmp 附属文件，共享一个帧号"""
+
+    __slots__ = ("base", "files", "source")
+
+    def __init__(self, base: str):
+        self.base = base
+        self.files: List[str] = []
+        self.source: Optional[str] = None
+        """读取拍摄时间的文件"""
+
+
+class RenameTimelapseTask(RenameRawPhotoTask):
+    """
+    延时摄影照片重命名任务，计划、快照和执行与 `RenameRawPhotoTask` 相同
+    """
+
+    config: RenameTimelapseTaskConfig
+    """任务配置"""
+
+    def __init__(
+        self,
+        config: RenameTimelapseTaskConfig,
+        process_tasks: Optional[List[ProcessTask]] = None,
+    ):
+        self.sequences: List[TimelapseSequence] = []
+        """划分出的序列"""
+        super().__init__(config, process_tasks)
+
+    @classmethod
+    def rescan_plan(
+        cls, plan_file: str, config: Optional[RenameRawPhotoTaskConfig] = None
+    ) -> "RenameTimelapseTask":
+        """
+        帧号依赖整个相册的拍摄时间，不能只重新扫描部分文件
+
+        Raises:
+            ValueError: 总是抛出，需要重新扫描整个相册
+        """
+        raise ValueError(
+            "timelapse plans can not be partially rescanned, scan the albums again"
+        )
+
+    def describe(self) -> str:
+        dropped = sum(sequence.dropped for sequence in self.sequences)
+        description = super().describe().rstrip(".")
+        return (
+            f"{description}, {len(self.sequences)} sequences, {dropped} dropped frames."
+        )
+
+    def _scan_files(self, items: List[Tuple[str, FileTag]]) -> List[ProcessTask]:
+        """按相册分组，并发读取每一帧的拍摄时间，再一次性划分序列并生成全部任务"""
+        readable_ext = {
+            *self.config.exif_supported_ext,
+            *self.config.heif_supported_ext,
+            PhotoFormat.JPG.value,
+            PhotoFormat.JPEG.value,
+        }
+        albums: Dict[str, Tuple[FileTag, Dict[str, _Frame]]] = {}
+        for file, file_tag in items:
+            if file.startswith("."):
+                continue
+            _, frames = albums.setdefault(file_tag.dir, (file_tag, {}))
+            file_base, file_ext = os.path.splitext(file)
+            frame = frames.setdefault(file_base, _Frame(file_base))
+            frame.files.append(file)
+            if file_ext.lower() in readable_ext:
+                # 同一帧有多个文件时优先使用 RAW 文件
+                if frame.source is None or file_ext.lower() in (
+                    self.config.exif_supported_ext
+                ):
+                    frame.source = file
+            elif not self._is_sidecar(file):
+                self._fail(
+                    file,
+                    file_tag,
+                    ValueError(f"unsupported file type '{file_ext}' for timelapse"),
+                )
+
+        pending = [
+            (file_tag, frame)
+            for file_tag, frames in albums.values()
+            for frame in frames.values()
+            if frame.source is not None
+        ]
+        captured: Dict[Tuple[str, str], Tuple[int, bool]] = {}
+        controller = AdaptiveConcurrency(
+            min_workers=self.config.scan_workers_min,
+            max_workers=self.config.scan_workers_max,
+            name=f"scan-{self.config.name}",
+        )
+
+        def read(item: Tuple[FileTag, _Frame]) -> Tuple[int, bool]:
+            file_tag, frame = item
+            return self._read_capture_ms(os.path.join(file_tag.dir, frame.source))
+
+        with self._progress("scan", len(pending)) as progress:
+            for (file_tag, frame), future in adaptive_map(read, pending, controller):
+                file_path = os.path.join(file_tag.dir, frame.source)
+                try:
+                    captured[(file_tag.dir, frame.base)] = future.result()
+                except Exception as e:
+                    progress.update(file_path, "failed", error=str(e))
+                    self._fail(frame.source, file_tag, e)
+                    continue
+                progress.update(file_path, "scanned")
+
+        process_tasks: List[ProcessTask] = []
+        for file_tag, frames in albums.values():
+            valid = [
+                frame
+                for frame in frames.values()
+                if (file_tag.dir, frame.base) in captured
+            ]
+            if valid:
+                process_tasks.extend(self._number_frames(file_tag, valid, captured))
+        return process_tasks
+
+    def _number_frames(
+        self,
+        file_tag: FileTag,
+        frames: List[_Frame],
+        captured: Dict[Tuple[str, str], Tuple[int, bool]],
+    ) -> List[ProcessTask]:
+        """划分一个相册中的序列并生成重命名任务"""
+        times = np.array(
+            [captured[(file_tag.dir, frame.base)][0] for frame in frames],
+            dtype=np.int64,
+        )
+        sub_sec = all(captured[(file_tag.dir, frame.base)][1] for frame in frames)
+        # 拍摄时间相同时按文件名排序
+        order = np.lexsort((np.array([frame.base for frame in frames]), times))
+        times = times[order]
+        split = split_sequences(
+            times,
+            tolerance=self.config.tolerance,
+            max_dropped=self.config.max_dropped,
+            slack_ms=0 if sub_sec else 1000,
+        )
+        numbers = split.frame if self.config.keep_gaps else split.position
+        lengths = np.diff(np.append(split.starts, len(times)))
+
+        # 序列号按日期分别从 1 开始编号
+        sequence_names: List[str] = []
+        per_date: Dict[str, int] = defaultdict(int)
+        for index, start in enumerate(split.starts):
+            start_time = times[start].astype("datetime64[ms]").item()
+            date = start_time.strftime("%Y%m%d")
+            per_date[date] += 1
+            name = f"{date}-{file_tag.tag}-{per_date[date]:03d}"
+            sequence_names.append(name)
+            self.sequences.append(
+                TimelapseSequence(
+                    parent_dir=file_tag.dir,
+                    name=name,
+                    start=start_time,
+                    frames=int(lengths[index]),
+                    interval_ms=float(split.interval_ms[index]),
+                    dropped=int(split.dropped[index]),
+                )
+            )
+            if split.dropped[index]:
+                logger.warning(
+                    f"sequence '{name}' in '{file_tag.dir}' dropped {split.dropped[index]} frames"
+                )
+
+        process_tasks: List[ProcessTask] = []
+        for rank, frame_index in enumerate(order):
+            frame = frames[frame_index]
+            update_base = (
+                f"{sequence_names[split.sequence[rank]]}_{numbers[rank] + 1:05d}"
+            )
+            for file in sorted(frame.files):
+                file_ext = file[len(frame.base) :]
+                process_tasks.append(
+                    ProcessTask(
+                        parent_dir=file_tag.dir,
+                        origin_file=file,
+                        update_file=f"{update_base}{file_ext}",
+                        skip=(frame.base == update_base),
+                        fingerprint=FileFingerprint.from_path(
+                            os.path.join(file_tag.dir, file)
+                        ),
+                        tag=file_tag.tag,
+                    )
+                )
+        return self._order_renames(file_tag, process_tasks)
+
+    def _order_renames(
+        self, file_tag: FileTag, process_tasks: List[ProcessTask]
+    ) -> List[ProcessTask]:
+        """
+        调整重命名顺序：重新编号时新文件名可能是另一个待重命名文件的当前文件名，
+        需要先重命名占用目标文件名的文件，否则会覆盖文件
+
+        Raises:
+            ValueError: 目标文件名被不参与重命名的文件占用，或者重命名形成环
+        """
+        existing = set(self._list_dir(file_tag))
+        moving = {task.origin_file: task for task in process_tasks if not task.skip}
+        ordered = [task for task in process_tasks if task.skip]
+        done = set()
+        for task in process_tasks:
+            # 每个目标文件名最多被一个文件占用，依赖关系是一条链，沿着链找到可以最先执行的任务
+            chain: List[ProcessTask] = []
+            # 链上的源文件名，用于在 O(1) 时间内发现环
+            in_chain: Set[str] = set()
+            current: Optional[ProcessTask] = moving.get(task.origin_file)
+            while current is not None and current.origin_file not in done:
+                if current.origin_file in in_chain:
+                    raise ValueError(
+                        f"cyclic renames in '{file_tag.dir}', move the files out first"
+                    )
+                chain.append(current)
+                in_chain.add(current.origin_file)
+                if current.update_file in moving:
+                    current = moving[current.update_file]
+                elif current.update_file in existing:
+                    raise ValueError(
+                        f"target '{current.update_file}' already exists in '{file_tag.dir}'"
+                    )
+                else:
+                    current = None
+            for blocked in reversed(chain):
+                ordered.append(blocked)
+                done.add(blocked.origin_file)
+        return ordered
+
+    def _fail(self, file: str, file_tag: FileTag, error: Exception) -> None:
+        if self.config.fail_fast:
+            raise error
+        self._add_scan_error(file, file_tag, error)
+
+    @staticmethod
+    def _read_capture_ms(file_path: str) -> Tuple[int, bool]:
+        """
+        读取拍摄时间(ms)
+
+        Returns:
+            Tuple[int, bool]: 拍摄时间(ms)和是否记录了秒的小数部分
+        """
+        index = read_exif_index(file_path)
+        date_time = index.date_time_original(sub_sec=True)
+        if date_time is None:
+            raise ValueError(f"EXIF DateTimeOriginal not found in '{file_path}'")
+        fraction = index.value(IfdName.EXIF, Tag.SUB_SEC_TIME_ORIGINAL)
+        has_sub_sec = isinstance(fraction, str) and fraction.isdigit()
+        return int(np.datetime64(date_time, "ms").astype(np.int64)), has_sub_sec
@@ -0,0 +1,645 @@
+"""
+并行流式归档：将相册打包为 tar 数据流，在每个成员开头以及每隔固定大小切分为数据块，在进程池中独立压缩后按顺序写入。
+gzip/xz/bzip2 都允许多个独立压缩的数据块首尾相接，生成的文件可以直接使用 `tar` 解压；
+同时进行中的数据块数量有上限，内存占用与相册大小无关。
+
+读取成员列表时只读取 zip 的中央目录和 tar 头，不解压成员数据
+"""
+
+import bisect
+import bz2
+import gzip
+import lzma
+import os
+import stat
+import struct
+import tarfile
+import tempfile
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from typing import (
+    BinaryIO,
+    Callable,
+    Deque,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from loguru import logger
+
+from modules.photograph._enums.archive import (
+    ARCHIVE_FILE_EXT,
+    ArchiveCodec,
+    ArchiveTimeSource,
+)
+from modules.photograph._enums.format import EXIF_SUPPORTED_FILE_EXT
+from modules.photograph._types.archive import (
+    ArchiveChunk,
+    ArchiveManifest,
+    ArchiveMember,
+)
+from modules.photograph.exif.tiff import DEFAULT_HEADER_BYTES, TiffIndex
+from modules.photograph.utils._fileops import PART_SUFFIX, commit_file
+
+ARCHIVE_TIME_FORMAT = "%Y%m%d_%H%M%S"
+"""归档文件名中的时间格式 `文件名~YYYYMMDD_HHMMSS.tar.gz`"""
+
+DEFAULT_CHUNK_BYTES = 16 * 1024 * 1024
+"""每个数据块压缩前的最大大小"""
+
+READ_BYTES = 1024 * 1024
+"""读取文件时每次读取的大小"""
+
+_DEFAULT_LEVELS = {ArchiveCodec.GZIP: 6, ArchiveCodec.XZ: 6, ArchiveCodec.BZIP2: 9}
+"""默认压缩级别"""
+
+_ARCHIVE_EXT_SET = frozenset(ARCHIVE_FILE_EXT)
+"""归档文件后缀，用于按后缀直接查找"""
+
+_MAX_EXT_DOTS = max(ext.count(".") for ext in ARCHIVE_FILE_EXT)
+"""归档文件后缀最多包含的 `.` 数量（`.tar.gz` 为 2）"""
+
+_ZIP_EXTENDED_TIMESTAMP = 0x5455
+"""zip 扩展时间戳字段（UT），记录 UTC 修改时间"""
+
+
+def archive_name(base_name: str, timestamp: float, codec: ArchiveCodec) -> str:
+    """归档文件名 `文件名~YYYYMMDD_HHMMSS.tar.gz`，时间为本地时间"""
+    date_time = time.strftime(ARCHIVE_TIME_FORMAT, time.localtime(timestamp))
+    return f"{base_name}~{date_time}{codec.ext}"
+
+
+def compress_chunk(data: bytes, codec: ArchiveCodec, level: int) -> bytes:
+    """将一个数据块压缩为独立的 gzip member / xz stream / bzip2 stream（在进程池中执行）"""
+    if codec == ArchiveCodec.GZIP:
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if codec == ArchiveCodec.XZ:
+        return lzma.compress(data, format=lzma.FORMAT_XZ, preset=level)
+    if codec == ArchiveCodec.BZIP2:
+        return bz2.compress(data, compresslevel=level)
+    return data
+
+
+class _ChunkWriter:
+    """按顺序写入压缩后的数据块，进行中的数据块超过上限时等待最早的数据块完成"""
+
+    def __init__(
+        self,
+        out: BinaryIO,
+        codec: ArchiveCodec,
+        level: int,
+        executor: Optional[ProcessPoolExecutor],
+        max_pending: int,
+    ):
+        self.out = out
+        self.codec = codec
+        self.level = level
+        self.executor = executor
+        self.max_pending = max_pending
+        self.chunks: List[ArchiveChunk] = []
+        self.offset = 0
+        """已经写入的压缩数据大小"""
+        self._pending: Deque[Tuple[int, "Future[bytes]"]] = deque()
+
+    def submit(self, raw_offset: int, data: bytes) -> None:
+        if self.executor is None:
+            self._write(raw_offset, compress_chunk(data, self.codec, self.level))
+            return
+        future = self.executor.submit(compress_chunk, data, self.codec, self.level)
+        self._pending.append((raw_offset, future))
+        while len(self._pending) > self.max_pending:
+            self._write_next()
+
+    def close(self) -> None:
+        while self._pending:
+            self._write_next()
+
+    def _write_next(self) -> None:
+        raw_offset, future = self._pending.popleft()
+        self._write(raw_offset, future.result())
+
+    def _write(self, raw_offset: int, compressed: bytes) -> None:
+        self.out.write(compressed)
+        self.chunks.append(
+            ArchiveChunk(
+                raw_offset=raw_offset, offset=self.offset, size=len(compressed)
+            )
+        )
+        self.offset += len(compressed)
+
+
+def list_album(album_dir: str) -> List[Tuple[str, str, os.stat_result]]:
+    """
+    递归列出相册中的文件（忽略 dotfile），按归档中的路径排序
+
+    Returns:
+        List[Tuple[str, str, os.stat_result]]: (文件路径, 归档中的路径, stat)，
+            归档中的路径以相册目录名开头，解压后还原相册目录
+    """
+    album_dir = os.path.abspath(album_dir)
+    base = os.path.dirname(album_dir)
+    files: List[Tuple[str, str, os.stat_result]] = []
+    for dir_path, dir_names, file_names in os.walk(album_dir):
+        dir_names[:] = [d for d in dir_names if not d.startswith(".")]
+        for file_name in file_names:
+            if file_name.startswith("."):
+                continue
+            file_path = os.path.join(dir_path, file_name)
+            st = os.stat(file_path)
+            if stat.S_ISREG(st.st_mode):
+                arcname = os.path.relpath(file_path, base).replace(os.sep, "/")
+                files.append((file_path, arcname, st))
+    files.sort(key=lambda item: item[1])
+    return files
+
+
+def write_archive(
+    files: List[Tuple[str, str, os.stat_result]],
+    out: BinaryIO,
+    codec: ArchiveCodec,
+    level: Optional[int] = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    workers: int = 4,
+) -> ArchiveManifest:
+    """
+    将文件打包为 tar 数据流并按数据块压缩写入 `out`
+
+    Args:
+        files (List[Tuple[str, str, os.stat_result]]): `list_album` 返回的文件
+        out (BinaryIO): 输出文件
+        codec (ArchiveCodec): 压缩方式
+        level (Optional[int]): 压缩级别，为 None 时使用默认级别
+        chunk_bytes (int): 每个数据块压缩前的最大大小，每个成员都从新的数据块开始
+        workers (int): 压缩进程数，`codec=NONE` 或者为 1 时在当前进程中处理
+    Returns:
+        ArchiveManifest: 归档成员索引
+    Raises:
+        OSError: 文件在归档过程中大小发生变化
+    """
+    level = _DEFAULT_LEVELS.get(codec, 0) if level is None else level
+    use_pool = codec != ArchiveCodec.NONE and workers > 1
+    executor = ProcessPoolExecutor(max_workers=workers) if use_pool else None
+    writer = _ChunkWriter(out, codec, level, executor, max_pending=2 * workers)
+    members: List[ArchiveMember] = []
+    # 尚未提交的未压缩数据，以及其开头在未压缩数据流中的偏移
+    buffer = bytearray()
+    raw_offset = 0
+
+    def emit(data: bytes) -> None:
+        nonlocal raw_offset
+        buffer.extend(data)
+        while len(buffer) >= chunk_bytes:
+            writer.submit(raw_offset, bytes(buffer[:chunk_bytes]))
+            del buffer[:chunk_bytes]
+            raw_offset += chunk_bytes
+
+    def flush() -> None:
+        nonlocal raw_offset
+        if buffer:
+            writer.submit(raw_offset, bytes(buffer))
+            raw_offset += len(buffer)
+            buffer.clear()
+
+    try:
+        for file_path, arcname, st in files:
+            # 每个成员从新的数据块开始，读取成员开头时不需要解压之前的成员
+            flush()
+            info = tarfile.TarInfo(arcname)
+            info.size = st.st_size
+            info.mtime = st.st_mtime
+            info.mode = stat.S_IMODE(st.st_mode)
+            header = info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
+            offset = raw_offset + len(buffer)
+            members.append(
+                ArchiveMember(
+                    name=arcname,
+                    size=st.st_size,
+                    mtime=st.st_mtime,
+                    offset=offset,
+                    data_offset=offset + len(header),
+                )
+            )
+            emit(header)
+            remaining = st.st_size
+            with open(file_path, "rb") as f:
+                while remaining > 0:
+                    data = f.read(min(READ_BYTES, remaining))
+                    if not data:
+                        break
+                    emit(data)
+                    remaining -= len(data)
+                if remaining != 0 or os.fstat(f.fileno()).st_size != st.st_size:
+                    raise OSError(f"'{file_path}' changed while archiving")
+            padding = -st.st_size % tarfile.BLOCKSIZE
+            emit(tarfile.NUL * padding)
+
+        # 结束标记：两个全零的数据块，总大小对齐到 RECORDSIZE
+        end = raw_offset + len(buffer) + 2 * tarfile.BLOCKSIZE
+        emit(tarfile.NUL * (2 * tarfile.BLOCKSIZE + (-end % tarfile.RECORDSIZE)))
+        flush()
+        writer.close()
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    return ArchiveManifest(
+        codec=codec,
+        size=writer.offset,
+        chunk_bytes=chunk_bytes,
+        chunks=writer.chunks,
+        members=members,
+    )
+
+
+def archive_album(
+    album_dir: str,
+    output_dir: Optional[str] = None,
+    codec: ArchiveCodec = ArchiveCodec.GZIP,
+    level: Optional[int] = None,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    workers: int = 4,
+) -> str:
+    """
+    将相册归档为 `相册名~YYYYMMDD_HHMMSS.tar.gz`，时间为相册中最新文件的修改时间，
+    归档文件的修改时间也设置为该时间；同时写入成员索引 `*.members.json.gz`
+
+    Args:
+        album_dir (str): 相册目录
+        output_dir (Optional[str]): 输出目录，为 None 时为相册的上级目录
+    Returns:
+        str: 归档文件路径
+    Raises:
+        FileExistsError: 归档文件已经存在
+    """
+    album_dir = os.path.abspath(album_dir)
+    files = list_album(album_dir)
+    if not files:
+        raise ValueError(f"no files to archive in '{album_dir}'")
+    newest_ns = max(st.st_mtime_ns for _, _, st in files)
+    newest = newest_ns / 1e9
+    output_dir = output_dir or os.path.dirname(album_dir)
+    archive_file = os.path.join(
+        output_dir, archive_name(os.path.basename(album_dir), newest, codec)
+    )
+    if os.path.exists(archive_file):
+        raise FileExistsError(f"archive '{archive_file}' already exists")
+
+    fd, part_file = tempfile.mkstemp(
+        prefix=f".{os.path.basename(archive_file)}.", suffix=PART_SUFFIX, dir=output_dir
+    )
+    try:
+        with os.fdopen(fd, "wb") as out:
+            manifest = write_archive(files, out, codec, level, chunk_bytes, workers)
+            out.flush()
+            os.fsync(out.fileno())
+        commit_file(part_file, archive_file, times_ns=(newest_ns, newest_ns))
+    except BaseException:
+        if os.path.exists(part_file):
+            os.remove(part_file)
+        raise
+    manifest.save(ArchiveManifest.path_of(archive_file))
+    return archive_file
+
+
+class ArchiveEntry(NamedTuple):
+    name: str
+    """成员在归档中的路径"""
+
+    size: int
+    """文件大小"""
+
+    mtime: Optional[float]
+    """修改时间(s)，归档中没有记录时为 None"""
+
+
+def archive_ext(file_name: str) -> Optional[str]:
+    """
+    归档文件的后缀（小写），不是归档文件时返回 None
+
+    从文件名末尾最多取 `_MAX_EXT_DOTS` 段后缀，从最长的复合后缀开始在集合中查找，
+    每个文件名最多查找两次，`.tar.gz` 优先于 `.gz`
+    """
+    lower = file_name.lower()
+    dots: List[int] = []
+    pos = len(lower)
+    for _ in range(_MAX_EXT_DOTS):
+        pos = lower.rfind(".", 0, pos)
+        # 文件名不能只有后缀（例如 dotfile `.tar`）
+        if pos <= 0:
+            break
+        dots.append(pos)
+    for pos in reversed(dots):
+        if lower[pos:] in _ARCHIVE_EXT_SET:
+            return lower[pos:]
+    return None
+
+
+def walk_archives(
+    root: str, recursive: bool = True
+) -> Iterator[Tuple[str, os.stat_result]]:
+    """
+    遍历目录下的归档文件（忽略 dotfile），返回 (路径, stat)，stat 来自 `DirEntry.stat()`
+
+    Args:
+        root (str): 目录
+        recursive (bool): 是否递归遍历子目录
+    """
+    stack: List[str] = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(entry.path)
+                    elif archive_ext(entry.name) is not None:
+                        yield entry.path, entry.stat()
+        except OSError as e:
+            logger.warning(f"scan directory '{current}' error: {e}")
+
+
+def _zip_mtime(info: zipfile.ZipInfo) -> float:
+    """优先使用扩展时间戳字段中的 UTC 时间，否则为 DOS 时间（本地时间，精度 2 秒）"""
+    extra = info.extra
+    pos = 0
+    while pos + 4 <= len(extra):
+        field_id, field_len = struct.unpack_from("<HH", extra, pos)
+        data = extra[pos + 4 : pos + 4 + field_len]
+        if field_id == _ZIP_EXTENDED_TIMESTAMP and len(data) >= 5 and data[0] & 1:
+            return float(struct.unpack_from("<i", data, 1)[0])
+        pos += 4 + field_len
+    return time.mktime(info.date_time + (0, 0, -1))
+
+
+def _read_zip(archive_file: str) -> List[ArchiveEntry]:
+    # ZipFile 只读取文件末尾的中央目录
+    with zipfile.ZipFile(archive_file) as zf:
+        return [
+            ArchiveEntry(info.filename, info.file_size, _zip_mtime(info))
+            for info in zf.infolist()
+            if not info.is_dir()
+        ]
+
+
+def _read_tar(archive_file: str, mode: str) -> List[ArchiveEntry]:
+    # 未压缩的 tar 在读取下一个成员时直接 seek 跳过成员数据；
+    # 压缩的 tar 只能顺序解压，但不保留成员数据
+    entries: List[ArchiveEntry] = []
+    with tarfile.open(archive_file, mode) as tar:
+        while (info := tar.next()) is not None:
+            if info.isfile():
+                entries.append(ArchiveEntry(info.name, info.size, float(info.mtime)))
+            # TarFile 默认保留全部 TarInfo，大型归档只需要逐个读取
+            tar.members.clear()
+    return entries
+
+
+def _load_manifest(archive_file: str) -> Optional[ArchiveManifest]:
+    """
+    读取 `archive_album` 写入的成员索引，索引不存在、早于归档文件或者记录的大小与归档文件不一致时返回 None
+
+    归档文件的修改时间是相册中最新文件的修改时间，使用保留修改时间的方式（`cp -p`、`rsync -t`）
+    替换归档文件后索引的修改时间仍然较新，因此还需要比较大小
+    """
+    manifest_file = ArchiveManifest.path_of(archive_file)
+    try:
+        archive_stat = os.stat(archive_file)
+        if os.stat(manifest_file).st_mtime_ns < archive_stat.st_mtime_ns:
+            return None
+        manifest = ArchiveManifest.load(manifest_file)
+    except (OSError, ValueError):
+        return None
+    if manifest.size != archive_stat.st_size:
+        return None
+    return manifest
+
+
+def _read_7z(archive_file: str) -> List[ArchiveEntry]:
+    try:
+        import py7zr
+    except ImportError:
+        raise RuntimeError(f"py7zr is required to read '{archive_file}'")
+    # 7z 的头部位于文件末尾，list() 只读取头部
+    with py7zr.SevenZipFile(archive_file, mode="r") as archive:
+        return [
+            ArchiveEntry(
+                info.filename,
+                info.uncompressed,
+                info.creationtime.timestamp() if info.creationtime else None,
+            )
+            for info in archive.list()
+            if not info.is_directory
+        ]
+
+
+def read_archive_entries(archive_file: str) -> List[ArchiveEntry]:
+    """
+    列出归档文件中的普通文件，不解压成员数据
+
+    - zip: 只读取中央目录
+    - tar: 读取每个成员的 tar 头并 seek 跳过成员数据
+    - tar.gz/tar.xz/tar.bz2: 优先读取成员索引 `*.members.json.gz`，没有时顺序解压 tar 头
+    - 7z: 读取头部，需要安装 `py7zr`
+
+    Raises:
+        ValueError: 不支持的文件后缀
+        RuntimeError: 读取 7z 时没有安装 `py7zr`
+    """
+    ext = archive_ext(archive_file)
+    if ext == ".zip":
+        return _read_zip(archive_file)
+    if ext == ".7z":
+        return _read_7z(archive_file)
+    if ext == ".tar":
+        return _read_tar(archive_file, "r:")
+    if ext is None:
+        raise ValueError(f"unsupported archive '{archive_file}'")
+    manifest = _load_manifest(archive_file)
+    if manifest is not None:
+        return [ArchiveEntry(m.name, m.size, m.mtime) for m in manifest.members]
+    return _read_tar(archive_file, "r|*")
+
+
+def _decompressor(codec: ArchiveCodec):
+    if codec == ArchiveCodec.GZIP:
+        return zlib.decompressobj(wbits=31)
+    if codec == ArchiveCodec.XZ:
+        return lzma.LZMADecompressor(format=lzma.FORMAT_XZ)
+    if codec == ArchiveCodec.BZIP2:
+        return bz2.BZ2Decompressor()
+    raise ValueError(f"codec '{codec}' has no decompressor")
+
+
+class _ChunkReader:
+    """
+    按成员索引中独立压缩的数据块读取未压缩数据流的片段：
+    从片段所在数据块的开头解压，解压到片段结束为止，不解压数据块的剩余部分
+    """
+
+    def __init__(self, f: BinaryIO, manifest: ArchiveManifest):
+        self.f = f
+        self.manifest = manifest
+        self._raw_offsets = [chunk.raw_offset for chunk in manifest.chunks]
+        self._index = -1
+        self._decompressor = None
+        self._remaining = 0
+        """当前数据块尚未读取的压缩数据大小"""
+        self._input = b""
+        """已经读取但尚未解压的压缩数据"""
+        self._data = bytearray()
+        """当前数据块已经解压的数据"""
+
+    def _open(self, index: int) -> None:
+        chunk = self.manifest.chunks[index]
+        self.f.seek(chunk.offset)
+        self._index = index
+        self._decompressor = _decompressor(self.manifest.codec)
+        self._remaining = chunk.size
+        self._input = b""
+        self._data = bytearray()
+
+    def _needs_input(self) -> bool:
+        # zlib 把超出 max_length 的输入留在 unconsumed_tail；lzma/bz2 在内部缓存，用 needs_input 表示
+        needs_input = getattr(self._decompressor, "needs_input", None)
+        return not self._input if needs_input is None else needs_input
+
+    def _fill(self, end: int) -> None:
+        # 通过 max_length 限制解压的大小，只解压到 end 为止
+        while len(self._data) < end and not self._decompressor.eof:
+            if self._needs_input():
+                if self._remaining <= 0:
+                    # zlib 可能还保留着已经读取的输入对应的输出
+                    if hasattr(self._decompressor, "flush"):
+                        self._data += self._decompressor.flush()
+                    break
+                self._input = self.f.read(min(READ_BYTES, self._remaining))
+                if not self._input:
+                    break
+                self._remaining -= len(self._input)
+            self._data += self._decompressor.decompress(
+                self._input, end - len(self._data)
+            )
+            self._input = getattr(self._decompressor, "unconsumed_tail", b"")
+
+    def read(self, offset: int, size: int) -> bytes:
+        out = bytearray()
+        while size > 0:
+            index = bisect.bisect_right(self._raw_offsets, offset) - 1
+            if index < 0:
+                break
+            # 只在切换数据块时重新开始解压，同一数据块中已经解压的数据直接复用
+            if index != self._index:
+                self._open(index)
+            pos = offset - self.manifest.chunks[index].raw_offset
+            self._fill(pos + size)
+            piece = self._data[pos : pos + size]
+            if not piece:
+                break
+            out += piece
+            offset += len(piece)
+            size -= len(piece)
+        return bytes(out)
+
+
+def _read_prefixes(
+    archive_file: str, want: Callable[[str], bool], prefix_bytes: int
+) -> Iterator[Tuple[str, bytes]]:
+    """依次读取所需成员开头的 `prefix_bytes` 字节，返回 (成员路径, 数据)"""
+    ext = archive_ext(archive_file)
+    if ext == ".zip":
+        # 压缩的成员只解压开头部分
+        with zipfile.ZipFile(archive_file) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and want(info.filename):
+                    with zf.open(info) as f:
+                        yield info.filename, f.read(prefix_bytes)
+        return
+    if ext == ".7z" or ext is None:
+        # 7z 通常是固实压缩，读取任何成员都需要解压之前的全部数据
+        return
+
+    manifest = _load_manifest(archive_file) if ext != ".tar" else None
+    if manifest is not None and manifest.chunks:
+        with open(archive_file, "rb") as f:
+            reader = _ChunkReader(f, manifest)
+            for member in manifest.members:
+                if want(member.name):
+                    size = min(prefix_bytes, member.size)
+                    yield member.name, reader.read(member.data_offset, size)
+        return
+
+    # 未压缩的 tar 按偏移 seek，压缩的 tar 只能顺序解压
+    with tarfile.open(archive_file, "r:" if ext == ".tar" else "r|*") as tar:
+        while (info := tar.next()) is not None:
+            if info.isfile() and want(info.name):
+                with tar.extractfile(info) as f:
+                    yield info.name, f.read(prefix_bytes)
+            tar.members.clear()
+
+
+def newest_capture_time(
+    archive_file: str, prefix_bytes: int = DEFAULT_HEADER_BYTES
+) -> Optional[datetime]:
+    """
+    归档中最新照片的拍摄时间，只读取每张照片开头的 `prefix_bytes` 字节中的 EXIF
+
+    - zip: 只解压每张照片的开头
+    - tar: seek 到每张照片的数据开头
+    - tar.gz/tar.xz/tar.bz2: 有成员索引时只解压每张照片所在数据块的开头部分，
+      否则顺序解压整个归档（仍然只保留照片开头）
+    - 7z: 不读取，返回 None
+
+    Returns:
+        Optional[datetime]: 没有可以读取拍摄时间的照片时为 None
+    """
+    exif_ext = {str(ext) for ext in EXIF_SUPPORTED_FILE_EXT}
+
+    def want(name: str) -> bool:
+        return os.path.splitext(name)[1].lower() in exif_ext
+
+    newest: Optional[datetime] = None
+    for _, data in _read_prefixes(archive_file, want, prefix_bytes):
+        try:
+            capture_time = TiffIndex.from_bytes(data).date_time_original()
+        except (ValueError, struct.error):
+            continue
+        if capture_time is not None and (newest is None or capture_time > newest):
+            newest = capture_time
+    return newest
+
+
+def archive_timestamp(
+    archive_file: str,
+    source: ArchiveTimeSource,
+    entries: Optional[List[ArchiveEntry]] = None,
+) -> Optional[float]:
+    """
+    归档文件名中使用的时间戳(s)
+
+    Args:
+        archive_file (str): 归档文件
+        source (ArchiveTimeSource): 时间戳来源，`MEMBER_EXIF` 没有照片时使用成员的修改时间
+        entries (Optional[List[ArchiveEntry]]): 已知的成员列表（例如来自归档成员索引），
+            为 None 时读取归档
+    Returns:
+        Optional[float]: 归档中没有记录时间的成员时为 None
+    """
+    if source == ArchiveTimeSource.MTIME:
+        return os.stat(archive_file).st_mtime
+    if source == ArchiveTimeSource.MEMBER_EXIF:
+        capture_time = newest_capture_time(archive_file)
+        if capture_time is not None:
+            return capture_time.timestamp()
+    if entries is None:
+        entries = read_archive_entries(archive_file)
+    return max((e.mtime for e in entries if e.mtime is not None), default=None)
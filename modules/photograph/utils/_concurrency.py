@@ -0,0 +1,154 @@
+"""
+自适应并发控制：根据观察到的单文件延迟和吞吐量，按 AIMD（加性增、乘性减）调整同时进行的读取数量
+"""
+
+import statistics
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD 并发控制器
+
+    每完成 `sample_size` 个任务评估一次：
+    - 延迟中位数超过基准延迟的 `latency_tolerance` 倍，且吞吐量没有提升时，认为存储已经饱和，
+      并发数乘以 `decrease_factor`
+    - 否则并发数加 1
+    并发数始终限制在 [min_workers, max_workers] 范围内。
+    """
+
+    def __init__(
+        self,
+        min_workers: int = 1,
+        max_workers: int = 16,
+        initial_workers: Optional[int] = None,
+        sample_size: int = 16,
+        latency_tolerance: float = 2.0,
+        decrease_factor: float = 0.5,
+        name: str = "adaptive",
+    ):
+        """
+        Args:
+            min_workers (int): 并发数下限
+            max_workers (int): 并发数上限
+            initial_workers (Optional[int]): 初始并发数，默认为下限
+            sample_size (int): 每次评估需要的完成任务数量
+            latency_tolerance (float): 延迟相对于基准延迟的容忍倍数
+            decrease_factor (float): 乘性减小的系数
+            name (str): 日志中使用的名称
+        """
+        if min_workers < 1 or max_workers < min_workers:
+            raise ValueError(
+                f"invalid concurrency range [{min_workers}, {max_workers}]"
+            )
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.sample_size = max(1, sample_size)
+        self.latency_tolerance = latency_tolerance
+        self.decrease_factor = decrease_factor
+        self.name = name
+
+        self._limit = min(max(initial_workers or min_workers, min_workers), max_workers)
+        self._lock = threading.Lock()
+        self._latencies: List[float] = []
+        self._window_start = time.perf_counter()
+        self._base_latency: Optional[float] = None
+        self._last_throughput: Optional[float] = None
+
+    @property
+    def limit(self) -> int:
+        """当前允许同时进行的任务数量"""
+        return self._limit
+
+    def record(self, latency: float) -> None:
+        """记录一个已完成任务的延迟(s)"""
+        with self._lock:
+            self._latencies.append(latency)
+            if len(self._latencies) >= self.sample_size:
+                self._adjust()
+
+    def _adjust(self) -> None:
+        now = time.perf_counter()
+        elapsed = max(now - self._window_start, 1e-9)
+        throughput = len(self._latencies) / elapsed
+        latency = statistics.median(self._latencies)
+        self._latencies = []
+        self._window_start = now
+
+        # 基准延迟取观察到的最小延迟，并缓慢上浮，避免被偶然的极小值长期锁定
+        if self._base_latency is None or latency < self._base_latency:
+            self._base_latency = latency
+        else:
+            self._base_latency *= 1.05
+
+        congested = latency > self._base_latency * self.latency_tolerance and (
+            self._last_throughput is not None and throughput <= self._last_throughput
+        )
+        old_limit = self._limit
+        if congested:
+            self._limit = max(self.min_workers, int(self._limit * self.decrease_factor))
+        else:
+            self._limit = min(self.max_workers, self._limit + 1)
+        self._last_throughput = throughput
+
+        logger.debug(
+            f"[{self.name}] concurrency {old_limit} -> {self._limit}, "
+            f"latency {latency * 1000:.1f}ms (base {self._base_latency * 1000:.1f}ms), "
+            f"throughput {throughput:.1f}/s{', congested' if congested else ''}"
+        )
+
+
+def adaptive_map(
+    fn: Callable[[T], R],
+    items: Iterable[T],
+    controller: AdaptiveConcurrency,
+) -> Iterator[Tuple[T, "Future[R]"]]:
+    """
+    在线程池中执行 `fn`，同时进行的任务数量由 `controller` 动态控制
+
+    按完成顺序返回 `(item, future)`，调用方通过 `future.result()` 获取结果或异常。
+    提前结束迭代时，尚未开始的任务会被取消。
+
+    Args:
+        fn (Callable[[T], R]): 处理单个对象的函数
+        items (Iterable[T]): 待处理的对象，按需逐个取出
+        controller (AdaptiveConcurrency): 并发控制器
+    """
+
+    def timed(item: T) -> R:
+        t0 = time.perf_counter()
+        try:
+            return fn(item)
+        finally:
+            controller.record(time.perf_counter() - t0)
+
+    iterator = iter(items)
+    in_flight: Dict["Future[R]", T] = {}
+    executor = ThreadPoolExecutor(
+        max_workers=controller.max_workers, thread_name_prefix=controller.name
+    )
+    try:
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) < controller.limit:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    exhausted = True
+                    break
+                in_flight[executor.submit(timed, item)] = item
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield in_flight.pop(future), future
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
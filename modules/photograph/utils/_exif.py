@@ -1,26 +1,48 @@
 from datetime import datetime
+from functools import cached_property
 from pathlib import Path
+from typing import Optional
 
 import exifread
 
-from pkg._enums.photo import ExifImageMake
+from modules.photograph._enums.photo import ExifImageMake
+from modules.photograph.exif.fields import LazyExifFields
+from modules.photograph.exif.tiff import (
+    EXIF_DATETIME_FORMAT,
+    EmbeddedImage,
+    GpsCoordinate,
+    IfdName,
+    Tag,
+    TiffIndex,
+)
+from modules.photograph.utils._preview import copy_range, find_preview
 
 
 class ExifInfo:
     def __init__(self, file_path: Path):
-        self._exifdata = self.get_exifdata(file_path)
+        self._file_path = file_path
+        self._fields = LazyExifFields(self.get_exif_index(file_path))
 
-    def get_exifdata(self, file_path: Path):
+    def get_exif_index(self, file_path: Path) -> TiffIndex:
         """
-        获取图片的 EXIF 数据
-        :return: 包含 EXIF 数据的字典
+        读取图片的 IFD 索引，只记录各个条目的偏移，字段在访问时才解码
+        :return: IFD 索引
         """
-        # 获取全部的 EXIF 数据
-
         if not file_path.exists():
             raise FileNotFoundError(f"File {file_path} does not exist.")
         if not file_path.is_file():
             raise TypeError(f"Expected a file, but got a directory: {file_path}")
+        try:
+            return TiffIndex.from_file(file_path)
+        except Exception as e:
+            raise ValueError(f"Error reading EXIF data from file {file_path}: {e}")
+
+    def get_exifdata(self, file_path: Path):
+        """
+        获取图片的 EXIF 数据
+        :return: 包含 EXIF 数据的字典
+        """
+        # 获取全部的 EXIF 数据
         with open(file_path, "rb") as f:
             try:
                 # 使用 exifread 读取 EXIF 数据
@@ -32,13 +54,13 @@ class ExifInfo:
                 raise ValueError(f"Error reading EXIF data from file {file_path}: {e}")
             return exif_data
 
-    @property
+    @cached_property
     def exifdata(self) -> dict:
         """
-        获取 EXIF 数据
+        获取 EXIF 数据，第一次访问时使用 exifread 完整解析
         :return: 包含 EXIF 数据的字典
         """
-        return self._exifdata
+        return self.get_exifdata(self._file_path)
 
     @property
     def camera_make(self) -> ExifImageMake:
@@ -46,7 +68,7 @@ class ExifInfo:
         获取相机制造商
         :return: 相机制造商字符串
         """
-        make = self._exifdata.get("Image Make", None)
+        make = self._fields.make
         if make is None:
             return ExifImageMake.UNKNOWN
 
@@ -61,12 +83,71 @@ class ExifInfo:
         获取原始拍摄时间
         :return: 拍摄时间
         """
-        datetime_str = self._exifdata.get("EXIF DateTimeOriginal", None)
+        datetime_str = self._fields.index.value(IfdName.EXIF, Tag.DATE_TIME_ORIGINAL)
         if datetime_str is None:
             raise ValueError("EXIF DateTimeOriginal not found in EXIF data")
 
-        print(datetime_str)
         try:
-            return datetime.strptime(str(datetime_str), "%Y:%m:%d %H:%M:%S")
+            return datetime.strptime(str(datetime_str), EXIF_DATETIME_FORMAT)
         except ValueError as e:
             raise ValueError(f"Error parsing original datetime from EXIF data: {e}")
+
+    @property
+    def camera_model(self) -> Optional[str]:
+        """相机型号"""
+        return self._fields.model
+
+    @property
+    def exposure_time(self) -> Optional[str]:
+        """曝光时间"""
+        return self._fields.exposure_time
+
+    @property
+    def f_number(self) -> Optional[float]:
+        """光圈值"""
+        return self._fields.f_number
+
+    @property
+    def iso_speed(self) -> Optional[int]:
+        """ISO 感光度"""
+        return self._fields.iso_speed
+
+    @property
+    def focal_length(self) -> Optional[float]:
+        """焦距"""
+        return self._fields.focal_length
+
+    @property
+    def lens_model(self) -> Optional[str]:
+        """镜头型号"""
+        return self._fields.lens_model
+
+    @property
+    def orientation(self) -> Optional[int]:
+        """方向"""
+        return self._fields.orientation
+
+    @property
+    def gps(self) -> Optional[GpsCoordinate]:
+        """GPS 坐标"""
+        return self._fields.gps
+
+    @property
+    def preview(self) -> Optional[EmbeddedImage]:
+        """最大的内嵌 JPEG 预览图的偏移和大小"""
+        return find_preview(self._fields.index)
+
+    def extract_preview(self, output_path: Path) -> int:
+        """
+        将内嵌的 JPEG 预览图按原始字节复制到文件，不解码
+        :return: 预览图大小(byte)
+        """
+        preview = self.preview
+        if preview is None:
+            raise ValueError(
+                f"no embedded JPEG preview found in file {self._file_path}"
+            )
+        copy_range(
+            str(self._file_path), preview.offset, preview.length, str(output_path)
+        )
+        return preview.length
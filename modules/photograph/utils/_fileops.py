@@ -0,0 +1,238 @@
+"""
+文件移动：同一文件系统内直接 `os.rename`；跨文件系统（EXDEV）时依次尝试
+reflink(FICLONE)、`copy_file_range`、`sendfile` 和分块复制，校验后再删除源文件
+"""
+
+import errno
+import os
+import shutil
+import stat
+import tempfile
+from typing import BinaryIO, Optional, Tuple
+
+from modules.photograph._enums.io import MoveMethod
+from modules.photograph._types.fingerprint import FileFingerprint
+from modules.photograph.utils._hash import file_checksum
+
+PART_SUFFIX = ".part"
+"""复制过程中的临时文件后缀"""
+
+FICLONE = 0x40049409
+"""Linux `ioctl(dst_fd, FICLONE, src_fd)` 的请求码"""
+
+COPY_CHUNK_BYTES = 8 * 1024 * 1024
+"""`copy_file_range`/`sendfile` 每次调用复制的大小，分块调用以兼容 32 位的内核实现"""
+
+_FALLBACK_ERRNOS = {
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EINVAL,
+    errno.EOPNOTSUPP,
+    errno.ENOTSUP,
+    errno.EBADF,
+    errno.ENOTSOCK,
+}
+"""内核复制方式不可用时的错误码，遇到时改用下一种方式"""
+
+
+def default_file_mode() -> int:
+    """
+    按当前 umask 正常创建文件时的权限（`0o666 & ~umask`），用于 `tempfile.mkstemp` 创建的临时文件（权限为 0600）
+
+    Linux 从 `/proc/self/status` 读取 umask；其他平台只能通过 `os.umask` 设置后再恢复，
+    期间其他线程创建的文件会使用临时的 umask，因此只在无法读取时使用
+    """
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return 0o666 & ~int(line.split()[1], 8)
+    except (OSError, ValueError):
+        pass
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def commit_file(
+    part_file: str,
+    dest_file: str,
+    mode: Optional[int] = None,
+    times_ns: Optional[Tuple[int, int]] = None,
+) -> None:
+    """
+    将 `tempfile.mkstemp` 创建的临时文件重命名为最终文件名，不覆盖已经存在的文件（包括其他线程同时写入的文件）
+
+    Args:
+        part_file (str): 临时文件
+        dest_file (str): 最终文件名
+        mode (Optional[int]): 文件权限，为 None 时为按 umask 正常创建文件时的权限（mkstemp 创建的文件为 0600）
+        times_ns (Optional[Tuple[int, int]]): (访问时间, 修改时间)(ns)，为 None 时不修改
+    Raises:
+        FileExistsError: 最终文件已经存在
+    """
+    os.chmod(part_file, default_file_mode() if mode is None else mode)
+    if times_ns is not None:
+        os.utime(part_file, ns=times_ns)
+    try:
+        os.link(part_file, dest_file)
+    except FileExistsError:
+        raise FileExistsError(f"destination '{dest_file}' already exists")
+    except OSError:
+        # 文件系统不支持硬链接
+        if os.path.exists(dest_file):
+            raise FileExistsError(f"destination '{dest_file}' already exists")
+        os.replace(part_file, dest_file)
+        return
+    os.remove(part_file)
+
+
+def _reflink(src_fd: int, dst_fd: int) -> bool:
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+    except OSError as e:
+        if e.errno in _FALLBACK_ERRNOS or e.errno == errno.ENOTTY:
+            return False
+        raise
+    return True
+
+
+def _copy_file_range(src_fd: int, dst_fd: int, size: int) -> bool:
+    if not hasattr(os, "copy_file_range"):
+        return False
+    copied = 0
+    try:
+        while copied < size:
+            count = os.copy_file_range(
+                src_fd, dst_fd, min(COPY_CHUNK_BYTES, size - copied)
+            )
+            if count == 0:
+                break
+            copied += count
+    except OSError as e:
+        if copied == 0 and e.errno in _FALLBACK_ERRNOS:
+            return False
+        raise
+    return copied == size
+
+
+def _sendfile(src_fd: int, dst_fd: int, size: int) -> bool:
+    if not hasattr(os, "sendfile"):
+        return False
+    copied = 0
+    try:
+        while copied < size:
+            count = os.sendfile(
+                dst_fd, src_fd, copied, min(COPY_CHUNK_BYTES, size - copied)
+            )
+            if count == 0:
+                break
+            copied += count
+    except OSError as e:
+        # macOS 的 sendfile 只支持写入 socket
+        if copied == 0 and e.errno in _FALLBACK_ERRNOS:
+            return False
+        raise
+    return copied == size
+
+
+def _rewind(src: BinaryIO, dst: BinaryIO) -> None:
+    src.seek(0)
+    dst.seek(0)
+    dst.truncate()
+
+
+def copy_data(src: BinaryIO, dst: BinaryIO, size: int) -> MoveMethod:
+    """
+    复制文件数据，依次尝试 reflink、`copy_file_range`、`sendfile` 和分块复制
+
+    Args:
+        src (BinaryIO): 源文件，位置在文件开头
+        dst (BinaryIO): 目标文件，位置在文件开头
+        size (int): 源文件大小
+    Returns:
+        MoveMethod: 实际使用的复制方式
+    """
+    src_fd, dst_fd = src.fileno(), dst.fileno()
+    if _reflink(src_fd, dst_fd):
+        return MoveMethod.REFLINK
+    if _copy_file_range(src_fd, dst_fd, size):
+        return MoveMethod.COPY_FILE_RANGE
+    _rewind(src, dst)
+    if _sendfile(src_fd, dst_fd, size):
+        return MoveMethod.SENDFILE
+    _rewind(src, dst)
+    shutil.copyfileobj(src, dst, COPY_CHUNK_BYTES)
+    return MoveMethod.COPY
+
+
+def move_file(
+    src: str, dst: str, verify: bool = True, fsync: bool = True
+) -> MoveMethod:
+    """
+    移动文件，不覆盖已经存在的目标文件
+
+    跨文件系统时先复制到目标目录下的临时文件，检查大小（`verify=True` 时还比较校验和）、
+    设置权限和修改时间后再重命名为目标文件，最后删除源文件；任何一步失败时保留源文件。
+
+    Args:
+        src (str): 源文件
+        dst (str): 目标文件
+        verify (bool): 跨文件系统复制后是否比较 BLAKE2b 校验和（reflink 不需要比较）
+        fsync (bool): 删除源文件之前是否将目标文件刷入磁盘
+    Returns:
+        MoveMethod: 实际使用的移动方式
+    Raises:
+        FileExistsError: 目标文件已经存在
+        OSError: 复制失败、校验失败或者源文件在复制期间被修改
+    """
+    if os.path.lexists(dst):
+        raise FileExistsError(f"destination '{dst}' already exists")
+    try:
+        os.rename(src, dst)
+        return MoveMethod.RENAME
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+
+    src_stat = os.stat(src)
+    fd, part_file = tempfile.mkstemp(
+        prefix=f".{os.path.basename(dst)}.",
+        suffix=PART_SUFFIX,
+        dir=os.path.dirname(os.path.abspath(dst)),
+    )
+    try:
+        with open(src, "rb") as fsrc, os.fdopen(fd, "wb") as fdst:
+            method = copy_data(fsrc, fdst, src_stat.st_size)
+            if fsync:
+                fdst.flush()
+                os.fsync(fdst.fileno())
+        copied_size = os.stat(part_file).st_size
+        if copied_size != src_stat.st_size:
+            raise OSError(
+                f"size mismatch after copying '{src}': {src_stat.st_size} -> {copied_size}"
+            )
+        if (
+            verify
+            and method != MoveMethod.REFLINK
+            and file_checksum(src) != file_checksum(part_file)
+        ):
+            raise OSError(f"checksum mismatch after copying '{src}'")
+        if not FileFingerprint.from_stat(src_stat).matches(src):
+            raise OSError(f"'{src}' changed while copying")
+        commit_file(
+            part_file,
+            dst,
+            mode=stat.S_IMODE(src_stat.st_mode),
+            times_ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns),
+        )
+    except BaseException:
+        if os.path.exists(part_file):
+            os.remove(part_file)
+        raise
+    os.remove(src)
+    return method
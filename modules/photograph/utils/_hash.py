@@ -0,0 +1,67 @@
+"""
+文件校验和：BLAKE2b，与 `b2sum` 的输出一致
+"""
+
+import hashlib
+import mmap
+import os
+
+EDGE_BYTES = 64 * 1024
+"""`edge_checksum` 读取的文件头和文件尾的大小"""
+
+
+def file_checksum(file_path: str) -> str:
+    """
+    通过 mmap 计算整个文件的 BLAKE2b 校验和，不在 Python 中分块复制数据
+
+    Args:
+        file_path (str): 文件路径
+    Returns:
+        str: 十六进制的校验和
+    """
+    checksum = hashlib.blake2b()
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return checksum.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            checksum.update(mm)
+    return checksum.hexdigest()
+
+
+def stream_checksum(file_path: str, chunk_bytes: int = 1024 * 1024) -> str:
+    """
+    分块 `read()` 计算整个文件的 BLAKE2b 校验和，返回值与 `file_checksum` 相同。
+    磁盘上有无法读取的扇区时 mmap 的访问会触发 SIGBUS 终止进程，`read()` 则抛出 `OSError`，
+    需要在读取错误后继续运行时（例如完整性校验）使用
+
+    Args:
+        file_path (str): 文件路径
+        chunk_bytes (int): 每次读取的大小
+    """
+    checksum = hashlib.blake2b()
+    with open(file_path, "rb", buffering=0) as f:
+        for chunk in iter(lambda: f.read(chunk_bytes), b""):
+            checksum.update(chunk)
+    return checksum.hexdigest()
+
+
+def edge_checksum(file_path: str, size: int, edge_bytes: int = EDGE_BYTES) -> str:
+    """
+    文件头和文件尾的校验和，用于在读取整个文件之前排除大部分不同的文件。
+    文件不大于 `2 * edge_bytes` 时读取整个文件，返回值与 `file_checksum` 相同
+
+    Args:
+        file_path (str): 文件路径
+        size (int): 文件大小
+        edge_bytes (int): 文件头和文件尾各自读取的大小
+    """
+    if size <= 2 * edge_bytes:
+        return file_checksum(file_path)
+    checksum = hashlib.blake2b(digest_size=32)
+    with open(file_path, "rb") as f:
+        checksum.update(f.read(edge_bytes))
+        f.seek(size - edge_bytes)
+        checksum.update(f.read(edge_bytes))
+    return checksum.hexdigest()
@@ -0,0 +1,115 @@
+"""
+批量读取的 I/O 调度：按磁盘布局重新排列待读取的文件，减少机械硬盘/NAS 上的寻道
+"""
+
+import os
+import struct
+import sys
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+from modules.photograph._enums.io import ReadOrder
+
+if sys.platform != "win32":
+    import fcntl
+else:  # pragma: no cover
+    fcntl = None
+
+T = TypeVar("T")
+
+_FS_IOC_FIEMAP = 0xC020660B
+"""Linux FIEMAP ioctl 请求码"""
+
+_FIEMAP_HEADER = struct.Struct("=QQLLLL")
+"""struct fiemap: fm_start, fm_length, fm_flags, fm_mapped_extents, fm_extent_count, fm_reserved"""
+
+_FIEMAP_EXTENT = struct.Struct("=QQQQQLLLL")
+"""struct fiemap_extent: fe_logical, fe_physical, fe_length, fe_reserved64[2], fe_flags, fe_reserved[3]"""
+
+_LOG2PHYS = struct.Struct("=Iqq")
+"""macOS struct log2phys: l2p_flags, l2p_contigbytes, l2p_devoffset"""
+
+
+def _fiemap_offset(fd: int) -> Optional[int]:
+    request = bytearray(_FIEMAP_HEADER.size + _FIEMAP_EXTENT.size)
+    # 只需要文件开头的第一个 extent
+    _FIEMAP_HEADER.pack_into(request, 0, 0, 1, 0, 0, 1, 0)
+    fcntl.ioctl(fd, _FS_IOC_FIEMAP, request, True)
+    mapped_extents = _FIEMAP_HEADER.unpack_from(request, 0)[3]
+    if mapped_extents == 0:
+        return None
+    return _FIEMAP_EXTENT.unpack_from(request, _FIEMAP_HEADER.size)[1]
+
+
+def _log2phys_offset(fd: int) -> Optional[int]:
+    result = fcntl.fcntl(fd, fcntl.F_LOG2PHYS, bytes(_LOG2PHYS.size))
+    return _LOG2PHYS.unpack(result)[2]
+
+
+def physical_offset(file_path: str) -> Optional[int]:
+    """
+    获取文件第一个数据块在设备上的物理偏移
+
+    Args:
+        file_path (str): 文件路径
+    Returns:
+        Optional[int]: 物理偏移(byte)，平台或文件系统不支持时返回 None
+    """
+    if fcntl is None:
+        return None
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        if sys.platform.startswith("linux"):
+            return _fiemap_offset(fd)
+        if hasattr(fcntl, "F_LOG2PHYS"):
+            return _log2phys_offset(fd)
+        return None
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def _inode(file_path: str) -> int:
+    try:
+        return os.stat(file_path).st_ino
+    except OSError:
+        return 0
+
+
+def schedule_reads(
+    items: List[T],
+    order: ReadOrder = ReadOrder.LISTDIR,
+    path_of: Callable[[T], str] = str,
+) -> List[T]:
+    """
+    按读取顺序重新排列待读取的文件
+
+    文件按所在目录分批，同一目录内的文件连续读取；目录之间按目录内最小的排序键排列。
+
+    Args:
+        items (List[T]): 待读取的对象
+        order (ReadOrder): 调度顺序
+        path_of (Callable[[T], str]): 从对象获取文件路径的函数
+    Returns:
+        List[T]: 排列后的对象列表，`ReadOrder.LISTDIR` 时原样返回
+    """
+    if order == ReadOrder.LISTDIR or len(items) < 2:
+        return list(items)
+
+    batches: Dict[str, List[Tuple[Tuple[int, int], int, T]]] = {}
+    for index, item in enumerate(items):
+        file_path = path_of(item)
+        inode = _inode(file_path)
+        offset = physical_offset(file_path) if order == ReadOrder.PHYSICAL else None
+        # 获取不到物理偏移的文件排在同一目录内有物理偏移的文件之后，再按 inode 排序
+        key = (0, offset) if offset is not None else (1, inode)
+        batches.setdefault(os.path.dirname(file_path), []).append((key, index, item))
+
+    scheduled: List[T] = []
+    for batch in sorted(batches.values(), key=lambda b: min(k for k, _, _ in b)):
+        batch.sort(key=lambda b: (b[0], b[1]))
+        scheduled.extend(item for _, _, item in batch)
+    return scheduled
@@ -0,0 +1,125 @@
+"""
+照片元数据的快速读取：只读取拍摄时间、相机品牌、型号和 GPS 坐标，不构建 pydantic 对象
+"""
+
+import io
+import os
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+import pillow_heif
+from PIL import Image
+
+from modules.photograph._enums.format import (
+    EXIF_SUPPORTED_FILE_EXT,
+    HEIF_SUPPORTED_FILE_EXT,
+    PhotoFormat,
+)
+from modules.photograph.exif.tiff import GpsCoordinate, IfdName, Tag, TiffIndex
+
+
+class CaptureMetadata(NamedTuple):
+    date_time_original: Optional[datetime]
+    """拍摄时间，缺失时为 None"""
+
+    make: str
+    """相机品牌"""
+
+    model: str
+    """相机型号"""
+
+    gps: Optional[GpsCoordinate] = None
+    """GPS 坐标，缺失时为 None"""
+
+
+def read_exif_index(file_path: str) -> TiffIndex:
+    """
+    读取照片的 IFD 索引，只记录条目偏移，不解码任何值
+
+    Args:
+        file_path (str): 图片文件路径
+    Raises:
+        ValueError: 不支持的文件格式
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext in EXIF_SUPPORTED_FILE_EXT:
+        return TiffIndex.from_file(file_path)
+    if file_ext in HEIF_SUPPORTED_FILE_EXT:
+        # reference from: https://github.com/bigcat88/pillow_heif/blob/master/examples/heif_dump_info.py
+        heif_file = pillow_heif.open_heif(file_path)
+        return TiffIndex.from_bytes(heif_file.info["exif"])
+    raise ValueError(f"Unsupported file({file_path}) format: {file_ext}")
+
+
+def read_capture_metadata(file_path: str) -> CaptureMetadata:
+    """
+    读取照片的拍摄时间、相机品牌、型号和 GPS 坐标
+
+    Args:
+        file_path (str): 图片文件路径
+    Returns:
+        CaptureMetadata: 拍摄元数据
+    Raises:
+        ValueError: 不支持的文件格式
+    """
+    index = read_exif_index(file_path)
+    make = index.value(IfdName.IFD0, Tag.MAKE)
+    model = index.value(IfdName.IFD0, Tag.MODEL)
+    return CaptureMetadata(
+        date_time_original=index.date_time_original(),
+        make=make if isinstance(make, str) else "",
+        model=model if isinstance(model, str) else "",
+        gps=index.gps(),
+    )
+
+
+class Thumbnail(NamedTuple):
+    image: Image.Image
+    """缩略图"""
+
+    date_time_original: Optional[datetime]
+    """拍摄时间，缺失时为 None"""
+
+
+def read_thumbnail(file_path: str, draft_size: int = 64) -> Thumbnail:
+    """
+    读取照片内嵌的缩略图和拍摄时间，不解码主图像
+
+    - RAW/JPEG: IFD1（或 IFD0/SubIFDs）中最小的内嵌 JPEG，只按偏移读取这一段数据；
+      没有内嵌缩略图的 JPEG 文件以 1/8 比例解码主图像
+    - HEIF: 文件中的缩略图，没有缩略图时解码主图像
+
+    Args:
+        file_path (str): 图片文件路径
+        draft_size (int): JPEG 解码时的最小边长，解码器据此选择缩小比例
+    Raises:
+        ValueError: 不支持的文件格式，或 RAW 文件中没有内嵌的 JPEG
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext in HEIF_SUPPORTED_FILE_EXT:
+        heif_file = pillow_heif.open_heif(file_path)
+        date_time = (
+            TiffIndex.from_bytes(heif_file.info["exif"]).date_time_original()
+            if heif_file.info.get("exif")
+            else None
+        )
+        primary = next(
+            (image for image in heif_file if image.info.get("primary")), heif_file[0]
+        )
+        if primary.info.get("thumbnails"):
+            return Thumbnail(primary.get_thumbnail(0).to_pillow(), date_time)
+        return Thumbnail(primary.to_pillow(), date_time)
+    if file_ext not in EXIF_SUPPORTED_FILE_EXT:
+        raise ValueError(f"Unsupported file({file_path}) format: {file_ext}")
+
+    index = TiffIndex.from_file(file_path)
+    images = index.embedded_jpegs()
+    if images:
+        image = Image.open(io.BytesIO(index.read(images[0].offset, images[0].length)))
+    elif file_ext in (PhotoFormat.JPG, PhotoFormat.JPEG):
+        image = Image.open(file_path)
+    else:
+        raise ValueError(f"no embedded JPEG found in file '{file_path}'")
+    image.draft("RGB", (draft_size, draft_size))
+    image.load()
+    return Thumbnail(image, index.date_time_original())
@@ -0,0 +1,44 @@
+"""
+归档文件命名规则：`YYYYMMDD-相册名-文件标识`
+"""
+
+from typing import Optional
+
+
+def archive_file_id(file_base: str, file_time: str) -> Optional[str]:
+    """
+    获取归档文件名中的文件标识
+
+    - 相机原始文件名 `DSC00001` 返回 `HHMMSS_DSC00001`
+    - 已经归档的文件名 `YYYYMMDD-相册名-文件标识` 返回原来的文件标识
+    - 其余格式返回 None
+
+    Args:
+        file_base (str): 不含后缀的文件名
+        file_time (str): 拍摄时间 `HHMMSS`
+    """
+    file_base_list = str(file_base).split("-")
+    if len(file_base_list) == 3:
+        return file_base_list[-1]
+
+    if len(file_base_list) == 1:
+        return f"{file_time}_{file_base_list[0]}"
+    return None
+
+
+def archive_base_name(file_base: str, date_time: str, tag: str) -> Optional[str]:
+    """
+    生成归档文件名（不含后缀），无法识别的文件名返回 None
+
+    Args:
+        file_base (str): 不含后缀的文件名
+        date_time (str): EXIF 格式的拍摄时间 `YYYY:MM:DD HH:MM:SS`
+        tag (str): 相册名
+    """
+    file_date, file_time = date_time.split(" ")
+    file_date = file_date.replace(":", "")  # 年月日
+    file_time = file_time.replace(":", "")  # 时分秒
+    fileid = archive_file_id(file_base, file_time)
+    if fileid is None:
+        return None
+    return f"{file_date}-{tag}-{fileid}"
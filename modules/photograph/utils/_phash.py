@@ -0,0 +1,115 @@
+"""
+感知哈希和近似重复查找：64 位 dHash/pHash，按拍摄时间排序后只比较时间窗口内的照片，
+汉明距离使用 NumPy 批量计算
+"""
+
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+from modules.photograph._enums.hash import PerceptualHash
+
+HASH_BITS = 64
+"""哈希位数"""
+
+
+def _dct_matrix(size: int) -> np.ndarray:
+    """DCT-II 变换矩阵"""
+    k = np.arange(size)[:, None]
+    n = np.arange(size)[None, :]
+    matrix = np.cos(np.pi * (2 * n + 1) * k / (2 * size)) * np.sqrt(2 / size)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+_DCT_32 = _dct_matrix(32)
+
+_POPCOUNT_8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+"""8 位整数的置位数量，numpy<2.0 没有 `np.bitwise_count` 时使用"""
+
+
+def _pack(bits: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def dhash(image: Image.Image) -> int:
+    """差异哈希：缩小为 9x8 灰度图，比较每行相邻像素的大小"""
+    pixels = np.asarray(
+        image.convert("L").resize((9, 8), Image.Resampling.BILINEAR), dtype=np.int16
+    )
+    return _pack(pixels[:, 1:] > pixels[:, :-1])
+
+
+def phash(image: Image.Image) -> int:
+    """DCT 哈希：缩小为 32x32 灰度图，比较 8x8 低频 DCT 系数与其中位数（不含直流分量）的大小"""
+    pixels = np.asarray(
+        image.convert("L").resize((32, 32), Image.Resampling.LANCZOS),
+        dtype=np.float64,
+    )
+    low = (_DCT_32 @ pixels @ _DCT_32.T)[:8, :8]
+    return _pack(low > np.median(low.ravel()[1:]))
+
+
+def perceptual_hash(image: Image.Image, kind: PerceptualHash) -> int:
+    """按算法计算感知哈希"""
+    return phash(image) if kind == PerceptualHash.PHASH else dhash(image)
+
+
+def popcount(values: np.ndarray) -> np.ndarray:
+    """uint64 数组每个元素的置位数量"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    counts = _POPCOUNT_8[values.view(np.uint8)].reshape(*values.shape, 8)
+    return counts.sum(axis=-1, dtype=np.uint8)
+
+
+def near_pairs(
+    hashes: np.ndarray,
+    times: np.ndarray,
+    max_distance: int,
+    window_s: float,
+    valid: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    查找拍摄时间相差不超过 `window_s` 秒、哈希汉明距离不超过 `max_distance` 的照片对
+
+    按拍摄时间排序后，第 d 轮同时比较所有排序后相隔 d 张的照片，
+    轮数等于时间窗口内最多的照片数量，复杂度为 O(n * k) 而不是 O(n^2)。
+
+    Args:
+        hashes (np.ndarray): uint64 哈希
+        times (np.ndarray): datetime64 拍摄时间，NaT 的照片不参与比较
+        max_distance (int): 最大汉明距离
+        window_s (float): 时间窗口(s)
+        valid (Optional[np.ndarray]): 参与比较的照片的掩码
+    Returns:
+        np.ndarray: 形状为 (k, 3) 的 int64 数组，每行为 (i, j, 汉明距离)，i < j 为原始下标
+    """
+    mask = ~np.isnat(times)
+    if valid is not None:
+        mask &= valid
+    indices = np.flatnonzero(mask)
+    order = indices[np.argsort(times[indices], kind="stable")]
+    sorted_times = times[order].astype("datetime64[ms]").astype(np.int64)
+    sorted_hashes = hashes[order].astype(np.uint64)
+    ends = np.searchsorted(
+        sorted_times, sorted_times + int(window_s * 1000), side="right"
+    )
+    span = int((ends - np.arange(len(order))).max(initial=1))
+
+    pairs = []
+    for d in range(1, span):
+        i = np.arange(len(order) - d)
+        i = i[i + d < ends[i]]
+        if len(i) == 0:
+            continue
+        distance = popcount(sorted_hashes[i] ^ sorted_hashes[i + d])
+        hit = distance <= max_distance
+        a, b = order[i[hit]], order[i[hit] + d]
+        pairs.append(
+            np.stack([np.minimum(a, b), np.maximum(a, b), distance[hit]], axis=1)
+        )
+    if not pairs:
+        return np.empty((0, 3), dtype=np.int64)
+    return np.concatenate(pairs).astype(np.int64)
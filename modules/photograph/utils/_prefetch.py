@@ -0,0 +1,189 @@
+"""
+文件头预读：在解析当前文件的同时，提前读取后续文件的文件头，使磁盘 I/O 与解析的 CPU 时间重叠
+"""
+
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Generic, Iterator, List, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from modules.photograph._enums.io import PrefetchMode
+
+T = TypeVar("T")
+
+
+class PrefetchStats(BaseModel):
+    """
+    预读统计
+
+    READ 模式下根据读取任务是否完成统计命中；FADVISE 模式下在使用文件前以 `RWF_NOWAIT` 读取文件头，
+    文件头已经全部在页缓存中才算命中。平台或文件系统不支持 `RWF_NOWAIT` 时不统计命中率，`hits` 和 `misses` 为 0
+    """
+
+    issued: int = 0
+    """发出的预读请求数量"""
+
+    hits: int = 0
+    """使用文件时预读已经完成的数量"""
+
+    misses: int = 0
+    """使用文件时预读尚未完成或未发出的数量"""
+
+    bytes: int = 0
+    """预读的字节数（FADVISE 模式下为请求预读的字节数）"""
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class HeaderPrefetcher(Generic[T]):
+    """
+    按顺序遍历待处理的文件，并提前预读后续 `window` 个文件的前 `header_kb` KB
+
+    >>> prefetcher = HeaderPrefetcher(files, window=8, header_kb=256)
+    >>> for file in prefetcher:
+    ...     parse(file)
+    >>> prefetcher.stats.hit_rate
+    """
+
+    def __init__(
+        self,
+        items: List[T],
+        window: int = 8,
+        header_kb: int = 256,
+        mode: PrefetchMode = PrefetchMode.AUTO,
+        path_of: Callable[[T], str] = str,
+    ):
+        """
+        Args:
+            items (List[T]): 按处理顺序排列的对象
+            window (int): 预读窗口，即提前预读的文件数量，0 表示不预读
+            header_kb (int): 每个文件预读的大小(KB)
+            mode (PrefetchMode): 预读方式
+            path_of (Callable[[T], str]): 从对象获取文件路径的函数
+        """
+        if mode == PrefetchMode.AUTO:
+            mode = (
+                PrefetchMode.FADVISE
+                if hasattr(os, "posix_fadvise")
+                else PrefetchMode.READ
+            )
+        if mode == PrefetchMode.FADVISE and not hasattr(os, "posix_fadvise"):
+            raise ValueError("posix_fadvise is not supported on this platform")
+        self._items = items
+        self._window = max(0, window)
+        self._header_bytes = header_kb * 1024
+        self._mode = mode
+        self._path_of = path_of
+        self._pending: Dict[int, Optional[Future]] = {}
+        self._probe = hasattr(os, "preadv") and hasattr(os, "RWF_NOWAIT")
+        """FADVISE 模式下是否以 RWF_NOWAIT 检查文件头是否已在页缓存中"""
+        self._probe_buffer: Optional[bytearray] = None
+        """已发出预读的文件，READ 模式下为读取任务，FADVISE 模式下为 None"""
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.stats = PrefetchStats()
+        """预读统计"""
+
+    def __iter__(self) -> Iterator[T]:
+        if self._window and self._mode == PrefetchMode.READ:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="prefetch"
+            )
+        try:
+            next_index = 0
+            for index, item in enumerate(self._items):
+                # 保持 [index + 1, index + window] 范围内的文件都已发出预读
+                while next_index <= min(index + self._window, len(self._items) - 1):
+                    if next_index > index:
+                        self._issue(next_index)
+                    next_index += 1
+                self._consume(index)
+                yield item
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            self._pending.clear()
+
+    def _issue(self, index: int) -> None:
+        file_path = self._path_of(self._items[index])
+        self.stats.issued += 1
+        if self._mode == PrefetchMode.FADVISE:
+            self.stats.bytes += self._fadvise(file_path)
+            self._pending[index] = None
+        else:
+            self._pending[index] = self._executor.submit(self._read, file_path)
+
+    def _consume(self, index: int) -> None:
+        if self._mode == PrefetchMode.FADVISE:
+            issued = index in self._pending
+            self._pending.pop(index, None)
+            if not self._probe:
+                return
+            cached = (
+                self._cached(self._path_of(self._items[index])) if issued else False
+            )
+            if cached is True:
+                self.stats.hits += 1
+            elif cached is False:
+                self.stats.misses += 1
+            return
+        if index not in self._pending:
+            self.stats.misses += 1
+            return
+        future = self._pending.pop(index)
+        if future.done():
+            self.stats.hits += 1
+            if future.exception() is None:
+                self.stats.bytes += future.result()
+        else:
+            self.stats.misses += 1
+            future.cancel()
+
+    def _fadvise(self, file_path: str) -> int:
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+        except OSError:
+            return 0
+        try:
+            os.posix_fadvise(fd, 0, self._header_bytes, os.POSIX_FADV_WILLNEED)
+            return self._header_bytes
+        except OSError:
+            return 0
+        finally:
+            os.close(fd)
+
+    def _cached(self, file_path: str) -> Optional[bool]:
+        """文件头是否已经全部在页缓存中，无法判断时返回 None"""
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            size = min(self._header_bytes, os.fstat(fd).st_size)
+            if self._probe_buffer is None:
+                self._probe_buffer = bytearray(self._header_bytes)
+            try:
+                # 不在页缓存中的数据不会等待磁盘 I/O，第一页不在页缓存中时抛出 BlockingIOError(EAGAIN)
+                read = os.preadv(
+                    fd, [memoryview(self._probe_buffer)[:size]], 0, os.RWF_NOWAIT
+                )
+            except BlockingIOError:
+                return False
+            except OSError:
+                # 文件系统不支持 RWF_NOWAIT，不再统计命中率
+                self._probe = False
+                self.stats.hits = self.stats.misses = 0
+                return None
+            return read >= size
+        except OSError:
+            return None
+        finally:
+            os.close(fd)
+
+    def _read(self, file_path: str) -> int:
+        with open(file_path, "rb", buffering=0) as f:
+            return len(f.read(self._header_bytes))
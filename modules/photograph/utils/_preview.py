@@ -0,0 +1,174 @@
+"""
+RAW 文件内嵌 JPEG 预览图的提取：按 IFD 中记录的偏移直接复制字节，不解码也不重新编码
+
+- ARW: IFD0 的 JPEGInterchangeFormat 指向预览图，IFD1 为缩略图
+- DNG: 预览图为 SubIFD（或 IFD0）中 Compression=7、只有一个 strip 的 JPEG 图像
+"""
+
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple, Optional
+
+from loguru import logger
+
+from modules.photograph.exif.tiff import EmbeddedImage, IfdName, Tag, TiffIndex
+
+_JPEG_COMPRESSION = (6, 7)
+"""TIFF Compression: 6 为旧式 JPEG，7 为 JPEG"""
+
+_RAW_PHOTOMETRIC = (32803, 34892)
+"""PhotometricInterpretation: CFA 和 LinearRaw，DNG 中无损 JPEG 压缩的原始数据，不是预览图"""
+
+_COPY_CHUNK = 8 * 1024 * 1024
+"""每次 sendfile 复制的最大字节数"""
+
+
+class PreviewResult(NamedTuple):
+    source_file: str
+    """RAW 文件"""
+
+    preview_file: Optional[str]
+    """提取的预览图，没有预览图或提取失败时为 None"""
+
+    size: int
+    """预览图大小(byte)"""
+
+    skipped: bool = False
+    """预览图已经存在且比 RAW 文件新，没有重新提取"""
+
+    error: str = ""
+    """错误信息"""
+
+
+def _strip_jpegs(index: TiffIndex) -> List[EmbeddedImage]:
+    """以单个 strip 保存的 JPEG 图像（DNG 的预览图）"""
+    images: List[EmbeddedImage] = []
+    for name in index.ifds:
+        if name in (IfdName.EXIF, IfdName.GPS):
+            continue
+        if index.value(name, Tag.COMPRESSION) not in _JPEG_COMPRESSION:
+            continue
+        if index.value(name, Tag.PHOTOMETRIC_INTERPRETATION) in _RAW_PHOTOMETRIC:
+            continue
+        offset = index.value(name, Tag.STRIP_OFFSETS)
+        length = index.value(name, Tag.STRIP_BYTE_COUNTS)
+        if isinstance(offset, int) and isinstance(length, int) and length > 0:
+            images.append(EmbeddedImage(name, index.tiff_offset + offset, length))
+    return images
+
+
+def find_preview(index: TiffIndex) -> Optional[EmbeddedImage]:
+    """
+    查找最大的内嵌 JPEG 图像，只读取 IFD 条目和图像开头的 2 字节
+
+    Args:
+        index (TiffIndex): IFD 索引
+    Returns:
+        Optional[EmbeddedImage]: 预览图的偏移和大小，没有内嵌 JPEG 时返回 None
+    """
+    candidates = index.embedded_jpegs() + _strip_jpegs(index)
+    for image in sorted(candidates, key=lambda image: image.length, reverse=True):
+        try:
+            if index.read(image.offset, 2) == b"\xff\xd8":
+                return image
+        except ValueError:
+            continue
+    return None
+
+
+def copy_range(source_file: str, offset: int, length: int, output_file: str) -> None:
+    """
+    将源文件中的一段字节复制到新文件：优先使用 `os.sendfile` 在内核中复制，
+    不支持时（例如 macOS 只支持写入 socket）写入 mmap 的切片，数据不经过 Python 对象复制
+    """
+    with open(source_file, "rb") as src, open(output_file, "wb") as dst:
+        if hasattr(os, "sendfile"):
+            try:
+                copied = 0
+                while copied < length:
+                    sent = os.sendfile(
+                        dst.fileno(),
+                        src.fileno(),
+                        offset + copied,
+                        min(_COPY_CHUNK, length - copied),
+                    )
+                    if sent == 0:
+                        raise ValueError(f"unexpected end of file '{source_file}'")
+                    copied += sent
+                return
+            except OSError:
+                dst.seek(0)
+                dst.truncate()
+        with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if offset + length > len(mm):
+                raise ValueError(f"unexpected end of file '{source_file}'")
+            with memoryview(mm) as view:
+                dst.write(view[offset : offset + length])
+
+
+def extract_preview(source_file: str, output_file: str) -> int:
+    """
+    提取 RAW 文件中最大的内嵌 JPEG 预览图，写入完成后才出现在 `output_file`，
+    修改时间与 RAW 文件相同
+
+    Args:
+        source_file (str): RAW 文件
+        output_file (str): 输出的 JPEG 文件
+    Returns:
+        int: 预览图大小(byte)
+    Raises:
+        ValueError: 没有内嵌的 JPEG 预览图
+    """
+    preview = find_preview(TiffIndex.from_file(source_file))
+    if preview is None:
+        raise ValueError(f"no embedded JPEG preview found in file '{source_file}'")
+    tmp_file = f"{output_file}.tmp"
+    try:
+        copy_range(source_file, preview.offset, preview.length, tmp_file)
+        stat = os.stat(source_file)
+        os.utime(tmp_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tmp_file, output_file)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+    return preview.length
+
+
+def extract_previews(
+    source_files: List[str], output_dir: str, workers: int = 4, overwrite=False
+) -> List[PreviewResult]:
+    """
+    在线程池中批量提取预览图，输出为 `output_dir/<文件名>.jpg`。
+    预览图的修改时间与 RAW 文件相同时跳过，重复运行只提取新增或修改过的文件
+
+    Args:
+        source_files (List[str]): RAW 文件
+        output_dir (str): 输出目录
+        workers (int): 并发数
+        overwrite (bool): 是否重新提取已经存在的预览图
+    Returns:
+        List[PreviewResult]: 与 `source_files` 顺序相同的结果
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    def extract(source_file: str) -> PreviewResult:
+        file_base = os.path.splitext(os.path.basename(source_file))[0]
+        output_file = os.path.join(output_dir, f"{file_base}.jpg")
+        try:
+            if not overwrite and os.path.exists(output_file):
+                output_stat = os.stat(output_file)
+                if output_stat.st_mtime_ns == os.stat(source_file).st_mtime_ns:
+                    return PreviewResult(
+                        source_file, output_file, output_stat.st_size, skipped=True
+                    )
+            return PreviewResult(
+                source_file, output_file, extract_preview(source_file, output_file)
+            )
+        except Exception as e:
+            logger.warning(f"extract preview from '{source_file}' error: {e}")
+            return PreviewResult(source_file, None, 0, error=str(e))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="preview") as pool:
+        return list(pool.map(extract, source_files))
@@ -0,0 +1,191 @@
+"""
+聚合、限速的进度报告：处理文件的线程只把事件放入队列，后台线程统计吞吐量、ETA 和每个目录的计数，
+每隔 `interval` 秒最多输出一行进度；每个文件的详细信息只写入可选的 JSONL 日志文件
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, NamedTuple, Optional, TextIO
+
+from loguru import logger
+
+
+class _Event(NamedTuple):
+    time: float
+    """事件发生的时间(time.time)"""
+
+    path: str
+    """文件路径"""
+
+    status: str
+    """处理结果，例如 `renamed`、`skipped`、`failed`"""
+
+    size: int
+    """处理的数据量(byte)"""
+
+    detail: Dict[str, Any]
+    """写入日志文件的其他信息"""
+
+
+_STOP = object()
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class ProgressReporter:
+    """
+    进度报告
+
+    >>> with ProgressReporter("scan", total=len(files), log_file="scan.jsonl") as progress:
+    ...     for file in files:
+    ...         progress.update(file, "ok", size=os.path.getsize(file))
+    """
+
+    def __init__(
+        self,
+        name: str,
+        total: Optional[int] = None,
+        interval: float = 1.0,
+        log_file: Optional[str] = None,
+        sink: Optional[Callable[[str], None]] = None,
+    ):
+        """
+        Args:
+            name (str): 进度行中使用的名称，同时写入日志文件的 `phase` 字段
+            total (Optional[int]): 文件总数，为 None 时不计算 ETA
+            interval (float): 两次输出进度之间的最短间隔(s)
+            log_file (Optional[str]): 每个文件一行的 JSONL 日志文件，追加写入，为 None 时不记录
+            sink (Optional[Callable[[str], None]]): 输出进度行的函数，默认为 `logger.info`
+        """
+        self.name = name
+        self.total = total
+        self.interval = interval
+        self.log_file = log_file
+        self.sink = sink or logger.info
+
+        self.done = 0
+        """已处理的文件数量"""
+        self.bytes = 0
+        """已处理的数据量(byte)"""
+        self.statuses: Counter = Counter()
+        """每种处理结果的文件数量"""
+        self.dirs: Dict[str, Counter] = {}
+        """每个目录中每种处理结果的文件数量"""
+
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._log: Optional[TextIO] = None
+        self._current_dir = ""
+        self._started_at = 0.0
+        self._reported_at = 0.0
+
+    def __enter__(self) -> "ProgressReporter":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def start(self) -> None:
+        # 在调用线程中打开日志文件，路径错误时直接抛出异常
+        if self.log_file:
+            self._log = open(self.log_file, "a", encoding="utf-8")
+        self._started_at = self._reported_at = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._run, name=f"progress-{self.name}", daemon=True
+        )
+        self._thread.start()
+
+    def update(self, path: str, status: str = "ok", size: int = 0, **detail) -> None:
+        """记录一个文件的处理结果，只放入队列，不在调用线程中格式化或写入"""
+        self._queue.put(_Event(time.time(), str(path), status, size, detail))
+
+    def close(self) -> None:
+        """处理队列中剩余的事件，输出汇总和每个目录的计数"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        if self.done == 0:
+            return
+        self.sink(f"[{self.name}] finished: {self._summary()}")
+        for parent_dir, counts in sorted(self.dirs.items()):
+            self.sink(f"[{self.name}] '{parent_dir}': {self._format_counts(counts)}")
+
+    def _run(self) -> None:
+        while True:
+            timeout = self._reported_at + self.interval - time.perf_counter()
+            try:
+                event = self._queue.get(timeout=max(timeout, 0.01))
+            except queue.Empty:
+                event = None
+            if event is _STOP:
+                return
+            if event is not None:
+                self._record(event)
+            now = time.perf_counter()
+            if now - self._reported_at >= self.interval and self.done:
+                self._reported_at = now
+                counts = self._format_counts(self.dirs[self._current_dir])
+                self.sink(
+                    f"[{self.name}] {self._summary()}, "
+                    f"current '{self._current_dir}': {counts}"
+                )
+
+    def _record(self, event: _Event) -> None:
+        self.done += 1
+        self.bytes += event.size
+        self.statuses[event.status] += 1
+        self._current_dir = os.path.dirname(event.path)
+        self.dirs.setdefault(self._current_dir, Counter())[event.status] += 1
+        if self._log is None:
+            return
+        self._log.write(
+            json.dumps(
+                {
+                    "time": datetime.fromtimestamp(event.time).isoformat(),
+                    "phase": self.name,
+                    "path": event.path,
+                    "status": event.status,
+                    "size": event.size,
+                    **event.detail,
+                },
+                ensure_ascii=False,
+                default=str,
+            )
+            + "\n"
+        )
+
+    def _summary(self) -> str:
+        elapsed = max(time.perf_counter() - self._started_at, 1e-9)
+        rate = self.done / elapsed
+        if self.total:
+            summary = f"{self.done}/{self.total} files ({self.done / self.total:.1%})"
+        else:
+            summary = f"{self.done} files"
+        summary += f", {rate:.1f} files/s"
+        if self.bytes:
+            summary += f", {self.bytes / 1024**2 / elapsed:.1f} MB/s"
+        if self.total and rate > 0 and self.done < self.total:
+            summary += f", ETA {_format_duration((self.total - self.done) / rate)}"
+        else:
+            summary += f", elapsed {_format_duration(elapsed)}"
+        return f"{summary} [{self._format_counts(self.statuses)}]"
+
+    @staticmethod
+    def _format_counts(counts: Counter) -> str:
+        return ", ".join(
+            f"{status} {count}" for status, count in sorted(counts.items())
+        )
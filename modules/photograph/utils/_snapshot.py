@@ -0,0 +1,202 @@
+"""
+目录快照：按照 Merkle 树记录每个根目录下全部子目录的 (mtime_ns, 条目数量, 目录清单摘要)，
+再次运行时只列出 mtime 发生变化的目录，未变化的目录只需要一次 stat
+
+注意：原地修改文件内容不会改变目录的 mtime，快照只能发现新增、删除和重命名的条目，
+需要检查文件内容时请忽略快照完整运行。
+"""
+
+import gzip
+import hashlib
+import os
+from typing import Dict, List, Optional
+
+from loguru import logger
+from pydantic import BaseModel, Field
+
+SNAPSHOT_VERSION = 1
+"""快照文件格式版本"""
+
+
+def _digest(*parts: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode("utf-8", errors="surrogateescape"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class DirNode(BaseModel):
+    mtime_ns: int
+    """目录的最后修改时间(ns)"""
+
+    entry_count: int
+    """目录下的条目数量（不含 dotfile）"""
+
+    listing_digest: str
+    """目录清单（文件名、大小、修改时间和子目录名）的摘要"""
+
+    digest: str
+    """Merkle 摘要：目录清单摘要和全部子目录摘要的摘要"""
+
+    children: Dict[str, "DirNode"] = Field(default_factory=dict)
+    """子目录"""
+
+    recursive: bool = True
+    """是否记录了子目录，只列出根目录时为 False"""
+
+
+class DirSnapshot(BaseModel):
+    """
+    多个根目录的目录快照
+
+    >>> snapshot = DirSnapshot.load(snapshot_file)
+    >>> changed_dirs = snapshot.refresh(root)  # 只有这些目录需要重新处理
+    >>> snapshot.save(snapshot_file)           # 处理完成之后再保存
+    """
+
+    version: int = SNAPSHOT_VERSION
+    """文件格式版本"""
+
+    roots: Dict[str, DirNode] = Field(default_factory=dict)
+    """根目录 -> 目录树"""
+
+    @classmethod
+    def load(cls, snapshot_file: str) -> "DirSnapshot":
+        """加载快照，文件不存在或版本不匹配时返回空快照"""
+        if not os.path.exists(snapshot_file):
+            return cls()
+        opener = gzip.open if snapshot_file.endswith(".gz") else open
+        with opener(snapshot_file, "rb") as f:
+            snapshot = cls.model_validate_json(f.read())
+        if snapshot.version != SNAPSHOT_VERSION:
+            logger.warning(
+                f"ignore snapshot '{snapshot_file}' of version {snapshot.version}"
+            )
+            return cls()
+        return snapshot
+
+    def save(self, snapshot_file: str) -> None:
+        """保存快照，文件后缀为 `.gz` 时使用 gzip 压缩"""
+        os.makedirs(os.path.dirname(os.path.abspath(snapshot_file)), exist_ok=True)
+        opener = gzip.open if snapshot_file.endswith(".gz") else open
+        tmp_file = f"{snapshot_file}.tmp"
+        with opener(tmp_file, "wb") as f:
+            f.write(self.model_dump_json().encode("utf-8"))
+        os.replace(tmp_file, snapshot_file)
+
+    def refresh(self, root: str, recursive: bool = True) -> List[str]:
+        """
+        将根目录的快照更新为当前状态
+
+        Args:
+            root (str): 根目录
+            recursive (bool): 是否检查子目录，为 False 时只 stat 和列出根目录
+        Returns:
+            List[str]: 清单发生变化（或新出现）的目录，父目录在子目录之前
+        """
+        root = os.path.abspath(root)
+        changed: List[str] = []
+        node = self._refresh(root, self.roots.get(root), changed, recursive)
+        if node is None:
+            self.roots.pop(root, None)
+        else:
+            self.roots[root] = node
+        return changed
+
+    def digest(self, root: str) -> Optional[str]:
+        """根目录的 Merkle 摘要，没有快照时返回 None"""
+        node = self.roots.get(os.path.abspath(root))
+        return None if node is None else node.digest
+
+    def forget(self, path: str) -> None:
+        """删除目录（及其子目录）的快照，下次运行时重新处理"""
+        path = os.path.abspath(path)
+        for root in list(self.roots):
+            if path == root:
+                del self.roots[root]
+                return
+            if path.startswith(root.rstrip(os.sep) + os.sep):
+                relative = os.path.relpath(path, root).split(os.sep)
+                node = self.roots[root]
+                for name in relative[:-1]:
+                    node = node.children.get(name)
+                    if node is None:
+                        return
+                node.children.pop(relative[-1], None)
+                # 修改 mtime 使父目录在下次运行时重新列出
+                node.mtime_ns = -1
+                return
+
+    def _refresh(
+        self,
+        path: str,
+        old: Optional[DirNode],
+        changed: List[str],
+        recursive: bool = True,
+    ) -> Optional[DirNode]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        children: Dict[str, DirNode] = {}
+        # 只列出根目录时没有记录子目录，递归检查时需要重新列出
+        if (
+            old is not None
+            and old.mtime_ns == st.st_mtime_ns
+            and (old.recursive or not recursive)
+        ):
+            # 目录清单未变化，不需要列出目录，只检查已知的子目录
+            if recursive:
+                for name, child in old.children.items():
+                    node = self._refresh(os.path.join(path, name), child, changed)
+                    if node is not None:
+                        children[name] = node
+            listing_digest = old.listing_digest
+            entry_count = old.entry_count
+        else:
+            listing: List[str] = []
+            subdirs: List[str] = []
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.name.startswith("."):
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                            listing.append(f"d:{entry.name}")
+                        else:
+                            entry_st = entry.stat(follow_symlinks=False)
+                            listing.append(
+                                f"f:{entry.name}:{entry_st.st_size}:{entry_st.st_mtime_ns}"
+                            )
+            except OSError as e:
+                logger.warning(f"scan directory '{path}' error: {e}")
+                return None
+            listing.sort()
+            listing_digest = _digest(*listing)
+            entry_count = len(listing)
+            if old is None or old.listing_digest != listing_digest:
+                changed.append(path)
+
+            old_children = old.children if old is not None else {}
+            for name in sorted(subdirs) if recursive else []:
+                node = self._refresh(
+                    os.path.join(path, name), old_children.get(name), changed
+                )
+                if node is not None:
+                    children[name] = node
+
+        digest = _digest(
+            listing_digest,
+            *(f"{name}:{child.digest}" for name, child in sorted(children.items())),
+        )
+        return DirNode(
+            mtime_ns=st.st_mtime_ns,
+            entry_count=entry_count,
+            listing_digest=listing_digest,
+            digest=digest,
+            children=children,
+            recursive=recursive,
+        )
@@ -0,0 +1,95 @@
+"""
+延时摄影的序列划分：按拍摄时间排序后，用相邻帧的时间差一次性划分序列并检测丢帧，
+所有计算都是 NumPy 向量运算，几万帧也只需要几毫秒
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+REFERENCE_WINDOW = 5
+"""估计局部拍摄间隔时使用的时间差数量（取中位数），单个丢帧或抖动不影响估计"""
+
+
+class SequenceSplit(NamedTuple):
+    sequence: np.ndarray
+    """每一帧所属的序列编号，从 0 开始"""
+
+    position: np.ndarray
+    """每一帧在序列中的位置，从 0 开始连续编号"""
+
+    frame: np.ndarray
+    """每一帧按拍摄时间推算的帧号，从 0 开始，丢帧处留空"""
+
+    starts: np.ndarray
+    """每个序列第一帧的下标"""
+
+    interval_ms: np.ndarray
+    """每个序列的平均拍摄间隔(ms)，只有一帧的序列为 0"""
+
+    dropped: np.ndarray
+    """每个序列的丢帧数量"""
+
+
+def split_sequences(
+    times_ms: np.ndarray,
+    tolerance: float = 0.2,
+    max_dropped: int = 5,
+    slack_ms: int = 0,
+) -> SequenceSplit:
+    """
+    将按拍摄时间排序的帧划分为序列
+
+    每个时间差与其附近 `REFERENCE_WINDOW` 个时间差的中位数（局部拍摄间隔）比较：
+
+    - 约等于间隔的整数倍 k（k > 1）时视为丢失了 k - 1 帧
+    - 不是整数倍、超过 `max_dropped + 1` 倍或者局部拍摄间隔本身发生变化时，开始新的序列
+
+    Args:
+        times_ms (np.ndarray): 升序排列的拍摄时间(ms)
+        tolerance (float): 允许的相对误差（相对于局部拍摄间隔）
+        max_dropped (int): 连续丢帧数量上限，超过时视为新的序列
+        slack_ms (int): 允许的绝对误差(ms)，拍摄时间只精确到秒时为 1000
+    """
+    times = np.asarray(times_ms, dtype=np.int64)
+    n = len(times)
+    if n == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return SequenceSplit(empty, empty, empty, empty, np.empty(0), empty)
+
+    diffs = np.diff(times).astype(np.float64)
+    if len(diffs):
+        half = REFERENCE_WINDOW // 2
+        padded = np.pad(diffs, half, mode="edge")
+        reference = np.median(sliding_window_view(padded, REFERENCE_WINDOW), axis=1)
+        reference = np.maximum(reference, 1.0)
+    else:
+        reference = diffs
+    allowed = np.maximum(tolerance * reference, slack_ms)
+    steps = np.maximum(np.rint(diffs / reference), 1.0)
+    irregular = (np.abs(diffs - steps * reference) > allowed) | (
+        steps > max_dropped + 1
+    )
+    # 局部拍摄间隔变化时开始新的序列，前一个时间差已经是断点（例如两个序列之间的空档）时除外
+    regime_change = np.zeros(len(diffs), dtype=bool)
+    regime_change[1:] = (np.abs(np.diff(reference)) > allowed[1:]) & ~irregular[:-1]
+    breaks = irregular | regime_change
+
+    # 第 i 个时间差为断点时，第 i + 1 帧开始新的序列
+    sequence = np.concatenate([[0], np.cumsum(breaks)]).astype(np.int64)
+    starts = np.flatnonzero(np.concatenate([[True], breaks]))
+    ends = np.append(starts[1:], n) - 1
+    position = np.arange(n, dtype=np.int64) - starts[sequence]
+    elapsed = np.concatenate([[0], np.cumsum(np.where(breaks, 0, steps))])
+    frame = (elapsed - elapsed[starts][sequence]).astype(np.int64)
+
+    last_frame = frame[ends]
+    interval_ms = np.divide(
+        (times[ends] - times[starts]).astype(np.float64),
+        last_frame,
+        out=np.zeros(len(starts)),
+        where=last_frame > 0,
+    )
+    dropped = last_frame - position[ends]
+    return SequenceSplit(sequence, position, frame, starts, interval_ms, dropped)
@@ -11,7 +11,8 @@ import exifread
 import piexif
 import pillow_heif
 
-from pkg._enums.photo import PhotographDir
+from modules.photograph._enums.photo import PhotographDir
+from modules.photograph.utils._progress import ProgressReporter
 
 
 class FileTag:
@@ -80,74 +81,75 @@ def main():
     args = DefaultArgs()
     process_task_list: List[ProcessTask] = []
 
-    # 遍历文件夹
-    for file_tag in FILE_TAG_LIST:
-        # 遍历文件
-        for file in os.listdir(file_tag.dir):
-            print(f"正在处理: {file_tag.tag} / {file}")
-            if file.startswith("."):
-                continue
-
-            # 分割文件名和后缀
-            file_base, file_ext = os.path.splitext(file)
-            file_path = os.path.join(file_tag.dir, file)
-
-            # 检查文件类型是否支持
-            # 解析 exif 信息
-            if file_ext.lower() in EXIF_SUPPORTED_FILE_EXT:
-                with open(file_path, "rb") as f:
-                    exif_data = exifread.process_file(f, details=False, strict=True)
-                    date_time = exif_data["EXIF DateTimeOriginal"].printable
-            elif file_ext.lower() in HEIF_SUPPORTED_FILE_EXT:
-                # reference from: https://github.com/bigcat88/pillow_heif/blob/master/examples/heif_dump_info.py
-                heif_file = pillow_heif.open_heif(file_path)
-                exif_dict = piexif.load(heif_file.info["exif"], key_is_name=True)
-                exif_data = exif_dict["Exif"]
-                date_time = exif_data["DateTimeOriginal"]
-                date_time = str(date_time, "utf-8")
-            else:
-                continue
-
-            file_date, file_time = date_time.split(" ")
-            file_date = file_date.replace(":", "")[2:]
-            file_time = file_time.replace(":", "")
-            # 获取文件名中的秒级标识
-            second_id = get_second_id_from_file_base(file_base)
-            if second_id is None:
-                print(
-                    f"{COLORMAP.YELLOW}未知文件名格式或已经命名: {file_tag.dir} / {file}{COLORMAP.DEFAULT}"
-                )
-                continue
-
-            # 文件标识
-            file_identification = f"{file_time}_{second_id}"
+    # 遍历文件夹，终端只输出聚合的进度
+    with ProgressReporter("scan") as progress:
+        for file_tag in FILE_TAG_LIST:
+            # 遍历文件
+            for file in os.listdir(file_tag.dir):
+                progress.update(os.path.join(file_tag.dir, file))
+                if file.startswith("."):
+                    continue
+
+                # 分割文件名和后缀
+                file_base, file_ext = os.path.splitext(file)
+                file_path = os.path.join(file_tag.dir, file)
+
+                # 检查文件类型是否支持
+                # 解析 exif 信息
+                if file_ext.lower() in EXIF_SUPPORTED_FILE_EXT:
+                    with open(file_path, "rb") as f:
+                        exif_data = exifread.process_file(f, details=False, strict=True)
+                        date_time = exif_data["EXIF DateTimeOriginal"].printable
+                elif file_ext.lower() in HEIF_SUPPORTED_FILE_EXT:
+                    # reference from: https://github.com/bigcat88/pillow_heif/blob/master/examples/heif_dump_info.py
+                    heif_file = pillow_heif.open_heif(file_path)
+                    exif_dict = piexif.load(heif_file.info["exif"], key_is_name=True)
+                    exif_data = exif_dict["Exif"]
+                    date_time = exif_data["DateTimeOriginal"]
+                    date_time = str(date_time, "utf-8")
+                else:
+                    continue
+
+                file_date, file_time = date_time.split(" ")
+                file_date = file_date.replace(":", "")[2:]
+                file_time = file_time.replace(":", "")
+                # 获取文件名中的秒级标识
+                second_id = get_second_id_from_file_base(file_base)
+                if second_id is None:
+                    print(
+                        f"{COLORMAP.YELLOW}未知文件名格式或已经命名: {file_tag.dir} / {file}{COLORMAP.DEFAULT}"
+                    )
+                    continue
 
-            # 更新文件名
-            update_name = f"{file_date}-{file_tag.tag}-{file_identification}"
-            update_file = f"{update_name}{file_ext}"
+                # 文件标识
+                file_identification = f"{file_time}_{second_id}"
 
-            process_task_list.append(
-                ProcessTask(
-                    parent_dir=file_tag.dir,
-                    origin_file=file,
-                    update_file=update_file,
-                    skip=(file_base == update_name),
-                )
-            )
+                # 更新文件名
+                update_name = f"{file_date}-{file_tag.tag}-{file_identification}"
+                update_file = f"{update_name}{file_ext}"
 
-            # 检查是否存在 xmp 文件
-            xmp_file = f"{file_base}.xmp"
-            xmp_file_path = os.path.join(file_tag.dir, xmp_file)
-            if os.path.exists(xmp_file_path):
                 process_task_list.append(
                     ProcessTask(
                         parent_dir=file_tag.dir,
-                        origin_file=xmp_file,
-                        update_file=f"{update_name}.xmp",
-                        skip=(xmp_file == f"{update_name}.xmp"),
+                        origin_file=file,
+                        update_file=update_file,
+                        skip=(file_base == update_name),
                     )
                 )
 
+                # 检查是否存在 xmp 文件
+                xmp_file = f"{file_base}.xmp"
+                xmp_file_path = os.path.join(file_tag.dir, xmp_file)
+                if os.path.exists(xmp_file_path):
+                    process_task_list.append(
+                        ProcessTask(
+                            parent_dir=file_tag.dir,
+                            origin_file=xmp_file,
+                            update_file=f"{update_name}.xmp",
+                            skip=(xmp_file == f"{update_name}.xmp"),
+                        )
+                    )
+
     # ========================================
     #   需要执行的任务
     # ========================================
@@ -167,13 +169,12 @@ def main():
 
     def execute_process_task(ptl: List[ProcessTask]):
         """执行的任务"""
-        for i, task in enumerate(ptl):
-            if not task.skip:
-                print(process_task_info_str(i, len(str(len(ptl))), task))
-                os.rename(
-                    os.path.join(task.parent_dir, task.origin_file),
-                    os.path.join(task.parent_dir, task.update_file),
-                )
+        rename_list = [task for task in ptl if not task.skip]
+        with ProgressReporter("rename", total=len(rename_list)) as progress:
+            for task in rename_list:
+                origin_file = os.path.join(task.parent_dir, task.origin_file)
+                os.rename(origin_file, os.path.join(task.parent_dir, task.update_file))
+                progress.update(origin_file, "renamed")
 
     # ========================================
     #   执行前的确认 输入 yes 才会执行
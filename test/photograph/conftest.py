@@ -0,0 +1,62 @@
+"""
+测试用的照片文件
+"""
+
+import io
+
+import piexif
+import pytest
+from PIL import Image
+
+
+def make_jpeg(
+    date_time: str = "2025:05:01 12:34:56",
+    make: str = "SONY",
+    model: str = "ILCE-7M4",
+    size=(64, 48),
+    color=(200, 100, 50),
+    gps=None,
+    thumbnail=True,
+    image=None,
+    sub_sec=None,
+) -> bytes:
+    """
+    生成带 EXIF 数据（以及 IFD1 缩略图）的 JPEG 文件内容，
+    `image` 不为 None 时作为主图像，缩略图为其缩小后的图像，否则使用纯色图像
+    """
+    exif_dict = {
+        "0th": {
+            piexif.ImageIFD.Make: make.encode(),
+            piexif.ImageIFD.Model: model.encode(),
+            piexif.ImageIFD.Orientation: 6,
+        },
+        "Exif": {
+            piexif.ExifIFD.DateTimeOriginal: date_time.encode(),
+            piexif.ExifIFD.ExposureTime: (1, 250),
+            piexif.ExifIFD.FNumber: (28, 10),
+            piexif.ExifIFD.ISOSpeedRatings: 400,
+            piexif.ExifIFD.FocalLength: (35, 1),
+            piexif.ExifIFD.LensModel: b"FE 35mm F1.8",
+        },
+        "GPS": gps or {},
+        "1st": {},
+        "thumbnail": None,
+    }
+    if sub_sec is not None:
+        exif_dict["Exif"][piexif.ExifIFD.SubSecTimeOriginal] = sub_sec.encode()
+    if image is None:
+        image = Image.new("RGB", size, color)
+    if thumbnail:
+        thumb = io.BytesIO()
+        image.resize((16, 12)).save(thumb, format="JPEG")
+        exif_dict["thumbnail"] = thumb.getvalue()
+    output = io.BytesIO()
+    image.save(output, format="JPEG", exif=piexif.dump(exif_dict))
+    return output.getvalue()
+
+
+@pytest.fixture
+def jpeg_file(tmp_path):
+    file_path = tmp_path / "DSC00001.JPG"
+    file_path.write_bytes(make_jpeg())
+    return file_path
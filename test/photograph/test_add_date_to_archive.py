@@ -0,0 +1,116 @@
+"""
+测试为归档文件添加时间戳
+"""
+
+import os
+import time
+
+from modules.photograph._enums.archive import ArchiveTimeSource
+from modules.photograph.tasks.add_date_to_archive import (
+    AddDateToArchiveTask,
+    AddDateToArchiveTaskConfig,
+    stamped_name,
+)
+from modules.photograph.utils._archive import archive_ext
+
+MTIME = time.mktime((2025, 5, 1, 12, 0, 0, 0, 0, -1))
+
+
+def _touch(path, mtime=MTIME):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"data")
+    os.utime(path, (mtime, mtime))
+
+
+def test_archive_ext_longest_suffix():
+    assert archive_ext("a.b.tar.gz") == ".tar.gz"
+    assert archive_ext("A.TAR.BZ2") == ".tar.bz2"
+    assert archive_ext("a.txz") == ".txz"
+    assert archive_ext("a.gz") is None
+    assert archive_ext(".tar") is None
+
+
+def test_stamped_name():
+    source = ArchiveTimeSource.MTIME
+    assert stamped_name("a.tar.gz", MTIME, source) == "a~20250501_120000.tar.gz"
+    assert stamped_name("a.ZIP", MTIME, source) == "a~20250501_120000.ZIP"
+    assert stamped_name("a~20250501_120000.tar.gz", MTIME, source) is None
+    # 修改时间不覆盖已有的时间戳，成员时间以归档内容为准
+    assert stamped_name("a~250101_000000.7z", MTIME, source) is None
+    assert (
+        stamped_name("a~250101_000000.7z", MTIME, ArchiveTimeSource.MEMBER_MTIME)
+        == "a~20250501_120000.7z"
+    )
+    assert stamped_name("a~v2.zip", MTIME, ArchiveTimeSource.MEMBER_MTIME) is None
+    assert stamped_name("notes.txt", MTIME, source) is None
+
+
+def test_add_date_recursive_multi_root(tmp_path):
+    root1, root2 = tmp_path / "iCloud", tmp_path / "local"
+    _touch(str(root1 / "250501-a.tar.gz"))
+    _touch(str(root1 / "2024" / "240101-b.zip"))
+    _touch(str(root1 / "2024" / "not-an-archive"))
+    _touch(str(root2 / "250601-c.7z"))
+    # 重命名后与已有的文件重名
+    _touch(str(root2 / "250601-d.tar"))
+    _touch(str(root2 / "250601-d~20250501_120000.tar"))
+
+    config = AddDateToArchiveTaskConfig(
+        roots=[str(root1), str(root2)],
+        snapshot_file=str(tmp_path / "snapshot.json"),
+        require_confirm=False,
+    )
+    task = AddDateToArchiveTask(config)
+    assert [os.path.basename(r.src) for r in task.renames] == [
+        "250501-a.tar.gz",
+        "250601-c.7z",
+    ]
+
+    config.recursive = True
+    task = AddDateToArchiveTask(config)
+    assert [os.path.basename(r.dst) for r in task.renames] == [
+        "240101-b~20250501_120000.zip",
+        "250501-a~20250501_120000.tar.gz",
+        "250601-c~20250501_120000.7z",
+    ]
+    assert task.execute() == 3
+    assert os.path.exists(root1 / "2024" / "240101-b~20250501_120000.zip")
+
+    # 快照：没有变化的目录不再列出
+    task = AddDateToArchiveTask(config)
+    assert task.renames == []
+    _touch(str(root2 / "new" / "250701-e.zip"))
+    task = AddDateToArchiveTask(config)
+    assert [os.path.basename(r.dst) for r in task.renames] == [
+        "250701-e~20250501_120000.zip"
+    ]
+
+
+def test_add_date_retries_skipped_archives(tmp_path):
+    root = tmp_path / "archives"
+    _touch(str(root / "250601-d.tar"))
+    _touch(str(root / "250601-d~20250501_120000.tar"))
+    _touch(str(root / "2024" / "240101-b.zip"))
+
+    config = AddDateToArchiveTaskConfig(
+        roots=[str(root)],
+        snapshot_file=str(tmp_path / "snapshot.json"),
+        require_confirm=False,
+    )
+    task = AddDateToArchiveTask(config)
+    assert task.renames == []
+    task.execute()
+    # 有归档被跳过的目录不记录快照
+    assert task.skipped_dirs == {str(root)}
+    assert task.snapshot.roots == {}
+
+    # 目标文件名被占用的归档在目录没有变化时仍然重新检查
+    os.remove(root / "250601-d~20250501_120000.tar")
+    task = AddDateToArchiveTask(config)
+    assert [os.path.basename(r.dst) for r in task.renames] == [
+        "250601-d~20250501_120000.tar"
+    ]
+    assert task.execute() == 1
+    # 非递归模式只记录根目录
+    assert task.snapshot.roots[str(root)].children == {}
@@ -0,0 +1,83 @@
+"""
+测试并行流式归档
+"""
+
+import gzip
+import os
+import tarfile
+
+import pytest
+
+from modules.photograph._enums.archive import ArchiveCodec
+from modules.photograph._types.archive import ArchiveManifest
+from modules.photograph.utils._archive import archive_album, compress_chunk
+from modules.photograph.utils._fileops import default_file_mode
+
+
+@pytest.fixture
+def album(tmp_path):
+    album_dir = tmp_path / "250501-测试"
+    (album_dir / "sub").mkdir(parents=True)
+    (album_dir / "DSC00001.ARW").write_bytes(os.urandom(300_000))
+    (album_dir / "DSC00001.xmp").write_text("xmp data")
+    (album_dir / "sub" / "DSC00002.JPG").write_bytes(b"\xff\xd8" + b"a" * 200_000)
+    (album_dir / ".DS_Store").write_bytes(b"ignored")
+    os.utime(album_dir / "DSC00001.ARW", (1_746_000_000, 1_746_000_000.5))
+    os.utime(album_dir / "sub" / "DSC00002.JPG", (1_745_000_000, 1_745_000_000))
+    return album_dir
+
+
+@pytest.mark.parametrize("codec", list(ArchiveCodec))
+def test_archive_album(tmp_path, album, codec):
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    workers = 1 if codec == ArchiveCodec.BZIP2 else 2
+    archive_file = archive_album(
+        str(album), str(output_dir), codec, chunk_bytes=64 * 1024, workers=workers
+    )
+
+    assert os.path.basename(archive_file).startswith("250501-测试~")
+    assert archive_file.endswith(codec.ext)
+    newest = os.stat(album / "DSC00001.xmp").st_mtime
+    assert os.stat(archive_file).st_mtime == newest
+    assert os.stat(archive_file).st_mode & 0o777 == default_file_mode()
+    assert sorted(os.listdir(output_dir)) == sorted(
+        [
+            os.path.basename(archive_file),
+            os.path.basename(archive_file) + ".members.json.gz",
+        ]
+    )
+
+    with tarfile.open(archive_file) as tar:
+        names = tar.getnames()
+        assert names == [
+            "250501-测试/DSC00001.ARW",
+            "250501-测试/DSC00001.xmp",
+            "250501-测试/sub/DSC00002.JPG",
+        ]
+        raw = tar.extractfile("250501-测试/DSC00001.ARW").read()
+        assert raw == (album / "DSC00001.ARW").read_bytes()
+        assert tar.getmember("250501-测试/DSC00001.ARW").mtime == 1_746_000_000.5
+
+    manifest = ArchiveManifest.load(ArchiveManifest.path_of(archive_file))
+    assert [m.name for m in manifest.members] == names
+    assert len(manifest.chunks) > 1
+    assert manifest.size == os.path.getsize(archive_file)
+    if codec == ArchiveCodec.GZIP:
+        # 从成员所在的数据块开始解压，直接读取成员数据
+        member = manifest.members[2]
+        chunk = max(
+            (c for c in manifest.chunks if c.raw_offset <= member.data_offset),
+            key=lambda c: c.raw_offset,
+        )
+        with open(archive_file, "rb") as f:
+            f.seek(chunk.offset)
+            with gzip.GzipFile(fileobj=f) as stream:
+                stream.read(member.data_offset - chunk.raw_offset)
+                assert stream.read(2) == b"\xff\xd8"
+
+
+def test_compress_chunk_members_concatenate():
+    data = [b"a" * 1000, b"b" * 1000]
+    joined = b"".join(compress_chunk(d, ArchiveCodec.GZIP, 6) for d in data)
+    assert gzip.decompress(joined) == b"".join(data)
@@ -0,0 +1,224 @@
+"""
+测试归档成员索引
+"""
+
+import io
+import os
+import tarfile
+import zipfile
+from datetime import datetime
+
+import pytest
+from conftest import make_jpeg
+
+from modules.photograph._enums.archive import ArchiveCodec, ArchiveTimeSource
+from modules.photograph._types.archive import ArchiveManifest
+from modules.photograph.exif.tiff import DEFAULT_HEADER_BYTES
+from modules.photograph.index.archive_index import ArchiveIndex
+from modules.photograph.utils import _archive
+from modules.photograph.utils._archive import (
+    archive_album,
+    archive_ext,
+    archive_timestamp,
+    newest_capture_time,
+    read_archive_entries,
+)
+
+
+def _make_tar(archive_file, mode, members):
+    with tarfile.open(archive_file, mode) as tar:
+        for name, data, mtime in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = mtime
+            tar.addfile(info, io.BytesIO(data))
+
+
+def test_archive_ext():
+    assert archive_ext("a~20250501_120000.tar.gz") == ".tar.gz"
+    assert archive_ext("A.TGZ") == ".tgz"
+    assert archive_ext("a.zip") == ".zip"
+    assert archive_ext("a.gz") is None
+
+
+def test_read_archive_entries(tmp_path):
+    tar_file = str(tmp_path / "a.tar")
+    _make_tar(tar_file, "w", [("a/DSC00001.ARW", b"x" * 1000, 1_746_000_000)])
+    assert read_archive_entries(tar_file) == [("a/DSC00001.ARW", 1000, 1_746_000_000.0)]
+
+    zip_file = str(tmp_path / "a.zip")
+    with zipfile.ZipFile(zip_file, "w") as zf:
+        zf.writestr("a/", b"")
+        zf.writestr("a/IMG_0001.HEIC", b"y" * 10)
+    assert [(e.name, e.size) for e in read_archive_entries(zip_file)] == [
+        ("a/IMG_0001.HEIC", 10)
+    ]
+
+    # 有成员索引时不读取压缩数据
+    album = tmp_path / "250501-测试"
+    album.mkdir()
+    (album / "DSC00002.ARW").write_bytes(os.urandom(1000))
+    archive_file = archive_album(str(album), str(tmp_path), ArchiveCodec.XZ, workers=1)
+    entries = read_archive_entries(archive_file)
+    assert [e.name for e in entries] == ["250501-测试/DSC00002.ARW"]
+    manifest = ArchiveManifest.load(ArchiveManifest.path_of(archive_file))
+    manifest.members[0].name = "from-manifest"
+    manifest.save(ArchiveManifest.path_of(archive_file))
+    assert read_archive_entries(archive_file)[0].name == "from-manifest"
+    # 保留修改时间替换归档文件后，索引记录的大小不一致，不再使用索引
+    stat = os.stat(archive_file)
+    with open(archive_file, "ab") as f:
+        f.write(b"\0" * 512)
+    os.utime(archive_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert read_archive_entries(archive_file)[0].name == "250501-测试/DSC00002.ARW"
+    os.remove(ArchiveManifest.path_of(archive_file))
+    assert read_archive_entries(archive_file)[0].name == "250501-测试/DSC00002.ARW"
+
+
+def test_archive_index_update_and_query(tmp_path):
+    root = tmp_path / "Photograph-Raw"
+    (root / "2025").mkdir(parents=True)
+    _make_tar(
+        root / "2025" / "250501-旅行~20250501_120000.tar.gz",
+        "w:gz",
+        [
+            ("250501-旅行/DSC00001.ARW", b"a" * 100, 1_746_000_000),
+            ("250501-旅行/DSC00001.xmp", b"b", 1_746_000_000),
+        ],
+    )
+    with zipfile.ZipFile(root / "250601-山.zip", "w") as zf:
+        zf.writestr("250601-山/dsc00001.arw", b"c" * 10)
+    (root / "broken.zip").write_bytes(b"not a zip")
+    (root / "notes.txt").write_text("not an archive")
+
+    with ArchiveIndex(str(tmp_path / "index.db")) as index:
+        stats = index.update([str(root)])
+        assert (stats.added, stats.failed) == (3, 1)
+        assert index.count() == (3, 3)
+        assert [p for p, _ in index.failures()] == [str(root / "broken.zip")]
+
+        records = index.query(name="DSC00001.ARW")
+        assert [(os.path.basename(r.archive), r.size) for r in records] == [
+            ("250501-旅行~20250501_120000.tar.gz", 100),
+            ("250601-山.zip", 10),
+        ]
+        assert records[0].mtime.timestamp() == 1_746_000_000
+        assert len(index.query(pattern="*.xmp")) == 1
+
+        # 增量更新只读取变化的归档
+        os.remove(root / "broken.zip")
+        with zipfile.ZipFile(root / "250601-山.zip", "w") as zf:
+            zf.writestr("250601-山/DSC00002.ARW", b"d")
+        stats = index.update([str(root)])
+        assert (stats.added, stats.updated, stats.removed, stats.unchanged) == (
+            0,
+            1,
+            1,
+            1,
+        )
+        assert [r.name for r in index.query(archive=str(root / "250601-山.zip"))] == [
+            "250601-山/DSC00002.ARW"
+        ]
+        assert index.failures() == []
+
+
+@pytest.mark.parametrize("kind", ["zip", "tar", "tar.gz", "manifest"])
+def test_newest_capture_time(tmp_path, kind):
+    album = tmp_path / "250501-测试"
+    album.mkdir()
+    (album / "DSC00001.JPG").write_bytes(make_jpeg("2025:05:01 10:00:00"))
+    # 较大的照片跨越多个数据块
+    (album / "DSC00002.JPG").write_bytes(
+        make_jpeg("2025:05:03 08:00:00") + os.urandom(200_000)
+    )
+    (album / "DSC00003.JPG").write_bytes(make_jpeg("2025:05:02 10:00:00"))
+    (album / "C0001.MP4").write_bytes(b"not a photo")
+    files = sorted(album.iterdir())
+    if kind == "zip":
+        archive_file = str(tmp_path / "a.zip")
+        with zipfile.ZipFile(archive_file, "w", zipfile.ZIP_DEFLATED) as zf:
+            for file in files:
+                zf.write(file, f"a/{file.name}")
+    elif kind in ("tar", "tar.gz"):
+        archive_file = str(tmp_path / f"a.{kind}")
+        with tarfile.open(archive_file, "w" if kind == "tar" else "w:gz") as tar:
+            for file in files:
+                tar.add(file, f"a/{file.name}")
+    else:
+        archive_file = archive_album(
+            str(album), str(tmp_path), ArchiveCodec.GZIP, chunk_bytes=64 * 1024
+        )
+
+    assert newest_capture_time(archive_file) == datetime(2025, 5, 3, 8)
+    assert (
+        archive_timestamp(archive_file, ArchiveTimeSource.MEMBER_EXIF)
+        == datetime(2025, 5, 3, 8).timestamp()
+    )
+
+
+@pytest.mark.parametrize("codec", [ArchiveCodec.GZIP, ArchiveCodec.XZ])
+def test_newest_capture_time_decompresses_headers_only(tmp_path, monkeypatch, codec):
+    album = tmp_path / "250501-测试"
+    album.mkdir()
+    for index in range(6):
+        (album / f"DSC0000{index}.JPG").write_bytes(
+            make_jpeg(f"2025:05:0{index + 1} 10:00:00") + os.urandom(1_000_000)
+        )
+        (album / f"DSC0000{index}.xmp").write_text("xmp data")
+    # 所有照片都在同一个默认大小的数据块范围内
+    archive_file = archive_album(str(album), str(tmp_path), codec, workers=1)
+
+    decompressed = 0
+
+    class CountingDecompressor:
+        def __init__(self, decompressor):
+            self._decompressor = decompressor
+
+        def __getattr__(self, name):
+            return getattr(self._decompressor, name)
+
+        def decompress(self, *args):
+            nonlocal decompressed
+            data = self._decompressor.decompress(*args)
+            decompressed += len(data)
+            return data
+
+    decompressor = _archive._decompressor
+    monkeypatch.setattr(
+        _archive,
+        "_decompressor",
+        lambda codec: CountingDecompressor(decompressor(codec)),
+    )
+    assert newest_capture_time(archive_file) == datetime(2025, 5, 6, 10)
+    # 每张照片只解压 tar 头和开头的 DEFAULT_HEADER_BYTES
+    assert 6 * DEFAULT_HEADER_BYTES <= decompressed <= 6 * (DEFAULT_HEADER_BYTES + 2048)
+
+
+def test_archive_timestamp_from_member_mtime(tmp_path):
+    archive_file = str(tmp_path / "a.tar.xz")
+    _make_tar(
+        archive_file,
+        "w:xz",
+        [("a/C0001.MP4", b"v", 1_745_000_000), ("a/C0002.MP4", b"v", 1_746_000_000)],
+    )
+    assert (
+        archive_timestamp(archive_file, ArchiveTimeSource.MEMBER_MTIME) == 1_746_000_000
+    )
+    # 没有照片时使用成员的修改时间
+    assert (
+        archive_timestamp(archive_file, ArchiveTimeSource.MEMBER_EXIF) == 1_746_000_000
+    )
+
+    with ArchiveIndex(str(tmp_path / "index.db")) as index:
+        index.update([str(tmp_path)])
+        st = os.stat(archive_file)
+        assert [e.name for e in index.entries(archive_file, st)] == [
+            "a/C0001.MP4",
+            "a/C0002.MP4",
+        ]
+        renamed = str(tmp_path / "a~20250428_195320.tar.xz")
+        os.rename(archive_file, renamed)
+        index.rename(archive_file, renamed)
+        assert index.entries(renamed, os.stat(renamed)) is not None
+        os.utime(renamed, (0, 0))
+        assert index.entries(renamed, os.stat(renamed)) is None
@@ -0,0 +1,69 @@
+"""
+测试目录快照的变化检测
+"""
+
+import os
+
+from modules.photograph.utils._snapshot import DirSnapshot
+
+
+def _touch(path: str, data: bytes = b"data"):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def test_refresh_reports_changed_dirs(tmp_path):
+    root = str(tmp_path / "root")
+    for album in ["a", "b", "b/c"]:
+        os.makedirs(os.path.join(root, album))
+        _touch(os.path.join(root, album, "1.ARW"))
+
+    snapshot = DirSnapshot()
+    assert snapshot.refresh(root) == [
+        root,
+        os.path.join(root, "a"),
+        os.path.join(root, "b"),
+        os.path.join(root, "b", "c"),
+    ]
+    digest = snapshot.digest(root)
+
+    snapshot_file = str(tmp_path / "snapshot.json.gz")
+    snapshot.save(snapshot_file)
+    snapshot = DirSnapshot.load(snapshot_file)
+    assert snapshot.refresh(root) == []
+    assert snapshot.digest(root) == digest
+
+    # 只有新增文件的目录被报告，摘要沿着路径向上变化
+    _touch(os.path.join(root, "b", "c", "2.ARW"))
+    assert snapshot.refresh(root) == [os.path.join(root, "b", "c")]
+    assert snapshot.digest(root) != digest
+
+    # 删除目录
+    os.remove(os.path.join(root, "a", "1.ARW"))
+    os.rmdir(os.path.join(root, "a"))
+    assert snapshot.refresh(root) == [root]
+    assert "a" not in snapshot.roots[root].children
+
+    # 遗忘的目录下次重新报告
+    snapshot.forget(os.path.join(root, "b"))
+    assert snapshot.refresh(root) == [
+        os.path.join(root, "b"),
+        os.path.join(root, "b", "c"),
+    ]
+
+
+def test_refresh_root_only(tmp_path):
+    root = str(tmp_path / "root")
+    os.makedirs(os.path.join(root, "a"))
+    _touch(os.path.join(root, "1.tar"))
+    _touch(os.path.join(root, "a", "2.tar"))
+
+    snapshot = DirSnapshot()
+    assert snapshot.refresh(root, recursive=False) == [root]
+    assert snapshot.roots[root].children == {}
+    _touch(os.path.join(root, "a", "3.tar"))
+    assert snapshot.refresh(root, recursive=False) == []
+
+    # 之前只记录了根目录，递归检查时重新列出子目录
+    assert snapshot.refresh(root) == [os.path.join(root, "a")]
+    assert snapshot.refresh(root) == []
@@ -0,0 +1,44 @@
+"""
+测试 TiffIndex 和按需解码的扩展 EXIF 字段
+"""
+
+from datetime import datetime
+from fractions import Fraction
+
+from modules.photograph.exif.tiff import IfdName, Tag, TiffIndex
+from modules.photograph.utils._exif import ExifInfo
+from utils.xphoto import XPhoto
+
+
+def test_tiff_index_records_offsets(jpeg_file):
+    index = TiffIndex.from_file(jpeg_file)
+    assert {IfdName.IFD0, IfdName.EXIF, IfdName.IFD1} <= set(index.ifds)
+    entry = index.entry(IfdName.EXIF, Tag.DATE_TIME_ORIGINAL)
+    assert index.read(entry.offset, entry.size)[:19] == b"2025:05:01 12:34:56"
+    assert index.date_time_original() == datetime(2025, 5, 1, 12, 34, 56)
+    assert index.value(IfdName.EXIF, Tag.EXPOSURE_TIME) == Fraction(1, 250)
+    assert index.value(IfdName.GPS, Tag.MAKE) is None
+
+
+def test_exif_data_lazy_fields(jpeg_file):
+    exif_data = XPhoto(str(jpeg_file)).photo_info.exif_data
+    assert exif_data.date_time_original == datetime(2025, 5, 1, 12, 34, 56)
+    # 只访问拍摄时间时不解码任何扩展字段
+    assert "make" not in exif_data._fields.__dict__
+    assert exif_data.make == "SONY"
+    assert "make" in exif_data._fields.__dict__
+    assert exif_data.model == "ILCE-7M4"
+    assert exif_data.exposure_time == "1/250"
+    assert exif_data.f_number == 2.8
+    assert exif_data.iso_speed == 400
+    assert exif_data.focal_length == 35.0
+    assert exif_data.lens_model == "FE 35mm F1.8"
+    assert exif_data.orientation == 6
+
+
+def test_exif_info_fields(jpeg_file):
+    exif_info = ExifInfo(jpeg_file)
+    assert exif_info.camera_make == "SONY"
+    assert exif_info.camera_model == "ILCE-7M4"
+    assert exif_info.original_datetime == datetime(2025, 5, 1, 12, 34, 56)
+    assert exif_info.exifdata["Image Model"].printable == "ILCE-7M4"
@@ -0,0 +1,90 @@
+"""
+测试跨文件系统的文件移动
+"""
+
+import errno
+import os
+
+import pytest
+
+from modules.photograph._enums.io import MoveMethod
+from modules.photograph.utils import _fileops
+from modules.photograph.utils._fileops import default_file_mode, move_file
+
+
+@pytest.fixture
+def cross_device(monkeypatch):
+    """模拟跨文件系统：`os.rename` 总是返回 EXDEV"""
+
+    def rename(src, dst):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(_fileops.os, "rename", rename)
+
+
+def _source(tmp_path, size=3 * 1024 * 1024 + 17):
+    src = tmp_path / "src" / "DSC00001.ARW"
+    src.parent.mkdir()
+    src.write_bytes(os.urandom(size))
+    os.utime(src, ns=(1_700_000_000_000_000_000, 1_700_000_000_123_456_789))
+    return src
+
+
+def test_move_same_device(tmp_path):
+    src = _source(tmp_path)
+    dst = tmp_path / "DSC00001.ARW"
+    assert move_file(str(src), str(dst)) == MoveMethod.RENAME
+    assert not src.exists() and dst.exists()
+
+
+@pytest.mark.parametrize(
+    "disabled",
+    [
+        [],
+        ["_reflink", "_copy_file_range"],
+        ["_reflink", "_copy_file_range", "_sendfile"],
+    ],
+)
+def test_move_cross_device(tmp_path, monkeypatch, cross_device, disabled):
+    for name in disabled:
+        monkeypatch.setattr(_fileops, name, lambda *args: False)
+    src = _source(tmp_path)
+    data = src.read_bytes()
+    dst = tmp_path / "dst" / "DSC00001.ARW"
+    dst.parent.mkdir()
+
+    method = move_file(str(src), str(dst))
+    assert method != MoveMethod.RENAME
+    if len(disabled) == 3:
+        assert method == MoveMethod.COPY
+    assert not src.exists()
+    assert dst.read_bytes() == data
+    assert os.stat(dst).st_mtime_ns == 1_700_000_000_123_456_789
+    assert os.listdir(dst.parent) == ["DSC00001.ARW"]
+
+
+def test_move_keeps_source_on_failure(tmp_path, monkeypatch, cross_device):
+    src = _source(tmp_path)
+    dst = tmp_path / "dst" / "DSC00001.ARW"
+    dst.parent.mkdir()
+    checksums = iter(["a", "b"])
+    monkeypatch.setattr(_fileops, "file_checksum", lambda path: next(checksums))
+    with pytest.raises(OSError, match="checksum mismatch"):
+        move_file(str(src), str(dst))
+    assert src.exists()
+    assert os.listdir(dst.parent) == []
+
+    dst.write_bytes(b"existing")
+    with pytest.raises(FileExistsError):
+        move_file(str(src), str(dst))
+
+
+def test_default_file_mode(tmp_path):
+    umask = os.umask(0o027)
+    try:
+        assert default_file_mode() == 0o640
+        with open(tmp_path / "normal", "w"):
+            pass
+        assert os.stat(tmp_path / "normal").st_mode & 0o777 == default_file_mode()
+    finally:
+        os.umask(umask)
@@ -0,0 +1,51 @@
+"""
+测试重复文件查找
+"""
+
+import os
+
+from modules.photograph.tasks.find_duplicates import (
+    FindDuplicatesTask,
+    FindDuplicatesTaskConfig,
+)
+from modules.photograph.utils._hash import EDGE_BYTES
+
+
+def test_find_and_hardlink_duplicates(tmp_path):
+    big = os.urandom(3 * EDGE_BYTES)
+    # 文件头和文件尾相同、中间不同的文件需要读取整个文件才能区分
+    same_edges = big[:EDGE_BYTES] + os.urandom(EDGE_BYTES) + big[-EDGE_BYTES:]
+    files = {
+        "a/DSC00001.ARW": big,
+        "b/DSC00001.ARW": big,
+        "b/DSC00002.ARW": same_edges,
+        "a/DSC00003.ARW": b"small",
+        "c/DSC00003.ARW": b"small",
+        "c/DSC00004.ARW": b"other",
+        "c/notes.txt": b"small",
+    }
+    for name, data in files.items():
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_bytes(data)
+
+    config = FindDuplicatesTaskConfig(
+        roots=[str(tmp_path)], hardlink=True, require_confirm=False
+    )
+    task = FindDuplicatesTask(config)
+    assert [group.files for group in task.groups] == [
+        [str(tmp_path / "a/DSC00001.ARW"), str(tmp_path / "b/DSC00001.ARW")],
+        [str(tmp_path / "a/DSC00003.ARW"), str(tmp_path / "c/DSC00003.ARW")],
+    ]
+    assert task.stats.files == 6
+    assert task.stats.edge_candidates == 3
+
+    assert task.execute(dry_run=True) == 0
+    assert task.execute(dry_run=False) == 2
+    assert os.path.samefile(tmp_path / "a/DSC00001.ARW", tmp_path / "b/DSC00001.ARW")
+    assert (tmp_path / "b/DSC00001.ARW").read_bytes() == big
+    assert not os.path.samefile(
+        tmp_path / "a/DSC00001.ARW", tmp_path / "b/DSC00002.ARW"
+    )
+
+    # 已经是硬链接的文件不再报告
+    assert FindDuplicatesTask(config).groups == []
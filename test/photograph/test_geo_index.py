@@ -0,0 +1,66 @@
+"""
+测试 GPS 读取和网格空间索引
+"""
+
+from datetime import datetime
+
+import numpy as np
+import piexif
+from conftest import make_jpeg
+
+from modules.photograph._types.catalog import PhotoCatalog, PhotoCatalogBuilder
+from modules.photograph.exif.tiff import GpsCoordinate
+from modules.photograph.index.geo_index import GeoGridIndex, haversine_km
+
+
+def test_read_gps(tmp_path):
+    gps = {
+        piexif.GPSIFD.GPSLatitudeRef: b"N",
+        piexif.GPSIFD.GPSLatitude: ((22, 1), (30, 1), (0, 1)),
+        piexif.GPSIFD.GPSLongitudeRef: b"W",
+        piexif.GPSIFD.GPSLongitude: ((114, 1), (15, 1), (36, 1)),
+        piexif.GPSIFD.GPSAltitudeRef: 0,
+        piexif.GPSIFD.GPSAltitude: (105, 2),
+    }
+    file_path = tmp_path / "DSC00001.JPG"
+    file_path.write_bytes(make_jpeg(gps=gps))
+    catalog = PhotoCatalog.from_files([str(file_path)])
+    assert catalog[0].exif_data.gps == GpsCoordinate(22.5, -114.26, 52.5)
+
+
+def test_within_and_cluster_match_brute_force():
+    rng = np.random.default_rng(0)
+    centers = np.array([[22.54, 114.06], [22.28, 114.16], [39.90, 116.40]])
+    points = np.concatenate(
+        [c + rng.normal(scale=0.01, size=(200, 2)) for c in centers]
+    )
+    latitude, longitude = points[:, 0].copy(), points[:, 1].copy()
+    latitude[::50] = np.nan
+
+    index = GeoGridIndex(latitude, longitude, cell_km=2.0)
+    for radius in [0.5, 3.0, 40.0]:
+        result = index.within(22.54, 114.06, radius)
+        distances = haversine_km(22.54, 114.06, latitude, longitude)
+        expected = np.flatnonzero(distances <= radius)
+        assert sorted(result) == sorted(expected)
+        assert np.all(np.diff(distances[result]) >= 0)
+
+    labels = index.cluster(eps_km=5.0)
+    assert np.all(labels[::50] == -1)
+    valid = labels >= 0
+    assert len(set(labels[valid])) == 3
+    # 同一个中心附近的点属于同一个地点
+    for c in range(3):
+        group = labels[c * 200 : (c + 1) * 200]
+        assert len(set(group[group >= 0])) == 1
+
+
+def test_catalog_cluster_locations():
+    builder = PhotoCatalogBuilder()
+    coords = [(22.54, 114.06), (22.541, 114.061), None, (39.9, 116.4)]
+    for i, coord in enumerate(coords):
+        gps = None if coord is None else GpsCoordinate(*coord, None)
+        builder.append(f"/a/{i}.JPG", 1, datetime(2025, 5, 1), gps=gps)
+    catalog = builder.build()
+    assert list(catalog.cluster_locations(eps_km=1.0)) == [0, 0, -1, 1]
+    assert list(catalog.geo_index().within(39.9, 116.4, 1.0)) == [3]
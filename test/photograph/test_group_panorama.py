@@ -0,0 +1,62 @@
+"""
+测试全景照片的按时间分组
+"""
+
+from conftest import make_jpeg
+
+from modules.photograph._types.catalog import PhotoCatalog
+from modules.photograph._types.photo import FileTag
+from modules.photograph.tasks.group_panorama import (
+    GroupPanoramaTask,
+    GroupPanoramaTaskConfig,
+)
+
+
+def _write(path, date_time, make="DJI", model="FC3582"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(make_jpeg(date_time=date_time, make=make, model=model))
+    return str(path)
+
+
+def test_cluster_by_time(tmp_path):
+    files = [
+        _write(tmp_path / "a.JPG", "2025:05:01 12:00:02"),
+        _write(tmp_path / "b.JPG", "2025:05:01 12:00:00"),
+        _write(tmp_path / "c.JPG", "2025:05:01 12:00:01", make="Canon"),
+        _write(tmp_path / "d.JPG", "2025:05:01 12:01:00"),
+    ]
+    catalog = PhotoCatalog.from_files(files)
+    assert catalog.cluster_by_time(5).tolist() == [0, 0, 1, 2]
+    assert catalog.cluster_by_time(5, by_camera=False).tolist() == [0, 0, 0, 1]
+
+
+def test_group_panorama(tmp_path):
+    root = tmp_path / "Panorama-Raw" / "incoming"
+    for index, second in enumerate([0, 1, 2, 60, 61, 62]):
+        _write(
+            root / f"DJI_{index:04d}.JPG",
+            f"2025:05:01 12:{second // 60:02d}:{second % 60:02d}",
+        )
+    (root / "DJI_0003.xmp").write_text("xmp data")
+    # 嵌套目录中的另一台相机
+    _write(root / "100CANON" / "IMG_0001.JPG", "2025:05:01 12:00:01", make="Canon")
+
+    config = GroupPanoramaTaskConfig(
+        name="test-pano",
+        file_tag_list=[FileTag(tag="山顶", dir=str(root))],
+        min_shots=2,
+        require_confirm=False,
+    )
+    task = GroupPanoramaTask(config)
+    assert [s.name for s in task.sets] == ["250501-山顶_120000", "250501-山顶_120100"]
+    assert task.skipped == [str(root / "100CANON" / "IMG_0001.JPG")]
+
+    assert task.execute() == 7
+    second_set = tmp_path / "Panorama-Raw" / "250501-山顶_120100"
+    assert sorted(p.name for p in second_set.iterdir()) == [
+        "250501-山顶_120100_00.JPG",
+        "250501-山顶_120100_00.xmp",
+        "250501-山顶_120100_01.JPG",
+        "250501-山顶_120100_02.JPG",
+    ]
+    assert sorted(p.name for p in root.rglob("*") if p.is_file()) == ["IMG_0001.JPG"]
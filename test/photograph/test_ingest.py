@@ -0,0 +1,85 @@
+"""
+测试存储卡导入任务
+"""
+
+import hashlib
+import os
+import struct
+
+from conftest import make_jpeg
+
+from modules.photograph.tasks.ingest import CHECKSUM_FILE, IngestTask, IngestTaskConfig
+from modules.photograph.utils._fileops import default_file_mode
+
+
+def test_ingest_copies_and_renames(tmp_path):
+    card = tmp_path / "DCIM"
+    (card / "100MSDCF").mkdir(parents=True)
+    (card / "101MSDCF").mkdir()
+    first = make_jpeg("2025:05:01 12:34:56")
+    (card / "100MSDCF" / "DSC00001.JPG").write_bytes(first)
+    (card / "100MSDCF" / "DSC00001.xmp").write_text("xmp data")
+    # 不同目录下的同名文件
+    (card / "101MSDCF" / "DSC00001.JPG").write_bytes(make_jpeg("2025:05:02 08:00:00"))
+    (card / "101MSDCF" / "NOTES.TXT").write_text("ignored")
+
+    dest = tmp_path / "250501-TEST"
+    config = IngestTaskConfig(
+        source_dir=str(card),
+        dest_dir=str(dest),
+        tag="TEST",
+        chunk_kb=64,
+        verify=True,
+        require_confirm=False,
+    )
+    task = IngestTask(config)
+    assert len(task.items) == 2
+    task.execute(dry_run=True)
+    assert not dest.exists()
+
+    task.execute(dry_run=False)
+    assert task.errors == []
+    assert sorted(os.listdir(dest)) == [
+        CHECKSUM_FILE,
+        "20250501-TEST-123456_DSC00001.JPG",
+        "20250501-TEST-123456_DSC00001.xmp",
+        "20250502-TEST-080000_DSC00001.JPG",
+    ]
+    assert (dest / "20250501-TEST-123456_DSC00001.JPG").read_bytes() == first
+    mode = os.stat(dest / "20250501-TEST-123456_DSC00001.JPG").st_mode & 0o777
+    assert mode == default_file_mode()
+    checksums = (dest / CHECKSUM_FILE).read_text()
+    assert (
+        f"{hashlib.blake2b(first).hexdigest()}  20250501-TEST-123456_DSC00001.JPG"
+        in checksums
+    )
+
+    # 重复导入时跳过已经存在的文件，只补充之后添加的 XMP
+    (card / "101MSDCF" / "DSC00001.xmp").write_text("added later")
+    (dest / "20250501-TEST-123456_DSC00001.xmp").write_text("edited")
+    task = IngestTask(config)
+    results = task.execute(dry_run=False)
+    assert [result.skipped for result in results] == [True, True]
+    assert len(os.listdir(dest)) == 5
+    assert (dest / "20250502-TEST-080000_DSC00001.xmp").read_text() == "added later"
+    assert (dest / "20250501-TEST-123456_DSC00001.xmp").read_text() == "edited"
+
+
+def test_ingest_fuji_raf(tmp_path):
+    card = tmp_path / "DCIM"
+    card.mkdir()
+    # RAF 文件头：偏移 84 处记录内嵌 JPEG 预览的偏移和长度
+    preview = make_jpeg("2025:05:01 12:34:56", make="FUJIFILM")
+    header = b"FUJIFILMCCD-RAW 0201FF383501".ljust(84, b"\x00")
+    header += struct.pack(">II", 148, len(preview)).ljust(64, b"\x00")
+    raf = header + preview + os.urandom(1000)
+    (card / "DSCF0001.RAF").write_bytes(raf)
+
+    dest = tmp_path / "250501-TEST"
+    config = IngestTaskConfig(
+        source_dir=str(card), dest_dir=str(dest), tag="TEST", require_confirm=False
+    )
+    task = IngestTask(config)
+    task.execute(dry_run=False)
+    assert task.errors == []
+    assert (dest / "20250501-TEST-123456_DSCF0001.RAF").read_bytes() == raf
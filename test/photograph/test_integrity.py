@@ -0,0 +1,108 @@
+"""
+测试完整性清单和增量复查
+"""
+
+import os
+
+from modules.photograph._enums.integrity import ScrubIssueKind
+from modules.photograph._types.integrity import IntegrityManifest
+from modules.photograph.index.integrity import find_albums, scrub_albums
+from modules.photograph.utils._hash import file_checksum, stream_checksum
+
+
+def _corrupt(path):
+    """原地修改一个字节并恢复修改时间，模拟静默损坏"""
+    st = os.stat(path)
+    with open(path, "r+b") as f:
+        f.seek(10)
+        byte = f.read(1)
+        f.seek(10)
+        f.write(bytes([byte[0] ^ 0xFF]))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def test_scrub_albums(tmp_path):
+    album = tmp_path / "250501-旅行"
+    (album / "sub").mkdir(parents=True)
+    for i in range(10):
+        (album / f"DSC{i:05d}.ARW").write_bytes(os.urandom(1000))
+    (album / "sub" / "DSC00100.JPG").write_bytes(os.urandom(1000))
+    (tmp_path / ".hidden").mkdir()
+    albums = find_albums([str(tmp_path)])
+    assert albums == [str(album)]
+
+    report = scrub_albums(albums, fraction=0.3)
+    assert (report.files, report.added, report.verified) == (11, 11, 0)
+    assert report.bytes_read == 11_000
+    manifest = IntegrityManifest.load(IntegrityManifest.path_of(str(album)))
+    assert "sub/DSC00100.JPG" in manifest.files
+
+    # 每次只复查约 30% 的未变化文件，多次运行后全部复查
+    report = scrub_albums(albums, fraction=0.3)
+    assert (report.added, report.updated, report.verified) == (0, 0, 4)
+    assert report.issues == []
+
+    _corrupt(album / "DSC00009.ARW")
+    (album / "DSC00000.ARW").write_bytes(os.urandom(1000))
+    os.remove(album / "DSC00001.ARW")
+    found = set()
+    for _ in range(3):
+        report = scrub_albums(albums, fraction=0.3, budget_bytes=5000)
+        assert report.bytes_read <= 5000
+        found.update((i.kind, os.path.basename(i.path)) for i in report.issues)
+    assert found == {
+        (ScrubIssueKind.MISMATCH, "DSC00009.ARW"),
+        (ScrubIssueKind.MODIFIED, "DSC00000.ARW"),
+        (ScrubIssueKind.MISSING, "DSC00001.ARW"),
+    }
+    # 损坏的文件保留原来的校验和，之后每次都会优先复查
+    report = scrub_albums(albums, fraction=0.01)
+    assert [i.kind for i in report.issues] == [ScrubIssueKind.MISMATCH]
+    assert report.has_errors
+
+
+def test_scrub_budget_limits_new_files(tmp_path):
+    album = tmp_path / "250501-旅行"
+    album.mkdir()
+    for i in range(10):
+        path = album / f"DSC{i:05d}.ARW"
+        path.write_bytes(os.urandom(1000))
+        os.utime(path, (1_746_000_000 + i, 1_746_000_000 + i))
+
+    # 第一次运行也不超过预算，修改时间较早的文件优先
+    report = scrub_albums([str(album)], budget_bytes=4500)
+    assert (report.added, report.deferred, report.bytes_read) == (4, 6, 4000)
+    manifest = IntegrityManifest.load(IntegrityManifest.path_of(str(album)))
+    assert sorted(manifest.files) == [f"DSC{i:05d}.ARW" for i in range(4)]
+
+    for _ in range(2):
+        report = scrub_albums([str(album)], budget_bytes=4500)
+        assert report.bytes_read <= 4500
+    manifest = IntegrityManifest.load(IntegrityManifest.path_of(str(album)))
+    assert len(manifest.files) == 10
+
+
+def test_scrub_read_error(tmp_path, monkeypatch):
+    album = tmp_path / "250501-旅行"
+    album.mkdir()
+    for i in range(2):
+        (album / f"DSC{i:05d}.ARW").write_bytes(os.urandom(1000))
+    assert stream_checksum(str(album / "DSC00000.ARW")) == file_checksum(
+        str(album / "DSC00000.ARW")
+    )
+
+    # 读取错误记录为 ERROR，其余文件继续校验并保存清单
+    def read_error(path):
+        if path.endswith("DSC00001.ARW"):
+            raise OSError(5, "Input/output error")
+        return file_checksum(path)
+
+    monkeypatch.setattr(
+        "modules.photograph.index.integrity.stream_checksum", read_error
+    )
+    report = scrub_albums([str(album)])
+    assert [(i.kind, os.path.basename(i.path)) for i in report.issues] == [
+        (ScrubIssueKind.ERROR, "DSC00001.ARW")
+    ]
+    manifest = IntegrityManifest.load(IntegrityManifest.path_of(str(album)))
+    assert list(manifest.files) == ["DSC00000.ARW"]
@@ -0,0 +1,103 @@
+"""
+测试读取调度顺序
+"""
+
+import os
+import threading
+import time
+
+from modules.photograph._enums.io import PrefetchMode, ReadOrder
+from modules.photograph.utils._concurrency import AdaptiveConcurrency, adaptive_map
+from modules.photograph.utils._io_schedule import schedule_reads
+from modules.photograph.utils._prefetch import HeaderPrefetcher
+
+
+def test_schedule_reads_batches_per_directory(tmp_path):
+    files = []
+    for album in ["a", "b"]:
+        os.makedirs(tmp_path / album)
+        for index in range(3):
+            file_path = str(tmp_path / album / f"DSC0000{index}.ARW")
+            with open(file_path, "wb") as f:
+                f.write(b"RAW DATA")
+            files.append(file_path)
+    # 交错两个目录的文件，模拟无序的输入
+    interleaved = [f for pair in zip(files[:3], files[3:]) for f in pair]
+
+    assert schedule_reads(interleaved, ReadOrder.LISTDIR) == interleaved
+    for order in [ReadOrder.INODE, ReadOrder.PHYSICAL]:
+        scheduled = schedule_reads(interleaved, order)
+        assert sorted(scheduled) == sorted(files)
+        dirs = [os.path.dirname(f) for f in scheduled]
+        assert dirs[:3] == [dirs[0]] * 3 and dirs[3:] == [dirs[3]] * 3
+    inode_order = schedule_reads(interleaved, ReadOrder.INODE)
+    for batch in [inode_order[:3], inode_order[3:]]:
+        inodes = [os.stat(f).st_ino for f in batch]
+        assert inodes == sorted(inodes)
+
+
+def test_header_prefetcher_stats(tmp_path, monkeypatch):
+    files = []
+    for index in range(5):
+        file_path = str(tmp_path / f"DSC0000{index}.ARW")
+        with open(file_path, "wb") as f:
+            f.write(b"R" * 4096)
+        files.append(file_path)
+
+    prefetcher = HeaderPrefetcher(files, window=2, header_kb=1, mode=PrefetchMode.READ)
+    assert list(prefetcher) == files
+    # 第一个文件没有机会提前预读
+    assert prefetcher.stats.issued == 4
+    assert prefetcher.stats.hits + prefetcher.stats.misses == 5
+    assert prefetcher.stats.misses >= 1
+
+    if hasattr(os, "posix_fadvise"):
+        prefetcher = HeaderPrefetcher(
+            files, window=2, header_kb=1, mode=PrefetchMode.FADVISE
+        )
+        assert list(prefetcher) == files
+        assert prefetcher.stats.issued == 4
+        # 刚写入的文件在页缓存中，以 RWF_NOWAIT 读取时全部命中，第一个文件没有预读
+        if hasattr(os, "RWF_NOWAIT"):
+            assert (prefetcher.stats.hits, prefetcher.stats.misses) in [(4, 1), (0, 0)]
+
+            # 文件头不在页缓存中时为未命中
+            def preadv(*args):
+                raise BlockingIOError
+
+            monkeypatch.setattr(os, "preadv", preadv)
+            prefetcher = HeaderPrefetcher(
+                files, window=2, header_kb=1, mode=PrefetchMode.FADVISE
+            )
+            assert list(prefetcher) == files
+            assert (prefetcher.stats.hits, prefetcher.stats.misses) == (0, 5)
+
+    prefetcher = HeaderPrefetcher(files, window=0)
+    assert list(prefetcher) == files
+    assert prefetcher.stats.issued == 0
+    assert prefetcher.stats.hit_rate == 0.0
+
+
+def test_adaptive_map_respects_limits():
+    controller = AdaptiveConcurrency(min_workers=1, max_workers=4, sample_size=2)
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def work(item: int) -> int:
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.001)
+        with lock:
+            in_flight -= 1
+        return item * 2
+
+    results = {
+        item: future.result()
+        for item, future in adaptive_map(work, range(40), controller)
+    }
+    assert results == {item: item * 2 for item in range(40)}
+    assert 1 <= max_in_flight <= 4
+    assert controller.min_workers <= controller.limit <= controller.max_workers
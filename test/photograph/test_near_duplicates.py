@@ -0,0 +1,80 @@
+"""
+测试近似重复照片查找
+"""
+
+import numpy as np
+from conftest import make_jpeg
+from PIL import Image
+
+from modules.photograph._enums.hash import PerceptualHash
+from modules.photograph._types.photo import FileTag
+from modules.photograph.tasks.find_near_duplicates import (
+    FindNearDuplicatesTask,
+    FindNearDuplicatesTaskConfig,
+)
+from modules.photograph.utils._metadata import read_thumbnail
+from modules.photograph.utils._phash import dhash, near_pairs, phash, popcount
+
+
+def _gradient(seed: int, size=(160, 120)) -> Image.Image:
+    rng = np.random.default_rng(seed)
+    low = rng.integers(0, 256, size=(6, 8, 3), dtype=np.uint8)
+    return Image.fromarray(low).resize(size, Image.Resampling.BICUBIC)
+
+
+def test_popcount_and_near_pairs():
+    values = np.array([0, 1, 0xFF, 2**64 - 1], dtype=np.uint64)
+    assert popcount(values).tolist() == [0, 1, 8, 64]
+
+    hashes = np.array([0b0000, 0b0001, 0b0111, 0b0000], dtype=np.uint64)
+    times = np.array(
+        ["2025-05-01T12:00:00", "2025-05-01T12:00:01", "2025-05-01T12:00:02", "NaT"],
+        dtype="datetime64[s]",
+    )
+    pairs = near_pairs(hashes, times, max_distance=2, window_s=1.5)
+    assert sorted(map(tuple, pairs.tolist())) == [(0, 1, 1), (1, 2, 2)]
+    # 时间窗口外的照片不比较
+    assert near_pairs(hashes, times, max_distance=3, window_s=0.5).shape == (0, 3)
+
+
+def test_hash_is_stable_under_resize():
+    image = _gradient(1)
+    for hash_fn in (dhash, phash):
+        a, b = hash_fn(image), hash_fn(image.resize((80, 60)))
+        assert bin(a ^ b).count("1") <= 4
+        assert bin(a ^ hash_fn(_gradient(2))).count("1") > 12
+
+
+def test_find_near_duplicates(tmp_path):
+    image = _gradient(3)
+    reexport = image.point(lambda v: min(255, v + 8))
+    (tmp_path / "DSC00001.JPG").write_bytes(
+        make_jpeg("2025:05:01 12:00:00", image=image)
+    )
+    (tmp_path / "DSC00002.JPG").write_bytes(
+        make_jpeg("2025:05:01 12:00:01", image=reexport)
+    )
+    (tmp_path / "DSC00003.JPG").write_bytes(
+        make_jpeg("2025:05:01 12:00:02", image=_gradient(4))
+    )
+    # RAW+JPEG 的同名文件只比较一个
+    (tmp_path / "DSC00003.ARW").write_bytes(
+        make_jpeg("2025:05:01 12:00:02", image=_gradient(4))
+    )
+    # 内容相同但拍摄时间相差很远
+    (tmp_path / "DSC00004.JPG").write_bytes(
+        make_jpeg("2025:05:03 12:00:00", image=image)
+    )
+    assert read_thumbnail(str(tmp_path / "DSC00001.JPG")).image.size == (16, 12)
+
+    config = FindNearDuplicatesTaskConfig(
+        file_tag_list=[FileTag(tag="TEST", dir=str(tmp_path))],
+        hash_kind=PerceptualHash.PHASH,
+    )
+    task = FindNearDuplicatesTask(config)
+    assert task.scan_errors == []
+    assert len(task.files) == 4
+    assert str(tmp_path / "DSC00003.ARW") in task.files
+    assert task.execute() == [
+        [str(tmp_path / "DSC00001.JPG"), str(tmp_path / "DSC00002.JPG")]
+    ]
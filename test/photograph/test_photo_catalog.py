@@ -0,0 +1,65 @@
+"""
+测试 PhotoCatalog 的功能
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+from modules.photograph._types.catalog import PhotoCatalogBuilder
+
+
+def build_catalog():
+    builder = PhotoCatalogBuilder()
+    builder.append(
+        "/a/DSC00003.ARW", 30, datetime(2025, 5, 2, 8, 0, 0), "SONY", "ILCE-7M4", 3
+    )
+    builder.append(
+        "/a/DSC00001.ARW", 10, datetime(2025, 5, 1, 9, 0, 0), "SONY", "ILCE-7M4", 1
+    )
+    builder.append(
+        "/b/IMG_0001.HEIC", 20, datetime(2025, 5, 1, 8, 0, 0), "Apple", "iPhone", 2
+    )
+    builder.append("/b/照片.JPG", 40, None, "", "", 4)
+    return builder.build()
+
+
+def test_catalog_rows():
+    catalog = build_catalog()
+    assert len(catalog) == 4
+    row = catalog[2]
+    assert row.file_path == "/b/IMG_0001.HEIC"
+    assert row.file_ext == ".HEIC"
+    assert row.photo_info.exif_data.date_time_original == datetime(2025, 5, 1, 8, 0, 0)
+    assert row.exif_data.make == "Apple"
+    assert catalog[-1].file_name == "照片.JPG"
+    assert catalog[-1].exif_data.date_time_original is None
+    assert row.to_photo_info().file_name == "IMG_0001.HEIC"
+
+
+def test_catalog_sort_filter_group():
+    catalog = build_catalog()
+    ordered = catalog.sort()
+    assert [r.file_name for r in ordered] == [
+        "IMG_0001.HEIC",
+        "DSC00001.ARW",
+        "DSC00003.ARW",
+        "照片.JPG",
+    ]
+    assert list(ordered.size) == [20, 10, 30, 40]
+
+    sony = catalog.filter(catalog.make_mask("SONY"))
+    assert [r.file_id for r in sony] == [3, 1]
+    assert len(catalog.filter(catalog.make_mask("Canon"))) == 0
+
+    may_first = catalog.filter(
+        catalog.time_mask(datetime(2025, 5, 1), datetime(2025, 5, 2))
+    )
+    assert sorted(r.file_name for r in may_first) == ["DSC00001.ARW", "IMG_0001.HEIC"]
+
+    groups = catalog.group_by_day()
+    assert [day for day, _ in groups] == [
+        np.datetime64("2025-05-01"),
+        np.datetime64("2025-05-02"),
+    ]
+    assert [r.file_name for r in groups[0][1]] == ["IMG_0001.HEIC", "DSC00001.ARW"]
@@ -0,0 +1,51 @@
+"""
+测试 PhotoIndex 的功能
+"""
+
+import os
+from datetime import datetime
+
+from conftest import make_jpeg
+
+from modules.photograph.index.photo_index import PhotoIndex, album_tag
+
+
+def test_photo_index_update_and_query(tmp_path):
+    root = tmp_path / "Photograph-Raw"
+    album = root / "250501-旅行"
+    os.makedirs(album / "sub")
+    (album / "DSC00001.JPG").write_bytes(make_jpeg("2025:05:01 10:00:00"))
+    (album / "sub" / "IMG_0001.JPG").write_bytes(
+        make_jpeg("2025:05:03 10:00:00", make="Apple", model="iPhone")
+    )
+    (root / "DSC00002.JPG").write_bytes(make_jpeg("2025:06:01 10:00:00"))
+    (root / "notes.txt").write_text("not a photo")
+
+    with PhotoIndex(str(tmp_path / "index.db")) as index:
+        stats = index.update([str(root)])
+        assert (stats.added, stats.updated, stats.removed) == (3, 0, 0)
+
+        records = index.query(
+            make="sony", start=datetime(2025, 5, 1), end=datetime(2025, 6, 1)
+        )
+        assert [r.path for r in records] == [str(album / "DSC00001.JPG")]
+        assert records[0].album == "旅行"
+        assert [r.model for r in index.query(album="旅行")] == ["ILCE-7M4", "iPhone"]
+
+        # 增量更新只读取变化的文件
+        os.remove(root / "DSC00002.JPG")
+        (album / "DSC00001.JPG").write_bytes(make_jpeg("2025:05:02 10:00:00"))
+        stats = index.update([str(root)])
+        assert (stats.added, stats.updated, stats.removed, stats.unchanged) == (
+            0,
+            1,
+            1,
+            1,
+        )
+        assert index.count() == 2
+        assert index.query(make="SONY")[0].capture_time == datetime(2025, 5, 2, 10)
+
+
+def test_album_tag():
+    assert album_tag("250501-旅行") == "旅行"
+    assert album_tag("Panorama") == "Panorama"
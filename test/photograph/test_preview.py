@@ -0,0 +1,116 @@
+"""
+测试内嵌 JPEG 预览图的提取
+"""
+
+import io
+import os
+import struct
+from pathlib import Path
+
+from conftest import make_jpeg
+from PIL import Image
+
+from modules.photograph.exif.tiff import TiffIndex
+from modules.photograph.utils._exif import ExifInfo
+from modules.photograph.utils._preview import copy_range, extract_previews, find_preview
+
+_SHORT, _LONG = 3, 4
+
+
+def _ifd(entries, next_offset=0) -> bytes:
+    data = struct.pack("<H", len(entries))
+    for tag, field_type, value in sorted(entries):
+        fmt = "<HHLHH" if field_type == _SHORT else "<HHLL"
+        data += struct.pack(fmt, tag, field_type, 1, value, *([0] * (fmt == "<HHLHH")))
+    return data + struct.pack("<L", next_offset)
+
+
+def _jpeg(size) -> bytes:
+    output = io.BytesIO()
+    Image.new("RGB", size, (10, 20, 30)).save(output, format="JPEG")
+    return output.getvalue()
+
+
+def make_dng(preview: bytes, thumbnail: bytes, raw: bytes) -> bytes:
+    """生成 DNG 结构的文件：IFD0 为 strip 保存的 JPEG 预览图，IFD1 为缩略图，SubIFD 为原始数据"""
+    ifd0_offset, ifd1_offset, sub_offset = 8, 128, 256
+    data_offset = 512
+    thumb_offset = data_offset
+    preview_offset = thumb_offset + len(thumbnail)
+    raw_offset = preview_offset + len(preview)
+    ifd0 = _ifd(
+        [
+            (0x00FE, _LONG, 1),
+            (0x0103, _SHORT, 7),
+            (0x0106, _SHORT, 6),
+            (0x0111, _LONG, preview_offset),
+            (0x0117, _LONG, len(preview)),
+            (0x014A, _LONG, sub_offset),
+        ],
+        ifd1_offset,
+    )
+    ifd1 = _ifd(
+        [
+            (0x0103, _SHORT, 6),
+            (0x0201, _LONG, thumb_offset),
+            (0x0202, _LONG, len(thumbnail)),
+        ]
+    )
+    sub_ifd = _ifd(
+        [
+            (0x00FE, _LONG, 0),
+            (0x0103, _SHORT, 7),
+            (0x0106, _SHORT, 32803),
+            (0x0111, _LONG, raw_offset),
+            (0x0117, _LONG, len(raw)),
+        ]
+    )
+    data = bytearray(data_offset)
+    data[0:8] = b"II*\x00" + struct.pack("<L", ifd0_offset)
+    data[ifd0_offset : ifd0_offset + len(ifd0)] = ifd0
+    data[ifd1_offset : ifd1_offset + len(ifd1)] = ifd1
+    data[sub_offset : sub_offset + len(sub_ifd)] = sub_ifd
+    return bytes(data) + thumbnail + preview + raw
+
+
+def test_find_and_extract_dng_preview(tmp_path):
+    preview, thumbnail = _jpeg((320, 240)), _jpeg((16, 12))
+    # 无损 JPEG 压缩的原始数据更大，但不是预览图
+    raw = b"\xff\xd8" + os.urandom(len(preview) * 2)
+    dng_file = tmp_path / "DSC00001.DNG"
+    dng_file.write_bytes(make_dng(preview, thumbnail, raw))
+
+    index = TiffIndex.from_file(dng_file)
+    assert [image.ifd for image in index.embedded_jpegs()] == ["IFD1"]
+    assert find_preview(index).length == len(preview)
+
+    results = extract_previews([str(dng_file)], str(tmp_path / "previews"))
+    assert results[0].error == ""
+    output = Path(results[0].preview_file)
+    assert output.read_bytes() == preview
+    assert output.stat().st_mtime_ns == dng_file.stat().st_mtime_ns
+    # 预览图已经是最新的，不再提取
+    assert extract_previews([str(dng_file)], str(tmp_path / "previews"))[0].skipped
+
+    assert ExifInfo(dng_file).extract_preview(tmp_path / "exif.jpg") == len(preview)
+    assert (tmp_path / "exif.jpg").read_bytes() == preview
+
+
+def test_extract_preview_errors(tmp_path):
+    jpeg_file = tmp_path / "DSC00001.JPG"
+    jpeg_file.write_bytes(make_jpeg(thumbnail=False))
+    results = extract_previews([str(jpeg_file)], str(tmp_path / "previews"))
+    assert results[0].preview_file is None
+    assert "no embedded JPEG preview" in results[0].error
+    assert os.listdir(tmp_path / "previews") == []
+
+
+def test_copy_range_without_sendfile(tmp_path, monkeypatch):
+    def sendfile(*args):
+        raise OSError("sendfile to a regular file is not supported")
+
+    monkeypatch.setattr(os, "sendfile", sendfile, raising=False)
+    source = tmp_path / "source.bin"
+    source.write_bytes(bytes(range(256)) * 64)
+    copy_range(str(source), 1000, 5000, str(tmp_path / "slice.bin"))
+    assert (tmp_path / "slice.bin").read_bytes() == source.read_bytes()[1000:6000]
@@ -0,0 +1,55 @@
+"""
+测试聚合、限速的进度报告
+"""
+
+import json
+import time
+
+from modules.photograph.utils._progress import ProgressReporter
+
+
+def test_progress_reporter(tmp_path):
+    lines = []
+    log_file = str(tmp_path / "progress.jsonl")
+    with ProgressReporter(
+        "scan", total=1000, interval=60, log_file=log_file, sink=lines.append
+    ) as progress:
+        for i in range(1000):
+            status = "failed" if i % 100 == 0 else "scanned"
+            progress.update(f"/album-{i % 2}/DSC{i:05d}.ARW", status, size=10, n=i)
+
+    # 间隔内不输出进度，结束时输出汇总和每个目录的计数
+    assert lines[0].startswith("[scan] finished: 1000/1000 files (100.0%)")
+    assert lines[0].endswith("[failed 10, scanned 990]")
+    assert lines[1:] == [
+        "[scan] '/album-0': failed 10, scanned 490",
+        "[scan] '/album-1': scanned 500",
+    ]
+
+    with open(log_file, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 1000
+    assert records[1]["phase"] == "scan"
+    assert records[1]["path"] == "/album-1/DSC00001.ARW"
+    assert (records[1]["status"], records[1]["size"], records[1]["n"]) == (
+        "scanned",
+        10,
+        1,
+    )
+
+
+def test_progress_reporter_refresh(tmp_path):
+    lines = []
+    with ProgressReporter(
+        "rename", total=3, interval=0.01, sink=lines.append
+    ) as progress:
+        progress.update(str(tmp_path / "a.ARW"), "renamed")
+        time.sleep(0.1)
+        progress.update(str(tmp_path / "b.ARW"), "renamed")
+
+    # 未完成时输出 ETA 和当前目录的计数，结束时不写日志文件
+    assert lines[0].startswith("[rename] 1/3 files (33.3%)")
+    assert f"current '{tmp_path}': renamed 1" in lines[0]
+    assert "ETA" in lines[0]
+    assert lines[-1] == f"[rename] '{tmp_path}': renamed 2"
+    assert list(tmp_path.iterdir()) == []
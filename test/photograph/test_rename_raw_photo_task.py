@@ -2,14 +2,17 @@
 测试 RenameRawPhotoTask 的功能
 """
 
+import json
 import os
 import shutil
 import tempfile
 
 import pytest
 
+from modules.photograph._types.fingerprint import FileFingerprint
 from modules.photograph._types.photo import FileTag
 from modules.photograph.tasks.rename_raw_photo import (
+    ProcessTask,
     RenameRawPhotoTask,
     RenameRawPhotoTaskConfig,
 )
@@ -74,3 +77,211 @@ def test_generate_and_execute(monkeypatch, temp_photo_dir):
     files = os.listdir(temp_photo_dir)
     assert any(f.endswith(".ARW") and f != "DSC00001.ARW" for f in files)
     assert any(f.endswith(".xmp") and f != "DSC00001.xmp" for f in files)
+
+
+def test_save_and_apply_plan(monkeypatch, temp_photo_dir):
+    monkeypatch.setattr("exifread.process_file", mock_exifread_process_file)
+
+    file_tag = FileTag(tag="TEST", dir=temp_photo_dir)
+    config = RenameRawPhotoTaskConfig(file_tag_list=[file_tag], require_confirm=False)
+    plan_file = os.path.join(temp_photo_dir, "plan.json.gz")
+    RenameRawPhotoTask(config).save_plan(plan_file)
+
+    # 执行计划时不能再读取 EXIF
+    def fail_process_file(*args, **kwargs):
+        raise AssertionError("EXIF must not be read when applying a plan")
+
+    monkeypatch.setattr("exifread.process_file", fail_process_file)
+    task = RenameRawPhotoTask.from_plan(plan_file, config)
+    assert len(task.process_tasks) == 2
+
+    # 修改 xmp 文件之后，对应的条目已过期，RAW 文件和 xmp 文件作为一组都不执行
+    with open(os.path.join(temp_photo_dir, "DSC00001.xmp"), "a") as f:
+        f.write("edited")
+    task.execute(dry_run=False)
+    files = os.listdir(temp_photo_dir)
+    assert "DSC00001.ARW" in files
+    assert "DSC00001.xmp" in files
+
+
+def test_keep_going_and_rescan(monkeypatch, temp_photo_dir):
+    broken_file = os.path.join(temp_photo_dir, "DSC00002.ARW")
+    with open(broken_file, "wb") as f:
+        f.write(b"BROKEN RAW DATA")
+    read_files = []
+
+    def process_file(f, details=False, strict=True):
+        read_files.append(os.path.basename(f.name))
+        if f.read() == b"BROKEN RAW DATA":
+            return {}  # 缺少 DateTimeOriginal
+        return mock_exifread_process_file(f)
+
+    monkeypatch.setattr("exifread.process_file", process_file)
+
+    file_tag = FileTag(tag="TEST", dir=temp_photo_dir)
+    with pytest.raises(KeyError):
+        RenameRawPhotoTask(RenameRawPhotoTaskConfig(file_tag_list=[file_tag]))
+
+    config = RenameRawPhotoTaskConfig(
+        file_tag_list=[file_tag], require_confirm=False, fail_fast=False
+    )
+    task = RenameRawPhotoTask(config)
+    assert len(task.process_tasks) == 2
+    assert [(e.file, e.error_type) for e in task.scan_errors] == [
+        ("DSC00002.ARW", "KeyError")
+    ]
+    plan_file = os.path.join(temp_photo_dir, "plan.json")
+    task.save_plan(plan_file)
+
+    # 修复文件后重新扫描，只读取失败的文件
+    with open(broken_file, "wb") as f:
+        f.write(b"RAW DATA")
+    read_files.clear()
+    task = RenameRawPhotoTask.rescan_plan(plan_file, config)
+    assert read_files == ["DSC00002.ARW"]
+    assert len(task.process_tasks) == 3
+    assert task.scan_errors == []
+
+    # 无法列出的目录在重新扫描时仍然无法列出，记录错误而不是终止
+    os.remove(plan_file)
+    missing_tag = FileTag(tag="TEST", dir=os.path.join(temp_photo_dir, "missing"))
+    task = RenameRawPhotoTask(
+        RenameRawPhotoTaskConfig(
+            file_tag_list=[file_tag, missing_tag],
+            require_confirm=False,
+            fail_fast=False,
+        )
+    )
+    assert [(e.parent_dir, e.file) for e in task.scan_errors] == [(missing_tag.dir, "")]
+    task.save_plan(plan_file)
+    task = RenameRawPhotoTask.rescan_plan(plan_file, config)
+    assert len(task.process_tasks) == 3
+    assert [(e.parent_dir, e.error_type) for e in task.scan_errors] == [
+        (missing_tag.dir, "FileNotFoundError")
+    ]
+    with pytest.raises(FileNotFoundError):
+        RenameRawPhotoTask.rescan_plan(
+            plan_file, RenameRawPhotoTaskConfig(require_confirm=False)
+        )
+
+
+def test_snapshot_skips_unchanged_album(monkeypatch, temp_photo_dir, tmp_path):
+    read_files = []
+
+    def process_file(f, details=False, strict=True):
+        read_files.append(os.path.basename(f.name))
+        return mock_exifread_process_file(f)
+
+    monkeypatch.setattr("exifread.process_file", process_file)
+
+    file_tag = FileTag(tag="TEST", dir=temp_photo_dir)
+    config = RenameRawPhotoTaskConfig(
+        file_tag_list=[file_tag],
+        require_confirm=False,
+        snapshot_file=str(tmp_path / "snapshot.json"),
+    )
+    # dry_run 不保存快照
+    RenameRawPhotoTask(config).execute(dry_run=True)
+    assert not os.path.exists(config.snapshot_file)
+
+    RenameRawPhotoTask(config).execute(dry_run=False)
+    assert read_files == ["DSC00001.ARW", "DSC00001.ARW"]
+
+    # 相册没有变化，不再列出和读取文件
+    read_files.clear()
+    task = RenameRawPhotoTask(config)
+    assert task.process_tasks == []
+    assert read_files == []
+
+    # 新增文件后重新扫描
+    with open(os.path.join(temp_photo_dir, "DSC00002.ARW"), "wb") as f:
+        f.write(b"RAW DATA")
+    task = RenameRawPhotoTask(config)
+    assert sorted(read_files) == ["20230817-TEST-123456_DSC00001.ARW", "DSC00002.ARW"]
+    assert [t.origin_file for t in task.process_tasks if not t.skip] == ["DSC00002.ARW"]
+
+
+def test_snapshot_retries_stale_album(monkeypatch, temp_photo_dir, tmp_path):
+    monkeypatch.setattr("exifread.process_file", mock_exifread_process_file)
+
+    file_tag = FileTag(tag="TEST", dir=temp_photo_dir)
+    config = RenameRawPhotoTaskConfig(
+        file_tag_list=[file_tag],
+        require_confirm=False,
+        snapshot_file=str(tmp_path / "snapshot.json"),
+    )
+    task = RenameRawPhotoTask(config)
+    # 扫描之后原地修改 xmp 文件，目录的 mtime 不变，整组跳过
+    with open(os.path.join(temp_photo_dir, "DSC00001.xmp"), "a") as f:
+        f.write("edited")
+    task.execute(dry_run=False)
+    assert "DSC00001.ARW" in os.listdir(temp_photo_dir)
+
+    # 跳过的相册没有记录在快照中，下次运行时重新扫描并重命名
+    task = RenameRawPhotoTask(config)
+    assert len(task.process_tasks) == 2
+    task.execute(dry_run=False)
+    assert sorted(os.listdir(temp_photo_dir)) == [
+        "20230817-TEST-123456_DSC00001.ARW",
+        "20230817-TEST-123456_DSC00001.xmp",
+    ]
+
+
+def test_progress_log(monkeypatch, temp_photo_dir, tmp_path):
+    monkeypatch.setattr("exifread.process_file", mock_exifread_process_file)
+
+    file_tag = FileTag(tag="TEST", dir=temp_photo_dir)
+    config = RenameRawPhotoTaskConfig(
+        file_tag_list=[file_tag],
+        require_confirm=False,
+        progress_log=str(tmp_path / "progress.jsonl"),
+    )
+    RenameRawPhotoTask(config).execute(dry_run=False)
+
+    # 逐个文件的扫描结果和重命名只记录在日志文件中
+    with open(config.progress_log, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    scanned = {r["path"]: r["status"] for r in records if r["phase"].startswith("scan")}
+    assert scanned == {
+        os.path.join(temp_photo_dir, "DSC00001.ARW"): "scanned",
+        os.path.join(temp_photo_dir, "DSC00001.xmp"): "ignored",
+    }
+    renamed = [r for r in records if r["phase"].startswith("rename")]
+    assert sorted(os.path.basename(r["update_file"]) for r in renamed) == [
+        "20230817-TEST-123456_DSC00001.ARW",
+        "20230817-TEST-123456_DSC00001.xmp",
+    ]
+
+
+def test_execute_never_replaces_existing_target(tmp_path):
+    # 重新编号形成的链：s_00002 -> s_00001，s_00003 -> s_00002；另一个目标被无关的文件占用
+    for name, data in [
+        ("s_00002.xmp", "two"),
+        ("s_00003.xmp", "three"),
+        ("s_00004.xmp", "four"),
+        ("other.xmp", "other"),
+    ]:
+        (tmp_path / name).write_text(data)
+    process_tasks = [
+        ProcessTask(
+            parent_dir=str(tmp_path),
+            origin_file=origin,
+            update_file=update,
+            fingerprint=FileFingerprint.from_path(tmp_path / origin),
+        )
+        for origin, update in [
+            ("s_00002.xmp", "s_00001.xmp"),
+            ("s_00003.xmp", "s_00002.xmp"),
+            ("s_00004.xmp", "other.xmp"),
+        ]
+    ]
+    (tmp_path / "s_00002.xmp").write_text("two, edited")
+
+    config = RenameRawPhotoTaskConfig(require_confirm=False)
+    RenameRawPhotoTask(config, process_tasks=process_tasks).execute(dry_run=False)
+    assert {f.name: f.read_text() for f in tmp_path.iterdir()} == {
+        "s_00002.xmp": "two, edited",
+        "s_00003.xmp": "three",
+        "s_00004.xmp": "four",
+        "other.xmp": "other",
+    }
@@ -0,0 +1,86 @@
+"""
+测试缩略图缓存
+"""
+
+import os
+
+import pytest
+from conftest import make_jpeg
+from PIL import Image
+
+from modules.photograph.index import thumbnail_cache
+from modules.photograph.index.thumbnail_cache import ThumbnailCache
+
+
+@pytest.fixture
+def photos(tmp_path):
+    files = []
+    for i in range(3):
+        file_path = tmp_path / "album" / f"DSC0000{i}.JPG"
+        file_path.parent.mkdir(exist_ok=True)
+        file_path.write_bytes(make_jpeg(size=(640, 480), color=(i * 80, 100, 50)))
+        files.append(str(file_path))
+    return files
+
+
+def test_generate_and_hit(tmp_path, photos, monkeypatch):
+    with ThumbnailCache(str(tmp_path / "cache"), workers=0) as cache:
+        thumbnails = cache.get_many(photos, max_size=64)
+        assert len(thumbnails) == 3
+        # Orientation=6 时旋转为竖图
+        assert Image.open(thumbnails[photos[0]]).size == (48, 64)
+        # 内嵌的 16x12 缩略图足够大时直接使用
+        assert Image.open(cache.get(photos[0], max_size=16)).size == (12, 16)
+        assert cache.stats.misses == 4
+
+        # 命中时不生成也不打开源文件
+        def fail(*args):
+            raise AssertionError("source photo must not be opened on a cache hit")
+
+        monkeypatch.setattr(thumbnail_cache, "_render", fail)
+        assert cache.get_many(photos, max_size=64) == thumbnails
+        assert cache.stats.hits == 3
+
+        # 源文件修改后缓存失效
+        os.utime(photos[0], ns=(0, 0))
+        assert cache.lookup(photos[0], max_size=64) is None
+        assert cache.get_many([photos[0]], max_size=64) == {}
+        assert cache.stats.failed == 1
+
+
+def test_lru_eviction(tmp_path, photos):
+    with ThumbnailCache(str(tmp_path / "cache"), workers=0) as cache:
+        cache.get_many(photos[:2], max_size=64)
+        one_size = cache.total_bytes() // 2
+        cache.lookup(photos[0], max_size=64)  # photos[1] 成为最久未访问的
+        cache.max_bytes = int(one_size * 2.5)
+        cache.get_many(photos[2:], max_size=64)
+        assert cache.stats.evicted == 1
+        assert cache.lookup(photos[1], max_size=64) is None
+        assert cache.lookup(photos[0], max_size=64) is not None
+        assert cache.total_bytes() <= cache.max_bytes
+
+
+def test_untracked_thumbnail_and_quality(tmp_path, photos):
+    with ThumbnailCache(str(tmp_path / "cache"), workers=0) as cache:
+        thumbnail = cache.get(photos[0], max_size=64)
+        # 模拟生成缩略图之后、写入数据库之前进程退出
+        with cache._conn:
+            cache._conn.execute("DELETE FROM thumbnails")
+        assert cache.total_bytes() == 0
+        assert cache.lookup(photos[0], max_size=64) == thumbnail
+        assert cache.total_bytes() == os.path.getsize(thumbnail)
+        assert cache.evict(target_bytes=0) == 1
+        assert not os.path.exists(thumbnail)
+
+    # 修改 JPEG 质量后重新生成
+    with ThumbnailCache(str(tmp_path / "cache"), workers=0, quality=85) as cache:
+        high = cache.get(photos[1], max_size=64)
+    with ThumbnailCache(str(tmp_path / "cache"), workers=0, quality=20) as cache:
+        assert cache.lookup(photos[1], max_size=64) is None
+        assert cache.get(photos[1], max_size=64) != high
+
+
+def test_process_pool(tmp_path, photos):
+    with ThumbnailCache(str(tmp_path / "cache"), workers=2) as cache:
+        assert len(cache.get_many(photos, max_size=32)) == 3
@@ -0,0 +1,107 @@
+"""
+测试延时摄影的序列划分和重命名
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from conftest import make_jpeg
+
+from modules.photograph._types.photo import FileTag
+from modules.photograph.tasks.rename_timelapse import (
+    RenameTimelapseTask,
+    RenameTimelapseTaskConfig,
+)
+from modules.photograph.utils._timelapse import split_sequences
+
+
+def test_split_dropped_frames_and_interval_change():
+    # 2s 间隔的 10 帧（丢失第 5 帧），紧接着 5s 间隔的 8 帧，再间隔 10 分钟的 3 帧
+    first = np.delete(np.arange(11) * 2000, 4)
+    second = first[-1] + np.arange(1, 9) * 5000
+    third = second[-1] + 600_000 + np.arange(3) * 2000
+    split = split_sequences(np.concatenate([first, second, third]))
+
+    assert split.starts.tolist() == [0, 10, 18]
+    assert split.dropped.tolist() == [1, 0, 0]
+    assert split.interval_ms.tolist() == [2000.0, 5000.0, 2000.0]
+    assert split.position[:10].tolist() == list(range(10))
+    assert split.frame[:10].tolist() == [0, 1, 2, 3, 5, 6, 7, 8, 9, 10]
+
+
+def test_split_second_resolution_and_large_input():
+    # 拍摄时间只精确到秒时，2.5s 的间隔表现为 2s 和 3s 交替
+    times = np.floor(np.arange(20) * 2.5).astype(np.int64) * 1000
+    assert split_sequences(times).starts.size > 1
+    assert split_sequences(times, slack_ms=1000).starts.tolist() == [0]
+
+    times = np.arange(50_000, dtype=np.int64) * 3000
+    times[25_000:] += 3_600_000
+    t0 = time.perf_counter()
+    split = split_sequences(times)
+    assert time.perf_counter() - t0 < 1.0
+    assert split.starts.tolist() == [0, 25_000]
+
+
+def test_rename_timelapse(tmp_path):
+    start = datetime(2025, 5, 1, 23, 59, 50)
+    offsets = [0.0, 2.5, 5.0, 10.0, 12.5, 700.0, 702.5, 705.0]
+    for index, offset in enumerate(offsets):
+        date_time = start + timedelta(seconds=offset)
+        (tmp_path / f"DSC{index:05d}.JPG").write_bytes(
+            make_jpeg(
+                date_time=date_time.strftime("%Y:%m:%d %H:%M:%S"),
+                sub_sec=f"{date_time.microsecond // 10000:02d}",
+            )
+        )
+    (tmp_path / "DSC00003.xmp").write_text("xmp data")
+
+    config = RenameTimelapseTaskConfig(
+        name="test-timelapse",
+        file_tag_list=[FileTag(tag="星空", dir=str(tmp_path))],
+        require_confirm=False,
+    )
+    task = RenameTimelapseTask(config)
+    assert [(s.name, s.frames, s.dropped) for s in task.sequences] == [
+        ("20250501-星空-001", 5, 1),
+        ("20250502-星空-001", 3, 0),
+    ]
+    task.execute(dry_run=False)
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "20250501-星空-001_00001.JPG",
+        "20250501-星空-001_00002.JPG",
+        "20250501-星空-001_00003.JPG",
+        "20250501-星空-001_00004.JPG",
+        "20250501-星空-001_00004.xmp",
+        "20250501-星空-001_00005.JPG",
+        "20250502-星空-001_00001.JPG",
+        "20250502-星空-001_00002.JPG",
+        "20250502-星空-001_00003.JPG",
+    ]
+
+    # 再次扫描时文件名不变
+    task = RenameTimelapseTask(config)
+    assert all(process_task.skip for process_task in task.process_tasks)
+
+    config.keep_gaps = True
+    task = RenameTimelapseTask(config)
+    renamed = {t.origin_file: t.update_file for t in task.process_tasks if not t.skip}
+    assert renamed["20250501-星空-001_00004.JPG"] == "20250501-星空-001_00005.JPG"
+
+    # 保留空位后编号整体后移，先重命名占用目标文件名的文件
+    task.execute(dry_run=False)
+    names = sorted(p.name for p in tmp_path.iterdir())
+    assert names[:6] == [
+        "20250501-星空-001_00001.JPG",
+        "20250501-星空-001_00002.JPG",
+        "20250501-星空-001_00003.JPG",
+        "20250501-星空-001_00005.JPG",
+        "20250501-星空-001_00005.xmp",
+        "20250501-星空-001_00006.JPG",
+    ]
+
+    # 帧号依赖整个相册，计划不能部分重新扫描
+    with pytest.raises(ValueError):
+        RenameTimelapseTask.rescan_plan(str(tmp_path / "plan.json"), config)
@@ -0,0 +1,85 @@
+"""
+测试视频拍摄时间的读取和重命名
+"""
+
+import os
+import struct
+from datetime import datetime, timezone
+
+from modules.photograph._types.photo import FileTag
+from modules.photograph.exif.video import (
+    MP4_EPOCH,
+    read_mvhd_creation_time,
+    read_video_creation_time,
+)
+from modules.photograph.tasks.rename_raw_photo import (
+    RenameRawPhotoTask,
+    RenameRawPhotoTaskConfig,
+)
+
+SONY_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<NonRealTimeMeta xmlns="urn:schemas-professionalDisc:nonRealTimeMeta:ver.2.00">
+  <Duration value="250"/>
+  <CreationDate value="2023-08-17T12:34:56+08:00"/>
+</NonRealTimeMeta>
+"""
+
+
+def _box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">L4s", 8 + len(payload), box_type) + payload
+
+
+def _mvhd(created: datetime, version=0) -> bytes:
+    seconds = int((created - MP4_EPOCH).total_seconds())
+    if version == 1:
+        payload = struct.pack(">B3xQQLQ", 1, seconds, seconds, 1000, 0)
+    else:
+        payload = struct.pack(">B3xLLLL", 0, seconds, seconds, 1000, 0)
+    return _box(b"mvhd", payload)
+
+
+def write_mp4(path, created: datetime, mdat_size=1024, version=0):
+    """写入 moov 位于 mdat 之后的 MP4 文件，mdat 使用 64 位大小并以稀疏文件的方式分配"""
+    with open(path, "wb") as f:
+        f.write(_box(b"ftyp", b"isom\x00\x00\x02\x00"))
+        f.write(struct.pack(">L4sQ", 1, b"mdat", 16 + mdat_size))
+        f.seek(mdat_size, os.SEEK_CUR)
+        f.write(_box(b"moov", _box(b"udta", b"") + _mvhd(created, version)))
+
+
+def _local(utc: datetime) -> datetime:
+    return utc.astimezone().replace(tzinfo=None)
+
+
+def test_read_mvhd_after_large_mdat(tmp_path):
+    created = datetime(2024, 3, 1, 8, 0, 0, tzinfo=timezone.utc)
+    video = tmp_path / "C0001.MP4"
+    # 5GB 的 mdat 只分配了文件头和文件尾
+    write_mp4(video, created, mdat_size=5 * 1024**3, version=1)
+    assert read_mvhd_creation_time(str(video)) == _local(created)
+
+    write_mp4(video, created)
+    assert read_video_creation_time(str(video)) == _local(created)
+    # 索尼的附属文件优先
+    (tmp_path / "C0001M01.XML").write_text(SONY_XML)
+    assert read_video_creation_time(str(video)) == datetime(2023, 8, 17, 12, 34, 56)
+
+
+def test_rename_video_with_sidecar(tmp_path):
+    created = datetime(2024, 3, 1, 8, 0, 0, tzinfo=timezone.utc)
+    write_mp4(tmp_path / "C0001.MP4", created)
+    (tmp_path / "C0001M01.XML").write_text(SONY_XML)
+    write_mp4(tmp_path / "IMG_0001.MOV", created)
+
+    config = RenameRawPhotoTaskConfig(
+        file_tag_list=[FileTag(tag="TEST", dir=str(tmp_path))], require_confirm=False
+    )
+    RenameRawPhotoTask(config).execute(dry_run=False)
+    mov_name = _local(created).strftime("%Y%m%d-TEST-%H%M%S_IMG_0001.MOV")
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [
+            "20230817-TEST-123456_C0001.MP4",
+            "20230817-TEST-123456_C0001M01.XML",
+            mov_name,
+        ]
+    )
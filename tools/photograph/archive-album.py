@@ -0,0 +1,88 @@
+"""
+将相册归档为 `相册名~YYYYMMDD_HHMMSS.tar.gz`，同时生成成员索引 `*.members.json.gz`
+archive-album
+
+- gzip: `archive-album.py "$HOME/Photograph-Raw/250501-XXXX"`
+- xz: `archive-album.py --codec xz --workers 8 250501-XXXX 250502-YYYY`
+- 输出到其他目录: `archive-album.py --output-dir /Volumes/Archive 250501-XXXX`
+"""
+
+import argparse
+import os
+from typing import List, Optional
+
+from loguru import logger
+
+from modules.photograph._enums.archive import ArchiveCodec
+from modules.photograph.tasks.archive_album import (
+    ArchiveAlbumTask,
+    ArchiveAlbumTaskConfig,
+)
+from modules.task.task_manager import TaskManager
+
+TASK_NAME = "archive-album"
+
+
+class DefaultArgs:
+    @staticmethod
+    def get_args():
+        parse = argparse.ArgumentParser(description="将相册打包压缩为归档文件")
+        parse.add_argument("album", type=str, nargs="+", help="相册目录")
+        parse.add_argument(
+            "--codec",
+            type=str,
+            default=ArchiveCodec.GZIP.value,
+            choices=[str(e.value) for e in ArchiveCodec],
+            help="压缩方式",
+        )
+        parse.add_argument("--level", type=int, default=None, help="压缩级别")
+        parse.add_argument(
+            "--chunk-mb", type=int, default=16, help="每个数据块压缩前的大小(MB)"
+        )
+        parse.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 4, help="压缩进程数"
+        )
+        parse.add_argument(
+            "--output-dir", type=str, default=None, help="归档文件的输出目录"
+        )
+        parse.add_argument("-y", "--yes", action="store_true", help="是否确认归档")
+        return parse.parse_args()
+
+    def __init__(self) -> None:
+        args = self.get_args()
+        self.albums: List[str] = [
+            os.path.expanduser(os.path.expandvars(album)) for album in args.album
+        ]
+        self.codec = ArchiveCodec(args.codec)
+        self.level: Optional[int] = args.level
+        self.chunk_mb: int = args.chunk_mb
+        self.workers: int = args.workers
+        self.output_dir: Optional[str] = args.output_dir
+        self.execute_confirm: bool = args.yes
+
+
+def main():
+    args = DefaultArgs()
+    config = ArchiveAlbumTaskConfig(
+        name=TASK_NAME,
+        album_dirs=args.albums,
+        output_dir=args.output_dir,
+        codec=args.codec,
+        level=args.level,
+        chunk_bytes=args.chunk_mb * 1024 * 1024,
+        workers=args.workers,
+        require_confirm=not args.execute_confirm,
+    )
+    manager = TaskManager()
+    task = ArchiveAlbumTask(config)
+    manager.register_task(task)
+    print(task.describe())
+
+    try:
+        manager.execute(TASK_NAME, dry_run=False)
+    except Exception as e:
+        logger.error(f"failed to execute task: {e}")
+
+
+if __name__ == "__main__":
+    main()
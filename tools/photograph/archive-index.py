@@ -0,0 +1,84 @@
+"""
+归档成员索引：增量更新归档文件的成员索引，并在不解压归档的情况下查找文件
+archive-index
+
+- 更新索引: `archive-index.py update`
+- 按文件名查找: `archive-index.py query --name DSC00001.ARW`
+- 按路径模式查找: `archive-index.py query --pattern '250501-*/DSC0001?.*'`
+"""
+
+import argparse
+import time
+
+from loguru import logger
+
+from modules.photograph.index.archive_index import (
+    DEFAULT_ARCHIVE_INDEX_PATH,
+    INDEXED_ARCHIVE_DIRS,
+    ArchiveIndex,
+)
+
+
+class DefaultArgs:
+    @staticmethod
+    def get_args():
+        parse = argparse.ArgumentParser(description="归档成员索引")
+        parse.add_argument(
+            "--db", type=str, default=DEFAULT_ARCHIVE_INDEX_PATH, help="索引数据库路径"
+        )
+        subparsers = parse.add_subparsers(dest="command", required=True)
+
+        update = subparsers.add_parser("update", help="增量更新索引")
+        update.add_argument(
+            "--root",
+            type=str,
+            nargs="+",
+            default=[str(d) for d in INDEXED_ARCHIVE_DIRS],
+            help="归档根目录",
+        )
+        update.add_argument("--workers", type=int, default=4, help="读取并发数上限")
+
+        query = subparsers.add_parser("query", help="查询索引")
+        query.add_argument(
+            "--name", type=str, default=None, help="成员文件名（不区分大小写）"
+        )
+        query.add_argument(
+            "--pattern", type=str, default=None, help="成员路径的 GLOB 模式"
+        )
+        query.add_argument("--archive", type=str, default=None, help="归档文件路径")
+        query.add_argument("--root", type=str, default=None, help="归档根目录")
+        query.add_argument("--limit", type=int, default=None, help="最多返回的数量")
+        return parse.parse_args()
+
+
+def main():
+    args = DefaultArgs.get_args()
+    with ArchiveIndex(args.db) as index:
+        if args.command == "update":
+            stats = index.update(args.root, max_workers=args.workers)
+            archives, members = index.count()
+            logger.info(
+                f"index updated: {stats._asdict()}, "
+                f"total {archives} archives, {members} members"
+            )
+            for path, error in index.failures():
+                logger.warning(f"unreadable archive '{path}': {error}")
+            return
+
+        t0 = time.perf_counter()
+        records = index.query(
+            name=args.name,
+            pattern=args.pattern,
+            archive=args.archive,
+            root=args.root,
+            limit=args.limit,
+        )
+        elapsed = time.perf_counter() - t0
+        for record in records:
+            mtime = record.mtime.strftime("%Y-%m-%d %H:%M:%S") if record.mtime else "-"
+            print(f"{mtime:<19}  {record.size:>12}  {record.archive}  {record.name}")
+        logger.info(f"{len(records)} members found in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
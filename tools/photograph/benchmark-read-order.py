@@ -0,0 +1,138 @@
+"""
+比较不同读取调度顺序下读取照片文件头的耗时
+benchmark-read-order
+
+每一轮读取前都会尝试清空文件的页缓存（冷缓存）：
+- Linux: 对每个文件调用 `posix_fadvise(POSIX_FADV_DONTNEED)`，使用 root 运行时可以加上 `--drop-caches`
+- macOS: 不支持按文件清除缓存，需要在每轮之前手动执行 `sudo purge`（`--pause`）
+"""
+
+import argparse
+import os
+import time
+from typing import List
+
+from loguru import logger
+
+from modules.photograph._enums.io import ReadOrder
+from modules.photograph._enums.photo import PhotographDir
+from modules.photograph.utils._io_schedule import schedule_reads
+
+
+class DefaultArgs:
+    @staticmethod
+    def get_args():
+        parse = argparse.ArgumentParser(description="比较不同读取调度顺序的耗时")
+        parse.add_argument(
+            "--dir",
+            type=str,
+            nargs="+",
+            default=[f"{PhotographDir.ICLOUD_RAW_PHOTO}"],
+            help="需要读取的文件夹（递归）",
+        )
+        parse.add_argument(
+            "--header-kb", type=int, default=64, help="每个文件读取的文件头大小(KB)"
+        )
+        parse.add_argument("--repeat", type=int, default=3, help="每种顺序重复的次数")
+        parse.add_argument(
+            "--order",
+            type=str,
+            nargs="+",
+            default=[str(e.value) for e in ReadOrder],
+            choices=[str(e.value) for e in ReadOrder],
+            help="参与比较的调度顺序",
+        )
+        parse.add_argument(
+            "--drop-caches",
+            action="store_true",
+            help="每轮之前写入 /proc/sys/vm/drop_caches（需要 root）",
+        )
+        parse.add_argument(
+            "--pause", action="store_true", help="每轮之前暂停，手动清除缓存"
+        )
+        return parse.parse_args()
+
+    def __init__(self) -> None:
+        args = self.get_args()
+        self.dirs: List[str] = [os.path.expandvars(d) for d in args.dir]
+        self.header_bytes: int = args.header_kb * 1024
+        self.repeat: int = args.repeat
+        self.orders: List[ReadOrder] = [ReadOrder(o) for o in args.order]
+        self.drop_caches: bool = args.drop_caches
+        self.pause: bool = args.pause
+
+
+def list_files(dirs: List[str]) -> List[str]:
+    """按 `os.listdir` 的顺序列出全部文件"""
+    files: List[str] = []
+    for root in dirs:
+        for parent_dir, dir_names, file_names in os.walk(root):
+            dir_names[:] = [d for d in dir_names if not d.startswith(".")]
+            files.extend(
+                os.path.join(parent_dir, f) for f in file_names if not f.startswith(".")
+            )
+    return files
+
+
+def evict_page_cache(files: List[str], drop_caches: bool) -> None:
+    """尽可能清除文件的页缓存"""
+    if drop_caches:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3")
+        return
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for file in files:
+        try:
+            fd = os.open(file, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def read_headers(files: List[str], header_bytes: int) -> int:
+    total = 0
+    for file in files:
+        with open(file, "rb", buffering=0) as f:
+            total += len(f.read(header_bytes))
+    return total
+
+
+def main():
+    args = DefaultArgs()
+    files = list_files(args.dirs)
+    if len(files) == 0:
+        logger.info("没有需要读取的文件")
+        return
+    if not args.drop_caches and not hasattr(os, "posix_fadvise") and not args.pause:
+        logger.warning("当前平台无法清除页缓存，结果为热缓存下的耗时，可以使用 --pause")
+    logger.info(f"{len(files)} files, header {args.header_bytes // 1024} KB")
+
+    results = []
+    for order in args.orders:
+        t0 = time.perf_counter()
+        scheduled = schedule_reads(files, order)
+        schedule_time = time.perf_counter() - t0
+
+        read_times: List[float] = []
+        for _ in range(args.repeat):
+            evict_page_cache(files, args.drop_caches)
+            if args.pause:
+                input(f"[{order}] 清除缓存后按回车继续...")
+            t0 = time.perf_counter()
+            read_headers(scheduled, args.header_bytes)
+            read_times.append(time.perf_counter() - t0)
+        best = min(read_times)
+        results.append((order, schedule_time, best, len(files) / best))
+
+    print(f"{'order':>10} {'schedule(s)':>12} {'read(s)':>10} {'files/s':>10}")
+    for order, schedule_time, best, throughput in results:
+        print(f"{order:>10} {schedule_time:>12.3f} {best:>10.3f} {throughput:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
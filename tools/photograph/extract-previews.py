@@ -0,0 +1,60 @@
+"""
+提取 RAW 文件内嵌的 JPEG 预览图，用于快速审阅，不转换 RAW
+extract-previews
+
+- 提取: `extract-previews.py --dir "$HOME/Photograph-Raw/250101-相册名" --output previews/250101-相册名`
+"""
+
+import argparse
+import os
+
+from loguru import logger
+
+from modules.photograph._enums.photo import SupportedPhotoRawExt
+from modules.photograph.utils._preview import extract_previews
+
+
+class DefaultArgs:
+    @staticmethod
+    def get_args():
+        parse = argparse.ArgumentParser(description="提取 RAW 文件内嵌的 JPEG 预览图")
+        parse.add_argument("--dir", type=str, required=True, help="相册目录")
+        parse.add_argument("--output", type=str, required=True, help="预览图输出目录")
+        parse.add_argument("--workers", type=int, default=4, help="并发数")
+        parse.add_argument(
+            "--overwrite", action="store_true", help="重新提取已经存在的预览图"
+        )
+        return parse.parse_args()
+
+    def __init__(self) -> None:
+        args = self.get_args()
+        self.dir: str = os.path.expandvars(args.dir)
+        assert os.path.isdir(self.dir), f"文件夹不存在: {self.dir}"
+        self.output: str = os.path.expandvars(args.output)
+        self.workers: int = args.workers
+        self.overwrite: bool = args.overwrite
+
+
+def main():
+    args = DefaultArgs()
+    raw_ext = {e.value for e in SupportedPhotoRawExt}
+    source_files = [
+        os.path.join(args.dir, file)
+        for file in sorted(os.listdir(args.dir))
+        if not file.startswith(".") and os.path.splitext(file)[1].lower() in raw_ext
+    ]
+    results = extract_previews(
+        source_files, args.output, workers=args.workers, overwrite=args.overwrite
+    )
+    extracted = [r for r in results if r.preview_file and not r.skipped]
+    skipped = sum(r.skipped for r in results)
+    failed = sum(r.preview_file is None for r in results)
+    logger.info(
+        f"{len(extracted)} previews extracted "
+        f"({sum(r.size for r in extracted) / 1024**2:.1f} MB), "
+        f"{skipped} up to date, {failed} failed"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+查找重复的照片文件，可以选择将重复的文件替换为硬链接
+find-duplicates
+
+- 查找: `find-duplicates.py --root "$HOME/Photograph-Raw" --report duplicates.json`
+- 替换为硬链接: `find-duplicates.py --hardlink`
+"""
+
+import argparse
+import json
+from typing import List, Optional
+
+from loguru import logger
+
+from modules.photograph.index.photo_index import INDEXED_PHOTO_DIRS
+from modules.photograph.tasks.find_duplicates import (
+    FindDuplicatesTask,
+    FindDuplicatesTaskConfig,
+)
+from modules.task.task_manager import TaskManager
+
+TASK_NAME = "find-duplicates"
+
+
+class DefaultArgs:
+    @staticmethod
+    def get_args():
+        parse = argparse.ArgumentParser(description="查找重复的照片文件")
+        parse.add_argument(
+            "--root",
+            type=str,
+            nargs="+",
+            default=[str(d) for d in INDEXED_PHOTO_DIRS],
+            help="查找的根目录",
+        )
+        parse.add_argument(
+            "--all-files", action="store_true", help="查找全部文件，而不只是照片"
+        )
+        parse.add_argument("--workers", type=int, default=4, help="计算校验和的并发数")
+        parse.add_argument(
+            "--report", type=str, default=None, help="将重复文件分组保存为 JSON 文件"
+        )
+        parse.add_argument(
+            "--hardlink", action="store_true", help="将重复的文件替换为硬链接"
+        )
+        parse.add_argument("-y", "--yes", action="store_true", help="是否确认替换")
+        return parse.parse_args()
+
+    def __init__(self) -> None:
+        args = self.get_args()
+        self.roots: List[str] = args.root
+        self.all_files: bool = args.all_files
+        self.workers: int = args.workers
+        self.report: Optional[str] = args.report
+        self.hardlink: bool = args.hardlink
+        self.execute_confirm: bool = args.yes
+
+
+def main():
+    args = DefaultArgs()
+    config = FindDuplicatesTaskConfig(
+        name=TASK_NAME,
+        roots=args.roots,
+        workers=args.workers,
+        hardlink=args.hardlink,
+        require_confirm=not args.execute_confirm,
+    )
+    if args.all_files:
+        config.extensions = []
+    task = FindDuplicatesTask(config)
+    manager = TaskManager()
+    manager.register_task(task)
+    print(task.describe())
+    logger.info(f"scan stats: {task.stats.model_dump()}")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(
+                [group.model_dump() for group in task.groups],
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        logger.info(f"duplicate report saved to '{args.report}'")
+    manager.execute(TASK_NAME, dry_run=not args.hardlink)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+查找近似重复的照片（连拍、重新导出），只读取照片内嵌的缩略图
+find-near-duplicates
+
+- 查找: `find-near-duplicates.py --dir "$HOME/Photograph-Raw/250101-相册名" --hash phash`
+"""
+
+import argparse
+import os
+from typing import List
+
+from modules.photograph._enums.hash import PerceptualHash
+from modules.photograph._types.photo import FileTag
+from modules.photograph.index.photo_index import album_tag
+from modules.photograph.tasks.find_near_duplicates import (
+    FindNearDuplicatesTask,
+    FindNearDuplicatesTaskConfig,
+)
+from modules.task.task_manager import TaskManager
+
+TASK_NAME = "find-near-duplicates"
+
+
+class DefaultArgs:
+    @staticmethod
+    def get_args():
+        parse = argparse.ArgumentParser(description="查找近似重复的照片")
+        parse.add_argument(
+            "--dir", type=str, nargs="+", required=True, help="相册目录 `YYMMDD-相册名`"
+        )
+        parse.add_argument(
+            "--hash",
+            type=str,
+            default=PerceptualHash.DHASH.value,
+            choices=[str(e.value) for e in PerceptualHash],
+            help="感知哈希算法",
+        )
+        parse.add_argument("--max-distance", type=int, default=6, help="最大汉明距离")
+        parse.add_argument(
+            "--window",
+            type=float,
+            default=10.0,
+            help="只比较拍摄时间相差不超过该值(s)的照片",
+        )
+        return parse.parse_args()
+
+    def __init__(self) -> None:
+        args = self.get_args()
+        self.file_tag_list: List[FileTag] = [
+            FileTag(tag=album_tag(os.path.basename(os.path.normpath(d))), dir=d)
+            for d in args.dir
+        ]
+        self.hash_kind = PerceptualHash(args.hash)
+        self.max_distance: int = args.max_distance
+        self.window: float = args.window
+
+
+def main():
+    args = DefaultArgs()
+    config = FindNearDuplicatesTaskConfig(
+        name=TASK_NAME,
+        file_tag_list=args.file_tag_list,
+        hash_kind=args.hash_kind,
+        max_distance=args.max_distance,
+        time_window_s=args.window,
+    )
+    task = FindNearDuplicatesTask(config)
+    manager = TaskManager()
+    manager.register_task(task)
+    print(task.describe())
+    manager.execute(TASK_NAME, dry_run=True)
+
+
+if __name__ == "__main__":
+    main()
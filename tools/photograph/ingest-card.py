@@ -0,0 +1,87 @@
+"""
+从存储卡导入照片：每个文件只读取一次，复制的同时计算校验和并解析 EXIF，直接写入最终文件名
+ingest-card
+
+- 导入: `ingest-card.py --src /Volumes/Untitled/DCIM --dest .cache/Photograph-local/250101-相册名`
+- 校验: `--verify` 写入后重新读取目标文件比较校验和，导入目录下的 `.checksums.b2sum` 可以使用 `b2sum -c` 校验
+"""
+
+import argparse
+import os
+
+from loguru import logger
+
+from modules.photograph.index.photo_index import album_tag
+from modules.photograph.tasks.ingest import IngestTask, IngestTaskConfig
+from modules.task.task_manager import TaskManager
+
+TASK_NAME = "ingest-card"
+
+
+class DefaultArgs:
+    @staticmethod
+    def get_args():
+        parse = argparse.ArgumentParser(description="从存储卡导入照片")
+        parse.add_argument("--src", type=str, required=True, help="存储卡目录")
+        parse.add_argument(
+            "--dest", type=str, required=True, help="导入的相册目录 `YYMMDD-相册名`"
+        )
+        parse.add_argument(
+            "--tag", type=str, default=None, help="相册名，默认从相册目录名获取"
+        )
+        parse.add_argument("--workers", type=int, default=4, help="并发复制的文件数量")
+        parse.add_argument(
+            "--chunk-kb", type=int, default=1024, help="每次读取的数据块大小(KB)"
+        )
+        parse.add_argument(
+            "--verify", action="store_true", help="写入后重新读取目标文件校验"
+        )
+        parse.add_argument("-y", "--yes", action="store_true", help="是否确认导入")
+        return parse.parse_args()
+
+    def __init__(self) -> None:
+        args = self.get_args()
+        self.src: str = os.path.expandvars(args.src)
+        assert os.path.isdir(self.src), f"文件夹不存在: {self.src}"
+        self.dest: str = os.path.expandvars(args.dest)
+        self.tag: str = args.tag or album_tag(
+            os.path.basename(os.path.normpath(self.dest))
+        )
+        self.workers: int = args.workers
+        self.chunk_kb: int = args.chunk_kb
+        self.verify: bool = args.verify
+        self.execute_confirm: bool = args.yes
+
+
+def main():
+    args = DefaultArgs()
+    config = IngestTaskConfig(
+        name=TASK_NAME,
+        source_dir=args.src,
+        dest_dir=args.dest,
+        tag=args.tag,
+        workers=args.workers,
+        chunk_kb=args.chunk_kb,
+        verify=args.verify,
+        require_confirm=not args.execute_confirm,
+    )
+    task = IngestTask(config)
+    manager = TaskManager()
+    manager.register_task(task)
+    print(task.describe())
+
+    manager.execute(TASK_NAME, dry_run=True)
+    manager.execute(TASK_NAME, dry_run=False)
+    for error in task.errors:
+        logger.warning(
+            f"{error.parent_dir}/{error.file}: [{error.error_type}] {error.message}"
+        )
+    skipped = sum(result.skipped for result in task.results)
+    logger.info(
+        f"{len(task.results) - skipped} files ingested, {skipped} already exist, "
+        f"{len(task.errors)} failed"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+照片索引：增量更新照片根目录的索引，并在不访问照片文件的情况下查询
+photo-index
+
+- 更新索引: `photo-index.py update`
+- 查询索引: `photo-index.py query --make SONY --start 2025-05-01 --end 2025-06-01`
+"""
+
+import argparse
+import time
+from datetime import datetime
+
+from loguru import logger
+
+from modules.photograph.index.photo_index import (
+    DEFAULT_INDEX_PATH,
+    INDEXED_PHOTO_DIRS,
+    PhotoIndex,
+)
+
+
+class DefaultArgs:
+    @staticmethod
+    def get_args():
+        parse = argparse.ArgumentParser(description="照片索引")
+        parse.add_argument(
+            "--db", type=str, default=DEFAULT_INDEX_PATH, help="索引数据库路径"
+        )
+        subparsers = parse.add_subparsers(dest="command", required=True)
+
+        update = subparsers.add_parser("update", help="增量更新索引")
+        update.add_argument(
+            "--root",
+            type=str,
+            nargs="+",
+            default=[str(d) for d in INDEXED_PHOTO_DIRS],
+            help="照片根目录",
+        )
+        update.add_argument("--workers", type=int, default=8, help="读取并发数上限")
+
+        query = subparsers.add_parser("query", help="查询索引")
+        query.add_argument("--make", type=str, default=None, help="相机品牌")
+        query.add_argument("--model", type=str, default=None, help="相机型号")
+        query.add_argument(
+            "--start", type=datetime.fromisoformat, default=None, help="开始时间"
+        )
+        query.add_argument(
+            "--end",
+            type=datetime.fromisoformat,
+            default=None,
+            help="结束时间（不包含）",
+        )
+        query.add_argument("--album", type=str, default=None, help="相册标签")
+        query.add_argument("--root", type=str, default=None, help="照片根目录")
+        query.add_argument("--limit", type=int, default=None, help="最多返回的数量")
+        return parse.parse_args()
+
+
+def main():
+    args = DefaultArgs.get_args()
+    with PhotoIndex(args.db) as index:
+        if args.command == "update":
+            stats = index.update(args.root, max_workers=args.workers)
+            logger.info(f"index updated: {stats._asdict()}, total {index.count()}")
+            return
+
+        t0 = time.perf_counter()
+        records = index.query(
+            make=args.make,
+            model=args.model,
+            start=args.start,
+            end=args.end,
+            album=args.album,
+            root=args.root,
+            limit=args.limit,
+        )
+        elapsed = time.perf_counter() - t0
+        for record in records:
+            print(
+                f"{record.capture_time or '-':<19}  {record.make} {record.model}  "
+                f"[{record.album}]  {record.path}"
+            )
+        logger.info(f"{len(records)} photos found in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
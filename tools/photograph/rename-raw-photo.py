@@ -1,9 +1,22 @@
 """
 基于通用任务框架的 RAW 照片重命名任务
+
+- 直接执行: 扫描 `FILE_TAG_LIST`，确认后重命名
+- 保存计划: `--save-plan plan.json.gz` 只扫描并保存计划，审阅后再执行
+- 执行计划: `--apply-plan plan.json.gz` 不重新读取 EXIF，只检查文件指纹后重命名
+- 重新扫描: `--rescan-plan plan.json.gz` 只重新读取扫描失败和已变化的文件，结合 `--save-plan` 更新计划
+- 容错扫描: `--keep-going` 收集出错的文件，其余文件继续处理
+- 增量扫描: `--snapshot snapshot.json` 跳过上次成功执行之后没有变化的相册
+- 逐个文件的日志: `--progress-log rename.jsonl` 终端只输出聚合的进度，每个文件的结果写入 JSONL 文件
 """
 
-from venv import logger
+import argparse
+import os
+from typing import Optional
+
+from loguru import logger
 
+from modules.photograph._enums.io import ReadOrder
 from modules.photograph._enums.photo import PhotographDir as PD
 from modules.photograph._types.photo import FileTag
 from modules.photograph.tasks.rename_raw_photo import (
@@ -19,13 +32,112 @@ FILE_TAG_LIST = [
 ]
 
 
+class DefaultArgs:
+    @staticmethod
+    def get_args():
+        parse = argparse.ArgumentParser(description="读取相机exif重命名文件")
+        parse.add_argument(
+            "--save-plan", type=str, default=None, help="只扫描并保存重命名计划"
+        )
+        group = parse.add_mutually_exclusive_group()
+        group.add_argument(
+            "--apply-plan", type=str, default=None, help="执行已保存的重命名计划"
+        )
+        group.add_argument(
+            "--rescan-plan",
+            type=str,
+            default=None,
+            help="只重新扫描计划中失败或已变化的文件",
+        )
+        parse.add_argument(
+            "--keep-going",
+            action="store_true",
+            help="扫描出错时继续处理其余文件，只执行有效的部分",
+        )
+        parse.add_argument(
+            "--read-order",
+            type=str,
+            default=ReadOrder.LISTDIR.value,
+            choices=[str(e.value) for e in ReadOrder],
+            help="读取 EXIF 时的文件调度顺序",
+        )
+        parse.add_argument(
+            "--prefetch-window",
+            type=int,
+            default=0,
+            help="提前预读文件头的文件数量，0 表示不预读",
+        )
+        parse.add_argument(
+            "--scan-workers",
+            type=int,
+            default=1,
+            help="扫描并发数上限，大于 1 时自适应调整并发数",
+        )
+        parse.add_argument(
+            "--snapshot",
+            type=str,
+            default=None,
+            help="目录快照文件，跳过上次执行之后没有变化的相册",
+        )
+        parse.add_argument(
+            "--progress-log",
+            type=str,
+            default=None,
+            help="逐个文件的 JSONL 日志文件，终端只输出聚合的进度",
+        )
+        parse.add_argument("-y", "--yes", action="store_true", help="是否确认重命名")
+        return parse.parse_args()
+
+    def __init__(self) -> None:
+        args = self.get_args()
+        self.save_plan: str = args.save_plan
+        self.apply_plan: str = args.apply_plan
+        self.rescan_plan: str = args.rescan_plan
+        self.keep_going: bool = args.keep_going
+        self.read_order = ReadOrder(args.read_order)
+        self.prefetch_window: int = args.prefetch_window
+        self.scan_workers: int = args.scan_workers
+        self.snapshot: Optional[str] = (
+            os.path.expanduser(args.snapshot) if args.snapshot else None
+        )
+        self.progress_log: Optional[str] = (
+            os.path.expanduser(args.progress_log) if args.progress_log else None
+        )
+        self.execute_confirm: bool = args.yes
+
+
 def main():
-    config = RenameRawPhotoTaskConfig(name=TASK_NAME, file_tag_list=FILE_TAG_LIST)
+    args = DefaultArgs()
+    config = RenameRawPhotoTaskConfig(
+        name=TASK_NAME,
+        file_tag_list=FILE_TAG_LIST,
+        require_confirm=not args.execute_confirm,
+        fail_fast=not args.keep_going,
+        read_order=args.read_order,
+        prefetch_window=args.prefetch_window,
+        scan_workers_max=args.scan_workers,
+        snapshot_file=args.snapshot,
+        progress_log=args.progress_log,
+    )
     manager = TaskManager()
-    task = RenameRawPhotoTask(config)
+    if args.apply_plan:
+        task = RenameRawPhotoTask.from_plan(args.apply_plan, config)
+    elif args.rescan_plan:
+        task = RenameRawPhotoTask.rescan_plan(args.rescan_plan, config)
+    else:
+        task = RenameRawPhotoTask(config)
     manager.register_task(task)
     print(task.describe())
-    # 执行（模拟）
+    for error in task.scan_errors:
+        logger.warning(
+            f"{error.parent_dir}/{error.file}: [{error.error_type}] {error.message}"
+        )
+
+    if args.save_plan:
+        manager.execute(TASK_NAME, dry_run=True)
+        task.save_plan(args.save_plan)
+        return
+
     try:
         manager.execute(TASK_NAME, dry_run=False)
     except Exception as e:
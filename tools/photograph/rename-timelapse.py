@@ -0,0 +1,124 @@
+"""
+延时摄影照片重命名：按拍摄时间划分序列，重命名为 `YYYYMMDD-相册名-序列号_帧号`
+
+- 直接执行: 扫描 `FILE_TAG_LIST`，确认后重命名
+- 保存计划: `--save-plan plan.json.gz` 只扫描并保存计划，审阅后再执行
+- 执行计划: `--apply-plan plan.json.gz` 不重新读取 EXIF，只检查文件指纹后重命名
+- 保留空位: `--keep-gaps` 帧号按拍摄时间推算，丢帧处留空
+- 增量扫描: `--snapshot snapshot.json` 跳过上次成功执行之后没有变化的相册
+"""
+
+import argparse
+import os
+from typing import Optional
+
+from loguru import logger
+
+from modules.photograph._enums.photo import PhotographDir as PD
+from modules.photograph.tasks.rename_timelapse import (
+    RenameTimelapseTask,
+    RenameTimelapseTaskConfig,
+)
+from modules.task.task_manager import TaskManager
+
+TASK_NAME = "rename-timelapse"
+BD = PD.ICLOUD_RAW_TIMELAPSE_PHOTO
+FILE_TAG_LIST = [
+    # FileTag(tag="XXXX", dir=f"{BD}/200101-XXXX"),
+]
+
+
+class DefaultArgs:
+    @staticmethod
+    def get_args():
+        parse = argparse.ArgumentParser(description="按序列和帧号重命名延时摄影照片")
+        parse.add_argument(
+            "--save-plan", type=str, default=None, help="只扫描并保存重命名计划"
+        )
+        parse.add_argument(
+            "--apply-plan", type=str, default=None, help="执行已保存的重命名计划"
+        )
+        parse.add_argument(
+            "--keep-going",
+            action="store_true",
+            help="扫描出错时继续处理其余文件，只执行有效的部分",
+        )
+        parse.add_argument(
+            "--keep-gaps", action="store_true", help="帧号保留丢帧的空位"
+        )
+        parse.add_argument(
+            "--tolerance", type=float, default=0.2, help="拍摄间隔允许的相对误差"
+        )
+        parse.add_argument(
+            "--max-dropped", type=int, default=5, help="连续丢帧数量上限"
+        )
+        parse.add_argument(
+            "--scan-workers", type=int, default=8, help="读取拍摄时间的并发数上限"
+        )
+        parse.add_argument(
+            "--snapshot",
+            type=str,
+            default=None,
+            help="目录快照文件，跳过上次执行之后没有变化的相册",
+        )
+        parse.add_argument("-y", "--yes", action="store_true", help="是否确认重命名")
+        return parse.parse_args()
+
+    def __init__(self) -> None:
+        args = self.get_args()
+        self.save_plan: str = args.save_plan
+        self.apply_plan: str = args.apply_plan
+        self.keep_going: bool = args.keep_going
+        self.keep_gaps: bool = args.keep_gaps
+        self.tolerance: float = args.tolerance
+        self.max_dropped: int = args.max_dropped
+        self.scan_workers: int = args.scan_workers
+        self.snapshot: Optional[str] = (
+            os.path.expanduser(args.snapshot) if args.snapshot else None
+        )
+        self.execute_confirm: bool = args.yes
+
+
+def main():
+    args = DefaultArgs()
+    config = RenameTimelapseTaskConfig(
+        name=TASK_NAME,
+        file_tag_list=FILE_TAG_LIST,
+        require_confirm=not args.execute_confirm,
+        fail_fast=not args.keep_going,
+        keep_gaps=args.keep_gaps,
+        tolerance=args.tolerance,
+        max_dropped=args.max_dropped,
+        scan_workers_max=args.scan_workers,
+        snapshot_file=args.snapshot,
+    )
+    manager = TaskManager()
+    if args.apply_plan:
+        task = RenameTimelapseTask.from_plan(args.apply_plan, config)
+    else:
+        task = RenameTimelapseTask(config)
+    manager.register_task(task)
+    print(task.describe())
+    for sequence in task.sequences:
+        logger.info(
+            f"{sequence.name}: {sequence.frames} frames from {sequence.start}, "
+            f"interval {sequence.interval_ms / 1000:.2f}s, {sequence.dropped} dropped"
+        )
+    for error in task.scan_errors:
+        logger.warning(
+            f"{error.parent_dir}/{error.file}: [{error.error_type}] {error.message}"
+        )
+
+    if args.save_plan:
+        manager.execute(TASK_NAME, dry_run=True)
+        task.save_plan(args.save_plan)
+        return
+
+    try:
+        manager.execute(TASK_NAME, dry_run=False)
+    except Exception as e:
+        logger.error(f"failed to execute task: {e}")
+
+
+if __name__ == "__main__":
+    main()
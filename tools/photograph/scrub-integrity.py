@@ -0,0 +1,101 @@
+"""
+照片完整性校验：为每个相册维护校验和清单，增量复查，发现静默损坏
+scrub-integrity
+
+- 校验默认的原始素材根目录: `scrub-integrity.py`
+- 指定相册，全部复查: `scrub-integrity.py --album "$HOME/Photograph-Raw/250501-XXXX" --fraction 1`
+- 每次最多读取 50GB，输出 JSON 报告: `scrub-integrity.py --budget-gb 50 --report scrub.json`
+
+发现可能的损坏或者读取失败时以状态码 1 退出
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+from loguru import logger
+
+from modules.photograph.index.integrity import (
+    DEFAULT_SCRUB_FRACTION,
+    INTEGRITY_PHOTO_DIRS,
+    find_albums,
+    scrub_albums,
+)
+
+
+class DefaultArgs:
+    @staticmethod
+    def get_args():
+        parse = argparse.ArgumentParser(description="照片完整性校验")
+        parse.add_argument(
+            "--root",
+            type=str,
+            nargs="+",
+            default=[str(d) for d in INTEGRITY_PHOTO_DIRS],
+            help="原始素材根目录，根目录下的每个子目录为一个相册",
+        )
+        parse.add_argument(
+            "--album", type=str, nargs="+", default=None, help="只校验这些相册目录"
+        )
+        parse.add_argument(
+            "--fraction",
+            type=float,
+            default=DEFAULT_SCRUB_FRACTION,
+            help="每次复查的数据量占未变化文件总大小的比例",
+        )
+        parse.add_argument(
+            "--budget-gb",
+            type=float,
+            default=None,
+            help="每次运行读取的数据量上限(GB)，包括新文件，超出的文件留到之后的运行",
+        )
+        parse.add_argument(
+            "--workers", type=int, default=4, help="计算校验和的并发数上限"
+        )
+        parse.add_argument(
+            "--report",
+            type=str,
+            default=None,
+            help="JSON 报告的输出路径，默认输出到标准输出",
+        )
+        return parse.parse_args()
+
+    def __init__(self) -> None:
+        args = self.get_args()
+        self.roots: List[str] = args.root
+        self.albums: Optional[List[str]] = args.album
+        self.fraction: float = args.fraction
+        self.budget_bytes: Optional[int] = (
+            int(args.budget_gb * 1024**3) if args.budget_gb is not None else None
+        )
+        self.workers: int = args.workers
+        self.report: Optional[str] = args.report
+
+
+def main():
+    args = DefaultArgs()
+    albums = args.albums if args.albums else find_albums(args.roots)
+    report = scrub_albums(
+        albums,
+        fraction=args.fraction,
+        budget_bytes=args.budget_bytes,
+        max_workers=args.workers,
+    )
+    content = report.model_dump_json(indent=2)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.write(content)
+    else:
+        print(content)
+    logger.info(
+        f"{report.files} files in {report.albums} albums: {report.added} added, "
+        f"{report.updated} updated, {report.verified} verified, "
+        f"{report.deferred} deferred, "
+        f"{report.bytes_read / 1024**3:.2f} GB read, {len(report.issues)} issues"
+    )
+    if report.has_errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,18 @@
 import os
 import stat
-from datetime import datetime
+from typing import Dict, List
 
 import exifread
 import piexif
 import pillow_heif
 
-from pkg._enums.format import EXIF_SUPPORTED_FILE_EXT, HEIF_SUPPORTED_FILE_EXT
-from pkg._types.photo import ExifData, PhotoInfo
+from modules.photograph._enums.format import (
+    EXIF_SUPPORTED_FILE_EXT,
+    HEIF_SUPPORTED_FILE_EXT,
+)
+from modules.photograph._types.photo import ExifData, PhotoInfo
+from modules.photograph.exif.tiff import TiffIndex
+from modules.photograph.utils._concurrency import AdaptiveConcurrency, adaptive_map
 
 
 class XExif:
@@ -48,6 +53,28 @@ class XPhoto:
     def __init__(self, file_path: str):
         self.photo_info = XPhoto.get_photo_info(file_path)
 
+    @staticmethod
+    def batch(
+        file_paths: List[str], min_workers: int = 1, max_workers: int = 8
+    ) -> List["XPhoto"]:
+        """批量读取图片信息，并发数根据读取延迟和吞吐量在上下限之间自适应调整
+
+        Args:
+            file_paths (List[str]): 图片文件路径列表
+            min_workers (int): 并发数下限
+            max_workers (int): 并发数上限
+
+        Returns:
+            List[XPhoto]: 与 `file_paths` 顺序一致的图片列表
+        """
+        controller = AdaptiveConcurrency(
+            min_workers=min_workers, max_workers=max_workers, name="xphoto"
+        )
+        xphotos: Dict[str, XPhoto] = {}
+        for file_path, future in adaptive_map(XPhoto, file_paths, controller):
+            xphotos[file_path] = future.result()
+        return [xphotos[file_path] for file_path in file_paths]
+
     @staticmethod
     def get_photo_info(file_path: str) -> PhotoInfo:
         """获取图片信息
@@ -71,33 +98,23 @@ class XPhoto:
         )
 
     @staticmethod
-    def get_exif_data(file_path: str) -> dict:
+    def get_exif_data(file_path: str) -> ExifData:
         """获取图片文件的 EXIF 数据
         Args:
             file_path (str): 图片文件路径
         Returns:
-            dict: EXIF 数据
+            ExifData: EXIF 数据
         """
         file_base, file_ext = os.path.splitext(file_path)
 
+        # 只解码拍摄时间，其余字段记录 IFD 偏移后在访问时解码
         if file_ext.lower() in EXIF_SUPPORTED_FILE_EXT:
-            with open(file_path, "rb") as f:
-                exif_data = exifread.process_file(f, details=False, strict=True)
-                exif_date_time_original = exif_data["EXIF DateTimeOriginal"].printable
-                # print(exif_data.keys())
-                date_time_original = datetime.strptime(
-                    exif_date_time_original, "%Y:%m:%d %H:%M:%S"
-                )
+            index = TiffIndex.from_file(file_path)
         elif file_ext.lower() in HEIF_SUPPORTED_FILE_EXT:
             # reference from: https://github.com/bigcat88/pillow_heif/blob/master/examples/heif_dump_info.py
             heif_file = pillow_heif.open_heif(file_path)
-            exif_dict = piexif.load(heif_file.info["exif"], key_is_name=True)
-            exif_data = exif_dict["Exif"]
-            date_time_original = exif_data["DateTimeOriginal"]
-            date_time_original = str(date_time_original, "utf-8")
+            index = TiffIndex.from_bytes(heif_file.info["exif"])
         else:
             raise ValueError(f"Unsupported file({file_path}) format: {file_ext}")
 
-        return ExifData(
-            date_time_original=date_time_original,
-        )
+        return ExifData.from_index(index)